@@ -3,14 +3,19 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
 from django.utils.html import format_html
-from django.db.models import Count, Sum, Avg
+from django.db.models import Count, DecimalField, Exists, OuterRef, Subquery, Sum, Avg, Value
+from django.db.models.functions import Coalesce, Now
+from .admin_tools import ExactLookupSearchMixin, bulk_update_action, report, run_in_chunks
 from .models import (
     UserProfile, UserWallet, Transaction, MpesaTransaction,
     Analyst, CryptoAnalysis, PurchasedAnalysis, 
     AnalysisRating, Category, Consultation, ConsultationPackage,
     SiteSetting, MarketInsight, ChartAnnotation, TechnicalIndicatorData,
     AnalysisInsight, AnalysisMetric, ConsultationAttachment, ConsultationReminder,
-    ConsultationChatRoom, ChatMessage, ConsultationParticipant
+    ConsultationChatRoom, ChatMessage, ConsultationParticipant,
+    ContentBlob, ChunkedUpload, ViewSketch, RelatedContent,
+    AlsoBought, CoPurchaseState, AnalystDailyStats, AnalysisDailyStats, SymbolDailyStats,
+    PriceAlert, PriceAlertCursor
 )
 
 class UserProfileInline(admin.StackedInline):
@@ -32,17 +37,22 @@ class UserAdmin(BaseUserAdmin):
     list_display = ['username', 'email', 'first_name', 'last_name', 'is_staff', 'date_joined', 'get_balance', 'get_purchases_count']
     list_filter = ['is_staff', 'is_superuser', 'is_active', 'date_joined']
     
+    def get_queryset(self, request):
+        balances = UserWallet.objects.filter(user=OuterRef('pk')).values('balance')[:1]
+        return super().get_queryset(request).annotate(
+            wallet_balance=Coalesce(Subquery(balances), Value(0), output_field=DecimalField(max_digits=10, decimal_places=2)),
+            purchases_count=Count('purchasedanalysis'),
+        )
+    
     def get_balance(self, obj):
-        try:
-            wallet = obj.userwallet
-            return f"${wallet.balance}"
-        except UserWallet.DoesNotExist:
-            return "$0.00"
+        return f"${obj.wallet_balance:.2f}"
     get_balance.short_description = 'Balance'
+    get_balance.admin_order_field = 'wallet_balance'
     
     def get_purchases_count(self, obj):
-        return obj.purchasedanalysis_set.count()
+        return obj.purchases_count
     get_purchases_count.short_description = 'Purchases'
+    get_purchases_count.admin_order_field = 'purchases_count'
 
 # Re-register UserAdmin
 admin.site.unregister(User)
@@ -52,6 +62,7 @@ admin.site.register(User, UserAdmin)
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'phone_number', 'date_of_birth', 'created_at', 'profile_picture_preview']
     search_fields = ['user__username', 'user__email', 'phone_number']
+    list_select_related = ['user']
     list_filter = ['created_at', 'date_of_birth']
     readonly_fields = ['created_at', 'updated_at', 'profile_picture_preview']
     
@@ -65,6 +76,7 @@ class UserProfileAdmin(admin.ModelAdmin):
 class UserWalletAdmin(admin.ModelAdmin):
     list_display = ['user', 'balance_display', 'preferred_payment_method', 'mpesa_verified', 'paypal_verified', 'created_at']
     search_fields = ['user__username', 'user__email', 'wallet_id']
+    list_select_related = ['user']
     list_filter = ['preferred_payment_method', 'mpesa_verified', 'paypal_verified', 'created_at']
     readonly_fields = ['wallet_id', 'created_at', 'updated_at']
     list_editable = ['mpesa_verified', 'paypal_verified']
@@ -74,10 +86,12 @@ class UserWalletAdmin(admin.ModelAdmin):
     balance_display.short_description = 'Balance'
 
 @admin.register(Transaction)
-class TransactionAdmin(admin.ModelAdmin):
+class TransactionAdmin(ExactLookupSearchMixin, admin.ModelAdmin):
     list_display = ['transaction_id_short', 'user', 'amount_display', 'transaction_type', 'payment_method', 'status_badge', 'created_at']
     list_filter = ['transaction_type', 'payment_method', 'status', 'created_at']
     search_fields = ['user__username', 'transaction_id', 'mpesa_code', 'paypal_transaction_id', 'description']
+    exact_search_fields = ['id', 'transaction_id', 'mpesa_code', 'reference', 'paypal_transaction_id']
+    list_select_related = ['user']
     readonly_fields = ['transaction_id', 'created_at', 'updated_at']
     list_per_page = 50
     
@@ -104,7 +118,7 @@ class TransactionAdmin(admin.ModelAdmin):
     status_badge.short_description = 'Status'
 
 @admin.register(MpesaTransaction)
-class MpesaTransactionAdmin(admin.ModelAdmin):
+class MpesaTransactionAdmin(ExactLookupSearchMixin, admin.ModelAdmin):
     list_display = [
         'user', 'transaction_type_badge', 'amount_display', 'phone_number', 
         'status_badge', 'mpesa_receipt_number_short', 'transaction_date', 'created_at'
@@ -114,6 +128,8 @@ class MpesaTransactionAdmin(admin.ModelAdmin):
         'user__username', 'phone_number', 'mpesa_receipt_number', 
         'checkout_request_id', 'merchant_request_id'
     ]
+    exact_search_fields = ['id', 'mpesa_receipt_number', 'checkout_request_id', 'merchant_request_id']
+    list_select_related = ['user']
     readonly_fields = ['created_at']
     list_per_page = 25
     
@@ -160,11 +176,23 @@ class MpesaTransactionAdmin(admin.ModelAdmin):
 
 @admin.register(Analyst)
 class AnalystAdmin(admin.ModelAdmin):
-    list_display = ['user', 'analyst_name', 'experience_years', 'verified', 'total_sales', 'rating_stars', 'joined_date']
+    list_display = [
+        'user', 'analyst_name', 'experience_years', 'verified', 'total_sales', 'rating_stars',
+        'performance_score', 'hit_rate', 'resolved_calls', 'joined_date'
+    ]
     list_filter = ['verified', 'experience_years', 'joined_date']
     search_fields = ['user__username', 'user__first_name', 'user__last_name', 'specialization']
-    readonly_fields = ['joined_date', 'total_sales', 'rating']
+    list_select_related = ['user']
+    readonly_fields = [
+        'joined_date', 'total_sales', 'total_revenue', 'rating', 'scored_calls', 'resolved_calls', 'hit_calls',
+        'hit_rate', 'average_return', 'max_drawdown', 'brier_score', 'calibration_error', 'performance_score',
+        'scored_at'
+    ]
     list_editable = ['verified', 'experience_years']
+    actions = [
+        bulk_update_action('mark_verified', 'Mark selected analysts verified', verified=True, is_verified=True),
+        bulk_update_action('mark_unverified', 'Mark selected analysts unverified', verified=False, is_verified=False),
+    ]
     
     def analyst_name(self, obj):
         return obj.analyst_name
@@ -175,18 +203,33 @@ class AnalystAdmin(admin.ModelAdmin):
         return format_html('<span style="color: gold;">{}</span>', stars)
     rating_stars.short_description = 'Rating'
 
+def invalidate_insights():
+    from .services.insights_feed import invalidate
+    invalidate()
+
+def invalidate_analysis_cards():
+    from .services.fragments import analyses_changed
+    analyses_changed()
+
 @admin.register(MarketInsight)
 class MarketInsightAdmin(admin.ModelAdmin):
     list_display = [
         'title', 'insight_type_badge', 'cryptocurrency', 
         'urgency_badge', 'impact_level_badge', 'is_verified', 
-        'is_featured', 'published_at', 'views_count'
+        'is_featured', 'published_at', 'views_count', 'unique_viewers'
     ]
     list_filter = ['insight_type', 'urgency', 'impact_level', 'is_verified', 'is_featured', 'published_at']
     search_fields = ['title', 'cryptocurrency', 'summary', 'key_takeaways']
-    readonly_fields = ['views_count', 'created_at', 'updated_at']
+    readonly_fields = ['views_count', 'unique_viewers', 'created_at', 'updated_at']
     list_editable = ['is_featured', 'is_verified']
     list_per_page = 20
+    actions = [
+        bulk_update_action('feature', 'Feature selected insights', after=invalidate_insights, is_featured=True),
+        bulk_update_action('unfeature', 'Unfeature selected insights', after=invalidate_insights, is_featured=False),
+        bulk_update_action('activate', 'Activate selected insights', after=invalidate_insights, is_active=True),
+        bulk_update_action('deactivate', 'Deactivate selected insights', after=invalidate_insights, is_active=False),
+        bulk_update_action('mark_verified', 'Mark selected insights verified', after=invalidate_insights, is_verified=True),
+    ]
     
     def insight_type_badge(self, obj):
         colors = {
@@ -239,11 +282,31 @@ class CryptoAnalysisAdmin(admin.ModelAdmin):
         'price_display', 'risk_level_badge', 'recommendation_badge', 
         'is_active', 'is_featured', 'sales_count', 'has_charts', 'created_at'
     ]
-    list_filter = ['analysis_type', 'risk_level', 'recommendation', 'is_active', 'is_featured', 'created_at']
+    list_filter = ['analysis_type', 'category', 'risk_level', 'recommendation', 'call_status', 'is_active', 'is_featured', 'created_at']
     search_fields = ['cryptocurrency', 'symbol', 'analyst__user__username', 'title', 'description']
-    readonly_fields = ['sales_count', 'views_count', 'rating', 'created_at', 'updated_at', 'chart_data_preview']
+    list_select_related = ['analyst__user']
+    readonly_fields = [
+        'sales_count', 'total_revenue', 'views_count', 'unique_viewers', 'rating', 'rating_sum', 'rating_count',
+        'overall_score', 'growth_potential', 'call_status', 'call_return', 'call_drawdown', 'call_hit', 'call_brier',
+        'scored_at', 'created_at', 'updated_at', 'chart_data_preview'
+    ]
     list_editable = ['is_active', 'is_featured']
     filter_horizontal = []
+    actions = [
+        bulk_update_action('feature', 'Feature selected analyses', after=invalidate_analysis_cards, is_featured=True),
+        bulk_update_action('unfeature', 'Unfeature selected analyses', after=invalidate_analysis_cards, is_featured=False),
+        bulk_update_action('activate', 'Activate selected analyses', after=invalidate_analysis_cards, is_active=True),
+        bulk_update_action('deactivate', 'Deactivate selected analyses', after=invalidate_analysis_cards, is_active=False),
+        'recompute_stats',
+    ]
+    
+    @admin.action(description='Recompute sales and rating stats')
+    def recompute_stats(self, request, queryset):
+        from .services.aggregates import reconcile
+        rows, elapsed = run_in_chunks(
+            queryset, lambda chunk: len(reconcile(analyses=chunk)['analyses']), label='Recompute stats'
+        )
+        report(self, request, 'Recompute stats', rows, elapsed)
     
     def price_display(self, obj):
         if obj.discount_percentage > 0:
@@ -282,8 +345,14 @@ class CryptoAnalysisAdmin(admin.ModelAdmin):
         )
     recommendation_badge.short_description = 'Recommendation'
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            has_annotations=Exists(ChartAnnotation.objects.filter(analysis=OuterRef('pk'))),
+            has_indicators=Exists(TechnicalIndicatorData.objects.filter(analysis=OuterRef('pk'))),
+        )
+    
     def has_charts(self, obj):
-        return obj.has_interactive_charts
+        return bool(obj.chart_data) or obj.has_annotations or obj.has_indicators
     has_charts.boolean = True
     has_charts.short_description = 'Charts'
     
@@ -299,6 +368,7 @@ class ChartAnnotationAdmin(admin.ModelAdmin):
     list_display = ['analysis', 'type_badge', 'price_level', 'description_short', 'created_at']
     list_filter = ['type', 'created_at']
     search_fields = ['analysis__cryptocurrency', 'description']
+    list_select_related = ['analysis']
     readonly_fields = ['created_at']
     
     def type_badge(self, obj):
@@ -328,6 +398,7 @@ class TechnicalIndicatorDataAdmin(admin.ModelAdmin):
     list_display = ['analysis', 'indicator_type_badge', 'parameters_display', 'created_at']
     list_filter = ['indicator_type', 'created_at']
     search_fields = ['analysis__cryptocurrency']
+    list_select_related = ['analysis']
     readonly_fields = ['created_at']
     
     def indicator_type_badge(self, obj):
@@ -358,6 +429,7 @@ class AnalysisInsightAdmin(admin.ModelAdmin):
     list_display = ['analysis', 'title', 'importance_badge', 'category_badge', 'created_at']
     list_filter = ['importance', 'category', 'created_at']
     search_fields = ['analysis__cryptocurrency', 'title', 'description']
+    list_select_related = ['analysis']
     readonly_fields = ['created_at']
     
     def importance_badge(self, obj):
@@ -394,6 +466,7 @@ class AnalysisMetricAdmin(admin.ModelAdmin):
     list_display = ['analysis', 'name', 'current_value', 'previous_value', 'change', 'trend_badge']
     list_filter = ['trend']
     search_fields = ['analysis__cryptocurrency', 'name']
+    list_select_related = ['analysis']
     
     def trend_badge(self, obj):
         colors = {
@@ -418,8 +491,12 @@ class PurchasedAnalysisAdmin(admin.ModelAdmin):
     list_display = ['user', 'analysis', 'purchase_price_display', 'purchased_at', 'access_expires', 'is_expired_badge', 'rating_given_stars']
     list_filter = ['purchased_at', 'access_expires']
     search_fields = ['user__username', 'analysis__cryptocurrency', 'analysis__symbol']
+    list_select_related = ['user', 'analysis']
     readonly_fields = ['purchased_at']
     list_per_page = 25
+    actions = [
+        bulk_update_action('expire_access', 'Expire access for selected purchases', access_expires=Now()),
+    ]
     
     def purchase_price_display(self, obj):
         return f"${obj.purchase_price:,.2f}"
@@ -443,6 +520,7 @@ class AnalysisRatingAdmin(admin.ModelAdmin):
     list_display = ['analysis', 'user', 'rating_stars', 'created_at', 'has_review']
     list_filter = ['rating', 'created_at']
     search_fields = ['analysis__cryptocurrency', 'user__username', 'review']
+    list_select_related = ['analysis', 'user']
     readonly_fields = ['created_at']
     
     def rating_stars(self, obj):
@@ -462,16 +540,54 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description']
     list_editable = ['is_active']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(analyses_total=Count('cryptoanalysis'))
+    
     def analyses_count(self, obj):
-        return obj.cryptoanalysis_set.count()
+        return obj.analyses_total
     analyses_count.short_description = 'Analyses'
+    analyses_count.admin_order_field = 'analyses_total'
+
+class AnalystListFilter(admin.SimpleListFilter):
+    """Analyst filter whose choices are labelled without a query per analyst"""
+    title = 'analyst'
+    parameter_name = 'analyst__id__exact'
+    
+    def lookups(self, request, model_admin):
+        return [(analyst.id, str(analyst)) for analyst in Analyst.objects.select_related('user').order_by('user__username')]
+    
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(analyst_id=self.value())
+        return queryset
 
 @admin.register(Consultation)
 class ConsultationAdmin(admin.ModelAdmin):
     list_display = ['user', 'title', 'level_badge', 'price_display', 'scheduled_date', 'status_badge', 'meeting_platform', 'created_at']
-    list_filter = ['level', 'status', 'meeting_platform', 'scheduled_date', 'created_at']
+    list_filter = ['level', 'status', 'meeting_platform', AnalystListFilter, 'scheduled_date', 'created_at']
     search_fields = ['user__username', 'title', 'description', 'notes']
+    list_select_related = ['user']
     readonly_fields = ['created_at', 'updated_at', 'meeting_details']
+    actions = ['provision_consultations', 'refund_consultations']
+    
+    @admin.action(description='Refund selected paid consultations')
+    def refund_consultations(self, request, queryset):
+        from .services.wallet import refund_consultations
+        credited = []
+        
+        def refund(chunk):
+            count, amount = refund_consultations(chunk)
+            credited.append(amount)
+            return count
+        
+        rows, elapsed = run_in_chunks(queryset, refund, label='Refund consultations')
+        report(self, request, f"Refund consultations (${sum(credited):,.2f} credited to wallets)", rows, elapsed)
+    
+    @admin.action(description='Provision meeting links, reminders and chat rooms')
+    def provision_consultations(self, request, queryset):
+        from .services.consultations import provision_existing
+        count = provision_existing(queryset)
+        self.message_user(request, f"Provisioned {count} scheduled consultation(s).")
     
     def price_display(self, obj):
         return f"${obj.price:,.2f}"
@@ -564,6 +680,7 @@ class ConsultationAttachmentAdmin(admin.ModelAdmin):
     list_display = ['consultation', 'file_name', 'file_type', 'uploaded_by', 'uploaded_at']
     list_filter = ['file_type', 'uploaded_at']
     search_fields = ['consultation__title', 'file_name', 'description']
+    list_select_related = ['consultation__user', 'uploaded_by']
     readonly_fields = ['uploaded_at']
     
     def file_preview(self, obj):
@@ -577,7 +694,8 @@ class ConsultationReminderAdmin(admin.ModelAdmin):
     list_display = ['consultation', 'reminder_type_badge', 'scheduled_time', 'is_sent_badge', 'sent_time']
     list_filter = ['reminder_type', 'is_sent', 'scheduled_time']
     search_fields = ['consultation__title', 'consultation__user__username']
-    readonly_fields = ['created_at']
+    list_select_related = ['consultation__user']
+    readonly_fields = ['created_at', 'claim_token', 'claimed_at']
     
     def reminder_type_badge(self, obj):
         colors = {
@@ -603,6 +721,7 @@ class ConsultationChatRoomAdmin(admin.ModelAdmin):
     list_display = ['consultation', 'room_id_short', 'is_active', 'created_at', 'last_activity']
     list_filter = ['is_active', 'created_at']
     search_fields = ['consultation__title', 'room_id']
+    list_select_related = ['consultation__user']
     readonly_fields = ['room_id', 'created_at', 'last_activity']
     
     def room_id_short(self, obj):
@@ -614,6 +733,7 @@ class ChatMessageAdmin(admin.ModelAdmin):
     list_display = ['chat_room', 'user', 'message_type', 'content_short', 'timestamp', 'is_read']
     list_filter = ['message_type', 'is_read', 'timestamp']
     search_fields = ['chat_room__consultation__title', 'user__username', 'content']
+    list_select_related = ['chat_room__consultation', 'user']
     readonly_fields = ['timestamp']
     
     def content_short(self, obj):
@@ -625,8 +745,136 @@ class ConsultationParticipantAdmin(admin.ModelAdmin):
     list_display = ['chat_room', 'user', 'is_online', 'joined_at', 'last_seen']
     list_filter = ['is_online', 'joined_at']
     search_fields = ['chat_room__consultation__title', 'user__username']
+    list_select_related = ['chat_room__consultation', 'user']
     readonly_fields = ['joined_at', 'last_seen']
 
+@admin.register(ContentBlob)
+class ContentBlobAdmin(admin.ModelAdmin):
+    list_display = ['sha256_short', 'content_type', 'size_display', 'created_at']
+    list_filter = ['content_type', 'created_at']
+    search_fields = ['sha256']
+    readonly_fields = ['sha256', 'file', 'size', 'content_type', 'created_at']
+    
+    def sha256_short(self, obj):
+        return obj.sha256[:12] + "..."
+    sha256_short.short_description = 'SHA-256'
+    
+    def size_display(self, obj):
+        return f"{obj.size / 1024:,.1f} KB"
+    size_display.short_description = 'Size'
+
+@admin.register(ChunkedUpload)
+class ChunkedUploadAdmin(admin.ModelAdmin):
+    list_display = ['file_name', 'user', 'message_type', 'progress_display', 'status', 'updated_at']
+    list_filter = ['status', 'message_type', 'created_at']
+    search_fields = ['file_name', 'user__username', 'upload_id']
+    list_select_related = ['user']
+    readonly_fields = ['upload_id', 'offset', 'total_size', 'message', 'created_at', 'updated_at']
+    
+    def progress_display(self, obj):
+        if obj.total_size:
+            return f"{obj.offset * 100 // obj.total_size}%"
+        return "0%"
+    progress_display.short_description = 'Progress'
+
+@admin.register(ViewSketch)
+class ViewSketchAdmin(admin.ModelAdmin):
+    list_display = ['model_label', 'object_id', 'estimate_display', 'updated_at']
+    list_filter = ['model_label']
+    search_fields = ['=object_id']
+    readonly_fields = ['model_label', 'object_id', 'estimate_display', 'updated_at']
+    exclude = ['registers']
+    
+    def estimate_display(self, obj):
+        from .services.view_counters import HyperLogLog
+        return f"~{HyperLogLog(registers=obj.registers).count():,} viewers"
+    estimate_display.short_description = 'Unique Viewers'
+
+@admin.register(RelatedContent)
+class RelatedContentAdmin(admin.ModelAdmin):
+    list_display = ['item_type', 'item_id', 'neighbour_count', 'is_stale', 'updated_at']
+    list_filter = ['item_type', 'is_stale']
+    search_fields = ['=item_id']
+    readonly_fields = ['item_type', 'item_id', 'terms', 'neighbours', 'is_stale', 'updated_at']
+    
+    def neighbour_count(self, obj):
+        return sum(len(items) for items in obj.neighbours.values())
+    neighbour_count.short_description = 'Neighbours'
+
+@admin.register(AlsoBought)
+class AlsoBoughtAdmin(admin.ModelAdmin):
+    list_display = ['analysis', 'neighbour_count', 'updated_at']
+    search_fields = ['analysis__title', 'analysis__cryptocurrency', '=analysis__id']
+    readonly_fields = ['analysis', 'neighbours', 'updated_at']
+    list_select_related = ['analysis']
+    
+    def neighbour_count(self, obj):
+        return len(obj.neighbours)
+    neighbour_count.short_description = 'Neighbours'
+
+@admin.register(CoPurchaseState)
+class CoPurchaseStateAdmin(admin.ModelAdmin):
+    list_display = ['watermark', 'matrix_size', 'built_at']
+    readonly_fields = ['watermark', 'matrix_size', 'built_at']
+    exclude = ['matrix']
+    
+    def matrix_size(self, obj):
+        return f"{len(obj.matrix) / 1024:,.1f} KB"
+    matrix_size.short_description = 'Stored Size'
+
+ROLLUP_FIELDS = ['date', 'sales', 'revenue', 'refunds', 'refunded', 'rating_sum', 'rating_count']
+
+@admin.register(AnalystDailyStats)
+class AnalystDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ['analyst', 'date', 'sales', 'revenue', 'refunds', 'refunded', 'rating_count']
+    list_filter = ['date']
+    search_fields = ['analyst__user__username']
+    readonly_fields = ['analyst'] + ROLLUP_FIELDS
+    list_select_related = ['analyst__user']
+    date_hierarchy = 'date'
+    ordering = ['-date']
+
+@admin.register(AnalysisDailyStats)
+class AnalysisDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ['analysis', 'date', 'sales', 'revenue', 'refunds', 'refunded', 'rating_count']
+    list_filter = ['date']
+    search_fields = ['analysis__title', '=analysis__id']
+    readonly_fields = ['analysis', 'analyst'] + ROLLUP_FIELDS
+    list_select_related = ['analysis']
+    date_hierarchy = 'date'
+    ordering = ['-date']
+
+@admin.register(SymbolDailyStats)
+class SymbolDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ['symbol', 'date', 'sales', 'revenue', 'refunds', 'refunded', 'rating_count']
+    list_filter = ['date']
+    search_fields = ['symbol']
+    readonly_fields = ['symbol'] + ROLLUP_FIELDS
+    date_hierarchy = 'date'
+    ordering = ['-date']
+
+@admin.register(PriceAlert)
+class PriceAlertAdmin(admin.ModelAdmin):
+    list_display = ['analysis', 'level_type', 'label', 'level_price', 'direction', 'crossed_price', 'crossed_at', 'notified_badge']
+    list_filter = ['level_type', 'direction', 'crossed_at']
+    search_fields = ['analysis__title', 'analysis__symbol', '=analysis__id']
+    readonly_fields = ['analysis', 'level_key', 'level_type', 'label', 'level_price', 'crossed_price', 'direction',
+                       'crossed_at', 'created_at', 'notified_at']
+    list_select_related = ['analysis']
+    date_hierarchy = 'crossed_at'
+    
+    def notified_badge(self, obj):
+        if obj.notified_at:
+            return format_html('<span style="color: green;">✓ Notified</span>')
+        return format_html('<span style="color: orange;">Pending</span>')
+    notified_badge.short_description = 'Notified'
+
+@admin.register(PriceAlertCursor)
+class PriceAlertCursorAdmin(admin.ModelAdmin):
+    list_display = ['symbol', 'last_timestamp', 'last_price', 'updated_at']
+    search_fields = ['symbol']
+    readonly_fields = ['updated_at']
+
 @admin.register(SiteSetting)
 class SiteSettingAdmin(admin.ModelAdmin):
     list_display = ['name', 'is_active', 'hero_video_preview', 'created_at']
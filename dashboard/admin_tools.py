@@ -0,0 +1,182 @@
+"""
+Changelist helpers for tables too large for exact counts and wildcard search.
+
+``EstimatedCountPaginator`` reads the planner's row estimate for unfiltered
+changelists (PostgreSQL ``pg_class.reltuples``, MySQL
+``information_schema.tables``) and otherwise uses a bounded ``COUNT`` that
+is cached briefly, so paging through a large table never counts it.
+
+``ExactLookupSearchMixin`` tries indexed exact matches on identifier
+columns (primary keys, UUIDs, receipt and reference numbers) before the
+admin's ``LIKE '%term%'`` search, which cannot use an index.
+
+``run_in_chunks`` and ``bulk_update_action`` let admin actions work on large
+selections as a series of set-based statements, walking the selection by
+primary key in chunks instead of saving object by object.
+"""
+import hashlib
+import logging
+import time
+import uuid
+
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections, models
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+logger = logging.getLogger(__name__)
+
+# Below this many rows an exact count is cheap enough
+ESTIMATE_THRESHOLD = 100_000
+
+# Filtered counts stop here; later pages are reached by narrowing the filter
+MAX_EXACT_COUNT = 100_000
+
+# Counts this large are cached briefly; smaller ones are cheap to repeat
+CACHE_COUNTS_FROM = 10_000
+COUNT_CACHE_TIMEOUT = 60
+
+
+def table_row_estimate(model, using):
+    """Row count from database statistics, or None where there are none"""
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            elif connection.vendor == 'mysql':
+                cursor.execute(
+                    'SELECT table_rows FROM information_schema.tables '
+                    'WHERE table_schema = DATABASE() AND table_name = %s',
+                    [table],
+                )
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError as e:
+        logger.warning(f"Could not read row estimate for {table}: {str(e)}")
+        return None
+    # PostgreSQL reports -1 for tables that were never analysed
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def cached_count(queryset, limit=MAX_EXACT_COUNT):
+    """``min(count, limit)`` for ``queryset``; large counts are cached for a short while"""
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.md5(f"{queryset.db}:{sql}:{params!r}".encode()).hexdigest()
+    key = f"admin-count:{digest}"
+    count = cache.get(key)
+    if count is None:
+        count = queryset.order_by()[:limit].count()
+        if count >= CACHE_COUNTS_FROM:
+            cache.set(key, count, COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator whose count never scans a large table"""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+        if not queryset.query.where:
+            estimate = table_row_estimate(queryset.model, queryset.db)
+            if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+                return estimate
+        return cached_count(queryset)
+
+
+class ExactLookupSearchMixin:
+    """
+    ModelAdmin mixin: a single-token search is first matched exactly against
+    ``exact_search_fields`` (all indexed); the regular ``search_fields``
+    search only runs when nothing matches.
+    """
+    exact_search_fields = ()
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    def exact_search_lookup(self, term):
+        lookup = Q()
+        for name in self.exact_search_fields:
+            field = self.model._meta.get_field(name)
+            if isinstance(field, models.UUIDField):
+                try:
+                    lookup |= Q(**{name: uuid.UUID(term)})
+                except ValueError:
+                    continue
+            elif isinstance(field, (models.AutoField, models.IntegerField)):
+                if term.isdigit():
+                    lookup |= Q(**{name: int(term)})
+            else:
+                lookup |= Q(**{f'{name}__in': {term, term.upper()}})
+        return lookup
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if term and not any(char.isspace() for char in term):
+            lookup = self.exact_search_lookup(term)
+            if lookup:
+                matches = queryset.filter(lookup)
+                if matches.exists():
+                    return matches, False
+        return super().get_search_results(request, queryset, search_term)
+
+
+# Rows handled per statement by bulk admin actions
+ACTION_CHUNK_SIZE = 1000
+
+
+def run_in_chunks(queryset, handler, chunk_size=ACTION_CHUNK_SIZE, label='Bulk action'):
+    """
+    Call ``handler`` with successive primary-key chunks of ``queryset`` (as
+    querysets) and add up the row counts it returns.
+
+    Chunks are taken by keyset on the primary key, so rows an update moves
+    out of the filter are not skipped or revisited. Returns
+    ``(rows, elapsed_seconds)``.
+    """
+    started = time.monotonic()
+    model = queryset.model
+    total = queryset.count()
+    done = rows = 0
+    last_pk = None
+    while True:
+        page = queryset.order_by('pk')
+        if last_pk is not None:
+            page = page.filter(pk__gt=last_pk)
+        pks = list(page.values_list('pk', flat=True)[:chunk_size])
+        if not pks:
+            break
+        rows += handler(model._default_manager.filter(pk__in=pks))
+        done += len(pks)
+        last_pk = pks[-1]
+        logger.info(f"{label}: {done}/{total} selected rows processed")
+    return rows, time.monotonic() - started
+
+
+def report(modeladmin, request, label, rows, elapsed):
+    modeladmin.message_user(request, f"{label}: {rows} row(s) updated in {elapsed:.2f}s.")
+
+
+def bulk_update_action(name, description, after=None, **values):
+    """
+    Admin action that applies ``values`` with chunked ``UPDATE`` statements.
+
+    ``post_save`` receivers do not run; ``after`` is called once at the end
+    for whatever they would have done (cache invalidation and the like).
+    """
+    def action(modeladmin, request, queryset):
+        rows, elapsed = run_in_chunks(queryset, lambda chunk: chunk.update(**values), label=description)
+        if after is not None:
+            after()
+        report(modeladmin, request, description, rows, elapsed)
+    action.__name__ = name
+    return admin.action(description=description)(action)
@@ -0,0 +1,45 @@
+from django.conf import settings
+
+from .routers import replicas, use_replica
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serve ``REPLICA_VIEWS`` and admin changelists from a read replica, and
+    pin a browser to the primary for ``REPLICA_PIN_SECONDS`` after it
+    writes (read-your-writes).
+
+    The replica stays selected until the response has been rendered, since
+    template responses (admin) run their queries then.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.views = set(getattr(settings, 'REPLICA_VIEWS', ()))
+        self.cookie = getattr(settings, 'REPLICA_PIN_COOKIE', 'db_pin')
+        self.pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+
+    def __call__(self, request):
+        request.replica_context = None
+        try:
+            response = self.get_response(request)
+        finally:
+            if request.replica_context is not None:
+                request.replica_context.__exit__(None, None, None)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(self.cookie, '1', max_age=self.pin_seconds, httponly=True, samesite='Lax')
+        return response
+
+    def replica_view(self, match):
+        if match.url_name in self.views:
+            return True
+        return match.namespace == 'admin' and (match.url_name or '').endswith('_changelist')
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (request.method in SAFE_METHODS and replicas() and not request.COOKIES.get(self.cookie)
+                and self.replica_view(request.resolver_match)):
+            request.replica_context = use_replica()
+            request.replica_context.__enter__()
+        return None
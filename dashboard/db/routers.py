@@ -0,0 +1,54 @@
+"""
+Read/write routing between the primary ("default") and read replicas.
+
+Writes always go to the primary. Reads go to the primary too, except
+inside ``use_replica()``, where they are spread over
+``DATABASE_REPLICAS``. ``ReplicaRoutingMiddleware`` turns that on for the
+read-only reporting pages in ``REPLICA_VIEWS`` and admin changelists, so
+long reporting queries run away from the database taking payments.
+
+Replication lags, so a browser that just wrote something (purchase,
+deposit, booking) is pinned to the primary for ``REPLICA_PIN_SECONDS`` and
+reads its own writes.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+@contextmanager
+def use_replica(enabled=True):
+    """Send reads in this block to a replica (or, with ``enabled=False``, to the primary)"""
+    token = _use_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        aliases = replicas()
+        if aliases and _use_replica.get():
+            return random.choice(aliases)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes through replication
+        return db == 'default'
@@ -0,0 +1,31 @@
+"""
+SQLite backend tuned for concurrent writers.
+
+New connections get ``SQLITE_PRAGMAS`` (WAL journal, busy timeout, relaxed
+fsync, mmap). ``atomic()`` blocks open with ``BEGIN <SQLITE_TRANSACTION_MODE>``
+(IMMEDIATE by default) so a transaction takes the write lock when it starts
+and waits ``busy_timeout`` for it. With the stock deferred ``BEGIN`` a
+transaction that reads first and then writes (wallet updates) fails with
+"database is locked" straight away when another writer got in between,
+because SQLite cannot upgrade a stale read snapshot.
+
+In-memory databases (the test database) are left alone: they have no
+journal, and their shared-cache connections lock whole tables instead.
+"""
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        if self.is_in_memory_db():
+            return conn
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = '' if self.is_in_memory_db() else getattr(settings, 'SQLITE_TRANSACTION_MODE', '')
+        self.cursor().execute(f"BEGIN {mode}".strip())
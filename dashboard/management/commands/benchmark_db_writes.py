@@ -0,0 +1,136 @@
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+from django.utils import timezone
+
+from dashboard.models import (
+    Analyst, Consultation, ConsultationChatRoom, ConsultationParticipant, CryptoAnalysis, Transaction, UserWallet
+)
+from dashboard.services import view_counters
+
+PREFIX = 'dbbench-'
+
+# Share of each write in the mix, roughly as the site sees them
+MIX = (('presence', 5), ('view', 4), ('wallet', 1))
+
+
+class Command(BaseCommand):
+    help = ('Measure write throughput of the configured database on the site\'s write mix '
+            '(presence updates, view counter flushes, wallet saves). Run it once per configuration, '
+            'e.g. with DATABASE_URL or SQLITE_PRAGMAS=off set, against a copy of the data.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent writers')
+        parser.add_argument('--seconds', type=float, default=10, help='Length of the run')
+        parser.add_argument('--users', type=int, default=50, help='Benchmark users (and wallets) to spread writes over')
+
+    def handle(self, *args, **options):
+        try:
+            self.fixtures(options['users'])
+            results, elapsed = self.run(options['threads'], options['seconds'])
+        finally:
+            self.cleanup()
+        self.summary(results, elapsed, options['threads'])
+
+    def fixtures(self, count):
+        self.users = [User.objects.create(username=f'{PREFIX}{i}') for i in range(count)]
+        analyst = Analyst.objects.create(user=User.objects.create(username=f'{PREFIX}analyst'))
+        consultation = Consultation.objects.create(
+            user=self.users[0], analyst=analyst, title='Benchmark', status='scheduled',
+            scheduled_date=timezone.now() + timedelta(days=1),
+        )
+        room, created = ConsultationChatRoom.objects.get_or_create(consultation=consultation)
+        ConsultationParticipant.objects.bulk_create(
+            (ConsultationParticipant(chat_room=room, user=user) for user in self.users), ignore_conflicts=True
+        )
+        self.participants = list(ConsultationParticipant.objects.filter(chat_room=room))
+        self.analyses = [CryptoAnalysis.objects.create(
+            analyst=analyst, title=f'Benchmark {i}', cryptocurrency='Bitcoin', symbol='BTC',
+            analysis_type='technical', timeframe='short_term', risk_level='low', description='-',
+            executive_summary='-', preview_content='-', full_content='-',
+        ) for i in range(10)]
+
+    def cleanup(self):
+        # Analyses, chat rooms, wallets and transactions cascade from the users
+        User.objects.filter(username__startswith=PREFIX).delete()
+
+    def presence(self, rng):
+        rng.choice(self.participants).update_online_status(True)
+
+    def view(self, rng):
+        view_counters.record_view(rng.choice(self.analyses), viewer=rng.random())
+        view_counters.flush()
+
+    def wallet(self, rng):
+        user = rng.choice(self.users)
+        with transaction.atomic():
+            wallet = UserWallet.objects.select_for_update().get(user=user)
+            wallet.balance += Decimal('1.00')
+            wallet.save()
+            Transaction.objects.create(user=user, amount=Decimal('1.00'), transaction_type='deposit',
+                                       payment_method='paypal', status='completed', description='Benchmark')
+
+    def run(self, threads, seconds):
+        operations = [name for name, weight in MIX for _ in range(weight)]
+        results = defaultdict(lambda: {'latencies': [], 'errors': 0})
+        lock = threading.Lock()
+        deadline = time.monotonic() + seconds
+
+        def worker(seed):
+            rng = random.Random(seed)
+            local = defaultdict(lambda: {'latencies': [], 'errors': 0})
+            try:
+                while time.monotonic() < deadline:
+                    name = rng.choice(operations)
+                    started = time.perf_counter()
+                    try:
+                        getattr(self, name)(rng)
+                    except OperationalError:
+                        local[name]['errors'] += 1
+                        continue
+                    local[name]['latencies'].append(time.perf_counter() - started)
+            finally:
+                connection.close()
+            with lock:
+                for name, result in local.items():
+                    results[name]['latencies'] += result['latencies']
+                    results[name]['errors'] += result['errors']
+
+        started = time.monotonic()
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return results, time.monotonic() - started
+
+    def summary(self, results, elapsed, threads):
+        settings_dict = connection.settings_dict
+        mode = ''
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                mode = f", journal_mode={cursor.fetchone()[0]}"
+        self.stdout.write(f"{connection.vendor} ({settings_dict['NAME']}{mode}, "
+                          f"CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']}), {threads} threads, {elapsed:.1f}s")
+        total = 0
+        for name, _ in MIX:
+            latencies = sorted(results[name]['latencies'])
+            total += len(latencies)
+            if not latencies:
+                self.stdout.write(f"  {name:<9} no successful writes, {results[name]['errors']} errors")
+                continue
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            self.stdout.write(
+                f"  {name:<9} {len(latencies) / elapsed:8.1f}/s  p50 {statistics.median(latencies) * 1000:7.2f} ms  "
+                f"p99 {p99 * 1000:7.2f} ms  errors {results[name]['errors']}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"  total     {total / elapsed:8.1f} writes/s"))
@@ -0,0 +1,103 @@
+import gzip
+import re
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from dashboard.models import Analyst, Consultation
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PREFIX = 'pagebench-'
+
+PAGES = [
+    'base', 'dashboard', 'marketplace', 'portfolio', 'profile', 'wallet', 'deposit_funds', 'withdraw_funds',
+    'transaction_history', 'my_consultations', 'book_consultation', 'market_insights', 'consultation_chat',
+]
+
+INLINE = re.compile(r'<(style|script)(?![^>]*\bsrc=)[^>]*>(.*?)</\1>', re.S)
+LOCAL_ASSETS = re.compile(r'<(?:link[^>]+href|script[^>]+src)="/static/([^"?]+\.(?:css|js))"')
+
+
+def _compressed(data):
+    if brotli is not None:
+        return 'br', len(brotli.compress(data, quality=11))
+    return 'gzip', len(gzip.compress(data, compresslevel=9))
+
+
+class Command(BaseCommand):
+    help = ('Measure each page\'s HTML size, inline CSS/JS, local static assets and time to first byte '
+            'as a signed-in user. Run before and after template changes to compare.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('pages', nargs='*', help=f'URL names to fetch (default: {", ".join(PAGES)})')
+        parser.add_argument('--repeat', type=int, default=20, help='Requests per page; the median is reported')
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST='localhost')
+        try:
+            paths = self.fixtures(client, options['pages'] or PAGES)
+            rows = [self.measure(client, name, path, options['repeat']) for name, path in paths]
+        finally:
+            self.cleanup()
+        self.summary(rows)
+
+    def fixtures(self, client, names):
+        user = User.objects.create(username=f'{PREFIX}user', email=f'{PREFIX}user@example.com')
+        client.force_login(user)
+        analyst = Analyst.objects.create(user=User.objects.create(username=f'{PREFIX}analyst'))
+        consultation = Consultation.objects.create(
+            user=user, analyst=analyst, title='Benchmark', status='scheduled',
+            scheduled_date=timezone.now() + timedelta(days=1),
+        )
+        args = {'consultation_chat': [consultation.id]}
+        return [(name, reverse(name, args=args.get(name))) for name in names]
+
+    def cleanup(self):
+        User.objects.filter(username__startswith=PREFIX).delete()
+
+    def measure(self, client, name, path, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = client.get(path)
+            timings.append(time.perf_counter() - started)
+        html = response.content
+        inline = sum(len(match.group(2).encode()) for match in INLINE.finditer(html.decode()))
+        assets = 0
+        for asset in set(LOCAL_ASSETS.findall(html.decode())):
+            # Hashed names (DEBUG off) are only in STATIC_ROOT
+            found = staticfiles_storage.path(asset) if staticfiles_storage.exists(asset) else finders.find(asset)
+            if found:
+                with open(found, 'rb') as f:
+                    assets += _compressed(f.read())[1]
+        return {
+            'name': name, 'status': response.status_code, 'html': len(html), 'compressed': _compressed(html)[1],
+            'inline': inline, 'assets': assets, 'ttfb': statistics.median(timings),
+        }
+
+    def summary(self, rows):
+        encoding = _compressed(b'')[0]
+        self.stdout.write(f"{'page':<22}{'status':>7}{'html':>10}{encoding:>9}{'inline':>10}"
+                          f"{'assets/' + encoding:>14}{'ttfb ms':>10}")
+        for row in rows:
+            self.stdout.write(
+                f"{row['name']:<22}{row['status']:>7}{row['html']:>10}{row['compressed']:>9}{row['inline']:>10}"
+                f"{row['assets']:>14}{row['ttfb'] * 1000:>10.1f}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{'total':<22}{'':>7}{sum(row['html'] for row in rows):>10}{sum(row['compressed'] for row in rows):>9}"
+            f"{sum(row['inline'] for row in rows):>10}{sum(row['assets'] for row in rows):>14}"
+            f"{sum(row['ttfb'] for row in rows) * 1000:>10.1f}"
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.services import copurchase
+
+
+class Command(BaseCommand):
+    help = 'Update "users also bought" neighbours from new analysis purchases'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Rebuild from every purchase instead of applying new ones since the watermark')
+
+    def handle(self, *args, **options):
+        if options['full']:
+            written = copurchase.rebuild()
+        else:
+            written = copurchase.update()
+        self.stdout.write(self.style.SUCCESS(f"Updated neighbours for {written} analyses"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.services import recommendations
+
+
+class Command(BaseCommand):
+    help = 'Refresh related-content neighbours for analyses and market insights'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Re-read every item and rebuild all neighbour lists')
+
+    def handle(self, *args, **options):
+        refreshed, updated = recommendations.refresh_index(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rescored {refreshed} items, updated {updated} neighbour lists"
+        ))
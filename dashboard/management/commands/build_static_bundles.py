@@ -0,0 +1,92 @@
+import re
+import textwrap
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# A whole-line inline <style> or <script> block (no src, no attributes)
+BLOCK = re.compile(r'^(?P<indent>[ \t]*)<(?P<tag>style|script)>\n(?P<body>.*?)^[ \t]*</(?P=tag)>[ \t]*$', re.S | re.M)
+TEMPLATE_SYNTAX = re.compile(r'\{[{%#]')
+EXTENDS = re.compile(r'^\{% extends [^%]+%\}\n')
+LOAD_STATIC = re.compile(r'\{% load [^%]*\bstatic\b[^%]*%\}')
+
+EXTENSIONS = {'style': 'css', 'script': 'js'}
+TAGS = {
+    'style': '{indent}<link rel="stylesheet" href="{{% static \'{name}\' %}}">',
+    'script': '{indent}<script src="{{% static \'{name}\' %}}"></script>',
+}
+
+
+class Command(BaseCommand):
+    help = ('Move inline <style> and <script> blocks out of the templates into static/bundles/, one file per '
+            'template and block, and reference them with {% static %}. Blocks that use template syntax stay '
+            'inline. collectstatic then fingerprints and compresses the bundles.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Only report blocks that would be moved; exit with an error if there are any')
+
+    def handle(self, *args, **options):
+        templates = Path(settings.TEMPLATES[0]['DIRS'][0])
+        static = Path(settings.STATICFILES_DIRS[0])
+        moved, kept, total = [], [], 0
+        for path in sorted(templates.rglob('*.html')):
+            relative = path.relative_to(templates).with_suffix('')
+            source = path.read_text()
+            output, blocks = self.extract(source, relative, static, kept, options['check'])
+            if not blocks:
+                continue
+            moved += [(relative, name, size) for name, size in blocks]
+            total += sum(size for _, size in blocks)
+            if not options['check']:
+                path.write_text(self.load_static(output))
+
+        for relative, line in kept:
+            self.stdout.write(f"  kept inline (template syntax): {relative}.html:{line}")
+        for relative, name, size in moved:
+            self.stdout.write(f"  {relative}.html -> {name} ({size} bytes)")
+        if options['check']:
+            if moved:
+                raise CommandError(f"{len(moved)} inline blocks ({total} bytes) should be moved to bundles")
+            self.stdout.write(self.style.SUCCESS('No inline blocks left to move'))
+            return
+        self.stdout.write(self.style.SUCCESS(f"Moved {len(moved)} blocks ({total} bytes) into {static / 'bundles'}"))
+
+    def extract(self, source, relative, static, kept, dry_run):
+        blocks = []
+
+        def replace(match):
+            body = match.group('body')
+            if TEMPLATE_SYNTAX.search(body):
+                kept.append((relative, source.count('\n', 0, match.start()) + 1))
+                return match.group(0)
+            name = self.bundle_name(static, relative, EXTENSIONS[match.group('tag')], blocks)
+            content = textwrap.dedent(body).strip('\n') + '\n'
+            if not dry_run:
+                target = static / name
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_text(content)
+            blocks.append((name, len(content.encode())))
+            return TAGS[match.group('tag')].format(indent=match.group('indent'), name=name)
+
+        return BLOCK.sub(replace, source), blocks
+
+    def bundle_name(self, static, relative, extension, taken):
+        """bundles/<template>.<ext>, numbered if the template has several blocks or was bundled before"""
+        taken = {name for name, _ in taken}
+        number = 1
+        while True:
+            suffix = '' if number == 1 else f'-{number}'
+            name = f"bundles/{relative.as_posix()}{suffix}.{extension}"
+            if name not in taken and not (static / name).exists():
+                return name
+            number += 1
+
+    def load_static(self, source):
+        if LOAD_STATIC.search(source):
+            return source
+        extends = EXTENDS.match(source)
+        if extends:
+            return source[:extends.end()] + '{% load static %}\n' + source[extends.end():]
+        return '{% load static %}\n' + source
@@ -0,0 +1,36 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard.services import price_alerts
+
+
+class Command(BaseCommand):
+    help = 'Check new candles against the price levels of purchased analyses and email crossed levels'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=price_alerts.BATCH_SIZE,
+                            help='Alerts claimed and emailed per batch')
+        parser.add_argument('--no-email', action='store_true',
+                            help='Record crossed levels without sending emails')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running and poll for new candles')
+        parser.add_argument('--interval', type=float, default=60,
+                            help='Seconds between polls when looping')
+
+    def handle(self, *args, **options):
+        while True:
+            book = price_alerts.get_book()
+            created = price_alerts.check_symbols(book)
+            message = f"Levels: {len(book)} across {len(book.symbols)} symbols, newly crossed: {created}"
+            if not options['no_email']:
+                stats = price_alerts.dispatch_alerts(batch_size=options['batch_size'])
+                message += f", alerts emailed: {stats['alerts']} in {stats['emails']} emails"
+            self.stdout.write(message)
+
+            if not options['loop']:
+                break
+            # Jitter keeps several workers from polling in lockstep
+            interval = options['interval']
+            time.sleep(interval + random.uniform(0, interval * 0.2))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.services import market_data
+
+
+class Command(BaseCommand):
+    help = 'Load OHLCV candles from CSV or Parquet dumps into the memory-mapped market-data store'
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+',
+                            help='Dump files with timestamp,open,high,low,close,volume columns')
+        parser.add_argument('--symbol', help='Symbol for every file; defaults to each file name (BTC.csv -> BTC)')
+        parser.add_argument('--resolution', default=market_data.BASE_RESOLUTION,
+                            help=f'Candle resolution of the dumps (default {market_data.BASE_RESOLUTION})')
+        parser.add_argument('--rebuild-rollups', action='store_true',
+                            help='Recompute the 1h/1d/1w rollups from scratch after loading')
+
+    def handle(self, *args, **options):
+        for path in options['files']:
+            try:
+                symbol, written = market_data.ingest(path, symbol=options['symbol'], resolution=options['resolution'])
+            except (OSError, market_data.MarketDataError) as e:
+                raise CommandError(f"{path}: {str(e)}")
+            self.stdout.write(self.style.SUCCESS(f"{symbol}: stored {written} {options['resolution']} candles"))
+            if options['rebuild_rollups']:
+                market_data.rebuild_rollups(symbol)
+                self.stdout.write(f"{symbol}: rebuilt {', '.join(market_data.rollup_resolutions())} rollups")
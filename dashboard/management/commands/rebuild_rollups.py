@@ -0,0 +1,28 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from dashboard.services import rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute daily analyst, analysis and symbol rollups from purchases, ratings and refunds'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='First day to rebuild (YYYY-MM-DD); defaults to all history')
+        parser.add_argument('--days', type=int, help='Rebuild only the last N days')
+
+    def handle(self, *args, **options):
+        start = None
+        if options['since']:
+            try:
+                start = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since must be a date in YYYY-MM-DD format')
+        elif options['days']:
+            start = timezone.localdate() - timedelta(days=options['days'] - 1)
+
+        written = rollups.rebuild(start=start)
+        scope = f"since {start}" if start else "for all history"
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} analysis-day rollups {scope}"))
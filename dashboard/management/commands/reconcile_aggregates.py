@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.services import aggregates
+
+
+class Command(BaseCommand):
+    help = 'Recompute analysis and analyst sales/rating aggregates and repair any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report drifted rows without rewriting them')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        drift = aggregates.reconcile(fix=not dry_run, batch_size=options['batch_size'])
+
+        for label, ids in drift.items():
+            if ids and options['verbosity'] > 1:
+                self.stdout.write(f"Drifted {label}: {', '.join(str(pk) for pk in ids)}")
+
+        summary = f"{len(drift['analyses'])} analyses and {len(drift['analysts'])} analysts drifted"
+        if not drift['analyses'] and not drift['analysts']:
+            self.stdout.write(self.style.SUCCESS('All aggregates are consistent'))
+        elif dry_run:
+            self.stdout.write(self.style.WARNING(f"{summary} (dry run, nothing written)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{summary}; repaired"))
@@ -0,0 +1,32 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard.services import analyst_scores
+
+
+class Command(BaseCommand):
+    help = 'Score every analysis and analyst against realized prices (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=analyst_scores.CHUNK_SIZE,
+                            help='Analyses scored and written per pass')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running and rescore every interval')
+        parser.add_argument('--interval', type=float, default=86400,
+                            help='Seconds between runs when looping')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = analyst_scores.score_all(chunk_size=options['chunk_size'])
+            self.stdout.write(
+                f"Analyses scored: {stats['analyses']} ({stats['analyses_updated']} changed), "
+                f"analysts updated: {stats['analysts_updated']}"
+            )
+
+            if not options['loop']:
+                break
+            # Jitter keeps several workers from running in lockstep
+            interval = options['interval']
+            time.sleep(interval + random.uniform(0, interval * 0.02))
@@ -0,0 +1,41 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard.services import reminders
+
+
+class Command(BaseCommand):
+    help = 'Send due consultation reminders and follow-up emails'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=reminders.BATCH_SIZE,
+                            help='Reminders claimed and sent per batch')
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='Stop after this many batches per run')
+        parser.add_argument('--pause', type=float, default=0,
+                            help='Seconds to wait between batches while catching up')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running and poll for due reminders')
+        parser.add_argument('--interval', type=float, default=60,
+                            help='Seconds between polls when looping')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = reminders.dispatch_reminders(
+                batch_size=options['batch_size'],
+                max_batches=options['max_batches'],
+                pause=options['pause'],
+            )
+            follow_ups = reminders.dispatch_follow_ups(limit=options['batch_size'])
+            self.stdout.write(
+                f"Reminders sent: {stats['sent']}, closed without sending: {stats['skipped']}, "
+                f"failed: {stats['failed']}, follow-ups sent: {follow_ups}"
+            )
+
+            if not options['loop']:
+                break
+            # Jitter keeps several workers from polling in lockstep
+            interval = options['interval']
+            time.sleep(interval + random.uniform(0, interval * 0.2))
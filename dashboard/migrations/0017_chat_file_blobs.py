@@ -0,0 +1,78 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:45
+
+import dashboard.models
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('dashboard', '0016_consultationchatroom_chatmessage_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('upload_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('file_name', models.CharField(max_length=255)),
+                ('content_type', models.CharField(max_length=100)),
+                ('message_type', models.CharField(choices=[('text', 'Text'), ('file', 'File'), ('system', 'System Message'), ('image', 'Image'), ('video', 'Video'), ('document', 'Document'), ('voice', 'Voice Message'), ('emoji', 'Emoji')], default='document', max_length=10)),
+                ('total_size', models.BigIntegerField()),
+                ('offset', models.BigIntegerField(default=0)),
+                ('status', models.CharField(choices=[('uploading', 'Uploading'), ('complete', 'Complete')], default='uploading', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ContentBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('file', models.FileField(max_length=255, upload_to=dashboard.models.content_blob_path)),
+                ('size', models.BigIntegerField(default=0)),
+                ('content_type', models.CharField(default='application/octet-stream', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='chatmessage',
+            name='message_type',
+            field=models.CharField(choices=[('text', 'Text'), ('file', 'File'), ('system', 'System Message'), ('image', 'Image'), ('video', 'Video'), ('document', 'Document'), ('voice', 'Voice Message'), ('emoji', 'Emoji')], default='text', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='chunkedupload',
+            name='chat_room',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='dashboard.consultationchatroom'),
+        ),
+        migrations.AddField(
+            model_name='chunkedupload',
+            name='message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='dashboard.chatmessage'),
+        ),
+        migrations.AddField(
+            model_name='chunkedupload',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='chatmessage',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='chat_messages', to='dashboard.contentblob'),
+        ),
+        migrations.AddField(
+            model_name='consultationattachment',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='attachments', to='dashboard.contentblob'),
+        ),
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(condition=models.Q(('blob__isnull', False)), fields=['chat_room', '-id'], name='chat_media_idx'),
+        ),
+    ]
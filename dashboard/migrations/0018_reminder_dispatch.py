@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0017_chat_file_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='consultationreminder',
+            name='claim_token',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='consultationreminder',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='consultationreminder',
+            index=models.Index(fields=['is_sent', 'scheduled_time'], name='reminder_due_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+from datetime import timedelta
+
+
+def fill_scheduled_end(apps, schema_editor):
+    Consultation = apps.get_model('dashboard', 'Consultation')
+    consultations = list(Consultation.objects.only('id', 'scheduled_date', 'duration_minutes'))
+    for consultation in consultations:
+        consultation.scheduled_end = consultation.scheduled_date + timedelta(minutes=consultation.duration_minutes)
+    Consultation.objects.bulk_update(consultations, ['scheduled_end'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0018_reminder_dispatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='consultation',
+            name='analyst',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='consultations', to='dashboard.analyst'),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='scheduled_end',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(fields=['analyst', 'scheduled_date'], name='consultation_analyst_date_idx'),
+        ),
+        migrations.RunPython(fill_scheduled_end, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0019_consultation_availability'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cryptoanalysis',
+            name='unique_viewers',
+            field=models.IntegerField(default=0, help_text='Estimated distinct viewers'),
+        ),
+        migrations.AddField(
+            model_name='marketinsight',
+            name='unique_viewers',
+            field=models.IntegerField(default=0, help_text='Estimated distinct viewers'),
+        ),
+        migrations.CreateModel(
+            name='ViewSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('registers', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('model_label', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0020_view_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedContent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_type', models.CharField(choices=[('analysis', 'Crypto Analysis'), ('insight', 'Market Insight')], max_length=10)),
+                ('item_id', models.PositiveIntegerField()),
+                ('terms', models.JSONField(default=dict)),
+                ('neighbours', models.JSONField(default=dict)),
+                ('is_stale', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Related content',
+                'unique_together': {('item_type', 'item_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0021_related_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlsoBought',
+            fields=[
+                ('analysis', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='also_bought', serialize=False, to='dashboard.cryptoanalysis')),
+                ('neighbours', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Also bought',
+            },
+        ),
+        migrations.CreateModel(
+            name='CoPurchaseState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('watermark', models.BigIntegerField(default=0, help_text='Highest PurchasedAnalysis id applied')),
+                ('matrix', models.BinaryField(help_text='Sparse co-occurrence matrix in SciPy .npz format')),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
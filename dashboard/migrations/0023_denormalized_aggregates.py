@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:58
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_aggregates(apps, schema_editor):
+    Analyst = apps.get_model('dashboard', 'Analyst')
+    CryptoAnalysis = apps.get_model('dashboard', 'CryptoAnalysis')
+    AnalysisRating = apps.get_model('dashboard', 'AnalysisRating')
+    PurchasedAnalysis = apps.get_model('dashboard', 'PurchasedAnalysis')
+
+    ratings = AnalysisRating.objects.order_by().values('analysis').annotate(total=Sum('rating'), n=Count('id'))
+    for row in ratings:
+        CryptoAnalysis.objects.filter(pk=row['analysis']).update(rating_sum=row['total'], rating_count=row['n'])
+
+    # The old purchase signal and views both bumped sales_count, so recount it from the purchases
+    CryptoAnalysis.objects.update(sales_count=0, total_revenue=0)
+    analysis_sales = PurchasedAnalysis.objects.order_by().values('analysis').annotate(total=Sum('purchase_price'), n=Count('id'))
+    for row in analysis_sales:
+        CryptoAnalysis.objects.filter(pk=row['analysis']).update(sales_count=row['n'], total_revenue=row['total'] or 0)
+
+    sales = PurchasedAnalysis.objects.order_by().values('analysis__analyst').annotate(total=Sum('purchase_price'), n=Count('id'))
+    for row in sales:
+        Analyst.objects.filter(pk=row['analysis__analyst']).update(total_sales=row['n'], total_revenue=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0022_copurchase'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyst',
+            name='total_revenue',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=15),
+        ),
+        migrations.AddField(
+            model_name='cryptoanalysis',
+            name='rating_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='cryptoanalysis',
+            name='rating_sum',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_aggregates, migrations.RunPython.noop),
+    ]
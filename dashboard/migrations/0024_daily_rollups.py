@@ -0,0 +1,100 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0023_denormalized_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('sales', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0.0, max_digits=15)),
+                ('refunds', models.IntegerField(default=0)),
+                ('refunded', models.DecimalField(decimal_places=2, default=0.0, max_digits=15)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('rating_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Analysis daily stats',
+                'ordering': ['date'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='AnalystDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('sales', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0.0, max_digits=15)),
+                ('refunds', models.IntegerField(default=0)),
+                ('refunded', models.DecimalField(decimal_places=2, default=0.0, max_digits=15)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('rating_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Analyst daily stats',
+                'ordering': ['date'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='SymbolDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('sales', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0.0, max_digits=15)),
+                ('refunds', models.IntegerField(default=0)),
+                ('refunded', models.DecimalField(decimal_places=2, default=0.0, max_digits=15)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('rating_count', models.IntegerField(default=0)),
+                ('symbol', models.CharField(max_length=10)),
+            ],
+            options={
+                'verbose_name_plural': 'Symbol daily stats',
+                'ordering': ['date'],
+                'abstract': False,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='symboldailystats',
+            constraint=models.UniqueConstraint(fields=('symbol', 'date'), name='symbol_daily_stats_unique'),
+        ),
+        migrations.AddField(
+            model_name='analystdailystats',
+            name='analyst',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='dashboard.analyst'),
+        ),
+        migrations.AddField(
+            model_name='analysisdailystats',
+            name='analysis',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='dashboard.cryptoanalysis'),
+        ),
+        migrations.AddField(
+            model_name='analysisdailystats',
+            name='analyst',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analysis_daily_stats', to='dashboard.analyst'),
+        ),
+        migrations.AddConstraint(
+            model_name='analystdailystats',
+            constraint=models.UniqueConstraint(fields=('analyst', 'date'), name='analyst_daily_stats_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='analysisdailystats',
+            index=models.Index(fields=['analyst', 'date'], name='analysis_stats_analyst_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='analysisdailystats',
+            constraint=models.UniqueConstraint(fields=('analysis', 'date'), name='analysis_daily_stats_unique'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0024_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cryptoanalysis',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='dashboard.category'),
+        ),
+    ]
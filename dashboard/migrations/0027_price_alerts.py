@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0026_transaction_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceAlertCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=10, unique=True)),
+                ('last_timestamp', models.BigIntegerField(help_text='Unix time of the last candle checked')),
+                ('last_price', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PriceAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level_key', models.CharField(max_length=120)),
+                ('level_type', models.CharField(choices=[('target', 'Price Target'), ('stop_loss', 'Stop Loss'), ('entry', 'Entry Point'), ('exit', 'Exit Point'), ('support', 'Support Level'), ('resistance', 'Resistance Level')], max_length=20)),
+                ('label', models.CharField(blank=True, max_length=100)),
+                ('level_price', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('crossed_price', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('direction', models.CharField(choices=[('up', 'Up'), ('down', 'Down')], max_length=4)),
+                ('crossed_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('notified_at', models.DateTimeField(blank=True, null=True)),
+                ('analysis', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_alerts', to='dashboard.cryptoanalysis')),
+            ],
+            options={
+                'ordering': ['-crossed_at'],
+                'indexes': [models.Index(fields=['notified_at', 'id'], name='price_alert_pending_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='pricealert',
+            constraint=models.UniqueConstraint(fields=('analysis', 'level_key'), name='price_alert_level_unique'),
+        ),
+    ]
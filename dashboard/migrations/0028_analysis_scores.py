@@ -0,0 +1,110 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:24
+
+from django.db import migrations, models
+
+
+def reset_hand_typed_scores(apps, schema_editor):
+    # Scores and growth were typed in by hand (8.0 and "+24%" by default); none of them is a scored call
+    CryptoAnalysis = apps.get_model('dashboard', 'CryptoAnalysis')
+    CryptoAnalysis.objects.update(overall_score=5.0, growth_potential='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0027_price_alerts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyst',
+            name='average_return',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Mean % return of closed calls', max_digits=8, null=True),
+        ),
+        migrations.AddField(
+            model_name='analyst',
+            name='brier_score',
+            field=models.DecimalField(blank=True, decimal_places=4, help_text='Lower is better calibrated', max_digits=5, null=True),
+        ),
+        migrations.AddField(
+            model_name='analyst',
+            name='calibration_error',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=5, null=True),
+        ),
+        migrations.AddField(
+            model_name='analyst',
+            name='hit_calls',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='analyst',
+            name='hit_rate',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='% of closed calls that were right', max_digits=5, null=True),
+        ),
+        migrations.AddField(
+            model_name='analyst',
+            name='max_drawdown',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True),
+        ),
+        migrations.AddField(
+            model_name='analyst',
+            name='performance_score',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, help_text='Out of 10', max_digits=4),
+        ),
+        migrations.AddField(
+            model_name='analyst',
+            name='resolved_calls',
+            field=models.IntegerField(default=0, help_text='Calls closed at target, stop or end of timeframe'),
+        ),
+        migrations.AddField(
+            model_name='analyst',
+            name='scored_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='analyst',
+            name='scored_calls',
+            field=models.IntegerField(default=0, help_text='Buy/sell calls with market data'),
+        ),
+        migrations.AddField(
+            model_name='cryptoanalysis',
+            name='call_brier',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=5, null=True),
+        ),
+        migrations.AddField(
+            model_name='cryptoanalysis',
+            name='call_drawdown',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True),
+        ),
+        migrations.AddField(
+            model_name='cryptoanalysis',
+            name='call_hit',
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cryptoanalysis',
+            name='call_return',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True),
+        ),
+        migrations.AddField(
+            model_name='cryptoanalysis',
+            name='call_status',
+            field=models.CharField(blank=True, choices=[('open', 'Open'), ('target', 'Target Hit'), ('stopped', 'Stopped Out'), ('expired', 'Timeframe Ended'), ('no_data', 'No Market Data')], max_length=10),
+        ),
+        migrations.AddField(
+            model_name='cryptoanalysis',
+            name='scored_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='cryptoanalysis',
+            name='growth_potential',
+            field=models.CharField(blank=True, default='', help_text='Return of the call so far', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='cryptoanalysis',
+            name='overall_score',
+            field=models.DecimalField(decimal_places=1, default=5.0, help_text='Score of the call out of 10', max_digits=3),
+        ),
+        migrations.RunPython(reset_hand_typed_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:56
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Upper
+
+
+def fill_symbols(apps, schema_editor):
+    AnalysisDailyStats = apps.get_model('dashboard', 'AnalysisDailyStats')
+    CryptoAnalysis = apps.get_model('dashboard', 'CryptoAnalysis')
+    AnalysisDailyStats.objects.update(symbol=Subquery(
+        CryptoAnalysis.objects.filter(pk=OuterRef('analysis_id')).values(upper=Upper('symbol'))[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0028_analysis_scores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisdailystats',
+            name='symbol',
+            field=models.CharField(blank=True, max_length=10),
+        ),
+        migrations.RunPython(fill_symbols, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:12
+
+from django.core.management import call_command
+from django.db import migrations, models
+
+
+def create_cache_table(apps, schema_editor):
+    # Table for the DatabaseCache used when REDIS_URL is not set; a no-op for other backends
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0029_analysis_daily_stats_symbol'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionCounter',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField()),
+            ],
+        ),
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:48
+
+from django.db import migrations
+
+
+def backfill_rollups(apps, schema_editor):
+    # The rollup tables (0024) start empty; fill them from existing purchases, ratings and refunds
+    from dashboard.services import rollups
+    rollups.rebuild(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0030_version_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
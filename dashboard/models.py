@@ -1,6 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 import os
 import uuid
@@ -8,6 +8,7 @@ from decimal import Decimal
 from django.utils import timezone
 from datetime import timedelta
 import random
+import secrets
 import string
 import logging
 
@@ -162,6 +163,12 @@ class Transaction(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='transaction_created_idx'),
+            models.Index(fields=['mpesa_code'], name='transaction_mpesa_code_idx'),
+            models.Index(fields=['reference'], name='transaction_reference_idx'),
+            models.Index(fields=['paypal_transaction_id'], name='transaction_paypal_id_idx'),
+        ]
     
     @property
     def is_successful(self):
@@ -179,12 +186,24 @@ class Analyst(models.Model):
     specialization = models.CharField(max_length=200, blank=True, null=True)
     verified = models.BooleanField(default=False)
     total_sales = models.IntegerField(default=0)
+    total_revenue = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
     joined_date = models.DateTimeField(auto_now_add=True)
     is_verified = models.BooleanField(default=False)
     # Consultation availability
     available_for_consultation = models.BooleanField(default=True)
     consultation_hours = models.JSONField(default=dict, blank=True, null=True)  # Store availability schedule
+    # Track record against realized prices, written by the nightly `score_analysts` run
+    scored_calls = models.IntegerField(default=0, help_text="Buy/sell calls with market data")
+    resolved_calls = models.IntegerField(default=0, help_text="Calls closed at target, stop or end of timeframe")
+    hit_calls = models.IntegerField(default=0)
+    hit_rate = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True, help_text="% of closed calls that were right")
+    average_return = models.DecimalField(max_digits=8, decimal_places=2, blank=True, null=True, help_text="Mean % return of closed calls")
+    max_drawdown = models.DecimalField(max_digits=6, decimal_places=2, blank=True, null=True)
+    brier_score = models.DecimalField(max_digits=5, decimal_places=4, blank=True, null=True, help_text="Lower is better calibrated")
+    calibration_error = models.DecimalField(max_digits=5, decimal_places=4, blank=True, null=True)
+    performance_score = models.DecimalField(max_digits=4, decimal_places=2, default=0, db_index=True, help_text="Out of 10")
+    scored_at = models.DateTimeField(blank=True, null=True)
     
     def __str__(self):
         return f"Analyst: {self.user.username}"
@@ -198,15 +217,6 @@ class Analyst(models.Model):
         if self.user.first_name and self.user.last_name:
             return f"{self.user.first_name[0]}{self.user.last_name[0]}".upper()
         return self.user.username[:2].upper()
-    
-    @property
-    def total_revenue(self):
-        """Calculate total revenue from all analyses"""
-        from django.db.models import Sum
-        result = CryptoAnalysis.objects.filter(
-            analyst=self
-        ).aggregate(total=Sum('total_revenue'))
-        return result['total'] or Decimal('0.00')
 
 
 class CryptoAnalysis(models.Model):
@@ -249,6 +259,7 @@ class CryptoAnalysis(models.Model):
     cryptocurrency = models.CharField(max_length=100)
     symbol = models.CharField(max_length=10)
     analyst = models.ForeignKey(Analyst, on_delete=models.CASCADE)
+    category = models.ForeignKey('Category', on_delete=models.SET_NULL, null=True, blank=True)
     
     # Analysis Details
     analysis_type = models.CharField(max_length=20, choices=ANALYSIS_TYPES)
@@ -295,14 +306,31 @@ class CryptoAnalysis(models.Model):
     bullish_recommendation = models.JSONField(default=dict, blank=True, null=True)
     bearish_recommendation = models.JSONField(default=dict, blank=True, null=True)
     
-    # Scoring and Ratings
-    overall_score = models.DecimalField(max_digits=3, decimal_places=1, default=8.0, help_text="Overall score out of 10")
-    growth_potential = models.CharField(max_length=20, default="+24%", help_text="Expected growth percentage")
+    CALL_STATUSES = [
+        ('open', 'Open'),
+        ('target', 'Target Hit'),
+        ('stopped', 'Stopped Out'),
+        ('expired', 'Timeframe Ended'),
+        ('no_data', 'No Market Data'),
+    ]
+    
+    # Scoring and Ratings, computed from realized prices by `score_analysts`
+    overall_score = models.DecimalField(max_digits=3, decimal_places=1, default=5.0, help_text="Score of the call out of 10")
+    growth_potential = models.CharField(max_length=20, blank=True, default="", help_text="Return of the call so far")
+    call_status = models.CharField(max_length=10, choices=CALL_STATUSES, blank=True)
+    call_return = models.DecimalField(max_digits=8, decimal_places=2, blank=True, null=True)
+    call_drawdown = models.DecimalField(max_digits=6, decimal_places=2, blank=True, null=True)
+    call_hit = models.BooleanField(blank=True, null=True)
+    call_brier = models.DecimalField(max_digits=5, decimal_places=4, blank=True, null=True)
+    scored_at = models.DateTimeField(blank=True, null=True)
     
     # Metadata
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
+    rating_sum = models.IntegerField(default=0)
+    rating_count = models.IntegerField(default=0)
     sales_count = models.IntegerField(default=0)
     views_count = models.IntegerField(default=0)
+    unique_viewers = models.IntegerField(default=0, help_text="Estimated distinct viewers")
     
     # Status
     is_active = models.BooleanField(default=True)
@@ -438,6 +466,7 @@ class MarketInsight(models.Model):
     
     # Metadata
     views_count = models.IntegerField(default=0)
+    unique_viewers = models.IntegerField(default=0, help_text="Estimated distinct viewers")
     is_featured = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     
@@ -476,10 +505,10 @@ class MarketInsight(models.Model):
         }
         return colors.get(self.impact_level, 'gray')
     
-    def increment_views(self):
-        """Increment view count"""
-        self.views_count += 1
-        self.save()
+    def increment_views(self, viewer=None):
+        """Count a view through the buffered view counters"""
+        from .services.view_counters import record_view
+        record_view(self, viewer)
     
     class Meta:
         ordering = ['-published_at', '-created_at']
@@ -721,13 +750,24 @@ class Consultation(models.Model):
         ('custom', 'Custom Link'),
     ]
     
+    MEETING_LINK_TEMPLATES = {
+        'jitsi': 'https://meet.jit.si/ConsApp{meeting_id}',
+        'zoom': 'https://zoom.us/j/{meeting_id}',
+        'google_meet': 'https://meet.google.com/{meeting_id}',
+        'teams': 'https://teams.microsoft.com/l/meetup-join/{meeting_id}',
+        'custom': 'https://your-platform.com/meet/{meeting_id}',
+    }
+    
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    analyst = models.ForeignKey(Analyst, on_delete=models.SET_NULL, null=True, blank=True, related_name='consultations')
     title = models.CharField(max_length=200)
     level = models.CharField(max_length=20, choices=LEVEL_CHOICES, default='beginner')
     description = models.TextField(blank=True, null=True)
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     duration_minutes = models.IntegerField(default=60)
     scheduled_date = models.DateTimeField()
+    # scheduled_date + duration_minutes, kept in sync on save for overlap queries
+    scheduled_end = models.DateTimeField(blank=True, null=True, editable=False)
     
     # Video Consultation Fields
     meeting_platform = models.CharField(max_length=20, choices=MEETING_PLATFORMS, default='jitsi')
@@ -765,6 +805,9 @@ class Consultation(models.Model):
     
     class Meta:
         ordering = ['-scheduled_date']
+        indexes = [
+            models.Index(fields=['analyst', 'scheduled_date'], name='consultation_analyst_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.title} - {self.scheduled_date}"
@@ -823,50 +866,36 @@ class Consultation(models.Model):
         else:
             return self.get_status_display()
     
+    def assign_meeting_details(self):
+        """Fill in meeting ID, password and links without touching the database"""
+        if self.meeting_id:
+            return
+        # Random rather than pk-based so details can be set before the first INSERT
+        self.meeting_id = f"CONS{secrets.randbelow(10 ** 10):010d}"
+        self.meeting_password = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(8))
+        link_template = self.MEETING_LINK_TEMPLATES.get(self.meeting_platform, self.MEETING_LINK_TEMPLATES['custom'])
+        self.meeting_link = link_template.format(meeting_id=self.meeting_id)
+        self.join_url = self.meeting_link
+    
     def generate_meeting_details(self):
-        """Generate meeting details for video consultation with enhanced error handling"""
-        if not self.meeting_id:
-            try:
-                # Generate unique meeting ID
-                self.meeting_id = f"CONS{self.id:06d}{random.randint(1000, 9999)}"
-                
-                # Generate secure password
-                self.meeting_password = ''.join(random.choices(string.ascii_letters + string.digits, k=8))
-                
-                # Generate meeting link based on platform
-                if self.meeting_platform == 'jitsi':
-                    self.meeting_link = f"https://meet.jit.si/ConsApp{self.meeting_id}"
-                    self.join_url = self.meeting_link
-                elif self.meeting_platform == 'zoom':
-                    # This would integrate with Zoom API in a real implementation
-                    self.meeting_link = f"https://zoom.us/j/{self.meeting_id}"
-                    self.join_url = self.meeting_link
-                elif self.meeting_platform == 'google_meet':
-                    # Google Meet links are generated differently
-                    self.meeting_link = f"https://meet.google.com/{self.meeting_id}"
-                    self.join_url = self.meeting_link
-                elif self.meeting_platform == 'teams':
-                    self.meeting_link = f"https://teams.microsoft.com/l/meetup-join/{self.meeting_id}"
-                    self.join_url = self.meeting_link
-                else:  # custom
-                    self.meeting_link = f"https://your-platform.com/meet/{self.meeting_id}"
-                    self.join_url = self.meeting_link
-                
-                self.save()
-                logger.info(f"Successfully generated meeting details for consultation {self.id}: {self.meeting_platform}")
-                
-            except Exception as e:
-                logger.error(f"Error generating meeting details for consultation {self.id}: {str(e)}")
-                # Set default Jitsi link as fallback
-                try:
-                    self.meeting_platform = 'jitsi'
-                    self.meeting_id = f"CONS{self.id:06d}{random.randint(1000, 9999)}"
-                    self.meeting_link = f"https://meet.jit.si/ConsApp{self.meeting_id}"
-                    self.join_url = self.meeting_link
-                    self.save()
-                    logger.info(f"Fallback meeting details generated for consultation {self.id}")
-                except Exception as fallback_error:
-                    logger.error(f"Fallback meeting generation also failed for consultation {self.id}: {str(fallback_error)}")
+        """Generate meeting details for an existing consultation that has none"""
+        if self.meeting_id:
+            return
+        self.assign_meeting_details()
+        if self.pk:
+            self.save(update_fields=['meeting_id', 'meeting_password', 'meeting_link', 'join_url', 'updated_at'])
+        logger.info(f"Generated meeting details for consultation {self.id}: {self.meeting_platform}")
+    
+    def save(self, *args, **kwargs):
+        # New bookings get their meeting details as part of the initial INSERT
+        if self._state.adding and self.status == 'scheduled':
+            self.assign_meeting_details()
+        if self.scheduled_date:
+            self.scheduled_end = self.scheduled_date + timedelta(minutes=self.duration_minutes)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and {'scheduled_date', 'duration_minutes'} & set(update_fields):
+                kwargs['update_fields'] = set(update_fields) | {'scheduled_end'}
+        super().save(*args, **kwargs)
     
     def start_session(self):
         """Mark session as started"""
@@ -891,33 +920,17 @@ class Consultation(models.Model):
     def cancel_consultation(self, refund=False):
         """Cancel consultation with optional refund"""
         previous_status = self.status
-        self.status = 'cancelled'
         
         if refund and self.payment_status == 'paid':
             try:
-                # Process refund logic here
-                self.payment_status = 'refunded'
-                
-                # Refund to user's wallet if paid with wallet
-                if self.payment_method == 'wallet':
-                    user_wallet = UserWallet.objects.get(user=self.user)
-                    user_wallet.balance += self.price
-                    user_wallet.save()
-                    
-                    # Create refund transaction
-                    Transaction.objects.create(
-                        user=self.user,
-                        amount=self.price,
-                        transaction_type='refund',
-                        payment_method='wallet',
-                        status='completed',
-                        description=f"Refund for cancelled consultation: {self.title}",
-                        consultation=self
-                    )
-                    logger.info(f"Refund processed for cancelled consultation {self.id}: ${self.price}")
+                from .services.wallet import refund_consultations
+                refund_consultations([self.pk])
+                self.refresh_from_db(fields=['payment_status'])
+                logger.info(f"Refund processed for cancelled consultation {self.id}: ${self.price}")
             except Exception as e:
                 logger.error(f"Error processing refund for consultation {self.id}: {str(e)}")
         
+        self.status = 'cancelled'
         self.save()
         logger.info(f"Consultation cancelled: {self.id}, previous status: {previous_status}, refund: {refund}")
     
@@ -952,16 +965,22 @@ class ConsultationAttachment(models.Model):
     uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     description = models.TextField(blank=True, null=True)
+    blob = models.ForeignKey('ContentBlob', on_delete=models.PROTECT, null=True, blank=True, related_name='attachments')
     
     def __str__(self):
         return f"{self.file_name} - {self.consultation.title}"
     
+    def save(self, *args, **kwargs):
+        from .services.chat_files import dedupe_file_field
+        dedupe_file_field(self)
+        super().save(*args, **kwargs)
+    
     @property
     def file_size(self):
         """Get file size in human readable format"""
         try:
             if self.file:
-                size = self.file.size
+                size = self.blob.size if self.blob else self.file.size
                 if size < 1024:
                     return f"{size} B"
                 elif size < 1024 * 1024:
@@ -984,10 +1003,17 @@ class ConsultationReminder(models.Model):
     scheduled_time = models.DateTimeField()
     sent_time = models.DateTimeField(blank=True, null=True)
     is_sent = models.BooleanField(default=False)
+    # Set by the dispatcher while a worker is sending this reminder
+    claim_token = models.UUIDField(blank=True, null=True)
+    claimed_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['scheduled_time']
+        indexes = [
+            # Due-reminder range scan: is_sent = false AND scheduled_time <= now
+            models.Index(fields=['is_sent', 'scheduled_time'], name='reminder_due_idx'),
+        ]
     
     def __str__(self):
         return f"{self.reminder_type} reminder for {self.consultation.title}"
@@ -1027,6 +1053,11 @@ class ChatMessage(models.Model):
         ('text', 'Text'),
         ('file', 'File'),
         ('system', 'System Message'),
+        ('image', 'Image'),
+        ('video', 'Video'),
+        ('document', 'Document'),
+        ('voice', 'Voice Message'),
+        ('emoji', 'Emoji'),
     ]
     
     chat_room = models.ForeignKey(ConsultationChatRoom, on_delete=models.CASCADE, related_name='messages')
@@ -1035,15 +1066,40 @@ class ChatMessage(models.Model):
     content = models.TextField()
     file = models.FileField(upload_to='chat_files/%Y/%m/%d/', blank=True, null=True)
     file_name = models.CharField(max_length=255, blank=True, null=True)
+    blob = models.ForeignKey('ContentBlob', on_delete=models.PROTECT, null=True, blank=True, related_name='chat_messages')
     timestamp = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
     
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            # Shared media listing: newest files first within a room
+            models.Index(fields=['chat_room', '-id'], condition=models.Q(blob__isnull=False), name='chat_media_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username}: {self.content[:50]}"
     
+    def save(self, *args, **kwargs):
+        from .services.chat_files import dedupe_file_field
+        dedupe_file_field(self)
+        super().save(*args, **kwargs)
+    
+    @property
+    def file_url(self):
+        """Range-capable URL for the attached file"""
+        if not self.blob_id:
+            return self.file.url if self.file else None
+        from django.urls import reverse
+        return reverse('chat_file', args=[self.chat_room.consultation_id, self.id])
+    
+    @property
+    def file_size(self):
+        """Attached file size in bytes"""
+        if self.blob_id:
+            return self.blob.size
+        return 0
+    
     def mark_as_read(self):
         """Mark message as read"""
         self.is_read = True
@@ -1075,6 +1131,221 @@ class ConsultationParticipant(models.Model):
         self.save()
 
 
+def content_blob_path(instance, filename):
+    # Blobs are stored under their digest: chat_blobs/<aa>/<sha256>.<ext>
+    ext = os.path.splitext(filename)[1].lower()
+    return os.path.join('chat_blobs', instance.sha256[:2], f"{instance.sha256}{ext}")
+
+
+class ContentBlob(models.Model):
+    """File content stored once and shared by every message or attachment that uses it"""
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to=content_blob_path, max_length=255)
+    size = models.BigIntegerField(default=0)
+    content_type = models.CharField(max_length=100, default='application/octet-stream')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.size} bytes)"
+
+
+class ChunkedUpload(models.Model):
+    """Resumable chat file upload, written to disk one chunk at a time"""
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('complete', 'Complete'),
+    ]
+    
+    upload_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    chat_room = models.ForeignKey(ConsultationChatRoom, on_delete=models.CASCADE, related_name='uploads')
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    file_name = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    message_type = models.CharField(max_length=10, choices=ChatMessage.MESSAGE_TYPES, default='document')
+    total_size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='uploading')
+    message = models.ForeignKey(ChatMessage, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.file_name} ({self.offset}/{self.total_size})"
+    
+    @property
+    def is_complete(self):
+        return self.status == 'complete'
+
+
+class ViewSketch(models.Model):
+    """HyperLogLog registers estimating the distinct viewers of one object"""
+    model_label = models.CharField(max_length=100)
+    object_id = models.PositiveBigIntegerField()
+    registers = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['model_label', 'object_id']
+    
+    def __str__(self):
+        return f"{self.model_label} #{self.object_id}"
+
+
+class RelatedContent(models.Model):
+    """Precomputed content neighbours of one analysis or market insight"""
+    ITEM_TYPES = [
+        ('analysis', 'Crypto Analysis'),
+        ('insight', 'Market Insight'),
+    ]
+    
+    item_type = models.CharField(max_length=10, choices=ITEM_TYPES)
+    item_id = models.PositiveIntegerField()
+    # Raw term counts of the item's text: {"btc": 3, "breakout": 1}
+    terms = models.JSONField(default=dict)
+    # Top neighbours per type: {"analysis": [[id, score], ...], "insight": [...]}
+    neighbours = models.JSONField(default=dict)
+    is_stale = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['item_type', 'item_id']
+        verbose_name_plural = 'Related content'
+    
+    def __str__(self):
+        return f"{self.get_item_type_display()} #{self.item_id}"
+
+
+class AlsoBought(models.Model):
+    """Materialised "users also bought" neighbours of one analysis"""
+    analysis = models.OneToOneField(CryptoAnalysis, on_delete=models.CASCADE, primary_key=True, related_name='also_bought')
+    # [[analysis_id, score], ...] best first; score is cosine co-purchase similarity
+    neighbours = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'Also bought'
+    
+    def __str__(self):
+        return f"Also bought with {self.analysis_id}"
+
+
+class CoPurchaseState(models.Model):
+    """Item-item co-purchase counts and the last purchase folded into them"""
+    watermark = models.BigIntegerField(default=0, help_text="Highest PurchasedAnalysis id applied")
+    matrix = models.BinaryField(help_text="Sparse co-occurrence matrix in SciPy .npz format")
+    built_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Co-purchase state up to purchase {self.watermark}"
+
+
+class DailyStats(models.Model):
+    """Counters for one day; subclasses add the dimension they are keyed on"""
+    date = models.DateField()
+    sales = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
+    refunds = models.IntegerField(default=0)
+    refunded = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
+    rating_sum = models.IntegerField(default=0)
+    rating_count = models.IntegerField(default=0)
+    
+    class Meta:
+        abstract = True
+        ordering = ['date']
+    
+    @property
+    def net_revenue(self):
+        return self.revenue - self.refunded
+
+
+class AnalystDailyStats(DailyStats):
+    analyst = models.ForeignKey(Analyst, on_delete=models.CASCADE, related_name='daily_stats')
+    
+    class Meta(DailyStats.Meta):
+        verbose_name_plural = 'Analyst daily stats'
+        constraints = [models.UniqueConstraint(fields=['analyst', 'date'], name='analyst_daily_stats_unique')]
+    
+    def __str__(self):
+        return f"Analyst {self.analyst_id} on {self.date}"
+
+
+class AnalysisDailyStats(DailyStats):
+    analysis = models.ForeignKey(CryptoAnalysis, on_delete=models.CASCADE, related_name='daily_stats')
+    # Copied from the analysis so per-analyst breakdowns need no join
+    analyst = models.ForeignKey(Analyst, on_delete=models.CASCADE, related_name='analysis_daily_stats')
+    symbol = models.CharField(max_length=10, blank=True)
+    
+    class Meta(DailyStats.Meta):
+        verbose_name_plural = 'Analysis daily stats'
+        constraints = [models.UniqueConstraint(fields=['analysis', 'date'], name='analysis_daily_stats_unique')]
+        indexes = [models.Index(fields=['analyst', 'date'], name='analysis_stats_analyst_idx')]
+    
+    def __str__(self):
+        return f"Analysis {self.analysis_id} on {self.date}"
+
+
+class SymbolDailyStats(DailyStats):
+    symbol = models.CharField(max_length=10)
+    
+    class Meta(DailyStats.Meta):
+        verbose_name_plural = 'Symbol daily stats'
+        constraints = [models.UniqueConstraint(fields=['symbol', 'date'], name='symbol_daily_stats_unique')]
+    
+    def __str__(self):
+        return f"{self.symbol} on {self.date}"
+
+
+class PriceAlert(models.Model):
+    """A price level from a purchased analysis that the market crossed"""
+    LEVEL_TYPES = [
+        ('target', 'Price Target'),
+        ('stop_loss', 'Stop Loss'),
+        ('entry', 'Entry Point'),
+        ('exit', 'Exit Point'),
+        ('support', 'Support Level'),
+        ('resistance', 'Resistance Level'),
+    ]
+    
+    analysis = models.ForeignKey(CryptoAnalysis, on_delete=models.CASCADE, related_name='price_alerts')
+    # Identifies the level within the analysis, price included, e.g. "annotation:12:27500.0"
+    level_key = models.CharField(max_length=120)
+    level_type = models.CharField(max_length=20, choices=LEVEL_TYPES)
+    label = models.CharField(max_length=100, blank=True)
+    level_price = models.DecimalField(max_digits=20, decimal_places=8)
+    crossed_price = models.DecimalField(max_digits=20, decimal_places=8)
+    direction = models.CharField(max_length=4, choices=[('up', 'Up'), ('down', 'Down')])
+    crossed_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    notified_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['-crossed_at']
+        constraints = [models.UniqueConstraint(fields=['analysis', 'level_key'], name='price_alert_level_unique')]
+        indexes = [models.Index(fields=['notified_at', 'id'], name='price_alert_pending_idx')]
+    
+    def __str__(self):
+        return f"{self.get_level_type_display()} {self.level_price} crossed {self.direction} ({self.analysis_id})"
+
+
+class PriceAlertCursor(models.Model):
+    """Last candle a symbol's price alerts were checked against"""
+    symbol = models.CharField(max_length=10, unique=True)
+    last_timestamp = models.BigIntegerField(help_text="Unix time of the last candle checked")
+    last_price = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.symbol} alerts checked to {self.last_timestamp}"
+
+
+class VersionCounter(models.Model):
+    """Shared version of derived state kept in caches or process memory (see ``services.versions``)"""
+    name = models.CharField(max_length=100, primary_key=True)
+    value = models.BigIntegerField()
+    
+    def __str__(self):
+        return f"{self.name} v{self.value}"
+
 class SiteSetting(models.Model):
     name = models.CharField(max_length=100)
     hero_video = models.FileField(upload_to='videos/', blank=True, null=True)
@@ -1115,6 +1386,14 @@ class MpesaTransaction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at'], name='mpesa_created_idx'),
+            models.Index(fields=['mpesa_receipt_number'], name='mpesa_receipt_idx'),
+            models.Index(fields=['checkout_request_id'], name='mpesa_checkout_idx'),
+            models.Index(fields=['merchant_request_id'], name='mpesa_merchant_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.transaction_type} - {self.amount} - {self.status}"
     
@@ -1159,66 +1438,158 @@ def save_user_profile(sender, instance, **kwargs):
         logger.info(f"Created missing user wallet for {instance.username}")
 
 @receiver(post_save, sender=Consultation)
-def generate_meeting_on_creation(sender, instance, created, **kwargs):
-    """Automatically generate meeting details when consultation is created"""
-    if created and instance.status == 'scheduled':
-        instance.generate_meeting_details()
-        logger.info(f"Generated meeting details for new consultation {instance.id}")
-
-@receiver(post_save, sender=Consultation)
-def create_consultation_reminders(sender, instance, created, **kwargs):
-    """Create automatic reminders for consultations"""
+def provision_new_consultation(sender, instance, created, **kwargs):
+    """Create reminders, chat room and participant for a newly scheduled consultation"""
     if created and instance.status == 'scheduled':
+        from .services.consultations import provision_related
         try:
-            # Create 24-hour reminder
-            ConsultationReminder.objects.create(
-                consultation=instance,
-                reminder_type='email',
-                scheduled_time=instance.scheduled_date - timedelta(hours=24)
-            )
-            
-            # Create 1-hour reminder
-            ConsultationReminder.objects.create(
-                consultation=instance,
-                reminder_type='email',
-                scheduled_time=instance.scheduled_date - timedelta(hours=1)
-            )
-            logger.info(f"Created reminders for consultation {instance.id}")
+            provision_related([instance])
+            logger.info(f"Provisioned reminders and chat room for consultation {instance.id}")
         except Exception as e:
-            logger.error(f"Error creating reminders for consultation {instance.id}: {str(e)}")
+            logger.error(f"Error provisioning consultation {instance.id}: {str(e)}")
 
 @receiver(post_save, sender=Consultation)
-def create_consultation_chat_room(sender, instance, created, **kwargs):
-    """Automatically create chat room when consultation is created"""
-    if created and instance.status == 'scheduled':
-        try:
-            chat_room, created = ConsultationChatRoom.objects.get_or_create(consultation=instance)
-            # Add user as participant
-            ConsultationParticipant.objects.get_or_create(chat_room=chat_room, user=instance.user)
-            logger.info(f"Created chat room for consultation {instance.id}")
-        except Exception as e:
-            logger.error(f"Error creating chat room for consultation {instance.id}: {str(e)}")
+def update_consultation_availability(sender, instance, **kwargs):
+    """Keep compiled analyst calendars in step with bookings"""
+    from .services.availability import booking_changed
+    booking_changed(instance)
+
+@receiver(post_delete, sender=Consultation)
+def release_consultation_slot(sender, instance, **kwargs):
+    from .services.availability import booking_changed
+    booking_changed(instance, deleted=True)
+
+@receiver(post_save, sender=Analyst)
+def refresh_analyst_availability(sender, instance, created, **kwargs):
+    if not created:
+        from .services.availability import schedule_changed
+        schedule_changed(instance)
+
+@receiver(post_save, sender=MarketInsight)
+@receiver(post_delete, sender=MarketInsight)
+def invalidate_insights_feed(sender, instance, **kwargs):
+    """
+    Retire cached insight lists and fragments built from the old version.
+    Bumped after commit, so a rebuild under the new version cannot read the
+    old rows.
+    """
+    from .services.insights_feed import invalidate
+    transaction.on_commit(invalidate)
+
+@receiver(post_save, sender=ConsultationPackage)
+@receiver(post_delete, sender=ConsultationPackage)
+def invalidate_package_catalog(sender, instance, **kwargs):
+    """
+    Retire the catalog snapshot and package cards. Bumped after commit, so
+    a rebuild under the new version cannot read the old rows.
+    """
+    from .services.fragments import packages_changed
+    transaction.on_commit(packages_changed)
+
+@receiver(post_save, sender=CryptoAnalysis)
+@receiver(post_delete, sender=CryptoAnalysis)
+def invalidate_analysis_cards(sender, instance, **kwargs):
+    """
+    Marketplace cards show the analysis's own fields; chart refreshes leave
+    them unchanged. Bumped after commit, like the package catalog.
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields and update_fields <= {'chart_data', 'updated_at'}:
+        return
+    from .services.fragments import analyses_changed
+    transaction.on_commit(analyses_changed)
+
+@receiver(post_save, sender=CryptoAnalysis)
+@receiver(post_save, sender=MarketInsight)
+def update_related_content_terms(sender, instance, **kwargs):
+    """Queue changed analyses and insights for the next related-content refresh"""
+    from .services.recommendations import item_changed
+    try:
+        item_changed(instance)
+    except Exception as e:
+        logger.error(f"Error queueing related content for {instance._meta.label} {instance.id}: {str(e)}")
+
+@receiver(post_delete, sender=CryptoAnalysis)
+@receiver(post_delete, sender=MarketInsight)
+def remove_related_content(sender, instance, **kwargs):
+    from .services.recommendations import item_deleted
+    item_deleted(instance)
+
+@receiver(post_save, sender=ChartAnnotation)
+@receiver(post_delete, sender=ChartAnnotation)
+@receiver(post_save, sender=TechnicalIndicatorData)
+@receiver(post_delete, sender=TechnicalIndicatorData)
+@receiver(post_save, sender=AnalysisInsight)
+@receiver(post_delete, sender=AnalysisInsight)
+@receiver(post_save, sender=AnalysisMetric)
+@receiver(post_delete, sender=AnalysisMetric)
+def expire_analysis_report(sender, instance, **kwargs):
+    """Reports include these rows, so a change must retire the cached PDF"""
+    from .services.reports import analysis_changed
+    analysis_changed(instance.analysis_id)
+
+@receiver(post_save, sender=CryptoAnalysis)
+@receiver(post_delete, sender=CryptoAnalysis)
+@receiver(post_save, sender=ChartAnnotation)
+@receiver(post_delete, sender=ChartAnnotation)
+@receiver(post_save, sender=PurchasedAnalysis)
+@receiver(post_delete, sender=PurchasedAnalysis)
+def recompile_price_alerts(sender, instance, **kwargs):
+    """Alert levels come from purchased analyses, so these changes alter the level book"""
+    if sender is PurchasedAnalysis and not kwargs.get('created', True):
+        return
+    update_fields = kwargs.get('update_fields')
+    if sender is CryptoAnalysis and update_fields and update_fields <= {'chart_data', 'updated_at'}:
+        # Chart refreshes do not touch the levels
+        return
+    from .services.price_alerts import levels_changed
+    levels_changed()
 
 @receiver(post_save, sender=PurchasedAnalysis)
 def update_analysis_sales_count(sender, instance, created, **kwargs):
-    """Update analysis sales count when purchase is created"""
+    """Add a new purchase to the sales totals and daily rollups"""
     if created:
-        try:
-            instance.analysis.sales_count = PurchasedAnalysis.objects.filter(analysis=instance.analysis).count()
-            instance.analysis.save()
-            logger.info(f"Updated sales count for analysis {instance.analysis.id}")
-        except Exception as e:
-            logger.error(f"Error updating sales count for analysis {instance.analysis.id}: {str(e)}")
+        from .services import aggregates, rollups
+        aggregates.purchase_created(instance)
+        rollups.purchase_created(instance)
+
+@receiver(post_delete, sender=PurchasedAnalysis)
+def remove_analysis_sale(sender, instance, **kwargs):
+    from .services import aggregates, rollups
+    aggregates.purchase_deleted(instance)
+    rollups.purchase_deleted(instance)
+
+@receiver(pre_save, sender=AnalysisRating)
+def remember_previous_rating(sender, instance, **kwargs):
+    """Keep the stored rating so an edit can be applied as a difference"""
+    instance._previous_rating = None
+    if instance.pk:
+        instance._previous_rating = AnalysisRating.objects.filter(pk=instance.pk).values_list(
+            'analysis_id', 'rating'
+        ).first()
 
 @receiver(post_save, sender=AnalysisRating)
 def update_analysis_rating(sender, instance, created, **kwargs):
-    """Update analysis average rating when new rating is added"""
-    if created:
-        try:
-            from django.db.models import Avg
-            result = AnalysisRating.objects.filter(analysis=instance.analysis).aggregate(avg_rating=Avg('rating'))
-            instance.analysis.rating = result['avg_rating'] or Decimal('0.00')
-            instance.analysis.save()
-            logger.info(f"Updated rating for analysis {instance.analysis.id}")
-        except Exception as e:
-            logger.error(f"Error updating rating for analysis {instance.analysis.id}: {str(e)}")
\ No newline at end of file
+    """Fold a new or edited rating into the analysis rating sum and count"""
+    from .services import aggregates, rollups
+    previous = getattr(instance, '_previous_rating', None)
+    aggregates.rating_saved(instance, created, previous)
+    rollups.rating_saved(instance, created, previous)
+
+@receiver(post_delete, sender=AnalysisRating)
+def remove_analysis_rating(sender, instance, **kwargs):
+    from .services import aggregates, rollups
+    aggregates.rating_deleted(instance)
+    rollups.rating_deleted(instance)
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_refund_status(sender, instance, **kwargs):
+    """Refunds are rolled up when they complete, so keep the stored status"""
+    instance._previous_status = None
+    if instance.pk and instance.transaction_type == 'refund':
+        instance._previous_status = Transaction.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+@receiver(post_save, sender=Transaction)
+def update_refund_rollups(sender, instance, created, **kwargs):
+    from .services.rollups import transaction_saved
+    transaction_saved(instance, getattr(instance, '_previous_status', None))
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""
+Denormalised sales and rating aggregates.
+
+``CryptoAnalysis.sales_count``/``total_revenue``/``rating_sum``/``rating_count``
+and ``Analyst.total_sales``/``total_revenue`` are maintained with ``F()``
+increments from the PurchasedAnalysis and AnalysisRating signals, so they
+commit or roll back together with the row that changed them and never read
+the whole purchase or rating history. ``rating`` is derived from the sum and
+count in the same transaction.
+
+Instances saved from stale copies can still overwrite a counter;
+``reconcile`` (run by ``reconcile_aggregates``) recomputes every aggregate in
+bulk and repairs whatever drifted.
+"""
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, FloatField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from ..models import AnalysisRating, Analyst, CryptoAnalysis, PurchasedAnalysis
+
+logger = logging.getLogger(__name__)
+
+RATING_PLACES = Decimal('0.01')
+
+ZERO = Decimal('0.00')
+
+AVERAGE_RATING = Case(
+    When(rating_count__gt=0, then=Cast(F('rating_sum'), FloatField()) / F('rating_count')),
+    default=Value(0.0),
+    output_field=FloatField(),
+)
+
+
+def _refresh(instance, fields):
+    """Pull counters written with F() back into a cached instance"""
+    if instance is not None:
+        instance.refresh_from_db(fields=fields)
+
+
+def _apply_sale(purchase, sign):
+    amount = (purchase.purchase_price or ZERO) * sign
+    with transaction.atomic():
+        CryptoAnalysis.objects.filter(pk=purchase.analysis_id).update(
+            sales_count=F('sales_count') + sign,
+            total_revenue=F('total_revenue') + amount,
+        )
+        Analyst.objects.filter(cryptoanalysis=purchase.analysis_id).update(
+            total_sales=F('total_sales') + sign,
+            total_revenue=F('total_revenue') + amount,
+        )
+
+
+def purchase_created(purchase):
+    _apply_sale(purchase, 1)
+    if PurchasedAnalysis.analysis.is_cached(purchase):
+        _refresh(purchase.analysis, ['sales_count', 'total_revenue'])
+
+
+def purchase_deleted(purchase):
+    _apply_sale(purchase, -1)
+
+
+def _apply_rating(analysis_id, delta_sum, delta_count):
+    with transaction.atomic():
+        analyses = CryptoAnalysis.objects.filter(pk=analysis_id)
+        analyses.update(rating_sum=F('rating_sum') + delta_sum, rating_count=F('rating_count') + delta_count)
+        # Separate statement: some backends evaluate SET clauses left to right. The PDF
+        # report prints the rating, so updated_at moves too and retires the cached file.
+        analyses.update(rating=AVERAGE_RATING, updated_at=timezone.now())
+
+
+def rating_saved(rating, created, previous=None):
+    """Fold a new rating, or the change from ``previous`` to an edited one"""
+    if created:
+        _apply_rating(rating.analysis_id, rating.rating, 1)
+    elif previous is not None:
+        previous_analysis_id, previous_value = previous
+        if previous_analysis_id != rating.analysis_id:
+            _apply_rating(previous_analysis_id, -previous_value, -1)
+            _apply_rating(rating.analysis_id, rating.rating, 1)
+        elif previous_value != rating.rating:
+            _apply_rating(rating.analysis_id, rating.rating - previous_value, 0)
+        else:
+            return
+    else:
+        return
+    if AnalysisRating.analysis.is_cached(rating):
+        _refresh(rating.analysis, ['rating', 'rating_sum', 'rating_count', 'updated_at'])
+
+
+def rating_deleted(rating):
+    _apply_rating(rating.analysis_id, -rating.rating, -1)
+
+
+def _average(rating_sum, rating_count):
+    if not rating_count:
+        return ZERO
+    return (Decimal(rating_sum) / rating_count).quantize(RATING_PLACES)
+
+
+def reconcile(fix=True, batch_size=500, analyses=None):
+    """
+    Recompute every aggregate from the purchase and rating tables, or only
+    those of ``analyses`` (a queryset or ids) and their analysts.
+
+    Returns ``{'analyses': [ids], 'analysts': [ids]}`` for rows whose stored
+    values drifted. With ``fix`` they are rewritten with ``bulk_update``.
+    """
+    purchases = PurchasedAnalysis.objects.filter(analysis=OuterRef('pk')).order_by().values('analysis')
+    ratings = AnalysisRating.objects.filter(analysis=OuterRef('pk')).order_by().values('analysis')
+    scope = CryptoAnalysis.objects.all()
+    analyst_scope = Analyst.objects.all()
+    if analyses is not None:
+        scope = scope.filter(pk__in=analyses)
+        analyst_scope = analyst_scope.filter(pk__in=scope.values('analyst_id'))
+
+    analysis_rows = scope.annotate(
+        true_sales=Coalesce(Subquery(purchases.annotate(n=Count('id')).values('n')), 0),
+        true_revenue=Coalesce(
+            Subquery(purchases.annotate(total=Sum('purchase_price')).values('total')),
+            Value(ZERO), output_field=DecimalField(max_digits=15, decimal_places=2),
+        ),
+        true_rating_sum=Coalesce(Subquery(ratings.annotate(total=Sum('rating')).values('total')), 0),
+        true_rating_count=Coalesce(Subquery(ratings.annotate(n=Count('id')).values('n')), 0),
+    ).only('sales_count', 'total_revenue', 'rating', 'rating_sum', 'rating_count', 'updated_at')
+
+    now = timezone.now()
+    drifted_analyses = []
+    for analysis in analysis_rows.iterator(chunk_size=batch_size):
+        expected = {
+            'sales_count': analysis.true_sales,
+            'total_revenue': Decimal(analysis.true_revenue).quantize(RATING_PLACES),
+            'rating_sum': analysis.true_rating_sum,
+            'rating_count': analysis.true_rating_count,
+            'rating': _average(analysis.true_rating_sum, analysis.true_rating_count),
+        }
+        if any(getattr(analysis, field) != value for field, value in expected.items()):
+            if analysis.rating != expected['rating'] or analysis.rating_count != expected['rating_count']:
+                # Shown in the PDF report
+                analysis.updated_at = now
+            for field, value in expected.items():
+                setattr(analysis, field, value)
+            drifted_analyses.append(analysis)
+
+    analyst_purchases = PurchasedAnalysis.objects.filter(analysis__analyst=OuterRef('pk')).order_by().values('analysis__analyst')
+    analysts = analyst_scope.annotate(
+        true_sales=Coalesce(Subquery(analyst_purchases.annotate(n=Count('id')).values('n')), 0),
+        true_revenue=Coalesce(
+            Subquery(analyst_purchases.annotate(total=Sum('purchase_price')).values('total')),
+            Value(ZERO), output_field=DecimalField(max_digits=15, decimal_places=2),
+        ),
+    ).only('total_sales', 'total_revenue')
+
+    drifted_analysts = []
+    for analyst in analysts.iterator(chunk_size=batch_size):
+        true_revenue = Decimal(analyst.true_revenue).quantize(RATING_PLACES)
+        if analyst.total_sales != analyst.true_sales or analyst.total_revenue != true_revenue:
+            analyst.total_sales = analyst.true_sales
+            analyst.total_revenue = true_revenue
+            drifted_analysts.append(analyst)
+
+    if fix:
+        with transaction.atomic():
+            CryptoAnalysis.objects.bulk_update(
+                drifted_analyses,
+                ['sales_count', 'total_revenue', 'rating', 'rating_sum', 'rating_count', 'updated_at'],
+                batch_size=batch_size,
+            )
+            Analyst.objects.bulk_update(drifted_analysts, ['total_sales', 'total_revenue'], batch_size=batch_size)
+        if drifted_analyses or drifted_analysts:
+            logger.info(
+                f"Reconciled aggregates for {len(drifted_analyses)} analyses and {len(drifted_analysts)} analysts"
+            )
+    return {
+        'analyses': [analysis.pk for analysis in drifted_analyses],
+        'analysts': [analyst.pk for analyst in drifted_analysts],
+    }
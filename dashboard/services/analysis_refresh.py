@@ -0,0 +1,233 @@
+"""
+Background refresh of an analysis's price series, indicators and metrics.
+
+``request_refresh`` hands out job ids: clicks on the same analysis while a
+refresh is queued or running get the running job's id, and for
+``ANALYSIS_REFRESH_MIN_INTERVAL`` seconds after one finishes they get the
+finished job instead of starting another. Both checks use ``cache.add``, so
+they hold across workers (see ``CACHES`` in settings).
+
+A refresh is incremental: only candles newer than the last point in
+``chart_data`` are read from ``market_data``, at the chart's resolution and
+never more than ``MAX_POINTS`` of them; indicators extend their series from
+stored state (see ``indicators``) and matching ``AnalysisMetric`` rows roll
+current into previous.
+"""
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from ..models import AnalysisMetric, CryptoAnalysis, TechnicalIndicatorData
+from . import indicators, market_data
+
+logger = logging.getLogger(__name__)
+
+MIN_INTERVAL = getattr(settings, 'ANALYSIS_REFRESH_MIN_INTERVAL', 60)
+WORKERS = getattr(settings, 'ANALYSIS_REFRESH_WORKERS', 2)
+
+# Points kept in chart_data; older ones are dropped as new candles arrive
+MAX_POINTS = getattr(settings, 'ANALYSIS_CHART_POINTS', 500)
+
+# Range a chart built from scratch is sized for when picking its resolution
+CHART_RANGE = '1M'
+
+# A job that has not finished by then is assumed lost and may be restarted
+JOB_TIMEOUT = 300
+JOB_TTL = 3600
+
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='analysis-refresh')
+
+
+def _active_key(analysis_id):
+    return f"analysis-refresh:active:{analysis_id}"
+
+
+def _recent_key(analysis_id):
+    return f"analysis-refresh:recent:{analysis_id}"
+
+
+def _job_key(job_id):
+    return f"analysis-refresh:job:{job_id}"
+
+
+def get_job(job_id):
+    return cache.get(_job_key(job_id))
+
+
+def _save_job(job, **changes):
+    job.update(changes)
+    cache.set(_job_key(job['id']), job, JOB_TTL)
+    return job
+
+
+def request_refresh(analysis_id):
+    """The job refreshing ``analysis_id``: a recent or running one, or a new one"""
+    for key in (_recent_key(analysis_id), _active_key(analysis_id)):
+        job_id = cache.get(key)
+        job = get_job(job_id) if job_id else None
+        if job:
+            return job
+
+    job = {'id': uuid.uuid4().hex, 'analysis_id': analysis_id, 'state': 'queued', 'message': '', 'result': None,
+           'queued_at': timezone.now().isoformat(), 'finished_at': None}
+    if not cache.add(_active_key(analysis_id), job['id'], JOB_TIMEOUT):
+        # Another request started one between our check and now
+        return get_job(cache.get(_active_key(analysis_id))) or job
+    _save_job(job)
+    _executor.submit(_run, dict(job))
+    return job
+
+
+def _run(job):
+    analysis_id = job['analysis_id']
+    try:
+        _save_job(job, state='running')
+        result = refresh(analysis_id)
+        _save_job(job, state='done', result=result, finished_at=timezone.now().isoformat(),
+                  message=f"{result['candles']} new candles" if result['candles'] else 'Already up to date')
+        cache.set(_recent_key(analysis_id), job['id'], MIN_INTERVAL)
+    except Exception as e:
+        logger.error(f"Refresh of analysis {analysis_id} failed: {str(e)}")
+        _save_job(job, state='failed', message='Refresh failed', finished_at=timezone.now().isoformat())
+    finally:
+        cache.delete(_active_key(analysis_id))
+        close_old_connections()
+
+
+def _to_iso(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc).isoformat()
+
+
+def _series(chart_data):
+    """chart_data as aligned close/high/low/volume lists; old data may lack the last three"""
+    closes = [float(price) for price in chart_data.get('prices') or []]
+    series = {'close': closes}
+    for field, key in (('high', 'highs'), ('low', 'lows'), ('volume', 'volumes')):
+        values = chart_data.get(key) or []
+        if len(values) != len(closes):
+            values = closes if field != 'volume' else [0.0] * len(closes)
+        series[field] = [float(value) for value in values]
+    return series
+
+
+def _chart_resolution(chart_data, timestamps):
+    """Resolution of the stored chart: as recorded, else from its last step, else sized for ``CHART_RANGE``"""
+    resolution = chart_data.get('resolution')
+    if resolution in market_data.RESOLUTION_SECONDS:
+        return resolution
+    if len(timestamps) >= 2:
+        step = timestamps[-1] - timestamps[-2]
+        fitting = [r for r in [market_data.BASE_RESOLUTION] + market_data.rollup_resolutions()
+                   if market_data.RESOLUTION_SECONDS[r] <= step]
+        return max(fitting, key=market_data.RESOLUTION_SECONDS.get) if fitting else market_data.BASE_RESOLUTION
+    return market_data.pick_resolution(market_data.CHART_RANGES[CHART_RANGE], MAX_POINTS)
+
+
+def _format(value):
+    if abs(value) >= 1000:
+        return f"{value:,.2f}"
+    return f"{value:.4f}".rstrip('0').rstrip('.')
+
+
+def _metric_values(series, indicator_rows):
+    """Current values for the metrics a refresh can compute, keyed by lower-case name"""
+    closes = series['close']
+    values = {'price': closes[-1], 'current price': closes[-1], 'volume': series['volume'][-1]}
+    for row in indicator_rows:
+        latest = indicators.latest(row.data)
+        if latest is not None:
+            values.setdefault(row.indicator_type, latest)
+            values.setdefault(row.get_indicator_type_display().lower(), latest)
+    return values
+
+
+def _refresh_metrics(analysis, values):
+    changed = []
+    for metric in analysis.metrics.all():
+        value = values.get(metric.name.strip().lower())
+        if value is None:
+            continue
+        try:
+            previous = float(str(metric.current_value).replace(',', '').rstrip('%'))
+        except ValueError:
+            previous = None
+        metric.previous_value = metric.current_value
+        metric.current_value = _format(value)
+        if previous:
+            change = (value - previous) / abs(previous) * 100
+            metric.change = f"{change:+.2f}%"
+            metric.trend = 'up' if change > 0 else 'down' if change < 0 else 'neutral'
+        changed.append(metric)
+    AnalysisMetric.objects.bulk_update(changed, ['previous_value', 'current_value', 'change', 'trend'])
+    return len(changed)
+
+
+def refresh(analysis_id):
+    """Append new candles to the analysis and extend its indicators and metrics"""
+    with transaction.atomic():
+        analysis = CryptoAnalysis.objects.select_for_update().get(pk=analysis_id)
+        chart_data = dict(analysis.chart_data or {})
+        timestamps = [market_data.parse_timestamp(t) for t in chart_data.get('timestamps') or []]
+        series = _series(chart_data)
+        if len(timestamps) != len(series['close']):
+            timestamps, series = [], _series({})
+        resolution = _chart_resolution(chart_data, timestamps)
+        latest = market_data.latest_timestamp(analysis.symbol, resolution)
+        if latest is None and not timestamps and resolution != market_data.BASE_RESOLUTION:
+            # Rollups not built for this symbol yet
+            resolution = market_data.BASE_RESOLUTION
+            latest = market_data.latest_timestamp(analysis.symbol, resolution)
+        if latest is None:
+            return {'candles': 0, 'indicators': 0, 'metrics': 0}
+
+        # Only the last MAX_POINTS candles can survive trimming, so read no further back
+        start = latest - (MAX_POINTS - 1) * market_data.RESOLUTION_SECONDS[resolution]
+        if timestamps and timestamps[-1] >= start:
+            start = timestamps[-1] + 1
+        else:
+            # Empty, or too old to continue: rebuild the series from the window
+            timestamps, series = [], _series({})
+        previous_length = len(timestamps)
+
+        candles = market_data.get_candles(analysis.symbol, start=start, resolution=resolution)
+        new_timestamps = candles['timestamp'].tolist()
+        if not new_timestamps:
+            return {'candles': 0, 'indicators': 0, 'metrics': 0}
+
+        timestamps += new_timestamps
+        for field in ('close', 'high', 'low', 'volume'):
+            series[field] += candles[field].tolist()
+        dropped = max(0, len(timestamps) - MAX_POINTS)
+        if dropped:
+            timestamps = timestamps[dropped:]
+            series = {field: values[dropped:] for field, values in series.items()}
+
+        chart_data.update({
+            'resolution': resolution,
+            'timestamps': [_to_iso(t) for t in timestamps],
+            'prices': series['close'],
+            'highs': series['high'],
+            'lows': series['low'],
+            'volumes': series['volume'],
+        })
+        analysis.chart_data = chart_data
+
+        indicator_rows = list(analysis.indicator_data.all())
+        for row in indicator_rows:
+            row.data = indicators.update(row.indicator_type, row.data, row.parameters, series,
+                                         previous_length, dropped)
+        TechnicalIndicatorData.objects.bulk_update(indicator_rows, ['data'])
+
+        metrics = _refresh_metrics(analysis, _metric_values(series, indicator_rows))
+        # Saving moves updated_at, which also retires the cached PDF report
+        analysis.save(update_fields=['chart_data', 'updated_at'])
+
+    logger.info(f"Refreshed analysis {analysis_id}: {len(new_timestamps)} candles, "
+                f"{len(indicator_rows)} indicators, {metrics} metrics")
+    return {'candles': len(new_timestamps), 'indicators': len(indicator_rows), 'metrics': metrics}
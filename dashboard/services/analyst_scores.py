@@ -0,0 +1,198 @@
+"""
+Nightly track record of every analysis and analyst against realized prices.
+
+Every analysis is scored as a call opened when it was published (see
+``portfolio`` for how a call runs and closes). Analyses are read in
+primary-key chunks; each chunk is scored in one vectorized pass and its
+rows written back with ``bulk_update`` (only rows whose results moved),
+while per-analyst sums are carried across chunks. Analysts are written
+once at the end.
+
+Per analysis: call status, return, drawdown, hit, the Brier term of its
+implied confidence, ``overall_score`` (0-10) and ``growth_potential`` (the
+call's return as text; neutral and blank for calls that are not scored). Per analyst: hit rate, average closed return, worst
+drawdown, Brier score, calibration error, ``performance_score`` and the
+star ``rating`` derived from it. The marketplace sorts on these stored
+columns; nothing is computed per request. ``bulk_update`` sends no
+signals, so a run that changed analyses bumps the analysis-card version
+itself.
+"""
+import logging
+import time
+from decimal import Decimal
+
+import numpy as np
+from django.utils import timezone
+
+from ..models import Analyst, CryptoAnalysis
+from . import fragments, portfolio
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 2000
+
+# Confidence a call implicitly claims, by recommendation strength
+CONFIDENCE = {'strong_buy': 0.75, 'strong_sell': 0.75, 'buy': 0.6, 'sell': 0.6}
+
+# Returns and drawdowns (in %) at which the score curve bends
+RETURN_SCALE = 10.0
+DRAWDOWN_SCALE = 10.0
+
+# Neutral calls added to every analyst's record so a few lucky calls do not top the ranking
+PRIOR_CALLS = 5
+NEUTRAL_SCORE = 5.0
+
+ANALYSIS_FIELDS = [
+    'overall_score', 'growth_potential', 'call_status', 'call_return', 'call_drawdown', 'call_hit', 'call_brier',
+    'scored_at', 'updated_at',
+]
+ANALYST_FIELDS = [
+    'scored_calls', 'resolved_calls', 'hit_calls', 'hit_rate', 'average_return', 'max_drawdown', 'brier_score',
+    'calibration_error', 'performance_score', 'rating', 'scored_at',
+]
+
+# Columns of the per-analyst running sums
+SCORED, RESOLVED, HITS, RETURN_SUM, DRAWDOWN, BRIER_SUM, SCORE_SUM = range(7)
+BUCKETS = sorted(set(CONFIDENCE.values()))
+BUCKET_COUNT = 7
+BUCKET_HITS = BUCKET_COUNT + len(BUCKETS)
+COLUMNS = BUCKET_HITS + len(BUCKETS)
+
+
+def _decimal(value, places):
+    if value is None:
+        return None
+    return Decimal(str(round(float(value), places)))
+
+
+def call_scores(returns, drawdowns):
+    """Score out of 10: rises with return, falls with drawdown"""
+    scores = NEUTRAL_SCORE + 5 * np.tanh(returns / RETURN_SCALE) - 2.5 * np.tanh(drawdowns / DRAWDOWN_SCALE)
+    return np.clip(scores, 0, 10)
+
+
+def _calls(rows):
+    levels = portfolio.annotation_levels([row['id'] for row in rows])
+    return [portfolio.make_call(
+        row['id'], row['id'], row['analyst_id'], row['symbol'], row['recommendation'], row['timeframe'],
+        row['price_targets'], row['published_at'] or row['created_at'], levels.get(row['id']),
+    ) for row in rows]
+
+
+def score_chunk(rows, now, totals):
+    """Score one chunk of analysis rows, add to ``totals`` and return the changed analyses"""
+    results = portfolio.score_calls(_calls(rows), now=now)
+    count = len(results)
+    returns = np.array([np.nan if r['return'] is None else r['return'] for r in results], dtype=np.float64)
+    drawdowns = np.array([r['drawdown'] or 0.0 for r in results], dtype=np.float64)
+    directional = np.array([r['direction'] != 0 for r in results]) & ~np.isnan(returns)
+    resolved = directional & np.array([r['realized'] for r in results])
+    hits = resolved & np.array([bool(r['hit']) for r in results])
+    confidence = np.array([CONFIDENCE.get(row['recommendation'], 0.5) for row in rows], dtype=np.float64)
+    brier = np.where(resolved, (confidence - hits) ** 2, np.nan)
+    scores = np.where(directional, call_scores(np.nan_to_num(returns), drawdowns), np.nan)
+
+    # Per-analyst sums for this chunk, merged into the running totals
+    analysts, index = np.unique(np.fromiter((row['analyst_id'] for row in rows), dtype=np.int64, count=count),
+                                return_inverse=True)
+    index = index.ravel()
+    size = len(analysts)
+    sums = np.zeros((size, COLUMNS))
+    sums[:, SCORED] = np.bincount(index, weights=directional, minlength=size)
+    sums[:, RESOLVED] = np.bincount(index, weights=resolved, minlength=size)
+    sums[:, HITS] = np.bincount(index, weights=hits, minlength=size)
+    sums[:, RETURN_SUM] = np.bincount(index, weights=np.where(resolved, returns, 0), minlength=size)
+    np.maximum.at(sums[:, DRAWDOWN], index[directional], drawdowns[directional])
+    sums[:, BRIER_SUM] = np.bincount(index, weights=np.nan_to_num(brier), minlength=size)
+    sums[:, SCORE_SUM] = np.bincount(index, weights=np.nan_to_num(scores), minlength=size)
+    for b, level in enumerate(BUCKETS):
+        in_bucket = resolved & (confidence == level)
+        sums[:, BUCKET_COUNT + b] = np.bincount(index, weights=in_bucket, minlength=size)
+        sums[:, BUCKET_HITS + b] = np.bincount(index, weights=in_bucket & hits, minlength=size)
+    for analyst_id, row_sums in zip(analysts.tolist(), sums):
+        total = totals.setdefault(analyst_id, np.zeros(COLUMNS))
+        drawdown = max(total[DRAWDOWN], row_sums[DRAWDOWN])
+        total += row_sums
+        total[DRAWDOWN] = drawdown
+
+    changed = []
+    for i, (row, result) in enumerate(zip(rows, results)):
+        values = {
+            'call_status': result['status'],
+            'call_return': _decimal(result['return'], 2),
+            'call_drawdown': _decimal(result['drawdown'], 2),
+            'call_hit': result['hit'],
+            'call_brier': _decimal(None if np.isnan(brier[i]) else brier[i], 4),
+        }
+        if directional[i]:
+            values['overall_score'] = _decimal(scores[i], 1)
+            values['growth_potential'] = f"{returns[i]:+.2f}%"
+        else:
+            # Holds and calls without market data are not scored
+            values['overall_score'] = _decimal(NEUTRAL_SCORE, 1)
+            values['growth_potential'] = ''
+        if any(row[field] != value for field, value in values.items()):
+            changed.append(CryptoAnalysis(id=row['id'], **{
+                field: values.get(field, row.get(field)) for field in ANALYSIS_FIELDS if field not in ('scored_at', 'updated_at')
+            }, scored_at=now, updated_at=now))
+    return changed
+
+
+def analyst_values(total):
+    """Stored track record for one analyst's running sums"""
+    scored, resolved, hits = int(total[SCORED]), int(total[RESOLVED]), int(total[HITS])
+    calibration = None
+    if resolved:
+        gaps = [total[BUCKET_COUNT + b] * abs(total[BUCKET_HITS + b] / total[BUCKET_COUNT + b] - level)
+                for b, level in enumerate(BUCKETS) if total[BUCKET_COUNT + b]]
+        calibration = sum(gaps) / resolved
+    performance = 0.0
+    if scored:
+        performance = (total[SCORE_SUM] + NEUTRAL_SCORE * PRIOR_CALLS) / (scored + PRIOR_CALLS)
+    return {
+        'scored_calls': scored,
+        'resolved_calls': resolved,
+        'hit_calls': hits,
+        'hit_rate': _decimal(hits / resolved * 100, 2) if resolved else None,
+        'average_return': _decimal(total[RETURN_SUM] / resolved, 2) if resolved else None,
+        'max_drawdown': _decimal(total[DRAWDOWN], 2) if scored else None,
+        'brier_score': _decimal(total[BRIER_SUM] / resolved, 4) if resolved else None,
+        'calibration_error': _decimal(calibration, 4),
+        'performance_score': _decimal(performance, 2),
+        'rating': _decimal(performance / 2, 2),
+    }
+
+
+def score_all(chunk_size=CHUNK_SIZE, now=None):
+    """Score every analysis and analyst; returns counters for the run"""
+    now = now or timezone.now()
+    started = time.monotonic()
+    stats = {'analyses': 0, 'analyses_updated': 0, 'analysts_updated': 0}
+    totals = {}
+    fields = ['id', 'analyst_id', 'symbol', 'recommendation', 'timeframe', 'price_targets', 'published_at',
+              'created_at'] + [field for field in ANALYSIS_FIELDS if field not in ('scored_at', 'updated_at')]
+    last_id = 0
+    while True:
+        rows = list(CryptoAnalysis.objects.filter(id__gt=last_id).order_by('id').values(*fields)[:chunk_size])
+        if not rows:
+            break
+        last_id = rows[-1]['id']
+        changed = score_chunk(rows, now, totals)
+        CryptoAnalysis.objects.bulk_update(changed, ANALYSIS_FIELDS, batch_size=500)
+        stats['analyses'] += len(rows)
+        stats['analyses_updated'] += len(changed)
+
+    # Analysts without any analysis left are reset rather than keeping an old record
+    analysts = []
+    for analyst_id in Analyst.objects.values_list('id', flat=True).iterator(chunk_size=chunk_size):
+        values = analyst_values(totals.get(analyst_id, np.zeros(COLUMNS)))
+        analysts.append(Analyst(id=analyst_id, scored_at=now, **values))
+    Analyst.objects.bulk_update(analysts, ANALYST_FIELDS, batch_size=500)
+    stats['analysts_updated'] = len(analysts)
+
+    if stats['analyses_updated']:
+        fragments.analyses_changed()
+
+    logger.info(f"Scored {stats['analyses']} analyses ({stats['analyses_updated']} changed) and "
+                f"{stats['analysts_updated']} analysts in {time.monotonic() - started:.1f}s")
+    return stats
@@ -0,0 +1,355 @@
+"""
+Analyst availability: weekly consultation hours plus existing bookings,
+compiled into sorted arrays per analyst.
+
+``Analyst.consultation_hours`` maps weekdays to time ranges in the analyst's
+timezone (``settings.TIME_ZONE`` unless a ``timezone`` key is given)::
+
+    {"timezone": "Africa/Nairobi",
+     "mon": ["09:00-12:00", "13:00-17:00"],
+     "tue": [["09:00", "17:00"]],
+     "sat": []}
+
+Weekday keys may be full names, three-letter names or 0-6 (Monday = 0).
+Analysts with no hours configured fall back to ``DEFAULT_WEEKLY_HOURS``.
+
+Compiled calendars live in process memory and are validated against a
+per-analyst version counter (``versions``). Committed booking changes are
+applied to the local calendar in place and bump the version so other
+processes rebuild. The database overlap check in ``reserve_slot`` stays authoritative.
+"""
+import copy
+import heapq
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Analyst, Consultation
+from .versions import bump_version, get_version
+
+logger = logging.getLogger(__name__)
+
+# Consultations in these states hold their time slot
+ACTIVE_STATUSES = ('scheduled', 'pending', 'in_progress')
+
+# Granularity of offered start times
+SLOT_STEP = timedelta(minutes=30)
+
+# How far ahead slot search looks
+SEARCH_HORIZON_DAYS = 60
+
+DEFAULT_WEEKLY_HOURS = {day: ['09:00-17:00'] for day in ('mon', 'tue', 'wed', 'thu', 'fri')}
+
+WEEKDAYS = {
+    'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3, 'friday': 4, 'saturday': 5, 'sunday': 6,
+    'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5, 'sun': 6,
+}
+
+
+class SlotUnavailable(Exception):
+    """Raised when a requested consultation slot cannot be reserved"""
+
+
+def _parse_minutes(value):
+    hours, minutes = str(value).strip().split(':')[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def _parse_range(value):
+    if isinstance(value, str):
+        value = value.split('-')
+    start, end = (_parse_minutes(part) for part in value)
+    if not 0 <= start < end <= 24 * 60:
+        raise ValueError(f"Invalid time range: {value}")
+    return start, end
+
+
+def _merge(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def compile_weekly_hours(schedule):
+    """
+    Parse a ``consultation_hours`` value into ``(tz, windows)`` where
+    ``windows[weekday]`` is a sorted list of ``(start_minute, end_minute)``.
+    """
+    if not schedule or not isinstance(schedule, dict):
+        # consultation_hours is free-form JSON; anything but a mapping means the defaults
+        if schedule:
+            logger.warning(f"Ignoring consultation hours that are not a mapping: {schedule!r}")
+        schedule = DEFAULT_WEEKLY_HOURS
+    try:
+        tz = ZoneInfo(schedule.get('timezone') or settings.TIME_ZONE)
+    except (ZoneInfoNotFoundError, TypeError, ValueError):
+        tz = ZoneInfo(settings.TIME_ZONE)
+
+    windows = [[] for _ in range(7)]
+    for key, ranges in schedule.items():
+        key = str(key).strip().lower()
+        weekday = int(key) if key.isdigit() else WEEKDAYS.get(key)
+        if weekday is None or not 0 <= weekday <= 6:
+            continue
+        if isinstance(ranges, str):
+            ranges = [ranges]
+        elif not isinstance(ranges, (list, tuple)):
+            if ranges:
+                logger.warning(f"Ignoring invalid consultation hours entry {key}: {ranges!r}")
+            continue
+        for value in ranges:
+            try:
+                windows[weekday].append(_parse_range(value))
+            except (TypeError, ValueError):
+                logger.warning(f"Ignoring invalid consultation hours entry {key}: {value!r}")
+    return tz, [_merge(day) for day in windows]
+
+
+def _at(day, minute, tz):
+    if minute >= 24 * 60:
+        return datetime.combine(day + timedelta(days=1), time(0), tzinfo=tz)
+    return datetime.combine(day, time(minute // 60, minute % 60), tzinfo=tz)
+
+
+class AnalystCalendar:
+    """Weekly hours and active bookings of one analyst as sorted arrays"""
+
+    def __init__(self, analyst_id, schedule, bookings, version=None):
+        self.analyst_id = analyst_id
+        self.version = version
+        self.tz, self.windows = compile_weekly_hours(schedule)
+        self.window_starts = [[start for start, _ in day] for day in self.windows]
+        # Bookings sorted by start; starts is kept parallel for bisect
+        self.starts = []
+        self.entries = []
+        self.max_duration = timedelta(0)
+        for consultation_id, start, end in sorted(bookings, key=lambda b: b[1]):
+            self.add(consultation_id, start, end)
+
+    def add(self, consultation_id, start, end):
+        index = bisect_right(self.starts, start)
+        self.starts.insert(index, start)
+        self.entries.insert(index, (start, end, consultation_id))
+        self.max_duration = max(self.max_duration, end - start)
+
+    def discard(self, consultation_id, start=None):
+        """Remove a booking; ``start`` narrows the search to a bisect"""
+        if start is not None:
+            index = bisect_left(self.starts, start)
+            while index < len(self.entries) and self.starts[index] == start:
+                if self.entries[index][2] == consultation_id:
+                    del self.starts[index], self.entries[index]
+                    return True
+                index += 1
+        for index, entry in enumerate(self.entries):
+            if entry[2] == consultation_id:
+                del self.starts[index], self.entries[index]
+                return True
+        return False
+
+    def conflict_end(self, start, end):
+        """End of the latest booking overlapping ``[start, end)``, or None"""
+        # Only bookings starting within max_duration before ``start`` can reach into it
+        low = bisect_left(self.starts, start - self.max_duration)
+        high = bisect_left(self.starts, end)
+        latest = None
+        for booked_start, booked_end, _ in self.entries[low:high]:
+            if booked_end > start and (latest is None or booked_end > latest):
+                latest = booked_end
+        return latest
+
+    def within_hours(self, start, end):
+        local_start = start.astimezone(self.tz)
+        day = local_start.date()
+        minute = local_start.hour * 60 + local_start.minute
+        windows = self.windows[day.weekday()]
+        index = bisect_right(self.window_starts[day.weekday()], minute) - 1
+        if index < 0:
+            return False
+        return end <= _at(day, windows[index][1], self.tz)
+
+    def is_free(self, start, end):
+        return self.within_hours(start, end) and self.conflict_end(start, end) is None
+
+    def iter_free_slots(self, duration, after, step=SLOT_STEP, horizon_days=SEARCH_HORIZON_DAYS):
+        """Yield free start times from ``after`` onwards in chronological order"""
+        local_after = after.astimezone(self.tz)
+        day = local_after.date()
+        for _ in range(horizon_days + 1):
+            for window_start_minute, window_end_minute in self.windows[day.weekday()]:
+                window_start = _at(day, window_start_minute, self.tz)
+                window_end = _at(day, window_end_minute, self.tz)
+                candidate = window_start
+                if candidate < after:
+                    steps = -(-(after - window_start) // step)
+                    candidate = window_start + steps * step
+                while candidate + duration <= window_end:
+                    blocked_until = self.conflict_end(candidate, candidate + duration)
+                    if blocked_until is None:
+                        yield candidate
+                        candidate += step
+                    else:
+                        steps = -(-(blocked_until - window_start) // step)
+                        candidate = window_start + steps * step
+            day += timedelta(days=1)
+
+
+_calendars = {}
+_booking_owners = {}
+_lock = threading.Lock()
+
+
+def _version_name(analyst_id):
+    return f'availability:{analyst_id}'
+
+
+def build_calendar(analyst, version=None):
+    bookings = Consultation.objects.filter(
+        analyst=analyst,
+        status__in=ACTIVE_STATUSES,
+        scheduled_end__gt=timezone.now(),
+    ).values_list('id', 'scheduled_date', 'scheduled_end')
+    return AnalystCalendar(analyst.id, analyst.consultation_hours, list(bookings), version)
+
+
+def get_calendar(analyst):
+    """Compiled calendar for ``analyst``, rebuilt only when its version moved"""
+    version = get_version(_version_name(analyst.id))
+    calendar = _calendars.get(analyst.id)
+    if calendar is None or calendar.version != version:
+        calendar = build_calendar(analyst, version)
+        with _lock:
+            _calendars[analyst.id] = calendar
+            for _, _, consultation_id in calendar.entries:
+                _booking_owners[consultation_id] = analyst.id
+    return calendar
+
+
+def _apply(analyst_id, consultation, remove_only):
+    name = _version_name(analyst_id)
+    previous = get_version(name)
+    current = bump_version(name)
+    with _lock:
+        calendar = _calendars.get(analyst_id)
+        if calendar is None:
+            return
+        if calendar.version != previous:
+            # Another process changed this analyst too; rebuild on next use
+            del _calendars[analyst_id]
+            return
+        calendar.discard(consultation.id, consultation.scheduled_date)
+        _booking_owners.pop(consultation.id, None)
+        if not remove_only:
+            calendar.add(consultation.id, consultation.scheduled_date, consultation.scheduled_end)
+            _booking_owners[consultation.id] = analyst_id
+        calendar.version = current
+
+
+def booking_changed(consultation, deleted=False):
+    """
+    Apply a created, updated, cancelled or deleted booking incrementally,
+    once the transaction saving it commits. A rolled back booking never
+    reaches the in-process calendar.
+    """
+    booking = copy.copy(consultation)
+    transaction.on_commit(lambda: _booking_committed(booking, deleted))
+
+
+def _booking_committed(consultation, deleted):
+    previous_owner = _booking_owners.get(consultation.id)
+    if previous_owner and previous_owner != consultation.analyst_id:
+        _apply(previous_owner, consultation, remove_only=True)
+    if consultation.analyst_id:
+        holds_slot = (not deleted and consultation.status in ACTIVE_STATUSES
+                      and consultation.scheduled_end is not None)
+        _apply(consultation.analyst_id, consultation, remove_only=not holds_slot)
+
+
+def schedule_changed(analyst):
+    """Drop the compiled calendar after an analyst's hours changed"""
+    bookings_changed([analyst.id])
+
+
+def bookings_changed(analyst_ids):
+    """Drop calendars whose bookings were changed in bulk, bypassing signals"""
+    for analyst_id in analyst_ids:
+        bump_version(_version_name(analyst_id))
+        with _lock:
+            _calendars.pop(analyst_id, None)
+
+
+def bookable_analysts():
+    return list(Analyst.objects.filter(available_for_consultation=True).select_related('user').order_by('id'))
+
+
+def is_slot_free(analyst, start, duration_minutes):
+    return get_calendar(analyst).is_free(start, start + timedelta(minutes=duration_minutes))
+
+
+def next_free_slots(duration_minutes, count=5, analyst=None, after=None):
+    """
+    Next ``count`` free start times as ``(start, analyst)`` pairs.
+
+    Without an analyst, every bookable analyst's free slots are merged in
+    time order and each start time is offered once.
+    """
+    duration = timedelta(minutes=duration_minutes)
+    after = after or timezone.now()
+    analysts = [analyst] if analyst else bookable_analysts()
+
+    streams = [
+        ((start, a.id, a) for start in get_calendar(a).iter_free_slots(duration, after))
+        for a in analysts
+    ]
+    slots = []
+    for start, _, slot_analyst in heapq.merge(*streams, key=lambda item: (item[0], item[1])):
+        if slots and slots[-1][0] == start:
+            continue
+        slots.append((start, slot_analyst))
+        if len(slots) >= count:
+            break
+    return slots
+
+
+def reserve_slot(start, duration_minutes, analyst=None, **consultation_fields):
+    """
+    Atomically book ``[start, start + duration)`` and return the consultation.
+
+    The analyst row is locked before the overlap check, so two bookings for
+    the same analyst are serialised and the second one sees the first.
+    Without an explicit analyst the first bookable analyst who is free is
+    used. Raises ``SlotUnavailable`` when nobody can take the slot.
+    """
+    end = start + timedelta(minutes=duration_minutes)
+    candidates = [analyst] if analyst else bookable_analysts()
+
+    with transaction.atomic():
+        for candidate in candidates:
+            if not candidate.available_for_consultation or not get_calendar(candidate).is_free(start, end):
+                continue
+            Analyst.objects.select_for_update().filter(pk=candidate.pk).first()
+            clash = Consultation.objects.filter(
+                analyst=candidate,
+                status__in=ACTIVE_STATUSES,
+                scheduled_date__lt=end,
+                scheduled_end__gt=start,
+            ).exists()
+            if clash:
+                continue
+            return Consultation.objects.create(
+                analyst=candidate,
+                scheduled_date=start,
+                duration_minutes=duration_minutes,
+                **consultation_fields
+            )
+    raise SlotUnavailable('That time slot is no longer available. Please pick another time.')
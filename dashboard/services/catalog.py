@@ -0,0 +1,74 @@
+"""
+Consultation package catalog.
+
+The home page, dashboard and booking page all list the active
+``ConsultationPackage`` rows. The list is built once per
+``consultation-packages`` version (the one the cached package cards are
+keyed on) as a tuple of immutable ``Package`` records, and kept both in
+process memory and in the shared cache, so only the first worker to see a
+new version queries for the packages; the others read just the version. Saving or deleting a package bumps the version
+once the change is committed.
+"""
+import logging
+from decimal import Decimal
+from typing import NamedTuple
+
+from django.core.cache import cache
+
+from ..models import ConsultationPackage
+from . import fragments
+
+logger = logging.getLogger(__name__)
+
+# Entries are retired by version bumps; the timeout only bounds cache growth
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class Package(NamedTuple):
+    id: int
+    title: str
+    level: str
+    level_display: str
+    description: str
+    price: Decimal
+    features: tuple
+    icon_class: str
+    duration_minutes: int
+
+
+_snapshot = None
+
+
+def _cache_key(version):
+    return f"catalog:packages:{version}"
+
+
+def build():
+    """Active packages, cheapest first"""
+    return tuple(Package(
+        id=package.id,
+        title=package.title,
+        level=package.level,
+        level_display=package.get_level_display(),
+        description=package.description,
+        price=package.price,
+        features=tuple(package.get_features_list()),
+        icon_class=package.icon_class,
+        duration_minutes=package.duration_minutes,
+    ) for package in ConsultationPackage.objects.filter(is_active=True))
+
+
+def snapshot():
+    """``(version, packages)``: the current catalog and the version it was built from"""
+    global _snapshot
+    version = fragments.packages_version()
+    current = _snapshot
+    if current is not None and current[0] == version:
+        return current
+    packages = cache.get(_cache_key(version))
+    if packages is None:
+        packages = build()
+        cache.set(_cache_key(version), packages, CACHE_TIMEOUT)
+        logger.info(f"Built consultation package catalog version {version} ({len(packages)} packages)")
+    _snapshot = (version, packages)
+    return _snapshot
@@ -0,0 +1,312 @@
+"""
+Chat file storage: resumable chunked uploads, content-addressed blobs and
+HTTP Range serving for consultation chat attachments.
+
+Uploads are appended to a partial file on disk chunk by chunk, so the request
+body is never held in memory. When the last byte arrives the partial file is
+hashed with SHA-256 and either moved into the blob store or, if the same
+content was uploaded before, discarded in favour of the existing blob.
+"""
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import shutil
+import uuid
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+
+from ..models import ChatMessage, ChunkedUpload, ContentBlob
+
+logger = logging.getLogger(__name__)
+
+# Size of the blocks used when hashing, copying and streaming files
+IO_BLOCK_SIZE = 64 * 1024
+
+# Largest file accepted by the chat upload endpoint
+MAX_UPLOAD_SIZE = getattr(settings, 'CHAT_UPLOAD_MAX_SIZE', 50 * 1024 * 1024)
+
+PARTIAL_UPLOAD_DIR = 'chat_uploads/partial'
+BLOB_DIR = 'chat_blobs'
+
+FILE_MESSAGE_TYPES = ('image', 'video', 'document', 'voice')
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class UploadError(Exception):
+    """Raised when an upload request cannot be applied"""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+def _media_path(*parts):
+    return os.path.join(str(settings.MEDIA_ROOT), *parts)
+
+
+def partial_path(upload):
+    """Absolute path of the partial file backing an in-progress upload"""
+    return _media_path(PARTIAL_UPLOAD_DIR, f"{upload.upload_id}.part")
+
+
+def guess_message_type(content_type, requested=None):
+    """Pick the chat message type for an uploaded file"""
+    if requested in FILE_MESSAGE_TYPES:
+        return requested
+    if content_type.startswith('image/'):
+        return 'image'
+    if content_type.startswith('video/'):
+        return 'video'
+    if content_type.startswith('audio/'):
+        return 'voice'
+    return 'document'
+
+
+def start_upload(chat_room, user, file_name, total_size, content_type='', message_type=None):
+    """Open a new resumable upload session"""
+    if total_size <= 0:
+        raise UploadError('File is empty.')
+    if total_size > MAX_UPLOAD_SIZE:
+        raise UploadError(f'File exceeds the maximum size of {MAX_UPLOAD_SIZE // (1024 * 1024)} MB.', status=413)
+
+    file_name = os.path.basename(file_name or 'upload')[:255]
+    content_type = content_type or mimetypes.guess_type(file_name)[0] or 'application/octet-stream'
+
+    upload = ChunkedUpload.objects.create(
+        chat_room=chat_room,
+        user=user,
+        file_name=file_name,
+        content_type=content_type[:100],
+        message_type=guess_message_type(content_type, message_type),
+        total_size=total_size,
+    )
+    os.makedirs(os.path.dirname(partial_path(upload)), exist_ok=True)
+    open(partial_path(upload), 'wb').close()
+    return upload
+
+
+def append_chunk(upload, offset, chunk):
+    """
+    Append an uploaded chunk at ``offset``.
+
+    The offset must match what the server already holds; a mismatch raises
+    ``UploadError`` carrying the current offset so the client can resume.
+    """
+    if upload.status != 'uploading':
+        raise UploadError('Upload is already complete.', status=409, offset=upload.offset)
+    if offset != upload.offset:
+        raise UploadError('Offset mismatch.', status=409, offset=upload.offset)
+
+    written = 0
+    with open(partial_path(upload), 'r+b') as destination:
+        destination.seek(offset)
+        destination.truncate()
+        for block in chunk.chunks(IO_BLOCK_SIZE):
+            if offset + written + len(block) > upload.total_size:
+                raise UploadError('Chunk runs past the declared file size.', status=413, offset=upload.offset)
+            destination.write(block)
+            written += len(block)
+
+    upload.offset = offset + written
+    ChunkedUpload.objects.filter(pk=upload.pk).update(offset=upload.offset)
+    return upload
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(IO_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def store_blob(path, content_type, original_name='', keep_source=False):
+    """
+    Move the file at ``path`` into the content-addressed blob store.
+
+    Returns the ``ContentBlob`` for the file's digest. When a blob with the
+    same content already exists the file at ``path`` is removed instead.
+    With ``keep_source`` the file is copied and left in place.
+    """
+    digest = _hash_file(path)
+    existing = ContentBlob.objects.filter(sha256=digest).first()
+    if existing:
+        if not keep_source:
+            os.remove(path)
+        return existing
+
+    ext = os.path.splitext(original_name)[1].lower()[:10]
+    name = f"{BLOB_DIR}/{digest[:2]}/{digest}{ext}"
+    os.makedirs(os.path.dirname(_media_path(name)), exist_ok=True)
+    if keep_source:
+        shutil.copyfile(path, _media_path(name))
+    else:
+        os.replace(path, _media_path(name))
+
+    try:
+        with transaction.atomic():
+            return ContentBlob.objects.create(
+                sha256=digest,
+                file=name,
+                size=os.path.getsize(_media_path(name)),
+                content_type=content_type[:100],
+            )
+    except IntegrityError:
+        # Another request stored the same content first
+        return ContentBlob.objects.get(sha256=digest)
+
+
+def store_uploaded_file(uploaded_file):
+    """Deduplicate a Django ``UploadedFile`` into the blob store"""
+    tmp_dir = _media_path(PARTIAL_UPLOAD_DIR)
+    os.makedirs(tmp_dir, exist_ok=True)
+    tmp_path = os.path.join(tmp_dir, f"direct-{uuid.uuid4().hex}.part")
+    with open(tmp_path, 'wb') as destination:
+        for block in uploaded_file.chunks(IO_BLOCK_SIZE):
+            destination.write(block)
+    content_type = getattr(uploaded_file, 'content_type', None) or \
+        mimetypes.guess_type(uploaded_file.name)[0] or 'application/octet-stream'
+    return store_blob(tmp_path, content_type, uploaded_file.name)
+
+
+def dedupe_file_field(instance, field_name='file'):
+    """
+    Route a freshly assigned FileField upload through the blob store.
+
+    Used from model ``save()`` so files added outside the chat endpoint (for
+    example through the admin) are deduplicated as well.
+    """
+    field_file = getattr(instance, field_name)
+    if not field_file or getattr(field_file, '_committed', True):
+        return
+    blob = store_uploaded_file(field_file.file)
+    instance.blob = blob
+    setattr(instance, field_name, blob.file.name)
+
+
+def finish_upload(upload, caption=''):
+    """
+    Hash the completed upload, store it and post it as a chat message.
+
+    The partial file is only removed once the message is committed, so an
+    upload whose finalize step failed can be finalized again.
+    """
+    if upload.offset != upload.total_size:
+        raise UploadError('Upload is incomplete.', status=409, offset=upload.offset)
+
+    blob = store_blob(partial_path(upload), upload.content_type, upload.file_name, keep_source=True)
+    with transaction.atomic():
+        if ChunkedUpload.objects.select_for_update().get(pk=upload.pk).is_complete:
+            raise UploadError('Upload is already complete.', status=409, offset=upload.offset)
+        message = ChatMessage.objects.create(
+            chat_room=upload.chat_room,
+            user=upload.user,
+            message_type=upload.message_type,
+            content=caption,
+            file=blob.file.name,
+            file_name=upload.file_name,
+            blob=blob,
+        )
+        upload.status = 'complete'
+        upload.message = message
+        upload.save(update_fields=['status', 'message', 'updated_at'])
+    _remove_partial(upload)
+    return message
+
+
+def _remove_partial(upload):
+    try:
+        os.remove(partial_path(upload))
+    except FileNotFoundError:
+        pass
+
+
+def discard_upload(upload):
+    """Remove an abandoned upload and its partial file"""
+    _remove_partial(upload)
+    upload.delete()
+
+
+def _iter_range(path, start, length):
+    with open(path, 'rb') as source:
+        source.seek(start)
+        remaining = length
+        while remaining > 0:
+            block = source.read(min(IO_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+def serve_blob(request, blob, file_name, as_attachment=False):
+    """
+    Serve a blob with ETag and single-range ``Range`` support.
+
+    Blobs are immutable, so the SHA-256 digest doubles as a strong ETag.
+    """
+    etag = f'"{blob.sha256}"'
+    if request.headers.get('If-None-Match') == etag:
+        return HttpResponseNotModified()
+
+    path = blob.file.path
+    size = blob.size
+    range_header = request.headers.get('Range', '')
+    match = RANGE_RE.match(range_header.strip())
+    if_range = request.headers.get('If-Range')
+
+    if match and (not if_range or if_range == etag):
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        elif last:
+            start = max(0, size - int(last))
+            end = size - 1
+        else:
+            start, end = 0, size - 1
+
+        if start >= size or start > end:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        length = end - start + 1
+        response = StreamingHttpResponse(_iter_range(path, start, length), status=206,
+                                         content_type=blob.content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(length)
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=blob.content_type)
+        response['Content-Length'] = str(size)
+
+    disposition = 'attachment' if as_attachment else 'inline'
+    safe_name = file_name.replace('"', '')
+    response['Content-Disposition'] = f'{disposition}; filename="{safe_name}"'
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
+
+
+def media_page(chat_room, before=None, limit=24):
+    """
+    Return one page of shared media, newest first.
+
+    Keyset pagination on ``id`` keeps every page on the partial
+    ``chat_media_idx`` index regardless of how deep the client scrolls.
+    """
+    queryset = chat_room.messages.filter(blob__isnull=False).select_related('blob').order_by('-id')
+    if before:
+        queryset = queryset.filter(id__lt=before)
+    items = list(queryset[:limit + 1])
+    has_more = len(items) > limit
+    items = items[:limit]
+    next_before = items[-1].id if has_more and items else None
+    return items, next_before
@@ -0,0 +1,131 @@
+"""
+Consultation provisioning: meeting details, reminders, chat room and
+participant for newly scheduled consultations.
+
+Everything a booking needs is written with one INSERT per table, so
+provisioning one consultation or a few hundred (admin imports) costs the
+same fixed number of queries.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import connection, transaction
+
+from ..models import Consultation, ConsultationChatRoom, ConsultationParticipant, ConsultationReminder
+from .availability import bookings_changed
+
+logger = logging.getLogger(__name__)
+
+# Email reminders created for every scheduled consultation, relative to its start
+REMINDER_OFFSETS = (timedelta(hours=24), timedelta(hours=1))
+
+MEETING_FIELDS = ['meeting_id', 'meeting_password', 'meeting_link', 'join_url']
+
+
+def build_reminders(consultation):
+    """Unsaved reminder rows for a consultation"""
+    return [
+        ConsultationReminder(
+            consultation=consultation,
+            reminder_type='email',
+            scheduled_time=consultation.scheduled_date - offset,
+        )
+        for offset in REMINDER_OFFSETS
+    ]
+
+
+def provision_related(consultations, skip_reminders=()):
+    """
+    Create reminders, chat rooms and participants for saved consultations.
+
+    Only scheduled consultations are provisioned; ``skip_reminders`` holds
+    IDs that already have reminders. Runs as a single transaction: either
+    every consultation gets its rows or none do.
+    """
+    consultations = [c for c in consultations if c.pk and c.status == 'scheduled']
+    if not consultations:
+        return []
+
+    with transaction.atomic():
+        ConsultationReminder.objects.bulk_create(
+            [
+                reminder
+                for consultation in consultations if consultation.pk not in skip_reminders
+                for reminder in build_reminders(consultation)
+            ]
+        )
+        rooms = ConsultationChatRoom.objects.bulk_create(
+            [ConsultationChatRoom(consultation=consultation) for consultation in consultations]
+        )
+        if not connection.features.can_return_rows_from_bulk_insert:
+            rooms = list(ConsultationChatRoom.objects.filter(consultation__in=consultations))
+
+        owners = {consultation.pk: consultation.user_id for consultation in consultations}
+        ConsultationParticipant.objects.bulk_create(
+            [ConsultationParticipant(chat_room=room, user_id=owners[room.consultation_id]) for room in rooms],
+            ignore_conflicts=True,
+        )
+    return rooms
+
+
+def provision_consultations(consultations):
+    """
+    Insert many unsaved consultations and provision them in bulk.
+
+    ``bulk_create`` bypasses ``save()`` and signals, so meeting details are
+    assigned here before the INSERT and related rows are created explicitly.
+    On databases that cannot return inserted primary keys, scheduled
+    consultations are re-read by their (random) meeting ID; other rows are
+    returned without one.
+    """
+    consultations = list(consultations)
+    for consultation in consultations:
+        consultation.scheduled_end = consultation.scheduled_date + timedelta(minutes=consultation.duration_minutes)
+        if consultation.status == 'scheduled':
+            consultation.assign_meeting_details()
+
+    with transaction.atomic():
+        created = Consultation.objects.bulk_create(consultations)
+        if not connection.features.can_return_rows_from_bulk_insert:
+            by_meeting = {c.meeting_id: c for c in created if c.status == 'scheduled'}
+            new_rows = Consultation.objects.filter(meeting_id__in=by_meeting).values_list('pk', 'meeting_id')
+            for pk, meeting_id in new_rows:
+                by_meeting[meeting_id].pk = pk
+                by_meeting[meeting_id]._state.adding = False
+        provision_related(created)
+
+    # bulk_create sends no post_save, so drop the affected analyst calendars here
+    analyst_ids = {consultation.analyst_id for consultation in created if consultation.analyst_id}
+    transaction.on_commit(lambda: bookings_changed(analyst_ids))
+
+    logger.info(f"Provisioned {len(created)} consultations in bulk")
+    return created
+
+
+def provision_existing(queryset):
+    """
+    Backfill meeting details, reminders and chat rooms for scheduled
+    consultations that were created without them.
+
+    Returns the number of consultations provisioned.
+    """
+    consultations = list(queryset.filter(status='scheduled', chat_room__isnull=True))
+    if not consultations:
+        return 0
+
+    missing_meeting = [c for c in consultations if not c.meeting_id]
+    for consultation in missing_meeting:
+        consultation.assign_meeting_details()
+
+    has_reminders = set(
+        ConsultationReminder.objects.filter(consultation__in=consultations)
+        .values_list('consultation_id', flat=True).distinct()
+    )
+
+    with transaction.atomic():
+        if missing_meeting:
+            Consultation.objects.bulk_update(missing_meeting, MEETING_FIELDS)
+        provision_related(consultations, skip_reminders=has_reminders)
+
+    logger.info(f"Backfilled provisioning for {len(consultations)} consultations")
+    return len(consultations)
@@ -0,0 +1,196 @@
+"""
+"Users also bought" engine built from the PurchasedAnalysis graph.
+
+Purchases form a binary user x analysis matrix X. The item-item
+co-occurrence matrix C = X^T X is accumulated chunk by chunk over users with
+SciPy sparse matrices, so the full purchase table is never in memory at once.
+Neighbours are ranked by cosine similarity C[a, b] / sqrt(C[a, a] * C[b, b])
+and the top ``TOP_K`` per analysis are materialised into ``AlsoBought``.
+
+C and the highest purchase id folded into it (the watermark) are kept in
+``CoPurchaseState``. An incremental run loads only users with purchases past
+the watermark and adds their contribution
+Xn^T Xn + Xn^T Xo + Xo^T Xn (n = new purchases, o = earlier ones), then
+re-ranks just the analyses whose rows or normalisation changed. Deleted
+purchases (refunds) are only reflected by a ``--full`` rebuild.
+"""
+import io
+import logging
+
+import numpy as np
+from scipy import sparse
+
+from django.db import transaction
+from django.db.models import Max
+
+from ..models import AlsoBought, CoPurchaseState, CryptoAnalysis, PurchasedAnalysis
+
+logger = logging.getLogger(__name__)
+
+TOP_K = 10
+
+# Users whose purchases are loaded per chunk
+USER_CHUNK_SIZE = 1000
+
+STATE_ID = 1
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _item_count():
+    return (CryptoAnalysis.objects.aggregate(top=Max('id'))['top'] or 0) + 1
+
+
+def _user_item_matrix(pairs, user_index, item_count):
+    """Binary CSR matrix with one row per user in ``user_index``"""
+    if not pairs:
+        return sparse.csr_matrix((len(user_index), item_count), dtype=np.int32)
+    rows = np.fromiter((user_index[user_id] for user_id, _ in pairs), dtype=np.int32, count=len(pairs))
+    cols = np.fromiter((analysis_id for _, analysis_id in pairs), dtype=np.int32, count=len(pairs))
+    data = np.ones(len(pairs), dtype=np.int32)
+    return sparse.csr_matrix((data, (rows, cols)), shape=(len(user_index), item_count))
+
+
+def _resize(matrix, size):
+    if matrix.shape[0] < size:
+        matrix = matrix.tolil()
+        matrix.resize((size, size))
+        matrix = matrix.tocsr()
+    return matrix
+
+
+def _load_state():
+    state = CoPurchaseState.objects.filter(pk=STATE_ID).first()
+    if state is None:
+        return None, 0
+    matrix = sparse.load_npz(io.BytesIO(bytes(state.matrix))).tocsr()
+    return matrix, state.watermark
+
+
+def _save_state(matrix, watermark):
+    buffer = io.BytesIO()
+    sparse.save_npz(buffer, matrix.tocsr(), compressed=True)
+    CoPurchaseState.objects.update_or_create(
+        pk=STATE_ID, defaults={'matrix': buffer.getvalue(), 'watermark': watermark}
+    )
+
+
+def _accumulate(user_ids, watermark, new_watermark, item_count):
+    """Co-occurrence contributed by purchases in (watermark, new_watermark]"""
+    delta = sparse.csr_matrix((item_count, item_count), dtype=np.int32)
+    for chunk in _chunks(user_ids, USER_CHUNK_SIZE):
+        user_index = {user_id: row for row, user_id in enumerate(chunk)}
+        old_pairs, new_pairs = [], []
+        purchases = PurchasedAnalysis.objects.filter(
+            user_id__in=chunk, id__lte=new_watermark
+        ).values_list('id', 'user_id', 'analysis_id')
+        for purchase_id, user_id, analysis_id in purchases:
+            (new_pairs if purchase_id > watermark else old_pairs).append((user_id, analysis_id))
+
+        new = _user_item_matrix(new_pairs, user_index, item_count)
+        old = _user_item_matrix(old_pairs, user_index, item_count)
+        delta = delta + new.T @ new
+        if old_pairs:
+            cross = new.T @ old
+            delta = delta + cross + cross.T
+    return delta.tocsr()
+
+
+def _materialise(matrix, items):
+    """Write top-K neighbours for ``items`` (analysis ids) into AlsoBought"""
+    existing = set(CryptoAnalysis.objects.filter(id__in=[int(i) for i in items]).values_list('id', flat=True))
+    buyers = matrix.diagonal().astype(np.float64)
+    rows = []
+    for item in items:
+        item = int(item)
+        if item not in existing:
+            continue
+        start, end = matrix.indptr[item], matrix.indptr[item + 1]
+        cols = matrix.indices[start:end]
+        counts = matrix.data[start:end].astype(np.float64)
+        mask = (cols != item) & (counts > 0)
+        cols, counts = cols[mask], counts[mask]
+        if len(cols):
+            scores = counts / np.sqrt(buyers[item] * buyers[cols])
+            top = np.argsort(-scores, kind='stable')[:TOP_K]
+            neighbours = [[int(cols[i]), round(float(scores[i]), 4)] for i in top]
+        else:
+            neighbours = []
+        rows.append(AlsoBought(analysis_id=item, neighbours=neighbours))
+
+    AlsoBought.objects.bulk_create(
+        rows, batch_size=500,
+        update_conflicts=True, unique_fields=['analysis'], update_fields=['neighbours', 'updated_at'],
+    )
+    return len(rows)
+
+
+def rebuild():
+    """Recompute the co-occurrence matrix and every neighbour list"""
+    new_watermark = PurchasedAnalysis.objects.aggregate(top=Max('id'))['top'] or 0
+    item_count = _item_count()
+    user_ids = list(
+        PurchasedAnalysis.objects.filter(id__lte=new_watermark)
+        .values_list('user_id', flat=True).distinct().order_by('user_id')
+    )
+    matrix = _accumulate(user_ids, 0, new_watermark, item_count)
+
+    with transaction.atomic():
+        _save_state(matrix, new_watermark)
+        AlsoBought.objects.all().delete()
+        written = _materialise(matrix, np.flatnonzero(matrix.diagonal()))
+    logger.info(f"Co-purchase index rebuilt up to purchase {new_watermark}: {written} analyses")
+    return written
+
+
+def update():
+    """
+    Fold purchases made since the watermark into the index.
+
+    Returns the number of analyses whose neighbour lists were rewritten.
+    """
+    matrix, watermark = _load_state()
+    if matrix is None:
+        return rebuild()
+
+    new_watermark = PurchasedAnalysis.objects.aggregate(top=Max('id'))['top'] or 0
+    if new_watermark <= watermark:
+        return 0
+
+    item_count = max(_item_count(), matrix.shape[0])
+    matrix = _resize(matrix, item_count)
+    user_ids = list(
+        PurchasedAnalysis.objects.filter(id__gt=watermark, id__lte=new_watermark)
+        .values_list('user_id', flat=True).distinct().order_by('user_id')
+    )
+    delta = _accumulate(user_ids, watermark, new_watermark, item_count)
+    matrix = (matrix + delta).tocsr()
+
+    # Rows that gained counts, plus neighbours of items whose buyer count
+    # (the cosine denominator) moved
+    touched = set(np.unique(delta.nonzero()[0]).tolist())
+    rebalanced = np.flatnonzero(delta.diagonal())
+    if len(rebalanced):
+        touched.update(np.unique(matrix[:, rebalanced].nonzero()[0]).tolist())
+
+    with transaction.atomic():
+        _save_state(matrix, new_watermark)
+        written = _materialise(matrix, sorted(touched))
+    logger.info(f"Co-purchase index updated to purchase {new_watermark}: {written} analyses re-ranked")
+    return written
+
+
+def also_bought(analysis_id, limit=4, exclude_ids=()):
+    """Active analyses bought together with ``analysis_id``, best first"""
+    neighbours = AlsoBought.objects.filter(analysis_id=analysis_id).values_list('neighbours', flat=True).first()
+    if not neighbours:
+        return []
+    exclude_ids = set(exclude_ids)
+    ranked = [item_id for item_id, _ in neighbours if item_id not in exclude_ids]
+    found = CryptoAnalysis.objects.filter(
+        id__in=ranked, is_active=True
+    ).select_related('analyst', 'analyst__user').in_bulk()
+    return [found[item_id] for item_id in ranked if item_id in found][:limit]
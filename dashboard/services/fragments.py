@@ -0,0 +1,30 @@
+"""
+Version counters for cached template fragments.
+
+Parts of a page that are the same for every user (package cards, analysis
+cards) are wrapped in ``{% cache %}`` with the version of the rows they
+show as a vary-on argument; the view passes the current version in. Saving
+or deleting a row bumps the version (see the signals in ``models``), which
+retires every cached copy at once, in every worker. Insight cards use the
+``insights_feed`` version the same way.
+"""
+from .versions import bump_version, get_version
+
+PACKAGES = 'consultation-packages'
+ANALYSES = 'analysis-cards'
+
+
+def packages_version():
+    return get_version(PACKAGES)
+
+
+def analyses_version():
+    return get_version(ANALYSES)
+
+
+def packages_changed():
+    return bump_version(PACKAGES)
+
+
+def analyses_changed():
+    return bump_version(ANALYSES)
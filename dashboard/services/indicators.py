@@ -0,0 +1,195 @@
+"""
+Incremental technical indicators over an analysis's price series.
+
+Each indicator keeps its points in ``TechnicalIndicatorData.data['values']``
+aligned with ``chart_data['prices']``, plus whatever running state it needs
+(``data['state']``) so appending candles only computes the new points:
+moving windows read the last ``period`` prices, and recursive indicators
+(EMA, RSI, MACD) continue from their stored state. Data that does not line
+up with the series (hand-entered, or from an older layout) is recomputed
+from scratch.
+"""
+import math
+
+DEFAULT_PARAMETERS = {
+    'sma': {'period': 20},
+    'ema': {'period': 20},
+    'rsi': {'period': 14},
+    'macd': {'fast': 12, 'slow': 26, 'signal': 9},
+    'bollinger': {'period': 20, 'std_dev': 2},
+    'stochastic': {'period': 14},
+    'volume': {},
+}
+
+
+def _param(parameters, indicator_type, name):
+    # Hand-entered rows may hold a bare number instead of a parameter dict
+    parameters = parameters if isinstance(parameters, dict) else {}
+    value = parameters.get(name, DEFAULT_PARAMETERS[indicator_type][name])
+    return int(value) if name != 'std_dev' else float(value)
+
+
+def _round(value):
+    return None if value is None else round(value, 6)
+
+
+def _window(values, end, period):
+    """The ``period`` values ending at index ``end``, or None if there are fewer"""
+    if end + 1 < period:
+        return None
+    window = [v for v in values[end + 1 - period:end + 1] if v is not None]
+    return window if len(window) == period else None
+
+
+def _sma(series, start, parameters, data):
+    period = _param(parameters, 'sma', 'period')
+    closes = series['close']
+    for i in range(start, len(closes)):
+        window = _window(closes, i, period)
+        data['values'].append(_round(sum(window) / period) if window else None)
+
+
+def _bollinger(series, start, parameters, data):
+    period = _param(parameters, 'bollinger', 'period')
+    width = _param(parameters, 'bollinger', 'std_dev')
+    closes = series['close']
+    for i in range(start, len(closes)):
+        window = _window(closes, i, period)
+        if not window:
+            mid = upper = lower = None
+        else:
+            mid = sum(window) / period
+            deviation = math.sqrt(sum((c - mid) ** 2 for c in window) / period)
+            upper, lower = mid + width * deviation, mid - width * deviation
+        data['values'].append(_round(mid))
+        data['upper'].append(_round(upper))
+        data['lower'].append(_round(lower))
+
+
+def _stochastic(series, start, parameters, data):
+    period = _param(parameters, 'stochastic', 'period')
+    closes, highs, lows = series['close'], series['high'], series['low']
+    for i in range(start, len(closes)):
+        high, low = _window(highs, i, period), _window(lows, i, period)
+        if not high or not low or max(high) == min(low):
+            data['values'].append(None)
+        else:
+            data['values'].append(_round((closes[i] - min(low)) / (max(high) - min(low)) * 100))
+
+
+def _volume(series, start, parameters, data):
+    data['values'].extend(series['volume'][start:])
+
+
+def _ema_step(previous, value, period):
+    if previous is None:
+        return value
+    k = 2 / (period + 1)
+    return value * k + previous * (1 - k)
+
+
+def _ema(series, start, parameters, data):
+    period = _param(parameters, 'ema', 'period')
+    state = data['state']
+    for close in series['close'][start:]:
+        state['ema'] = _ema_step(state.get('ema'), close, period)
+        state['count'] = state.get('count', 0) + 1
+        data['values'].append(_round(state['ema']) if state['count'] >= period else None)
+
+
+def _rsi(series, start, parameters, data):
+    """Wilder's RSI: a simple average over the first ``period`` changes, then smoothed"""
+    period = _param(parameters, 'rsi', 'period')
+    closes = series['close']
+    state = data['state']
+    for i in range(start, len(closes)):
+        if i == 0:
+            data['values'].append(None)
+            continue
+        change = closes[i] - closes[i - 1]
+        gain, loss = max(change, 0), max(-change, 0)
+        state['count'] = state.get('count', 0) + 1
+        if state['count'] <= period:
+            state['gain'] = state.get('gain', 0) + gain / period
+            state['loss'] = state.get('loss', 0) + loss / period
+        else:
+            state['gain'] = (state['gain'] * (period - 1) + gain) / period
+            state['loss'] = (state['loss'] * (period - 1) + loss) / period
+        if state['count'] < period:
+            data['values'].append(None)
+        elif state['loss'] == 0:
+            data['values'].append(100.0)
+        else:
+            data['values'].append(_round(100 - 100 / (1 + state['gain'] / state['loss'])))
+
+
+def _macd(series, start, parameters, data):
+    fast = _param(parameters, 'macd', 'fast')
+    slow = _param(parameters, 'macd', 'slow')
+    signal_period = _param(parameters, 'macd', 'signal')
+    state = data['state']
+    for close in series['close'][start:]:
+        state['fast'] = _ema_step(state.get('fast'), close, fast)
+        state['slow'] = _ema_step(state.get('slow'), close, slow)
+        state['count'] = state.get('count', 0) + 1
+        if state['count'] < slow:
+            data['values'].append(None)
+            data['signal'].append(None)
+            data['histogram'].append(None)
+            continue
+        macd = state['fast'] - state['slow']
+        state['signal'] = _ema_step(state.get('signal'), macd, signal_period)
+        data['values'].append(_round(macd))
+        data['signal'].append(_round(state['signal']))
+        data['histogram'].append(_round(macd - state['signal']))
+
+
+CALCULATORS = {
+    'sma': (_sma, ()),
+    'ema': (_ema, ()),
+    'rsi': (_rsi, ()),
+    'macd': (_macd, ('signal', 'histogram')),
+    'bollinger': (_bollinger, ('upper', 'lower')),
+    'stochastic': (_stochastic, ()),
+    'volume': (_volume, ()),
+}
+
+
+def update(indicator_type, data, parameters, series, previous_length, dropped=0):
+    """
+    New ``data`` for an indicator after the price series changed.
+
+    ``series`` holds the full ``close``/``high``/``low``/``volume`` lists
+    after the refresh; ``previous_length`` is how many points the series had
+    before it, and ``dropped`` how many were trimmed from the front.
+    """
+    calculate, extra = CALCULATORS[indicator_type]
+    data = data if isinstance(data, dict) else {}
+    keys = ('values',) + extra
+    aligned = all(isinstance(data.get(key), list) and len(data[key]) == previous_length for key in keys)
+    # Recursive indicators need their running state to continue, and must
+    # see every candle, including ones trimmed before they were processed
+    if calculate in (_ema, _rsi, _macd) and not isinstance(data.get('state'), dict):
+        aligned = False
+    if dropped > previous_length:
+        aligned = False
+
+    if aligned:
+        result = {key: data[key][dropped:] for key in keys}
+        result['state'] = dict(data.get('state') or {})
+        start = previous_length - dropped
+    else:
+        result = {key: [] for key in keys}
+        result['state'] = {}
+        start = 0
+    calculate(series, start, parameters, result)
+    return result
+
+
+def latest(data):
+    """Most recent non-empty point of an indicator's ``values``"""
+    values = data.get('values') if isinstance(data, dict) else data
+    for value in reversed(values or []):
+        if value is not None:
+            return value
+    return None
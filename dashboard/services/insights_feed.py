@@ -0,0 +1,116 @@
+"""
+Market insights feed.
+
+Lists shown on the insights pages and the dashboard are the same for every
+user, so they are built once per insights version and kept in the shared
+cache. ``MarketInsight`` post_save/post_delete bumps the version, which
+retires every cached list and every template fragment keyed on it at once.
+"""
+import hashlib
+
+from django.core.cache import cache
+
+from ..models import MarketInsight
+from .versions import bump_version, get_version
+
+VERSION_NAME = 'insights'
+
+# Entries are retired by version bumps; the timeout only bounds cache growth
+FEED_TIMEOUT = 60 * 60 * 24
+
+SIDEBAR_SIZE = 5
+DASHBOARD_SIZE = 6
+RELATED_SIZE = 3
+
+
+def current_version():
+    return get_version(VERSION_NAME)
+
+
+def invalidate():
+    return bump_version(VERSION_NAME)
+
+
+def _active():
+    return MarketInsight.objects.filter(is_active=True).order_by('-published_at', '-created_at')
+
+
+def _cached(name, builder):
+    key = f"insights:{current_version()}:{name}"
+    return cache.get_or_set(key, builder, FEED_TIMEOUT)
+
+
+def featured(limit=SIDEBAR_SIZE):
+    return _cached(f'featured:{limit}', lambda: list(_active().filter(is_featured=True)[:limit]))
+
+
+def recent(limit=SIDEBAR_SIZE):
+    return _cached(f'recent:{limit}', lambda: list(_active()[:limit]))
+
+
+def dashboard_insights(limit=DASHBOARD_SIZE):
+    """Featured insights for the dashboard, falling back to the latest ones"""
+    return _cached(f'dashboard:{limit}', lambda: featured(limit) or recent(limit))
+
+
+def stats():
+    def build():
+        active = MarketInsight.objects.filter(is_active=True)
+        return {
+            'total': active.count(),
+            'featured': active.filter(is_featured=True).count(),
+            'verified': active.filter(is_verified=True).count(),
+        }
+    return _cached('stats', build)
+
+
+INSIGHT_TYPES = {value for value, _ in MarketInsight.INSIGHT_TYPES}
+URGENCY_LEVELS = {value for value, _ in MarketInsight.URGENCY_LEVELS}
+
+
+def normalize_filters(insight_type='', urgency='', cryptocurrency=''):
+    """
+    Filters as used in cache keys: unknown types and urgencies mean no
+    filter, and the cryptocurrency search is case-insensitive.
+    """
+    return (
+        insight_type if insight_type in INSIGHT_TYPES else '',
+        urgency if urgency in URGENCY_LEVELS else '',
+        cryptocurrency.strip().lower(),
+    )
+
+
+def listing(insight_type='', urgency='', cryptocurrency=''):
+    """Filtered insight list as used by the market insights page"""
+    insight_type, urgency, cryptocurrency = normalize_filters(insight_type, urgency, cryptocurrency)
+
+    def build():
+        queryset = _active()
+        if insight_type:
+            queryset = queryset.filter(insight_type=insight_type)
+        if urgency:
+            queryset = queryset.filter(urgency=urgency)
+        if cryptocurrency:
+            queryset = queryset.filter(cryptocurrency__icontains=cryptocurrency)
+        return list(queryset)
+
+    crypto_key = hashlib.md5(cryptocurrency.encode()).hexdigest()[:12] if cryptocurrency else ''
+    return _cached(f'list:{insight_type}:{urgency}:{crypto_key}', build)
+
+
+def by_cryptocurrency(cryptocurrency, limit=RELATED_SIZE + 1):
+    key = hashlib.md5((cryptocurrency or '').encode()).hexdigest()[:12]
+    return _cached(f'crypto:{key}:{limit}', lambda: list(_active().filter(cryptocurrency=cryptocurrency)[:limit]))
+
+
+def by_type(insight_type, limit=RELATED_SIZE + 1):
+    return _cached(f'type:{insight_type}:{limit}', lambda: list(_active().filter(insight_type=insight_type)[:limit]))
+
+
+def related(insight, limit=RELATED_SIZE):
+    """Insights on the same cryptocurrency, or of the same type if there are none"""
+    for candidates in (by_cryptocurrency(insight.cryptocurrency), by_type(insight.insight_type)):
+        others = [other for other in candidates if other.id != insight.id][:limit]
+        if others:
+            return others
+    return []
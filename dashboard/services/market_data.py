@@ -0,0 +1,388 @@
+"""
+Local OHLCV market-data store backed by memory-mapped binary files.
+
+Each symbol and resolution has an append-only file of fixed-width records
+(``RECORD``: int64 Unix-second timestamp and five float64 fields, 48 bytes),
+sorted by timestamp, under ``MARKET_DATA_DIR/<SYMBOL>/<resolution>.ohlcv``.
+Readers map the file with ``numpy.memmap`` and ``get_candles`` returns a
+slice of it, so a range query copies nothing and touches only the pages it
+returns.
+
+Beside every data file a sparse index (``<resolution>.idx``) holds the
+timestamp of every ``INDEX_STRIDE``-th record. A range lookup bisects that
+small array, then searches within a single stride of the mapped file: two
+O(log n) steps that read a handful of pages however long the history is.
+
+Candles are loaded with ``ingest`` (CSV, or Parquet when pyarrow is
+installed) or ``append``; see the ``ingest_market_data`` command.
+
+Coarser resolutions (``ROLLUP_RESOLUTIONS``) are stored as their own files
+and kept current on every base append: only base candles from the start of
+the last, still-open bucket onward are re-aggregated, and that bucket's
+record is replaced in place. ``chart_candles`` serves a chart from the
+coarsest stored resolution that still yields the requested number of points.
+
+Every base append bumps the ``market-data`` version so results derived from
+candles (portfolio scores) are recomputed on the next read.
+"""
+import csv
+import logging
+import os
+import threading
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+
+from .versions import bump_version
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows development machines
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+VERSION_NAME = 'market-data'
+
+MARKET_DATA_DIR = getattr(settings, 'MARKET_DATA_DIR', os.path.join(str(settings.BASE_DIR), 'market_data'))
+
+# Resolution of the candles loaded by ingest and append
+BASE_RESOLUTION = getattr(settings, 'MARKET_DATA_BASE_RESOLUTION', '1m')
+
+FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+RECORD = np.dtype([('timestamp', '<i8')] + [(field, '<f8') for field in FIELDS[1:]])
+
+# Length of each resolution in seconds
+RESOLUTION_SECONDS = {
+    '1m': 60, '5m': 300, '15m': 900, '1h': 3600, '4h': 4 * 3600, '1d': 86400, '1w': 7 * 86400,
+}
+
+# Resolutions rolled up from the base candles, finest first
+ROLLUP_RESOLUTIONS = tuple(getattr(settings, 'MARKET_DATA_ROLLUPS', ('1h', '1d', '1w')))
+
+# Weekly buckets start on Monday; the Unix epoch fell on a Thursday
+WEEK_OFFSET = 4 * 86400
+
+# Chart ranges offered by the analysis page, in seconds
+CHART_RANGES = {
+    '1D': 86400, '1W': 7 * 86400, '1M': 30 * 86400, '3M': 90 * 86400, '1Y': 365 * 86400,
+}
+DEFAULT_CHART_POINTS = 60
+MAX_CHART_POINTS = 1000
+
+# Records per sparse index entry (48 KB of data per entry)
+INDEX_STRIDE = 1024
+
+_lock = threading.Lock()
+_maps = {}
+
+
+class MarketDataError(Exception):
+    """Raised when candles cannot be read or stored"""
+
+
+def parse_timestamp(value):
+    """Unix seconds for a numeric or ISO 8601 timestamp"""
+    value = str(value).strip()
+    try:
+        return int(float(value))
+    except ValueError:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=dt_timezone.utc)
+        return int(parsed.timestamp())
+
+
+def _symbol_dir(symbol):
+    return os.path.join(MARKET_DATA_DIR, symbol.upper())
+
+
+def data_path(symbol, resolution=BASE_RESOLUTION):
+    return os.path.join(_symbol_dir(symbol), f"{resolution}.ohlcv")
+
+
+def index_path(symbol, resolution=BASE_RESOLUTION):
+    return os.path.join(_symbol_dir(symbol), f"{resolution}.idx")
+
+
+def symbols():
+    """Symbols with stored candles"""
+    if not os.path.isdir(MARKET_DATA_DIR):
+        return []
+    return sorted(name for name in os.listdir(MARKET_DATA_DIR)
+                  if os.path.exists(data_path(name)))
+
+
+def _open(symbol, resolution):
+    """``(records, sparse_index)`` for a file, remapped whenever it has grown"""
+    path = data_path(symbol, resolution)
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return np.empty(0, dtype=RECORD), np.empty(0, dtype='<i8')
+    with _lock:
+        cached = _maps.get(path)
+        if cached and cached[0] == size:
+            return cached[1], cached[2]
+
+    count = size // RECORD.itemsize
+    records = np.memmap(path, dtype=RECORD, mode='r', shape=(count,)) if count else np.empty(0, dtype=RECORD)
+    try:
+        index = np.fromfile(index_path(symbol, resolution), dtype='<i8')
+    except OSError:
+        index = np.empty(0, dtype='<i8')
+    if len(index) != (count + INDEX_STRIDE - 1) // INDEX_STRIDE:
+        # Index missing or behind the data (e.g. an interrupted append)
+        index = np.array(records['timestamp'][::INDEX_STRIDE])
+    with _lock:
+        _maps[path] = (size, records, index)
+    return records, index
+
+
+def _search(records, index, timestamp):
+    """Position of the first record with ``record.timestamp >= timestamp``"""
+    block = max(int(np.searchsorted(index, timestamp, side='right')) - 1, 0)
+    first = block * INDEX_STRIDE
+    stride = records['timestamp'][first:first + INDEX_STRIDE]
+    # Falling off the end of the block lands on the first record of the next
+    return first + int(np.searchsorted(stride, timestamp, side='left'))
+
+
+def get_candles(symbol, start=None, end=None, resolution=BASE_RESOLUTION):
+    """
+    Candles for ``symbol`` with ``start <= timestamp < end`` (Unix seconds).
+
+    Returns a read-only structured NumPy array (a view into the mapped file)
+    whose fields are ``FIELDS``: ``candles['close']`` is a float64 array,
+    ``candles['timestamp']`` an int64 one.
+    """
+    records, index = _open(symbol, resolution)
+    if not len(records):
+        return records
+    first = _search(records, index, start) if start is not None else 0
+    last = _search(records, index, end) if end is not None else len(records)
+    return records[first:last]
+
+
+def latest_timestamp(symbol, resolution=BASE_RESOLUTION):
+    records, _ = _open(symbol, resolution)
+    return int(records['timestamp'][-1]) if len(records) else None
+
+
+class _FileLock:
+    """Exclusive lock on a symbol's directory so only one writer appends at a time"""
+
+    def __init__(self, symbol):
+        os.makedirs(_symbol_dir(symbol), exist_ok=True)
+        self.path = os.path.join(_symbol_dir(symbol), '.lock')
+
+    def __enter__(self):
+        self.handle = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self.handle, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.handle, fcntl.LOCK_UN)
+        self.handle.close()
+
+
+def _to_records(candles):
+    """Structured array from a structured array or a mapping of field -> sequence"""
+    if isinstance(candles, np.ndarray) and candles.dtype.names:
+        array = np.empty(len(candles), dtype=RECORD)
+        for field in FIELDS:
+            array[field] = candles[field]
+    else:
+        length = len(candles['timestamp'])
+        array = np.empty(length, dtype=RECORD)
+        for field in FIELDS:
+            array[field] = np.asarray(candles[field])
+    order = np.argsort(array['timestamp'], kind='stable')
+    array = array[order]
+    # Keep the last candle for each timestamp
+    keep = np.ones(len(array), dtype=bool)
+    keep[:-1] = array['timestamp'][1:] != array['timestamp'][:-1]
+    return array[keep]
+
+
+def _extend_index(symbol, resolution, path, count, total, new):
+    """Add sparse index entries for records ``count..total`` (``new``)"""
+    first_entry = (count + INDEX_STRIDE - 1) // INDEX_STRIDE
+    target = index_path(symbol, resolution)
+    existing = os.path.getsize(target) if os.path.exists(target) else 0
+    if existing < first_entry * 8:
+        # Index fell behind the data: rebuild it from the file
+        records = np.memmap(path, dtype=RECORD, mode='r', shape=(total,))
+        records['timestamp'][::INDEX_STRIDE].astype('<i8').tofile(target)
+        return
+    positions = np.arange(first_entry * INDEX_STRIDE, total, INDEX_STRIDE) - count
+    with open(target, 'r+b' if existing else 'wb') as index_file:
+        index_file.truncate(first_entry * 8)
+        index_file.seek(first_entry * 8)
+        index_file.write(new['timestamp'][positions].astype('<i8').tobytes())
+
+
+def append(symbol, candles, resolution=BASE_RESOLUTION):
+    """
+    Append ``candles`` to the store and return how many records were written.
+
+    Files only grow: a candle with the same timestamp as the last stored one
+    replaces it (the still-open candle being updated); older ones are skipped.
+    """
+    new = _to_records(candles)
+    if not len(new):
+        return 0
+    path = data_path(symbol, resolution)
+    with _FileLock(symbol):
+        with open(path, 'ab+') as handle:
+            size = handle.seek(0, os.SEEK_END)
+            count = size // RECORD.itemsize
+            if size % RECORD.itemsize:
+                # Drop a torn record left by an interrupted write
+                handle.truncate(count * RECORD.itemsize)
+            last = None
+            if count:
+                handle.seek((count - 1) * RECORD.itemsize)
+                last = int(np.frombuffer(handle.read(RECORD.itemsize), dtype=RECORD)['timestamp'][0])
+
+            skipped = replaced = 0
+            if last is not None:
+                skipped = int(np.count_nonzero(new['timestamp'] < last))
+                new = new[new['timestamp'] >= last]
+                if len(new) and new['timestamp'][0] == last:
+                    with open(path, 'r+b') as rewrite:
+                        rewrite.seek((count - 1) * RECORD.itemsize)
+                        rewrite.write(new[:1].tobytes())
+                    new, replaced = new[1:], 1
+            handle.seek(0, os.SEEK_END)
+            handle.write(new.tobytes())
+            total = count + len(new)
+
+        _extend_index(symbol, resolution, path, count, total, new)
+
+    if skipped:
+        logger.warning(f"Skipped {skipped} {symbol} {resolution} candles older than the stored history")
+    if resolution == BASE_RESOLUTION and (len(new) or replaced):
+        update_rollups(symbol)
+        bump_version(VERSION_NAME)
+    return len(new) + replaced
+
+
+def rollup_resolutions():
+    """Rollups coarser than the base resolution"""
+    base = RESOLUTION_SECONDS[BASE_RESOLUTION]
+    return [r for r in ROLLUP_RESOLUTIONS if RESOLUTION_SECONDS[r] > base]
+
+
+def bucket_starts(timestamps, resolution):
+    """Start of the ``resolution`` bucket holding each timestamp"""
+    size = RESOLUTION_SECONDS[resolution]
+    offset = WEEK_OFFSET if resolution == '1w' else 0
+    return (timestamps - offset) // size * size + offset
+
+
+def resample(candles, resolution):
+    """Aggregate sorted candles into ``resolution`` buckets"""
+    starts = bucket_starts(candles['timestamp'], resolution)
+    # Index of the first candle in each bucket
+    first = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    last = np.r_[first[1:], len(candles)] - 1
+    rolled = np.empty(len(first), dtype=RECORD)
+    rolled['timestamp'] = starts[first]
+    rolled['open'] = candles['open'][first]
+    rolled['close'] = candles['close'][last]
+    rolled['high'] = np.maximum.reduceat(candles['high'], first)
+    rolled['low'] = np.minimum.reduceat(candles['low'], first)
+    rolled['volume'] = np.add.reduceat(candles['volume'], first)
+    return rolled
+
+
+def update_rollups(symbol):
+    """Re-aggregate each rollup from its last (possibly still open) bucket onward"""
+    for resolution in rollup_resolutions():
+        since = latest_timestamp(symbol, resolution)
+        base = get_candles(symbol, start=since)
+        if len(base):
+            append(symbol, resample(base, resolution), resolution)
+
+
+def rebuild_rollups(symbol):
+    """Recompute every rollup for ``symbol`` from the base candles"""
+    with _FileLock(symbol):
+        for resolution in rollup_resolutions():
+            for path in (data_path(symbol, resolution), index_path(symbol, resolution)):
+                if os.path.exists(path):
+                    os.remove(path)
+    update_rollups(symbol)
+
+
+def pick_resolution(span, points, available=None):
+    """
+    Coarsest resolution that still gives at least ``points`` candles over
+    ``span`` seconds, falling back to the finest available.
+    """
+    available = available or [BASE_RESOLUTION] + rollup_resolutions()
+    ordered = sorted(available, key=RESOLUTION_SECONDS.get)
+    for resolution in reversed(ordered):
+        if span // RESOLUTION_SECONDS[resolution] >= points:
+            return resolution
+    return ordered[0]
+
+
+def chart_candles(symbol, range_name='1M', points=DEFAULT_CHART_POINTS, end=None):
+    """
+    ``(resolution, candles)`` for a chart covering ``range_name`` up to
+    ``end`` (defaults to just after the latest stored candle).
+    """
+    span = CHART_RANGES[range_name]
+    points = max(1, min(int(points), MAX_CHART_POINTS))
+    if end is None:
+        latest = latest_timestamp(symbol)
+        if latest is None:
+            return BASE_RESOLUTION, get_candles(symbol)
+        end = latest + 1
+    resolution = pick_resolution(span, points)
+    return resolution, get_candles(symbol, start=end - span, end=end, resolution=resolution)
+
+
+def _read_csv(path):
+    columns = {field: [] for field in FIELDS}
+    with open(path, newline='') as handle:
+        for row in csv.DictReader(handle):
+            try:
+                values = [parse_timestamp(row['timestamp'])] + [float(row[field]) for field in FIELDS[1:]]
+            except (KeyError, TypeError, ValueError):
+                continue
+            for field, value in zip(FIELDS, values):
+                columns[field].append(value)
+    return columns
+
+
+def _read_parquet(path):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise MarketDataError('Reading Parquet dumps requires the pyarrow package')
+    table = pq.read_table(path, columns=list(FIELDS))
+    columns = {field: table.column(field).to_numpy() for field in FIELDS}
+    if np.issubdtype(columns['timestamp'].dtype, np.datetime64):
+        columns['timestamp'] = columns['timestamp'].astype('datetime64[s]').astype('<i8')
+    return columns
+
+
+def ingest(path, symbol=None, resolution=BASE_RESOLUTION):
+    """Load a CSV or Parquet dump into the store; returns ``(symbol, records written)``"""
+    name, extension = os.path.splitext(os.path.basename(path))
+    symbol = (symbol or name).upper()
+    if extension.lower() in ('.parquet', '.pq'):
+        columns = _read_parquet(path)
+    elif extension.lower() == '.csv':
+        columns = _read_csv(path)
+    else:
+        raise MarketDataError(f"Unsupported market data file: {path}")
+    written = append(symbol, columns, resolution)
+    logger.info(f"Ingested {written} {symbol} {resolution} candles from {path}")
+    return symbol, written
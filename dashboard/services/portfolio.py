@@ -0,0 +1,265 @@
+"""
+Performance of the calls in a user's purchased analyses.
+
+Each purchase is scored as a position opened at ``purchased_at``: long for
+buy/strong buy, short for sell/strong sell, flat for hold. The entry is the
+analysis's entry annotation, or the market price at purchase when it has
+none; the target is the nearest ``price_targets``/target annotation beyond
+the entry in the call's direction and the stop the nearest stop-loss on the
+other side. The position runs until the target or stop is touched (the stop
+wins when both fall in one candle) or the timeframe ends, and is still open
+otherwise.
+
+All positions are scored together: their candle paths from ``market_data``
+are concatenated into one array and the hits, exits and drawdowns found
+with segment-wise NumPy reductions, so the Python work per position is one
+mmap slice.
+
+``user_portfolio`` caches a user's scores until new candles arrive (the
+``market-data`` version) or their purchases or analyses change.
+"""
+import logging
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from ..models import ChartAnnotation
+from . import market_data
+from .price_alerts import json_levels
+from .versions import get_version
+
+logger = logging.getLogger(__name__)
+
+DIRECTIONS = {'strong_buy': 1, 'buy': 1, 'hold': 0, 'sell': -1, 'strong_sell': -1}
+
+# How long a call runs, by the analysis's timeframe
+HORIZONS = {
+    'short_term': timedelta(days=7),
+    'medium_term': timedelta(days=28),
+    'long_term': timedelta(days=182),
+}
+
+# Candles read per position: the coarsest stored resolution giving this many
+PATH_POINTS = 100
+
+LEVEL_TYPES = ('entry', 'target', 'stop_loss')
+
+CACHE_TIMEOUT = getattr(settings, 'PORTFOLIO_CACHE_TIMEOUT', 900)
+
+
+def _cache_key(user_id):
+    return f"portfolio:{user_id}"
+
+
+def annotation_levels(analysis_ids):
+    """Entry, target and stop-loss annotation prices per analysis"""
+    levels = {}
+    annotations = ChartAnnotation.objects.filter(
+        analysis_id__in=analysis_ids, type__in=LEVEL_TYPES, price_level__isnull=False,
+    ).values_list('analysis_id', 'type', 'price_level')
+    for analysis_id, level_type, price in annotations.iterator(chunk_size=5000):
+        levels.setdefault(analysis_id, {}).setdefault(level_type, []).append(float(price))
+    return levels
+
+
+def make_call(key, analysis_id, analyst_id, symbol, recommendation, timeframe, price_targets, start, levels=None):
+    """A call to score, opened at ``start`` (an aware datetime)"""
+    levels = levels or {}
+    entries = levels.get('entry') or []
+    targets = [price for _, price in json_levels(price_targets or [])] + (levels.get('target') or [])
+    horizon = HORIZONS.get(timeframe, HORIZONS['medium_term'])
+    return {
+        'key': key,
+        'analysis_id': analysis_id,
+        'analyst_id': analyst_id,
+        'symbol': symbol.upper(),
+        'direction': DIRECTIONS.get(recommendation, 0),
+        'start': int(start.timestamp()),
+        'end': int((start + horizon).timestamp()),
+        'entry': entries[0] if entries else None,
+        'targets': targets,
+        'stops': levels.get('stop_loss') or [],
+    }
+
+
+def _path(call, now):
+    """Candles from the call's start to the end of its horizon, or ``now``"""
+    end = min(call['end'], now)
+    if end <= call['start']:
+        return market_data.get_candles(call['symbol'])[:0]
+    resolution = market_data.pick_resolution(end - call['start'], PATH_POINTS)
+    candles = market_data.get_candles(call['symbol'], start=call['start'], end=end, resolution=resolution)
+    if not len(candles) and resolution != market_data.BASE_RESOLUTION:
+        # Rollups not built for this symbol yet
+        candles = market_data.get_candles(call['symbol'], start=call['start'], end=end)
+    return candles
+
+
+def _nearest(levels, entry, side):
+    """Closest level strictly beyond ``entry`` on ``side`` (+1 above, -1 below)"""
+    beyond = [level for level in levels if side and (level - entry) * side > 0]
+    if not beyond:
+        return np.nan
+    return min(beyond) if side > 0 else max(beyond)
+
+
+def _percent(value):
+    return None if value is None or not np.isfinite(value) else round(float(value) * 100, 2) + 0.0
+
+
+def score_calls(calls, now=None):
+    """
+    Outcome of each call, in order. Returns and drawdowns are percentages;
+    ``hit`` is None until a directional call is closed.
+    """
+    now = int((now or timezone.now()).timestamp())
+    paths = [_path(call, now) for call in calls]
+    lengths = np.fromiter((len(path) for path in paths), dtype=np.int64, count=len(paths))
+    scored = np.flatnonzero(lengths)
+    results = [{'key': call['key'], 'analysis_id': call['analysis_id'], 'analyst_id': call['analyst_id'],
+                'direction': call['direction'], 'status': 'no_data', 'realized': False, 'hit': None,
+                'return': None, 'drawdown': None, 'entry': None, 'target': None, 'stop': None,
+                'last_price': None} for call in calls]
+    if not len(scored):
+        return results
+
+    candles = np.concatenate([paths[i] for i in scored])
+    lengths = lengths[scored]
+    first = np.r_[0, np.cumsum(lengths)[:-1]]
+    owner = np.repeat(np.arange(len(scored)), lengths)
+    position = np.arange(len(candles)) - first[owner]
+
+    direction = np.array([calls[i]['direction'] for i in scored], dtype=np.float64)
+    entry = np.array([calls[i]['entry'] or np.nan for i in scored], dtype=np.float64)
+    entry = np.where(np.isnan(entry), candles['open'][first], entry)
+    target = np.array([_nearest(calls[i]['targets'], entry[j], calls[i]['direction'])
+                       for j, i in enumerate(scored)], dtype=np.float64)
+    stop = np.array([_nearest(calls[i]['stops'], entry[j], -calls[i]['direction'])
+                     for j, i in enumerate(scored)], dtype=np.float64)
+    expired = np.array([calls[i]['end'] <= now for i in scored])
+
+    # First candle touching the target / stop (comparisons with NaN are False)
+    side = direction[owner]
+    long_side = side >= 0
+    favorable = np.where(long_side, candles['high'], candles['low'])
+    adverse = np.where(long_side, candles['low'], candles['high'])
+    never = int(lengths.max())
+    with np.errstate(invalid='ignore'):
+        touched_target = (side != 0) & (side * (favorable - target[owner]) >= 0)
+        touched_stop = (side != 0) & (side * (adverse - stop[owner]) <= 0)
+    target_at = np.minimum.reduceat(np.where(touched_target, position, never), first)
+    stop_at = np.minimum.reduceat(np.where(touched_stop, position, never), first)
+
+    stopped = (stop_at < never) & (stop_at <= target_at)
+    reached = (target_at < never) & ~stopped
+    exit_at = np.where(stopped, stop_at, np.where(reached, target_at, lengths - 1))
+    closes = candles['close']
+    exit_price = np.where(stopped, stop, np.where(reached, target, closes[first + exit_at]))
+    returns = direction * (exit_price / entry - 1)
+    realized = stopped | reached | expired
+
+    # Drawdown of the position's value from its running peak, up to the exit.
+    # Offsetting each segment above the previous one keeps the running max
+    # from carrying across positions.
+    value = np.maximum(1 + side * (closes / entry[owner] - 1), 0)
+    offset = owner * (float(value.max()) + 1)
+    peak = np.maximum(np.maximum.accumulate(value + offset) - offset, 1.0)
+    drawdown = np.where(position <= exit_at[owner], 1 - value / peak, 0)
+    drawdown = np.maximum.reduceat(drawdown, first)
+
+    for j, i in enumerate(scored):
+        status = 'stopped' if stopped[j] else 'target' if reached[j] else 'expired' if expired[j] else 'open'
+        results[i].update({
+            'status': status,
+            'realized': bool(realized[j]),
+            'hit': bool(returns[j] > 0 if status == 'expired' else reached[j]) if realized[j] and direction[j] else None,
+            'return': _percent(returns[j]),
+            'drawdown': _percent(drawdown[j]),
+            'entry': float(entry[j]),
+            'target': None if np.isnan(target[j]) else float(target[j]),
+            'stop': None if np.isnan(stop[j]) else float(stop[j]),
+            'last_price': float(exit_price[j]),
+        })
+    return results
+
+
+def summarize(results, group='analyst_id'):
+    """
+    Totals over ``results``: ``(overall, {group id: totals})``, grouped by
+    an integer field. Hold calls and calls without market data count as
+    positions but not in the rates.
+    """
+    count = len(results)
+    keys = np.fromiter((result[group] for result in results), dtype=np.int64, count=count)
+    groups, index = np.unique(keys, return_inverse=True)
+
+    scored = np.array([result['return'] is not None and result['direction'] != 0 for result in results], dtype=bool)
+    realized = scored & np.array([result['realized'] for result in results], dtype=bool)
+    hits = realized & np.array([bool(result['hit']) for result in results], dtype=bool)
+    returns = np.array([result['return'] or 0.0 for result in results], dtype=np.float64)
+    drawdowns = np.array([result['drawdown'] or 0.0 for result in results], dtype=np.float64)
+
+    def totals(index, size):
+        resolved = np.bincount(index[realized], minlength=size)
+        open_ = np.bincount(index[scored & ~realized], minlength=size)
+        hit = np.bincount(index[hits], minlength=size)
+        realized_sum = np.bincount(index[realized], weights=returns[realized], minlength=size)
+        unrealized_sum = np.bincount(index[scored & ~realized], weights=returns[scored & ~realized], minlength=size)
+        max_drawdown = np.zeros(size)
+        np.maximum.at(max_drawdown, index[scored], drawdowns[scored])
+        positions = np.bincount(index, minlength=size)
+        return [{
+            'positions': int(positions[g]),
+            'resolved': int(resolved[g]),
+            'open': int(open_[g]),
+            'hits': int(hit[g]),
+            'hit_rate': round(float(hit[g] / resolved[g]) * 100, 1) if resolved[g] else None,
+            'realized_return': round(float(realized_sum[g] / resolved[g]), 2) if resolved[g] else None,
+            'unrealized_return': round(float(unrealized_sum[g] / open_[g]), 2) if open_[g] else None,
+            'max_drawdown': round(float(max_drawdown[g]), 2),
+        } for g in range(size)]
+
+    overall = totals(np.zeros(count, dtype=np.int64), 1)[0]
+    by_group = dict(zip(groups.tolist(), totals(index.ravel(), len(groups))))
+    return overall, by_group
+
+
+def purchase_calls(purchases):
+    """Calls for ``PurchasedAnalysis`` rows loaded with their analysis"""
+    levels = annotation_levels({purchase.analysis_id for purchase in purchases})
+    return [make_call(
+        purchase.id, purchase.analysis_id, purchase.analysis.analyst_id, purchase.analysis.symbol,
+        purchase.analysis.recommendation, purchase.analysis.timeframe, purchase.analysis.price_targets,
+        purchase.purchased_at, levels.get(purchase.analysis_id),
+    ) for purchase in purchases]
+
+
+def user_portfolio(user, purchases):
+    """
+    Scores for ``purchases`` (the user's ``PurchasedAnalysis`` rows with
+    ``analysis`` loaded): ``{'positions': {purchase id: result},
+    'summary': totals, 'analysts': {analyst id: totals}}``.
+
+    Served from the cache while the candles and the purchased analyses are
+    unchanged; a cache hit costs one cache read and no queries.
+    """
+    fingerprint = tuple((purchase.id, purchase.analysis_id, purchase.analysis.updated_at.timestamp())
+                        for purchase in purchases)
+    cached, version = cache.get(_cache_key(user.id)), get_version(market_data.VERSION_NAME)
+    if cached and cached['version'] == version and cached['fingerprint'] == fingerprint:
+        return cached['portfolio']
+
+    results = score_calls(purchase_calls(purchases))
+    summary, analysts = summarize(results)
+    portfolio = {
+        'positions': {result['key']: result for result in results},
+        'summary': summary,
+        'analysts': analysts,
+    }
+    cache.set(_cache_key(user.id), {'version': version, 'fingerprint': fingerprint, 'portfolio': portfolio},
+              CACHE_TIMEOUT)
+    logger.info(f"Scored {len(results)} positions for user {user.id}")
+    return portfolio
@@ -0,0 +1,279 @@
+"""
+Price-target, stop-loss and support/resistance alerts for purchased analyses.
+
+Every active level of every purchased analysis (``ChartAnnotation`` rows of
+type target/stop_loss/entry/exit, ``price_targets``, ``support_levels`` and
+``resistance_levels``) is compiled into one book per symbol: a sorted
+float64 array of prices with the level details alongside. Checking new
+candles is two ``searchsorted`` calls per candle over the range the price
+travelled, so the cost grows with log(levels) plus the levels actually
+crossed, never with the size of the book.
+
+Crossed levels are written as ``PriceAlert`` rows, unique per analysis and
+level, so a level fires once however often the price returns to it.
+``dispatch_alerts`` then claims pending alerts in batches and sends each
+purchaser a single email covering all of their crossed levels.
+
+The book is rebuilt lazily when the ``price-alert-levels`` version moves
+(annotations, analyses or purchases changed). The ``check_price_alerts``
+command feeds it new candles from ``market_data`` and sends the emails.
+"""
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from ..models import ChartAnnotation, CryptoAnalysis, PriceAlert, PriceAlertCursor, PurchasedAnalysis
+from . import market_data
+from .versions import bump_version, get_version
+
+logger = logging.getLogger(__name__)
+
+VERSION_NAME = 'price-alert-levels'
+
+ANNOTATION_TYPES = ('target', 'stop_loss', 'entry', 'exit')
+
+# Alerts claimed and emailed per batch
+BATCH_SIZE = 500
+
+_lock = threading.Lock()
+_book = None
+
+
+class Book:
+    """Sorted level prices per symbol with the level each one belongs to"""
+
+    def __init__(self, version, levels, fired):
+        self.version = version
+        self.fired = fired
+        self.symbols = {}
+        by_symbol = defaultdict(list)
+        for level in levels:
+            by_symbol[level['symbol']].append(level)
+        for symbol, rows in by_symbol.items():
+            rows.sort(key=lambda level: level['price'])
+            prices = np.fromiter((level['price'] for level in rows), dtype=np.float64, count=len(rows))
+            self.symbols[symbol] = (prices, rows)
+
+    def __len__(self):
+        return sum(len(prices) for prices, _ in self.symbols.values())
+
+
+def levels_changed():
+    bump_version(VERSION_NAME)
+
+
+def _number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 and np.isfinite(number) else None
+
+
+def json_levels(value, path=''):
+    """``(label, price)`` pairs found in a JSON list or dict of levels"""
+    if isinstance(value, dict):
+        for key in ('price', 'level', 'value'):
+            price = _number(value.get(key))
+            if price is not None:
+                yield str(value.get('label') or value.get('name') or path), price
+                return
+        for key, item in value.items():
+            yield from json_levels(item, f"{path}.{key}" if path else str(key))
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            yield from json_levels(item, f"{path}[{i}]")
+    else:
+        price = _number(value)
+        if price is not None:
+            yield path, price
+
+
+def compile_levels():
+    """Every alertable level of active, purchased analyses"""
+    purchased = Exists(PurchasedAnalysis.objects.filter(analysis=OuterRef('pk')))
+    analyses = CryptoAnalysis.objects.filter(purchased, is_active=True)
+    levels = []
+    labels = dict(ChartAnnotation.ANALYSIS_TYPES)
+
+    annotations = ChartAnnotation.objects.filter(
+        analysis__in=analyses, type__in=ANNOTATION_TYPES, price_level__isnull=False,
+    ).values_list('id', 'analysis_id', 'analysis__symbol', 'type', 'price_level')
+    for annotation_id, analysis_id, symbol, level_type, price in annotations.iterator(chunk_size=5000):
+        price = _number(price)
+        if price is not None:
+            levels.append({
+                'analysis_id': analysis_id, 'symbol': symbol.upper(), 'type': level_type, 'price': price,
+                'key': f"annotation:{annotation_id}:{price}", 'label': labels[level_type],
+            })
+
+    fields = analyses.values_list('id', 'symbol', 'price_targets', 'support_levels', 'resistance_levels')
+    for analysis_id, symbol, targets, supports, resistances in fields.iterator(chunk_size=2000):
+        for level_type, value in (('target', targets), ('support', supports), ('resistance', resistances)):
+            for path, price in json_levels(value or []):
+                # Plain list entries ("[0]") have no name worth showing
+                label = '' if path.startswith('[') else path.replace('_', ' ')[:100]
+                levels.append({
+                    'analysis_id': analysis_id, 'symbol': symbol.upper(), 'type': level_type, 'price': price,
+                    'key': f"{level_type}:{path}:{price}"[:120], 'label': label or dict(PriceAlert.LEVEL_TYPES)[level_type],
+                })
+    return levels
+
+
+def get_book():
+    """The compiled level book, rebuilt if levels changed since it was built"""
+    global _book
+    version = get_version(VERSION_NAME)
+    with _lock:
+        if _book is not None and _book.version == version:
+            return _book
+    fired = set(PriceAlert.objects.values_list('analysis_id', 'level_key'))
+    book = Book(version, compile_levels(), fired)
+    with _lock:
+        _book = book
+    logger.info(f"Compiled {len(book)} price alert levels across {len(book.symbols)} symbols")
+    return book
+
+
+def check_candles(symbol, candles, previous_close=None, book=None):
+    """
+    Record every unfired level crossed by ``candles`` (sorted, from
+    ``market_data``). A candle covers its own high/low range and the gap
+    from the previous close. Returns the number of new alerts.
+    """
+    book = book or get_book()
+    symbol = symbol.upper()
+    if symbol not in book.symbols or not len(candles):
+        return 0
+
+    closes = candles['close']
+    previous = np.empty(len(candles))
+    previous[0] = closes[0] if previous_close is None else previous_close
+    previous[1:] = closes[:-1]
+    lows = np.minimum(candles['low'], previous)
+    highs = np.maximum(candles['high'], previous)
+
+    prices, rows = book.symbols[symbol]
+    firsts = np.searchsorted(prices, lows, side='left')
+    lasts = np.searchsorted(prices, highs, side='right')
+
+    alerts = {}
+    for i in np.flatnonzero(lasts > firsts):
+        for level in rows[firsts[i]:lasts[i]]:
+            key = (level['analysis_id'], level['key'])
+            if key in alerts or key in book.fired:
+                continue
+            alerts[key] = PriceAlert(
+                analysis_id=level['analysis_id'],
+                level_key=level['key'],
+                level_type=level['type'],
+                label=level['label'],
+                level_price=Decimal(str(level['price'])),
+                crossed_price=Decimal(str(float(closes[i]))),
+                direction='up' if level['price'] >= previous[i] else 'down',
+                crossed_at=datetime.fromtimestamp(int(candles['timestamp'][i]), tz=dt_timezone.utc),
+            )
+    if not alerts:
+        return 0
+
+    PriceAlert.objects.bulk_create(alerts.values(), batch_size=1000, ignore_conflicts=True)
+    with _lock:
+        book.fired.update(alerts)
+    logger.info(f"{symbol}: {len(alerts)} price levels crossed")
+    return len(alerts)
+
+
+def check_symbols(book=None):
+    """
+    Feed each symbol's candles since its cursor through the book.
+
+    A symbol seen for the first time starts from its latest candle, so
+    history loaded in bulk does not set off alerts.
+    """
+    book = book or get_book()
+    cursors = {cursor.symbol: cursor for cursor in PriceAlertCursor.objects.filter(symbol__in=book.symbols)}
+    created = 0
+    for symbol in book.symbols:
+        cursor = cursors.get(symbol)
+        if cursor is None:
+            latest = market_data.get_candles(symbol)[-1:]
+            if len(latest):
+                PriceAlertCursor.objects.create(symbol=symbol, last_timestamp=int(latest['timestamp'][0]),
+                                                last_price=float(latest['close'][0]))
+            continue
+        candles = market_data.get_candles(symbol, start=cursor.last_timestamp + 1)
+        if not len(candles):
+            continue
+        created += check_candles(symbol, candles, cursor.last_price, book)
+        cursor.last_timestamp = int(candles['timestamp'][-1])
+        cursor.last_price = float(candles['close'][-1])
+        cursor.save(update_fields=['last_timestamp', 'last_price', 'updated_at'])
+    return created
+
+
+def _claim(limit):
+    """Mark up to ``limit`` pending alerts notified and return them"""
+    pending = PriceAlert.objects.filter(notified_at__isnull=True).order_by('id')
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        ids = list(pending.values_list('id', flat=True)[:limit])
+        # Flipped before sending: an alert is emailed at most once
+        PriceAlert.objects.filter(id__in=ids, notified_at__isnull=True).update(notified_at=timezone.now())
+    return list(PriceAlert.objects.filter(id__in=ids).select_related('analysis').order_by('crossed_at'))
+
+
+def build_alert_email(user, alerts):
+    return EmailMessage(
+        subject=f"{len(alerts)} price level{'s' if len(alerts) != 1 else ''} crossed in your analyses",
+        body=render_to_string('dashboard/emails/price_alerts.txt', {'user': user, 'alerts': alerts}),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user['email']],
+    )
+
+
+def dispatch_alerts(batch_size=BATCH_SIZE, mail_connection=None):
+    """Email pending alerts, one message per purchaser per batch; returns counters"""
+    stats = {'alerts': 0, 'emails': 0}
+    mail_connection = mail_connection or get_connection()
+    mail_connection.open()
+    try:
+        while True:
+            alerts = _claim(batch_size)
+            if not alerts:
+                break
+            stats['alerts'] += len(alerts)
+            by_analysis = defaultdict(list)
+            for alert in alerts:
+                by_analysis[alert.analysis_id].append(alert)
+
+            by_user = {}
+            holders = PurchasedAnalysis.objects.filter(
+                analysis_id__in=by_analysis, user__is_active=True,
+            ).exclude(user__email='').values('analysis_id', 'user_id', 'user__email', 'user__first_name', 'user__username')
+            for row in holders.iterator(chunk_size=2000):
+                entry = by_user.setdefault(row['user_id'], ({
+                    'email': row['user__email'], 'name': row['user__first_name'] or row['user__username'],
+                }, []))
+                entry[1].extend(by_analysis[row['analysis_id']])
+
+            messages = [build_alert_email(user, user_alerts) for user, user_alerts in by_user.values()]
+            if messages:
+                mail_connection.send_messages(messages)
+            stats['emails'] += len(messages)
+            logger.info(f"Price alerts: emailed {len(alerts)} alerts to {len(messages)} users")
+            if len(alerts) < batch_size:
+                break
+    finally:
+        mail_connection.close()
+    return stats
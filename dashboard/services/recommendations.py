@@ -0,0 +1,227 @@
+"""
+Related-content index for analyses and market insights.
+
+Each item's text is reduced to term counts when it is saved and the item is
+marked stale. ``refresh_index`` (run by ``build_related_index``) weighs the
+terms with TF-IDF, scores stale items against the corpus through an inverted
+index, keeps the top ``TOP_K`` neighbours per item type and splices the
+stale items into the neighbour lists of the items they beat. Request-time
+lookups read one ``RelatedContent`` row by its unique key.
+
+IDF weights drift as the corpus grows; a periodic ``--full`` rebuild
+recomputes every neighbour list from scratch.
+"""
+import heapq
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from ..models import CryptoAnalysis, MarketInsight, RelatedContent
+
+logger = logging.getLogger(__name__)
+
+# Neighbours kept per item and per item type
+TOP_K = 10
+
+# Neighbours scoring below this are not worth showing
+MIN_SCORE = 0.05
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+STOP_WORDS = frozenset('''
+    a an and are as at be but by for from has have in into is it its of on or our that the their this
+    to was were will with we you your can may also more than over under about after before these those
+    which while what when where who how all any not no so such very just up down out if then there
+'''.split())
+
+ITEM_MODELS = {'analysis': CryptoAnalysis, 'insight': MarketInsight}
+
+
+def item_type_for(instance):
+    return 'analysis' if isinstance(instance, CryptoAnalysis) else 'insight'
+
+
+def item_text(instance):
+    """Weighted text of an item; identifying fields are repeated to count more"""
+    if isinstance(instance, CryptoAnalysis):
+        parts = [
+            instance.title,
+            instance.cryptocurrency, instance.cryptocurrency,
+            instance.symbol, instance.symbol, instance.symbol,
+            instance.get_analysis_type_display(),
+            instance.get_timeframe_display(),
+            instance.description,
+            instance.executive_summary,
+        ]
+    else:
+        parts = [
+            instance.title,
+            instance.cryptocurrency or '', instance.cryptocurrency or '',
+            instance.symbol or '', instance.symbol or '', instance.symbol or '',
+            instance.get_insight_type_display(),
+            instance.summary,
+            instance.key_takeaways,
+        ]
+    return ' '.join(part for part in parts if part)
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if len(token) > 1 and token not in STOP_WORDS]
+
+
+def term_counts(instance):
+    return dict(Counter(tokenize(item_text(instance))))
+
+
+def item_changed(instance):
+    """Record new term counts; only a real text change marks the item stale"""
+    item_type = item_type_for(instance)
+    terms = term_counts(instance)
+    row = RelatedContent.objects.filter(item_type=item_type, item_id=instance.pk).only('terms').first()
+    if row is None:
+        RelatedContent.objects.create(item_type=item_type, item_id=instance.pk, terms=terms, is_stale=True)
+    elif row.terms != terms:
+        RelatedContent.objects.filter(pk=row.pk).update(terms=terms, is_stale=True)
+
+
+def item_deleted(instance):
+    RelatedContent.objects.filter(item_type=item_type_for(instance), item_id=instance.pk).delete()
+
+
+def _tfidf_vectors(rows):
+    """Unit-length sparse TF-IDF vectors keyed by row id"""
+    document_frequency = Counter()
+    for row in rows:
+        document_frequency.update(row.terms.keys())
+    total = len(rows)
+    idf = {term: math.log((1 + total) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+    vectors = {}
+    for row in rows:
+        vector = {term: (1 + math.log(count)) * idf[term] for term, count in row.terms.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vectors[row.pk] = {term: weight / norm for term, weight in vector.items()}
+    return vectors
+
+
+def _insert_neighbour(neighbours, item_type, item_id, score):
+    """Splice ``item_id`` into a top-K list; returns True if the list changed"""
+    current = [entry for entry in neighbours.get(item_type, []) if entry[0] != item_id]
+    changed = len(current) != len(neighbours.get(item_type, []))
+    if len(current) < TOP_K or score > current[-1][1]:
+        current.append([item_id, score])
+        current.sort(key=lambda entry: -entry[1])
+        del current[TOP_K:]
+        changed = True
+    if changed:
+        neighbours[item_type] = current
+    return changed
+
+
+def _remove_neighbour(neighbours, item_type, item_id):
+    current = neighbours.get(item_type, [])
+    kept = [entry for entry in current if entry[0] != item_id]
+    if len(kept) == len(current):
+        return False
+    neighbours[item_type] = kept
+    return True
+
+
+def refresh_index(full=False):
+    """
+    Recompute neighbours for stale items (or every item with ``full``).
+
+    Returns ``(refreshed, updated)``: items rescored and rows written.
+    """
+    if full:
+        _sync_items()
+    rows = list(RelatedContent.objects.all())
+    targets = rows if full else [row for row in rows if row.is_stale]
+    if not targets:
+        return 0, 0
+
+    vectors = _tfidf_vectors(rows)
+    by_id = {row.pk: row for row in rows}
+    postings = defaultdict(list)
+    for row_id, vector in vectors.items():
+        for term, weight in vector.items():
+            postings[term].append((row_id, weight))
+
+    changed = {}
+    for target in targets:
+        scores = defaultdict(float)
+        for term, weight in vectors[target.pk].items():
+            for other_id, other_weight in postings[term]:
+                if other_id != target.pk:
+                    scores[other_id] += weight * other_weight
+
+        per_type = defaultdict(list)
+        for other_id, score in scores.items():
+            if score >= MIN_SCORE:
+                per_type[by_id[other_id].item_type].append((score, by_id[other_id].item_id))
+        target.neighbours = {
+            item_type: [[item_id, round(score, 4)] for score, item_id in heapq.nlargest(TOP_K, candidates)]
+            for item_type, candidates in per_type.items()
+        }
+        target.is_stale = False
+        changed[target.pk] = target
+
+        if not full:
+            # Splice the refreshed item into (or out of) every settled item's list
+            for other in rows:
+                if other.is_stale or other.pk == target.pk:
+                    continue
+                score = scores.get(other.pk, 0.0)
+                if score >= MIN_SCORE:
+                    if _insert_neighbour(other.neighbours, target.item_type, target.item_id, round(score, 4)):
+                        changed[other.pk] = other
+                elif _remove_neighbour(other.neighbours, target.item_type, target.item_id):
+                    changed[other.pk] = other
+
+    with transaction.atomic():
+        RelatedContent.objects.bulk_update(list(changed.values()), ['neighbours', 'is_stale'], batch_size=500)
+    logger.info(f"Related content refreshed for {len(targets)} items, {len(changed)} rows updated")
+    return len(targets), len(changed)
+
+
+def _sync_items():
+    """Create missing rows and refresh term counts for every item"""
+    existing = {(row.item_type, row.item_id): row for row in RelatedContent.objects.only('item_type', 'item_id', 'terms')}
+    created, updated, seen = [], [], set()
+    for item_type, model in ITEM_MODELS.items():
+        for instance in model.objects.iterator():
+            key = (item_type, instance.pk)
+            seen.add(key)
+            terms = term_counts(instance)
+            row = existing.get(key)
+            if row is None:
+                created.append(RelatedContent(item_type=item_type, item_id=instance.pk, terms=terms))
+            elif row.terms != terms:
+                row.terms = terms
+                updated.append(row)
+    RelatedContent.objects.bulk_create(created, batch_size=500)
+    RelatedContent.objects.bulk_update(updated, ['terms'], batch_size=500)
+    orphans = [row.pk for key, row in existing.items() if key not in seen]
+    RelatedContent.objects.filter(pk__in=orphans).delete()
+
+
+def related_items(instance, item_type, limit, queryset=None):
+    """
+    Up to ``limit`` active neighbours of ``instance`` of the given type, best
+    first. Returns None when the item has not been indexed yet.
+    """
+    row = RelatedContent.objects.filter(
+        item_type=item_type_for(instance), item_id=instance.pk
+    ).only('neighbours').first()
+    if row is None or not row.neighbours:
+        return None
+
+    ranked = [item_id for item_id, _ in row.neighbours.get(item_type, [])]
+    if not ranked:
+        return []
+    queryset = queryset if queryset is not None else ITEM_MODELS[item_type].objects.all()
+    found = queryset.filter(pk__in=ranked, is_active=True).in_bulk()
+    return [found[item_id] for item_id in ranked if item_id in found][:limit]
@@ -0,0 +1,208 @@
+"""
+Consultation reminder and follow-up dispatch.
+
+Due reminders are claimed in bounded batches using the
+``(is_sent, scheduled_time)`` index. On databases with
+``SELECT ... FOR UPDATE SKIP LOCKED`` concurrent workers skip each other's
+rows; on SQLite a conditional UPDATE on ``claim_token`` decides which worker
+owns a row. Each batch is sent over one mail connection and closed out with
+a single UPDATE.
+"""
+import logging
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import Case, DateTimeField, Q, Value, When
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from ..models import Consultation, ConsultationReminder
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+
+# Claims older than this are assumed to belong to a crashed worker
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# Follow-up emails go out this long after a session is completed
+FOLLOW_UP_DELAY = timedelta(hours=2)
+
+
+def _lock_ids(queryset, limit):
+    """IDs of up to ``limit`` rows, row-locked where the database supports it"""
+    if connection.features.has_select_for_update_skip_locked:
+        queryset = queryset.select_for_update(skip_locked=True)
+    return list(queryset.values_list('id', flat=True)[:limit])
+
+
+def claim_due_reminders(limit=BATCH_SIZE, now=None):
+    """
+    Claim up to ``limit`` due email reminders for this worker.
+
+    Returns ``(token, reminders)``; the reminders are loaded with their
+    consultation and user so rendering does not query per row.
+    """
+    now = now or timezone.now()
+    token = uuid.uuid4()
+    due = ConsultationReminder.objects.filter(
+        is_sent=False,
+        scheduled_time__lte=now,
+        reminder_type='email',
+    ).filter(
+        Q(claim_token__isnull=True) | Q(claimed_at__lt=now - CLAIM_TIMEOUT)
+    ).order_by('scheduled_time')
+
+    with transaction.atomic():
+        ids = _lock_ids(due, limit)
+        if ids:
+            # Re-applying the due filter makes this a compare-and-set on SQLite
+            due.filter(id__in=ids).update(claim_token=token, claimed_at=now)
+
+    reminders = list(
+        ConsultationReminder.objects.filter(claim_token=token, is_sent=False)
+        .select_related('consultation__user')
+        .order_by('scheduled_time')
+    )
+    return token, reminders
+
+
+def release_claim(token):
+    """Hand claimed reminders back so the next run retries them"""
+    ConsultationReminder.objects.filter(claim_token=token, is_sent=False).update(claim_token=None, claimed_at=None)
+
+
+def build_reminder_email(reminder):
+    consultation = reminder.consultation
+    context = {'consultation': consultation, 'user': consultation.user, 'reminder': reminder}
+    return EmailMessage(
+        subject=f"Reminder: {consultation.title} on {consultation.scheduled_date:%b %d at %H:%M}",
+        body=render_to_string('dashboard/emails/consultation_reminder.txt', context),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[consultation.user.email],
+    )
+
+
+def build_follow_up_email(consultation):
+    context = {'consultation': consultation, 'user': consultation.user}
+    return EmailMessage(
+        subject=f"Thanks for attending {consultation.title}",
+        body=render_to_string('dashboard/emails/consultation_follow_up.txt', context),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[consultation.user.email],
+    )
+
+
+def _select_deliverable(reminders, now):
+    """
+    Pick the reminders worth emailing from a claimed batch.
+
+    When a backlog is drained several reminders for one consultation can be
+    due at once; only the latest is sent. Reminders for consultations that
+    already started, were cancelled or have no email address are closed
+    without sending.
+    """
+    latest = {}
+    for reminder in reminders:
+        consultation = reminder.consultation
+        if consultation.status != 'scheduled' or consultation.scheduled_date <= now:
+            continue
+        if not consultation.user.email:
+            continue
+        current = latest.get(consultation.id)
+        if current is None or reminder.scheduled_time > current.scheduled_time:
+            latest[consultation.id] = reminder
+    return list(latest.values())
+
+
+def _close_batch(token, delivered_ids, now):
+    """Mark every reminder in the batch done with one UPDATE"""
+    ConsultationReminder.objects.filter(claim_token=token, is_sent=False).update(
+        is_sent=True,
+        sent_time=Case(
+            When(id__in=delivered_ids, then=Value(now)),
+            default=None,
+            output_field=DateTimeField(),
+        ),
+    )
+
+
+def dispatch_reminders(batch_size=BATCH_SIZE, max_batches=None, pause=0, mail_connection=None):
+    """
+    Send due reminders batch by batch.
+
+    ``max_batches`` bounds the work done per run and ``pause`` spaces batches
+    out, so a large backlog drains steadily instead of all at once.
+    Returns a dict of counters.
+    """
+    stats = {'batches': 0, 'sent': 0, 'skipped': 0, 'failed': 0}
+    mail_connection = mail_connection or get_connection()
+    mail_connection.open()
+    try:
+        while max_batches is None or stats['batches'] < max_batches:
+            now = timezone.now()
+            token, reminders = claim_due_reminders(batch_size, now)
+            if not reminders:
+                break
+            stats['batches'] += 1
+
+            deliverable = _select_deliverable(reminders, now)
+            try:
+                if deliverable:
+                    mail_connection.send_messages([build_reminder_email(r) for r in deliverable])
+            except Exception as e:
+                logger.error(f"Reminder batch failed, releasing {len(reminders)} reminders: {str(e)}")
+                release_claim(token)
+                stats['failed'] += len(deliverable)
+                break
+
+            _close_batch(token, [r.id for r in deliverable], now)
+            Consultation.objects.filter(
+                id__in={r.consultation_id for r in deliverable}, reminder_sent=False
+            ).update(reminder_sent=True)
+
+            stats['sent'] += len(deliverable)
+            stats['skipped'] += len(reminders) - len(deliverable)
+            logger.info(f"Reminder batch {stats['batches']}: sent {len(deliverable)}, "
+                        f"closed {len(reminders) - len(deliverable)} without sending")
+
+            if len(reminders) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+    finally:
+        mail_connection.close()
+    return stats
+
+
+def dispatch_follow_ups(limit=BATCH_SIZE, mail_connection=None):
+    """
+    Send follow-up emails for completed consultations.
+
+    ``follow_up_sent`` is flipped before sending, so a follow-up goes out at
+    most once even if two workers run at the same time.
+    """
+    cutoff = timezone.now() - FOLLOW_UP_DELAY
+    pending = Consultation.objects.filter(
+        status='completed', follow_up_sent=False,
+    ).filter(
+        Q(session_ended__lte=cutoff) | Q(session_ended__isnull=True, scheduled_date__lte=cutoff)
+    ).order_by('id')
+
+    with transaction.atomic():
+        ids = _lock_ids(pending, limit)
+        Consultation.objects.filter(id__in=ids).update(follow_up_sent=True)
+
+    consultations = [
+        consultation
+        for consultation in Consultation.objects.filter(id__in=ids).select_related('user')
+        if consultation.user.email
+    ]
+    if consultations:
+        mail_connection = mail_connection or get_connection()
+        mail_connection.send_messages([build_follow_up_email(c) for c in consultations])
+    return len(consultations)
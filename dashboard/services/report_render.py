@@ -0,0 +1,273 @@
+"""
+PDF layout for analysis reports.
+
+This module runs inside report worker processes, so it imports nothing from
+Django: it receives the plain ``payload`` dict built by
+``services.reports.build_payload`` and writes a PDF to the path it is given.
+"""
+import os
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from reportlab.graphics.charts.lineplots import LinePlot
+from reportlab.graphics.shapes import Drawing, Line, String
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+YELLOW = colors.HexColor('#F0B90B')
+GREEN = colors.HexColor('#03A66D')
+RED = colors.HexColor('#CF304A')
+DARK = colors.HexColor('#1E2026')
+MUTED = colors.HexColor('#848E9C')
+BORDER = colors.HexColor('#D5D8DC')
+
+# Indicators drawn on the price axis; the rest go on their own chart
+OVERLAY_INDICATORS = ('sma', 'ema', 'bollinger')
+
+CHART_WIDTH = 170 * mm
+CHART_HEIGHT = 70 * mm
+
+
+def _styles():
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle('ReportTitle', parent=styles['Title'], textColor=DARK, spaceAfter=2 * mm))
+    styles.add(ParagraphStyle('Muted', parent=styles['Normal'], textColor=MUTED, fontSize=9))
+    styles.add(ParagraphStyle('Section', parent=styles['Heading2'], textColor=DARK, spaceBefore=5 * mm))
+    styles.add(ParagraphStyle('Cell', parent=styles['Normal'], fontSize=9, leading=11))
+    return styles
+
+
+def _text(value):
+    """Escape user content for Paragraph markup, keeping line breaks"""
+    return escape(str(value or '')).replace('\n', '<br/>')
+
+
+def _color(value, default=YELLOW):
+    try:
+        return colors.HexColor(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _series(data):
+    """Numeric points from an indicator's ``data`` (a list, a dict holding ``values``, or one number)"""
+    if isinstance(data, dict):
+        data = data.get('values') or data.get('data') or []
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        data = [data]
+    points = []
+    for value in data if isinstance(data, list) else []:
+        try:
+            points.append(float(value))
+        except (TypeError, ValueError):
+            points.append(None)
+    return points
+
+
+def _parameters(parameters):
+    """``key=value`` list of an indicator's parameters; other JSON values are not shown"""
+    if not isinstance(parameters, dict):
+        return '-'
+    return ', '.join(f"{key}={value}" for key, value in parameters.items()) or '-'
+
+
+def _date_label(timestamp):
+    try:
+        return datetime.fromisoformat(str(timestamp).replace('Z', '+00:00')).strftime('%d %b')
+    except ValueError:
+        return str(timestamp)[:10]
+
+
+def _line_chart(series, labels=(), levels=()):
+    """
+    Line chart of ``series`` (``(name, points, color)``), with horizontal
+    ``levels`` (``(label, price, color)``) for annotations.
+    """
+    drawing = Drawing(CHART_WIDTH, CHART_HEIGHT)
+    plot = LinePlot()
+    plot.x, plot.y = 12 * mm, 10 * mm
+    plot.width, plot.height = CHART_WIDTH - 40 * mm, CHART_HEIGHT - 16 * mm
+
+    data = []
+    for _, points, _ in series:
+        data.append([(i, point) for i, point in enumerate(points) if point is not None])
+    values = [y for line in data for _, y in line] + [price for _, price, _ in levels]
+    low, high = min(values), max(values)
+    padding = (high - low) * 0.05 or abs(high) * 0.05 or 1
+
+    plot.data = data
+    plot.yValueAxis.valueMin = low - padding
+    plot.yValueAxis.valueMax = high + padding
+    plot.yValueAxis.labels.fontSize = 7
+    plot.xValueAxis.valueMin = 0
+    plot.xValueAxis.valueMax = max(len(points) for _, points, _ in series) - 1 or 1
+    plot.xValueAxis.labels.fontSize = 7
+    if labels:
+        step = max(1, len(labels) // 6)
+        plot.xValueAxis.valueSteps = list(range(0, len(labels), step))
+        plot.xValueAxis.labelTextFormat = lambda i: labels[int(i)] if 0 <= int(i) < len(labels) else ''
+    for i, (_, _, color) in enumerate(series):
+        plot.lines[i].strokeColor = color
+        plot.lines[i].strokeWidth = 1.2 if i == 0 else 0.8
+    drawing.add(plot)
+
+    scale = plot.height / ((high + padding) - (low - padding))
+    for label, price, color in levels:
+        y = plot.y + (price - (low - padding)) * scale
+        drawing.add(Line(plot.x, y, plot.x + plot.width, y, strokeColor=color, strokeWidth=0.6,
+                         strokeDashArray=[3, 2]))
+        drawing.add(String(plot.x + plot.width + 2, y - 2, label, fontSize=6, fillColor=color))
+
+    legend_y = CHART_HEIGHT - 4 * mm
+    for i, (name, _, color) in enumerate(series):
+        drawing.add(String(plot.x + i * 35 * mm, legend_y, name, fontSize=7, fillColor=color))
+    return drawing
+
+
+def _table(rows, widths, header=True):
+    table = Table(rows, colWidths=widths, repeatRows=1 if header else 0)
+    style = [
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LINEBELOW', (0, 0), (-1, -1), 0.25, BORDER),
+        ('TOPPADDING', (0, 0), (-1, -1), 3),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+    ]
+    if header:
+        style += [('TEXTCOLOR', (0, 0), (-1, 0), MUTED), ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold')]
+    table.setStyle(TableStyle(style))
+    return table
+
+
+def _price_section(payload, styles):
+    chart = payload['chart_data'] or {}
+    prices = _series(chart.get('prices'))
+    if len([p for p in prices if p is not None]) < 2:
+        return []
+
+    series = [(f"{payload['symbol']} price", prices, GREEN if prices[-1] >= prices[0] else RED)]
+    for indicator in payload['indicators']:
+        points = _series(indicator['data'])
+        if indicator['type'] in OVERLAY_INDICATORS and len(points) == len(prices):
+            series.append((indicator['name'], points, _color(indicator['color'], MUTED)))
+    levels = [
+        (annotation['label'], annotation['price_level'], _color(annotation['color']))
+        for annotation in payload['annotations'] if annotation['price_level'] is not None
+    ]
+    labels = [_date_label(t) for t in chart.get('timestamps') or chart.get('labels') or []]
+    if len(labels) != len(prices):
+        labels = []
+
+    flowables = [Paragraph('Price Chart', styles['Section']), _line_chart(series, labels, levels)]
+    if chart.get('timeframe'):
+        flowables.append(Paragraph(f"Timeframe: {_text(chart['timeframe'])}", styles['Muted']))
+    return flowables
+
+
+def _indicator_charts(payload, styles):
+    flowables = []
+    for indicator in payload['indicators']:
+        points = _series(indicator['data'])
+        if indicator['type'] in OVERLAY_INDICATORS or len([p for p in points if p is not None]) < 2:
+            continue
+        flowables.append(Spacer(1, 3 * mm))
+        flowables.append(_line_chart([(indicator['name'], points, _color(indicator['color'], GREEN))]))
+    return flowables
+
+
+def render_pdf(payload, path):
+    """Write the report for ``payload`` to ``path``; returns ``path``"""
+    styles = _styles()
+    story = [
+        Paragraph(_text(payload['title']), styles['ReportTitle']),
+        Paragraph(
+            f"{_text(payload['cryptocurrency'])} ({_text(payload['symbol'])}) &middot; "
+            f"{_text(payload['analysis_type'])} &middot; {_text(payload['timeframe'])} &middot; "
+            f"by {_text(payload['analyst'])}",
+            styles['Muted'],
+        ),
+        Spacer(1, 4 * mm),
+        _table([
+            ['Recommendation', 'Risk level', 'Overall score', 'Growth potential', 'Rating'],
+            [payload['recommendation'], payload['risk_level'], f"{payload['overall_score']}/10",
+             payload['growth_potential'], f"{payload['rating']} ({payload['rating_count']})"],
+        ], [34 * mm] * 5),
+        Paragraph('Executive Summary', styles['Section']),
+        Paragraph(_text(payload['executive_summary']), styles['Normal']),
+    ]
+
+    story += _price_section(payload, styles)
+
+    if payload['annotations']:
+        story.append(Paragraph('Key Levels', styles['Section']))
+        story.append(_table(
+            [['Type', 'Price', 'Notes']] + [
+                [a['label'], f"{a['price_level']:,.4f}" if a['price_level'] is not None else '-',
+                 Paragraph(_text(a['description']), styles['Cell'])]
+                for a in payload['annotations']
+            ],
+            [35 * mm, 30 * mm, 105 * mm],
+        ))
+
+    if payload['indicators']:
+        story.append(Paragraph('Technical Indicators', styles['Section']))
+        story.append(_table(
+            [['Indicator', 'Parameters', 'Latest']] + [
+                [i['name'], _parameters(i['parameters']),
+                 next((f"{p:,.4f}" for p in reversed(_series(i['data'])) if p is not None), '-')]
+                for i in payload['indicators']
+            ],
+            [60 * mm, 70 * mm, 40 * mm],
+        ))
+        story += _indicator_charts(payload, styles)
+
+    if payload['metrics']:
+        story.append(Paragraph('Metrics', styles['Section']))
+        story.append(_table(
+            [['Metric', 'Current', 'Previous', 'Change']] + [
+                [m['name'], f"{m['current_value']} {m['unit']}".strip(), f"{m['previous_value']} {m['unit']}".strip(),
+                 m['change']]
+                for m in payload['metrics']
+            ],
+            [70 * mm, 35 * mm, 35 * mm, 30 * mm],
+        ))
+
+    if payload['insights']:
+        story.append(Paragraph('Insights', styles['Section']))
+        for insight in payload['insights']:
+            story.append(Paragraph(
+                f"<b>{_text(insight['title'])}</b> "
+                f"<font color='#848E9C'>({_text(insight['category'])}, {_text(insight['importance'])})</font>",
+                styles['Normal'],
+            ))
+            story.append(Paragraph(_text(insight['description']), styles['Normal']))
+            story.append(Spacer(1, 2 * mm))
+
+    story.append(Paragraph('Full Analysis', styles['Section']))
+    story.append(Paragraph(_text(payload['full_content']), styles['Normal']))
+    if payload['risk_management_note']:
+        story.append(Paragraph('Risk Management', styles['Section']))
+        story.append(Paragraph(_text(payload['risk_management_note']), styles['Normal']))
+
+    def footer(canvas, doc):
+        canvas.saveState()
+        canvas.setFont('Helvetica', 7)
+        canvas.setFillColor(MUTED)
+        canvas.drawString(20 * mm, 10 * mm, f"Analysis #{payload['id']} · {payload['updated_at']}")
+        canvas.drawRightString(A4[0] - 20 * mm, 10 * mm, f"Page {doc.page}")
+        canvas.restoreState()
+
+    # Write beside the target and rename, so readers never see a partial file
+    partial = f"{path}.{os.getpid()}.part"
+    doc = SimpleDocTemplate(partial, pagesize=A4, title=payload['title'], author=payload['analyst'],
+                            leftMargin=20 * mm, rightMargin=20 * mm, topMargin=18 * mm, bottomMargin=18 * mm)
+    try:
+        doc.build(story, onFirstPage=footer, onLaterPages=footer)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return path
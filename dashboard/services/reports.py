@@ -0,0 +1,226 @@
+"""
+Analysis PDF reports, rendered in a process pool and cached in media storage.
+
+A report's file name is the SHA-256 of ``(analysis id, updated_at, template
+version)``, so a cached file is valid for exactly as long as the analysis
+and the layout are unchanged; editing either produces a new name and the
+stale file is pruned on the next render. Rating changes, written with
+queryset updates in ``aggregates``, move ``updated_at`` as well. Rendering (charts and layout with
+ReportLab) is CPU-bound, so it runs in worker processes and request threads
+only wait on the result.
+
+Downloads are served with ``FileResponse`` and answer ``If-None-Match`` /
+``If-Modified-Since`` with 304 before any rendering is considered.
+"""
+import atexit
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.http import http_date, parse_http_date_safe
+
+from ..models import CryptoAnalysis
+from . import report_render
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout in report_render changes; every cached report is re-rendered
+TEMPLATE_VERSION = 1
+
+REPORT_DIR = 'analysis_reports'
+
+RENDER_WORKERS = getattr(settings, 'REPORT_RENDER_WORKERS', 2)
+RENDER_TIMEOUT = getattr(settings, 'REPORT_RENDER_TIMEOUT', 60)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Renders in flight in this process, so concurrent downloads share one job
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+class ReportError(Exception):
+    """Raised when a report cannot be rendered"""
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Workers are spawned rather than forked: the renderer needs no
+            # Django state, and forking a threaded server is unsafe
+            _executor = ProcessPoolExecutor(
+                max_workers=RENDER_WORKERS, mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+@atexit.register
+def _shutdown():
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+
+
+def report_key(analysis):
+    raw = f"{analysis.pk}:{analysis.updated_at.isoformat()}:{TEMPLATE_VERSION}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def report_path(analysis, key=None):
+    """Absolute cache path of the current report for ``analysis``"""
+    key = key or report_key(analysis)
+    return os.path.join(str(settings.MEDIA_ROOT), REPORT_DIR, str(analysis.pk), f"{key}.pdf")
+
+
+def build_payload(analysis):
+    """Everything the renderer needs, as plain picklable data"""
+    return {
+        'id': analysis.pk,
+        'updated_at': analysis.updated_at.strftime('%Y-%m-%d %H:%M UTC'),
+        'title': analysis.title,
+        'cryptocurrency': analysis.cryptocurrency,
+        'symbol': analysis.symbol,
+        'analyst': analysis.analyst.analyst_name,
+        'analysis_type': analysis.get_analysis_type_display(),
+        'timeframe': analysis.get_timeframe_display(),
+        'risk_level': analysis.get_risk_level_display(),
+        'recommendation': analysis.get_recommendation_display(),
+        'overall_score': str(analysis.overall_score),
+        'growth_potential': analysis.growth_potential,
+        'rating': str(analysis.rating),
+        'rating_count': analysis.rating_count,
+        'executive_summary': analysis.executive_summary,
+        'full_content': analysis.full_content,
+        'risk_management_note': analysis.risk_management_note or '',
+        'chart_data': analysis.chart_data or {},
+        'annotations': [
+            {
+                'label': annotation.get_type_display(),
+                'price_level': float(annotation.price_level) if annotation.price_level is not None else None,
+                'description': annotation.description,
+                'color': annotation.color,
+            }
+            for annotation in analysis.chart_annotations.all()
+        ],
+        'indicators': [
+            {
+                'type': indicator.indicator_type,
+                'name': indicator.get_indicator_type_display(),
+                'data': indicator.data,
+                'parameters': indicator.parameters,
+                'color': indicator.color,
+            }
+            for indicator in analysis.indicator_data.order_by('id')
+        ],
+        'insights': list(analysis.insights.values('title', 'description', 'importance', 'category')),
+        'metrics': list(analysis.metrics.values(
+            'name', 'current_value', 'previous_value', 'change', 'trend', 'unit'
+        )),
+    }
+
+
+def _prune(directory, keep):
+    """Remove reports for earlier versions of the analysis"""
+    for name in os.listdir(directory):
+        if name != keep and name.endswith('.pdf'):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def get_report(analysis):
+    """
+    Path of the current PDF for ``analysis``, rendering it first if needed.
+
+    Raises ``ReportError`` if rendering fails or takes longer than
+    ``REPORT_RENDER_TIMEOUT`` seconds.
+    """
+    key = report_key(analysis)
+    path = report_path(analysis, key)
+    if os.path.exists(path):
+        return path
+
+    with _pending_lock:
+        future = _pending.get(key)
+        owner = future is None
+        if owner:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                future = _get_executor().submit(report_render.render_pdf, build_payload(analysis), path)
+            except BrokenProcessPool:
+                _reset_executor()
+                future = _get_executor().submit(report_render.render_pdf, build_payload(analysis), path)
+            _pending[key] = future
+
+    try:
+        future.result(timeout=RENDER_TIMEOUT)
+    except BrokenProcessPool as e:
+        _reset_executor()
+        raise ReportError(f"Report worker crashed: {str(e)}")
+    except Exception as e:
+        raise ReportError(f"Could not render report for analysis {analysis.pk}: {str(e)}")
+    finally:
+        if owner:
+            with _pending_lock:
+                _pending.pop(key, None)
+
+    if owner:
+        _prune(os.path.dirname(path), os.path.basename(path))
+        logger.info(f"Rendered report for analysis {analysis.pk} ({os.path.getsize(path)} bytes)")
+    return path
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return since is not None and int(last_modified.timestamp()) <= since
+
+
+def serve_report(request, analysis):
+    """Stream the analysis report, answering conditional requests with 304"""
+    key = report_key(analysis)
+    etag = f'"{key}"'
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(analysis.updated_at.timestamp()),
+        # Purchases gate access, so only the buyer's own cache may keep it
+        'Cache-Control': 'private, no-cache',
+    }
+    if _not_modified(request, etag, analysis.updated_at):
+        response = HttpResponseNotModified()
+    else:
+        path = get_report(analysis)
+        response = FileResponse(
+            open(path, 'rb'), as_attachment=True, content_type='application/pdf',
+            filename=f"{analysis.symbol}_analysis_{analysis.pk}.pdf",
+        )
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def analysis_changed(analysis_id):
+    """
+    Move ``updated_at`` forward when something the report shows (annotations,
+    indicators, insights, metrics) changes, so the cached report is replaced.
+    """
+    CryptoAnalysis.objects.filter(pk=analysis_id).update(updated_at=timezone.now())
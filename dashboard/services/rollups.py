@@ -0,0 +1,299 @@
+"""
+Daily sales, refund and rating rollups per analyst, per analysis and per
+symbol.
+
+Purchase, rating and refund-transaction signals add their deltas to the
+day's row in each table with ``F()`` increments, inside the transaction of
+the event, so an analyst's 12-month chart reads at most ~365 small rows
+instead of scanning purchases or transactions. Sales and ratings land on the
+day they were made (a deleted purchase is taken back from that day);
+refunds land on the day the refund transaction completed.
+
+``rebuild`` (run by ``rebuild_rollups``) recomputes a date range from the
+source tables, for backfills or after bulk edits that bypass signals.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.apps import apps as global_apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from ..models import AnalysisDailyStats, AnalystDailyStats, CryptoAnalysis, SymbolDailyStats
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ('sales', 'revenue', 'refunds', 'refunded', 'rating_sum', 'rating_count')
+
+ZERO = Decimal('0.00')
+
+
+def _bump(model, day, key, deltas, extra=None):
+    """Add ``deltas`` to the row for ``key`` on ``day``, creating it on first use"""
+    updates = {field: F(field) + value for field, value in deltas.items()}
+    if model.objects.filter(date=day, **key).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(date=day, **key, **(extra or {}), **deltas)
+    except IntegrityError:
+        # Someone else created the row first
+        model.objects.filter(date=day, **key).update(**updates)
+
+
+def _apply(analysis_id, day, deltas):
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas or analysis_id is None:
+        return
+    row = CryptoAnalysis.objects.filter(pk=analysis_id).values_list('analyst_id', 'symbol').first()
+    if row is None:
+        return
+    analyst_id, symbol = row
+    with transaction.atomic():
+        _bump(AnalystDailyStats, day, {'analyst_id': analyst_id}, deltas)
+        _bump(AnalysisDailyStats, day, {'analysis_id': analysis_id}, deltas,
+              extra={'analyst_id': analyst_id, 'symbol': symbol.upper()})
+        _bump(SymbolDailyStats, day, {'symbol': symbol.upper()}, deltas)
+
+
+def _day(moment):
+    return timezone.localdate(moment) if moment else timezone.localdate()
+
+
+def purchase_created(purchase):
+    _apply(purchase.analysis_id, _day(purchase.purchased_at),
+           {'sales': 1, 'revenue': purchase.purchase_price or ZERO})
+
+
+def purchase_deleted(purchase):
+    _apply(purchase.analysis_id, _day(purchase.purchased_at),
+           {'sales': -1, 'revenue': -(purchase.purchase_price or ZERO)})
+
+
+def rating_saved(rating, created, previous=None):
+    day = _day(rating.created_at)
+    if created:
+        _apply(rating.analysis_id, day, {'rating_sum': rating.rating, 'rating_count': 1})
+    elif previous is not None:
+        previous_analysis_id, previous_value = previous
+        if previous_analysis_id != rating.analysis_id:
+            _apply(previous_analysis_id, day, {'rating_sum': -previous_value, 'rating_count': -1})
+            _apply(rating.analysis_id, day, {'rating_sum': rating.rating, 'rating_count': 1})
+        else:
+            _apply(rating.analysis_id, day, {'rating_sum': rating.rating - previous_value})
+
+
+def rating_deleted(rating):
+    _apply(rating.analysis_id, _day(rating.created_at), {'rating_sum': -rating.rating, 'rating_count': -1})
+
+
+def transaction_saved(txn, previous_status=None):
+    """Count an analysis refund once, when its transaction becomes completed"""
+    if txn.transaction_type != 'refund' or not txn.analysis_id:
+        return
+    if txn.status == 'completed' and previous_status != 'completed':
+        _apply(txn.analysis_id, _day(txn.updated_at), {'refunds': 1, 'refunded': txn.amount})
+    elif previous_status == 'completed' and txn.status != 'completed':
+        _apply(txn.analysis_id, _day(txn.updated_at), {'refunds': -1, 'refunded': -txn.amount})
+
+
+# Rebuilding
+
+
+def _models(apps=None):
+    """Models ``rebuild`` reads and writes, historical ones when given migration ``apps``"""
+    apps = apps or global_apps
+    return SimpleNamespace(**{name: apps.get_model('dashboard', name) for name in (
+        'AnalysisDailyStats', 'AnalysisRating', 'AnalystDailyStats', 'CryptoAnalysis', 'PurchasedAnalysis',
+        'SymbolDailyStats', 'Transaction',
+    )})
+
+
+def rebuild(start=None, end=None, apps=None):
+    """
+    Recompute rollup rows for ``start``..``end`` (inclusive, all time when
+    omitted) from purchases, ratings and refund transactions. Migrations pass
+    their ``apps`` so the historical models are used.
+
+    Returns the number of analysis-day rows written.
+    """
+    models = _models(apps)
+
+    def in_range(queryset, field):
+        if start:
+            queryset = queryset.filter(**{f'{field}__gte': start})
+        if end:
+            queryset = queryset.filter(**{f'{field}__lte': end})
+        return queryset
+
+    rows = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    purchases = in_range(
+        models.PurchasedAnalysis.objects.annotate(day=TruncDate('purchased_at')), 'day'
+    ).order_by().values('analysis_id', 'day').annotate(n=Count('id'), total=Sum('purchase_price'))
+    for row in purchases:
+        counters = rows[(row['analysis_id'], row['day'])]
+        counters['sales'] = row['n']
+        counters['revenue'] = row['total'] or ZERO
+
+    ratings = in_range(
+        models.AnalysisRating.objects.annotate(day=TruncDate('created_at')), 'day'
+    ).order_by().values('analysis_id', 'day').annotate(n=Count('id'), total=Sum('rating'))
+    for row in ratings:
+        counters = rows[(row['analysis_id'], row['day'])]
+        counters['rating_sum'] = row['total']
+        counters['rating_count'] = row['n']
+
+    refunds = in_range(
+        models.Transaction.objects.filter(transaction_type='refund', status='completed', analysis__isnull=False)
+        .annotate(day=TruncDate('updated_at')), 'day'
+    ).order_by().values('analysis_id', 'day').annotate(n=Count('id'), total=Sum('amount'))
+    for row in refunds:
+        counters = rows[(row['analysis_id'], row['day'])]
+        counters['refunds'] = row['n']
+        counters['refunded'] = row['total'] or ZERO
+
+    owners = {
+        pk: (analyst_id, symbol.upper())
+        for pk, analyst_id, symbol in models.CryptoAnalysis.objects.filter(
+            pk__in={analysis_id for analysis_id, _ in rows}
+        ).values_list('id', 'analyst_id', 'symbol')
+    }
+    analysis_rows = []
+    analyst_totals = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    symbol_totals = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    for (analysis_id, day), counters in rows.items():
+        if analysis_id not in owners:
+            continue
+        analyst_id, symbol = owners[analysis_id]
+        analysis_rows.append(models.AnalysisDailyStats(analysis_id=analysis_id, analyst_id=analyst_id,
+                                                       symbol=symbol, date=day, **counters))
+        for bucket in (analyst_totals[(analyst_id, day)], symbol_totals[(symbol, day)]):
+            for field, value in counters.items():
+                bucket[field] += value
+
+    with transaction.atomic():
+        for model in (models.AnalystDailyStats, models.AnalysisDailyStats, models.SymbolDailyStats):
+            in_range(model.objects.all(), 'date').delete()
+        models.AnalysisDailyStats.objects.bulk_create(analysis_rows, batch_size=1000)
+        models.AnalystDailyStats.objects.bulk_create(
+            [models.AnalystDailyStats(analyst_id=analyst_id, date=day, **counters)
+             for (analyst_id, day), counters in analyst_totals.items()],
+            batch_size=1000,
+        )
+        models.SymbolDailyStats.objects.bulk_create(
+            [models.SymbolDailyStats(symbol=symbol, date=day, **counters)
+             for (symbol, day), counters in symbol_totals.items()],
+            batch_size=1000,
+        )
+    logger.info(f"Rebuilt rollups for {len(analysis_rows)} analysis-days")
+    return len(analysis_rows)
+
+
+# Reading
+
+
+def _sums(queryset):
+    return queryset.aggregate(**{field: Sum(field) for field in COUNTER_FIELDS})
+
+
+def _point(period, values):
+    values = {field: values.get(field) or 0 for field in COUNTER_FIELDS}
+    revenue, refunded = Decimal(values['revenue']), Decimal(values['refunded'])
+    return {
+        'period': period.isoformat(),
+        'sales': values['sales'],
+        'revenue': float(revenue),
+        'refunds': values['refunds'],
+        'net_revenue': float(revenue - refunded),
+        'rating_count': values['rating_count'],
+        'average_rating': round(values['rating_sum'] / values['rating_count'], 2) if values['rating_count'] else None,
+    }
+
+
+def _month_start(day, months_back=0):
+    month = day.year * 12 + day.month - 1 - months_back
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def daily_series(queryset, days=30):
+    """One point per day for the last ``days`` days, gaps filled with zeros"""
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    found = {
+        row['date']: row
+        for row in queryset.filter(date__gte=start).order_by().values('date').annotate(
+            **{field: Sum(field) for field in COUNTER_FIELDS}
+        )
+    }
+    return [_point(start + timedelta(days=offset), found.get(start + timedelta(days=offset), {}))
+            for offset in range(days)]
+
+
+def monthly_series(queryset, months=12):
+    """One point per calendar month for the last ``months`` months"""
+    today = timezone.localdate()
+    start = _month_start(today, months - 1)
+    found = {
+        row['month']: row
+        for row in queryset.filter(date__gte=start).annotate(month=TruncMonth('date')).order_by()
+        .values('month').annotate(**{field: Sum(field) for field in COUNTER_FIELDS})
+    }
+    return [_point(_month_start(today, back), found.get(_month_start(today, back), {}))
+            for back in range(months - 1, -1, -1)]
+
+
+def totals(queryset, since=None):
+    if since:
+        queryset = queryset.filter(date__gte=since)
+    return _point(since or date.min, _sums(queryset))
+
+
+def analyst_stats(analyst):
+    return AnalystDailyStats.objects.filter(analyst=analyst)
+
+
+def symbol_stats(symbol):
+    return SymbolDailyStats.objects.filter(symbol=symbol.upper())
+
+
+def top_analyses(analyst, since, limit=5):
+    """Best-selling analyses of ``analyst`` since ``since``"""
+    rows = list(
+        AnalysisDailyStats.objects.filter(analyst=analyst, date__gte=since)
+        .order_by().values('analysis_id')
+        .annotate(sales=Sum('sales'), revenue=Sum('revenue'), refunded=Sum('refunded'))
+        .order_by('-revenue', '-sales')[:limit]
+    )
+    analyses = CryptoAnalysis.objects.only('id', 'title', 'cryptocurrency', 'symbol').in_bulk(
+        [row['analysis_id'] for row in rows]
+    )
+    return [
+        {
+            'id': row['analysis_id'],
+            'title': analyses[row['analysis_id']].title,
+            'symbol': analyses[row['analysis_id']].symbol,
+            'sales': row['sales'],
+            'revenue': float(row['revenue'] or 0),
+            'net_revenue': float((row['revenue'] or 0) - (row['refunded'] or 0)),
+        }
+        for row in rows if row['analysis_id'] in analyses
+    ]
+
+
+def symbol_breakdown(analyst, since):
+    """Sales of ``analyst`` since ``since`` grouped by symbol"""
+    rows = (
+        AnalysisDailyStats.objects.filter(analyst=analyst, date__gte=since)
+        .order_by().values('symbol')
+        .annotate(sales=Sum('sales'), revenue=Sum('revenue'))
+        .order_by('-revenue')
+    )
+    return [
+        {'symbol': row['symbol'], 'sales': row['sales'], 'revenue': float(row['revenue'] or 0)}
+        for row in rows
+    ]
@@ -0,0 +1,45 @@
+"""
+Shared version counters.
+
+Components that keep derived state (in process memory or in cached
+fragments) read a named version and compare it with the one their state
+was built from; writers bump the version to invalidate every copy at once.
+
+Counters are rows in ``VersionCounter`` rather than cache entries: a bump
+is a single atomic UPDATE, and cache culling or eviction cannot drop a
+counter and hand out its old numbers again. They are always read from the
+primary so a replica's lag cannot serve an old version.
+
+A missing counter (a new name, or a table that was reset) starts at the
+current time in nanoseconds rather than 1, so it cannot repeat a number
+whose cached fragments and snapshots may still be stored.
+"""
+import time
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+
+from ..models import VersionCounter
+
+
+def _counters():
+    return VersionCounter.objects.using(DEFAULT_DB_ALIAS)
+
+
+def get_version(name):
+    """Current version of ``name``"""
+    version = _counters().filter(name=name).values_list('value', flat=True).first()
+    if version is None:
+        version = _counters().get_or_create(name=name, defaults={'value': time.time_ns()})[0].value
+    return version
+
+
+def bump_version(name):
+    """Invalidate everything built from ``name`` and return the new version"""
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        if not _counters().filter(name=name).update(value=F('value') + 1):
+            counter, created = _counters().get_or_create(name=name, defaults={'value': time.time_ns()})
+            if not created:
+                _counters().filter(name=name).update(value=F('value') + 1)
+        return _counters().get(name=name).value
+
@@ -0,0 +1,175 @@
+"""
+Buffered page-view counters.
+
+Views are counted in process memory and written back in batches: one
+``UPDATE ... SET views_count = views_count + n`` per model and distinct
+``n``, so a popular page costs one write per flush instead of one per hit.
+Unique viewers are tracked with a HyperLogLog sketch per object, persisted
+in ``ViewSketch`` and summarised into the object's ``unique_viewers`` field.
+
+Buffers are flushed when ``VIEW_COUNTER_FLUSH_INTERVAL`` seconds have passed
+or ``VIEW_COUNTER_MAX_PENDING`` hits are waiting, and at process exit.
+Setting the interval to 0 flushes on every hit (useful in development).
+"""
+import atexit
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+
+from ..models import ViewSketch
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = getattr(settings, 'VIEW_COUNTER_FLUSH_INTERVAL', 30)
+MAX_PENDING = getattr(settings, 'VIEW_COUNTER_MAX_PENDING', 500)
+
+
+class HyperLogLog:
+    """
+    Cardinality sketch with 2**precision one-byte registers.
+
+    Precision 10 (1 KB per object) gives a standard error of about 3%.
+    Sketches merge by taking the register-wise maximum.
+    """
+
+    def __init__(self, precision=10, registers=None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers) if registers else bytearray(self.size)
+
+    def add(self, value):
+        digest = int.from_bytes(hashlib.sha1(str(value).encode()).digest()[:8], 'big')
+        index = digest >> (64 - self.precision)
+        remainder = digest & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size ** 2 / sum(2.0 ** -r for r in self.registers)
+        empty = self.registers.count(0)
+        if estimate <= 2.5 * self.size and empty:
+            # Linear counting is more accurate for small cardinalities
+            estimate = self.size * math.log(self.size / empty)
+        return int(round(estimate))
+
+
+_lock = threading.Lock()
+_counts = defaultdict(int)
+_sketches = {}
+_pending = 0
+_last_flush = time.monotonic()
+
+
+def viewer_key(request):
+    """Stable identifier for the viewer behind a request"""
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    if request.session.session_key:
+        return f"session:{request.session.session_key}"
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def record_view(obj, viewer=None):
+    """
+    Count one view of ``obj`` (a model with ``views_count``).
+
+    The in-memory instance is bumped as well so the page being rendered
+    shows the new total.
+    """
+    global _pending
+    key = (obj._meta.label, obj.pk)
+    with _lock:
+        _counts[key] += 1
+        if viewer is not None:
+            sketch = _sketches.get(key)
+            if sketch is None:
+                sketch = _sketches[key] = HyperLogLog()
+            sketch.add(viewer)
+        _pending += 1
+        due = _pending >= MAX_PENDING or time.monotonic() - _last_flush >= FLUSH_INTERVAL
+    obj.views_count += 1
+    if due:
+        flush()
+
+
+def flush():
+    """Write buffered counts and sketches to the database"""
+    global _counts, _sketches, _pending, _last_flush
+    with _lock:
+        counts, sketches = _counts, _sketches
+        _counts, _sketches = defaultdict(int), {}
+        _pending = 0
+        _last_flush = time.monotonic()
+    if not counts and not sketches:
+        return
+
+    try:
+        _write_counts(counts)
+    except Exception as e:
+        logger.error(f"Error flushing view counts, keeping them buffered: {str(e)}")
+        with _lock:
+            for key, n in counts.items():
+                _counts[key] += n
+    try:
+        _write_sketches(sketches)
+    except Exception as e:
+        logger.error(f"Error flushing unique viewer sketches: {str(e)}")
+
+
+def _write_counts(counts):
+    by_model = defaultdict(lambda: defaultdict(list))
+    for (label, pk), n in counts.items():
+        by_model[label][n].append(pk)
+    for label, by_increment in by_model.items():
+        model = apps.get_model(label)
+        for n, pks in by_increment.items():
+            model.objects.filter(pk__in=pks).update(views_count=F('views_count') + n)
+
+
+def _write_sketches(sketches):
+    if not sketches:
+        return
+    lookup = Q()
+    by_model = defaultdict(list)
+    for label, pk in sketches:
+        by_model[label].append(pk)
+    for label, pks in by_model.items():
+        lookup |= Q(model_label=label, object_id__in=pks)
+
+    with transaction.atomic():
+        stored = {
+            (row.model_label, row.object_id): row
+            for row in ViewSketch.objects.select_for_update().filter(lookup)
+        }
+        created, updated, estimates = [], [], defaultdict(list)
+        for (label, pk), sketch in sketches.items():
+            row = stored.get((label, pk))
+            if row:
+                sketch.merge(HyperLogLog(registers=row.registers))
+                row.registers = bytes(sketch.registers)
+                updated.append(row)
+            else:
+                created.append(ViewSketch(model_label=label, object_id=pk, registers=bytes(sketch.registers)))
+            estimates[label].append((pk, sketch.count()))
+
+        ViewSketch.objects.bulk_create(created, ignore_conflicts=True)
+        ViewSketch.objects.bulk_update(updated, ['registers'])
+        for label, values in estimates.items():
+            model = apps.get_model(label)
+            model.objects.bulk_update([model(pk=pk, unique_viewers=count) for pk, count in values], ['unique_viewers'])
+
+
+atexit.register(flush)
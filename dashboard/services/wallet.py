@@ -0,0 +1,83 @@
+"""
+Wallet credits and consultation refunds applied in batches.
+
+Balances move with ``F()`` increments, one ``UPDATE`` per distinct amount,
+so concurrent purchases and deposits are never overwritten and refunding a
+thousand consultations costs a handful of statements.
+"""
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+
+from ..models import Consultation, Transaction, UserWallet
+from . import availability
+
+logger = logging.getLogger(__name__)
+
+
+def credit_wallets(amounts):
+    """Add ``amounts`` (user id -> Decimal) to the users' wallet balances"""
+    by_amount = defaultdict(list)
+    for user_id, amount in amounts.items():
+        if amount:
+            by_amount[amount].append(user_id)
+    with transaction.atomic():
+        existing = set(UserWallet.objects.filter(user_id__in=amounts).values_list('user_id', flat=True))
+        UserWallet.objects.bulk_create(
+            [UserWallet(user_id=user_id) for user_id in amounts if user_id not in existing],
+            ignore_conflicts=True,
+        )
+        for amount, user_ids in by_amount.items():
+            UserWallet.objects.filter(user_id__in=user_ids).update(balance=F('balance') + amount)
+
+
+def refund_consultations(consultations):
+    """
+    Refund paid consultations and cancel the ones still holding a slot.
+
+    ``consultations`` is a queryset or iterable of ids. Wallet payments are
+    credited back with a completed refund transaction each; other payment
+    methods are only marked refunded and settled outside the wallet.
+    Returns ``(refunded, credited_total)``.
+    """
+    ids = consultations.values('pk') if hasattr(consultations, 'values') else list(consultations)
+    with transaction.atomic():
+        rows = list(
+            Consultation.objects.select_for_update()
+            .filter(pk__in=ids, payment_status='paid')
+            .values('id', 'user_id', 'analyst_id', 'title', 'price', 'payment_method', 'status')
+        )
+        if not rows:
+            return 0, Decimal('0.00')
+
+        credits = defaultdict(Decimal)
+        refunds = []
+        for row in rows:
+            if row['payment_method'] == 'wallet' and row['price']:
+                credits[row['user_id']] += row['price']
+                refunds.append(Transaction(
+                    user_id=row['user_id'],
+                    amount=row['price'],
+                    transaction_type='refund',
+                    payment_method='wallet',
+                    status='completed',
+                    description=f"Refund for cancelled consultation: {row['title']}",
+                    consultation_id=row['id'],
+                ))
+        credit_wallets(credits)
+        Transaction.objects.bulk_create(refunds, batch_size=500)
+
+        refunded_ids = [row['id'] for row in rows]
+        cancelled = [row for row in rows if row['status'] in availability.ACTIVE_STATUSES]
+        Consultation.objects.filter(pk__in=refunded_ids).update(payment_status='refunded')
+        Consultation.objects.filter(pk__in=[row['id'] for row in cancelled]).update(status='cancelled')
+
+    # Cancelled bookings free their slots; rebuild those analysts' calendars
+    availability.bookings_changed({row['analyst_id'] for row in cancelled if row['analyst_id']})
+
+    credited = sum(credits.values(), Decimal('0.00'))
+    logger.info(f"Refunded {len(rows)} consultations, ${credited} credited to {len(credits)} wallets")
+    return len(rows), credited
@@ -1,3 +1,1381 @@
-from django.test import TestCase
+import math
+import shutil
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import admin_tools
+from .models import (
+    AnalysisInsight, AnalysisMetric, AnalysisRating, Analyst, Category, ChartAnnotation, ChatMessage,
+    Consultation, ConsultationAttachment, ConsultationChatRoom, ConsultationPackage, ConsultationParticipant,
+    ConsultationReminder, CryptoAnalysis, MarketInsight, MpesaTransaction, PriceAlert, PurchasedAnalysis,
+    TechnicalIndicatorData, Transaction, UserProfile, UserWallet, VersionCounter
+)
+from .services import (
+    aggregates, analysis_refresh, analyst_scores, availability, catalog, chat_files, consultations, indicators,
+    insights_feed, market_data, portfolio, price_alerts, reminders, reports, rollups, versions, view_counters
+)
+
+# Tests that clear the cache get their own instead of the configured shared one
+LOCAL_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+# Replica routing is covered below; under TestCase the mirror cannot see uncommitted rows
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage', DATABASE_REPLICAS=[])
+class AdminChangelistQueryTests(TestCase):
+    """Changelists must not issue queries per row"""
+
+    ROWS = 100
+
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(self.admin_user)
+        self.analyst = Analyst.objects.create(user=User.objects.create(username='analyst'))
+        self.category = Category.objects.create(name='Layer 1')
+        self.analysis = self.make_analysis(0)
+
+    def make_user(self, i):
+        return User.objects.create(username=f'user{i}')
+
+    def make_analysis(self, i):
+        return CryptoAnalysis.objects.create(
+            analyst=self.analyst, category=self.category, title=f'Analysis {i}',
+            cryptocurrency='Bitcoin', symbol='BTC', analysis_type='technical', timeframe='1D',
+            risk_level='low', price=Decimal('10.00'), description='d', executive_summary='e',
+            preview_content='p', full_content='f',
+        )
+
+    def make_consultation(self, i):
+        return Consultation.objects.create(
+            user=self.make_user(f'c{i}'), analyst=self.analyst, title=f'Session {i}', status='scheduled',
+            scheduled_date=timezone.now() + timedelta(days=1, hours=i),
+        )
+
+    def changelist_queries(self, model):
+        url = reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def assertFixedQueries(self, model, make_row):
+        make_row(0)
+        few = self.changelist_queries(model)
+        for i in range(1, self.ROWS):
+            make_row(i)
+        self.assertGreaterEqual(model.objects.count(), self.ROWS)
+        self.assertEqual(self.changelist_queries(model), few)
+
+    def test_user_changelist(self):
+        def make_row(i):
+            user = self.make_user(i)
+            UserWallet.objects.update_or_create(user=user, defaults={'balance': Decimal('5.00')})
+            PurchasedAnalysis.objects.create(user=user, analysis=self.analysis, purchase_price=Decimal('10.00'))
+        self.assertFixedQueries(User, make_row)
+
+    def test_user_profile_changelist(self):
+        self.assertFixedQueries(UserProfile, lambda i: UserProfile.objects.get_or_create(user=self.make_user(i)))
+
+    def test_user_wallet_changelist(self):
+        self.assertFixedQueries(UserWallet, lambda i: UserWallet.objects.get_or_create(user=self.make_user(i)))
+
+    def test_transaction_changelist(self):
+        self.assertFixedQueries(Transaction, lambda i: Transaction.objects.create(
+            user=self.make_user(i), amount=Decimal('1.00'), transaction_type='deposit', payment_method='mpesa',
+        ))
+
+    def test_mpesa_transaction_changelist(self):
+        self.assertFixedQueries(MpesaTransaction, lambda i: MpesaTransaction.objects.create(
+            user=self.make_user(i), transaction_type='deposit', amount=Decimal('100.00'), phone_number='254700000000',
+        ))
+
+    def test_analyst_changelist(self):
+        self.assertFixedQueries(Analyst, lambda i: Analyst.objects.create(user=self.make_user(i)))
+
+    def test_analysis_changelist(self):
+        def make_row(i):
+            analysis = self.make_analysis(i + 1)
+            ChartAnnotation.objects.create(analysis=analysis, type='support', price_level=Decimal('1.00'))
+        self.assertFixedQueries(CryptoAnalysis, make_row)
+
+    def test_category_changelist(self):
+        def make_row(i):
+            self.category = Category.objects.create(name=f'Category {i}')
+            self.make_analysis(i + 1)
+        self.assertFixedQueries(Category, make_row)
+
+    def test_chart_annotation_changelist(self):
+        self.assertFixedQueries(ChartAnnotation, lambda i: ChartAnnotation.objects.create(
+            analysis=self.analysis, type='support', price_level=Decimal(i),
+        ))
+
+    def test_indicator_data_changelist(self):
+        self.assertFixedQueries(TechnicalIndicatorData, lambda i: TechnicalIndicatorData.objects.create(
+            analysis=self.analysis, indicator_type='rsi', parameters={'period': 14},
+        ))
+
+    def test_analysis_insight_changelist(self):
+        self.assertFixedQueries(AnalysisInsight, lambda i: AnalysisInsight.objects.create(
+            analysis=self.analysis, title=f'Insight {i}', description='d', importance='low', category='technical',
+        ))
+
+    def test_analysis_metric_changelist(self):
+        self.assertFixedQueries(AnalysisMetric, lambda i: AnalysisMetric.objects.create(
+            analysis=self.analysis, name=f'Metric {i}', current_value='1', previous_value='0', change='+1', trend='up',
+        ))
+
+    def test_purchased_analysis_changelist(self):
+        self.assertFixedQueries(PurchasedAnalysis, lambda i: PurchasedAnalysis.objects.create(
+            user=self.make_user(i), analysis=self.analysis, purchase_price=Decimal('10.00'),
+        ))
+
+    def test_analysis_rating_changelist(self):
+        self.assertFixedQueries(AnalysisRating, lambda i: AnalysisRating.objects.create(
+            user=self.make_user(i), analysis=self.analysis, rating=4,
+        ))
+
+    def test_consultation_changelist(self):
+        self.assertFixedQueries(Consultation, self.make_consultation)
+
+    def test_consultation_attachment_changelist(self):
+        def make_row(i):
+            consultation = self.make_consultation(i)
+            ConsultationAttachment.objects.create(
+                consultation=consultation, file='consultation_attachments/notes.pdf', file_name='notes.pdf',
+                file_type='pdf', uploaded_by=consultation.user,
+            )
+        self.assertFixedQueries(ConsultationAttachment, make_row)
+
+    def test_chat_message_changelist(self):
+        def make_row(i):
+            consultation = self.make_consultation(i)
+            ChatMessage.objects.create(chat_room=consultation.chat_room, user=consultation.user, content=f'Hi {i}')
+        self.assertFixedQueries(ChatMessage, make_row)
+
+    def test_consultation_reminder_changelist(self):
+        self.assertFixedQueries(ConsultationReminder, self.make_consultation)
+
+    def test_chat_room_changelist(self):
+        self.assertFixedQueries(ConsultationChatRoom, self.make_consultation)
+
+    def test_participant_changelist(self):
+        self.assertFixedQueries(ConsultationParticipant, self.make_consultation)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage', DATABASE_REPLICAS=[],
+                   CACHES=LOCAL_CACHES)
+class AdminSearchTests(TestCase):
+    """Identifier searches use exact lookups and changelist counts are bounded"""
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.user = User.objects.create(username='payer')
+        self.receipt = MpesaTransaction.objects.create(user=self.user, transaction_type='deposit', amount=10,
+                                                       phone_number='254700000000', mpesa_receipt_number='QAB12CD34E')
+        MpesaTransaction.objects.create(user=self.user, transaction_type='deposit', amount=20,
+                                        phone_number='254700000001', mpesa_receipt_number='QZZ99YY88X')
+
+    def search(self, model, term):
+        url = reverse(f'admin:dashboard_{model._meta.model_name}_changelist')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {'q': term})
+        self.assertEqual(response.status_code, 200)
+        like = [query['sql'] for query in context.captured_queries if ' LIKE ' in query['sql']]
+        return list(response.context['cl'].result_list), like
+
+    def test_exact_searches_skip_the_like_fallback(self):
+        for term in ('QAB12CD34E', 'qab12cd34e', str(self.receipt.pk)):
+            results, like = self.search(MpesaTransaction, term)
+            self.assertEqual(results, [self.receipt], term)
+            self.assertEqual(like, [], term)
+
+        payment = Transaction.objects.create(user=self.user, amount=10, transaction_type='deposit',
+                                             payment_method='mpesa', status='completed')
+        results, like = self.search(Transaction, str(payment.transaction_id))
+        self.assertEqual((results, like), ([payment], []))
+
+    def test_unmatched_terms_fall_back_to_like(self):
+        results, like = self.search(MpesaTransaction, 'QAB12')
+        self.assertEqual(results, [self.receipt])
+        self.assertTrue(like)
+        results, like = self.search(MpesaTransaction, 'payer')
+        self.assertEqual(len(results), 2)
+        self.assertTrue(like)
+
+    def test_sqlite_count_is_capped_and_cached(self):
+        queryset = MpesaTransaction.objects.order_by('pk')
+        self.assertIsNone(admin_tools.table_row_estimate(MpesaTransaction, queryset.db))
+        self.assertEqual(admin_tools.cached_count(queryset, limit=1), 1)
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(admin_tools.EstimatedCountPaginator(queryset, 1).count, 2)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertIn(f'LIMIT {admin_tools.MAX_EXACT_COUNT}', context.captured_queries[0]['sql'])
+
+        with mock.patch.object(admin_tools, 'CACHE_COUNTS_FROM', 2):
+            admin_tools.EstimatedCountPaginator(queryset, 1).count
+            with self.assertNumQueries(0):
+                self.assertEqual(admin_tools.EstimatedCountPaginator(queryset, 1).count, 2)
+        # Filtered querysets are counted under their own key
+        with self.assertNumQueries(1):
+            self.assertEqual(admin_tools.EstimatedCountPaginator(queryset.filter(amount=10), 1).count, 1)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+                   DATABASE_REPLICAS=['replica_1'])
+class ReplicaRoutingTests(TransactionTestCase):
+    """Reporting pages read from the replica until the browser writes"""
+
+    databases = {'default', 'replica_1'}
+
+    def setUp(self):
+        self.user = User.objects.create_superuser('buyer', 'buyer@example.com', 'password')
+        self.client.force_login(self.user)
+        analyst = Analyst.objects.create(user=User.objects.create(username='analyst'))
+        self.analysis = CryptoAnalysis.objects.create(
+            analyst=analyst, title='Analysis', cryptocurrency='Bitcoin', symbol='BTC', analysis_type='technical',
+            timeframe='short_term', risk_level='low', price=Decimal('10.00'), description='d',
+            executive_summary='e', preview_content='p', full_content='f',
+        )
+        UserWallet.objects.filter(user=self.user).update(balance=Decimal('50.00'))
+
+    def queries(self, url):
+        with CaptureQueriesContext(connection) as primary, CaptureQueriesContext(connections['replica_1']) as replica:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(primary.captured_queries), len(replica.captured_queries)
+
+    def test_reporting_pages_read_from_replica(self):
+        for url in (reverse('marketplace'), reverse('admin:dashboard_cryptoanalysis_changelist')):
+            primary, replica = self.queries(url)
+            self.assertGreater(replica, 0, url)
+
+    def test_other_pages_read_from_primary(self):
+        primary, replica = self.queries(reverse('portfolio'))
+        self.assertEqual(replica, 0)
+
+    def test_write_pins_browser_to_primary(self):
+        response = self.client.post(reverse('purchase_analysis'), {'analysis_id': self.analysis.id},
+                                    HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.json()['status'], 'success')
+        self.assertIn('db_pin', response.cookies)
+        primary, replica = self.queries(reverse('marketplace'))
+        self.assertEqual(replica, 0)
+        self.assertIn(self.analysis.id, self.client.get(reverse('marketplace')).context['purchased_analysis_ids'])
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage', DATABASE_REPLICAS=[])
+class StaticBundleTests(TestCase):
+    """Page CSS/JS lives in static bundles, not in the templates"""
+
+    def test_no_inline_blocks_left(self):
+        call_command('build_static_bundles', '--check', stdout=StringIO())
+
+    def test_pages_link_bundles(self):
+        self.client.force_login(User.objects.create(username='buyer'))
+        response = self.client.get(reverse('marketplace'))
+        self.assertContains(response, '/static/bundles/base.css')
+        self.assertContains(response, '/static/bundles/dashboard/marketplace.js')
+        self.assertNotContains(response, '<style>')
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage', DATABASE_REPLICAS=[],
+                   CACHES=LOCAL_CACHES)
+class FragmentCacheTests(TestCase):
+    """The package catalog and the package and analysis cards are kept until their rows are saved"""
+
+    def setUp(self):
+        cache.clear()
+        catalog._snapshot = None
+        self.client.force_login(User.objects.create(username='buyer'))
+
+    def test_package_catalog_snapshot(self):
+        ConsultationPackage.objects.create(title='Starter Pack', level='beginner', description='d',
+                                           price=Decimal('20.00'), features='Chart review\n\nRisk plan')
+        version, packages = catalog.snapshot()
+        self.assertEqual(packages[0].price, Decimal('20.00'))
+        self.assertEqual(packages[0].features, ('Chart review', 'Risk plan'))
+        self.assertEqual(packages[0].level_display, 'Beginner')
+        # Only the version is read
+        with self.assertNumQueries(1):
+            self.assertIs(catalog.snapshot()[1], packages)
+        # Another process starts from the shared cache
+        catalog._snapshot = None
+        with self.assertNumQueries(1):
+            self.assertEqual(catalog.snapshot(), (version, packages))
+        with self.captureOnCommitCallbacks(execute=True):
+            ConsultationPackage.objects.create(title='Expert Pack', level='expert', description='d',
+                                               price=Decimal('90.00'), features='')
+        new_version, packages = catalog.snapshot()
+        self.assertGreater(new_version, version)
+        self.assertEqual([package.title for package in packages], ['Starter Pack', 'Expert Pack'])
+
+    def test_package_cards(self):
+        package = ConsultationPackage.objects.create(title='Starter Pack', level='beginner', description='d',
+                                                     price=Decimal('20.00'), features='Chart review')
+        self.assertContains(self.client.get(reverse('dashboard')), 'Starter Pack')
+        # update() sends no signal, so the cached card stays
+        ConsultationPackage.objects.filter(pk=package.pk).update(title='Renamed Pack')
+        self.assertContains(self.client.get(reverse('dashboard')), 'Starter Pack')
+        package.title = 'Expert Pack'
+        with self.captureOnCommitCallbacks(execute=True):
+            package.save()
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'Expert Pack')
+        self.assertNotContains(response, 'Starter Pack')
+
+    def test_analysis_cards(self):
+        analysis = CryptoAnalysis.objects.create(
+            analyst=Analyst.objects.create(user=User.objects.create(username='analyst')), title='Analysis',
+            cryptocurrency='Bitcoin', symbol='BTC', analysis_type='technical', timeframe='short_term',
+            risk_level='low', price=Decimal('10.00'), description='Original call', executive_summary='e',
+            preview_content='p', full_content='f',
+        )
+        self.assertContains(self.client.get(reverse('marketplace')), 'Original call')
+        analysis.chart_data = {'points': []}
+        analysis.save(update_fields=['chart_data', 'updated_at'])
+        CryptoAnalysis.objects.filter(pk=analysis.pk).update(description='Silent edit')
+        self.assertContains(self.client.get(reverse('marketplace')), 'Original call')
+        analysis.description = 'Revised call'
+        with self.captureOnCommitCallbacks() as callbacks:
+            analysis.save()
+        self.assertContains(self.client.get(reverse('marketplace')), 'Original call')
+        for callback in callbacks:
+            callback()
+        self.assertContains(self.client.get(reverse('marketplace')), 'Revised call')
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class VersionTests(TestCase):
+    """Version counters only move forward, even when their row is lost"""
+
+    def test_counters_never_repeat(self):
+        version = versions.get_version('cards')
+        self.assertEqual(versions.get_version('cards'), version)
+        self.assertEqual(versions.bump_version('cards'), version + 1)
+        VersionCounter.objects.all().delete()
+        self.assertGreater(versions.bump_version('cards'), version + 1)
+        self.assertGreater(versions.get_version('new'), version)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage', DATABASE_REPLICAS=[],
+                   CACHES=LOCAL_CACHES)
+class InsightsFeedTests(TestCase):
+    """Cached insight lists are retired once an insight change commits"""
+
+    def setUp(self):
+        cache.clear()
+
+    def make_insight(self, title, **fields):
+        return MarketInsight.objects.create(title=title, summary=f'{title} summary', full_content='f', **fields)
+
+    def test_version_moves_after_commit(self):
+        version = insights_feed.current_version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.make_insight('Halving ahead')
+        self.assertEqual(insights_feed.current_version(), version)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(insights_feed.current_version(), version + 1)
+
+    def test_unknown_filters_are_ignored(self):
+        self.assertEqual(insights_feed.normalize_filters('bogus', 'high', ' BTC '), ('', 'high', 'btc'))
+        self.make_insight('Halving ahead', cryptocurrency='Bitcoin', urgency='high')
+        self.make_insight('Merge done', cryptocurrency='Ethereum', insight_type='technology')
+        self.assertEqual(len(insights_feed.listing(insight_type='<script>')), 2)
+        self.assertEqual([i.title for i in insights_feed.listing(urgency='high')], ['Halving ahead'])
+
+    def test_crypto_filter_shares_one_fragment(self):
+        self.make_insight('Halving ahead', cryptocurrency='Bitcoin')
+        self.client.force_login(User.objects.create(username='reader'))
+        with mock.patch.object(insights_feed, 'listing', wraps=insights_feed.listing) as listing:
+            for query in ({'crypto': 'Bitcoin'}, {'crypto': 'bitcoin '}, {'crypto': 'BITCOIN', 'type': 'bogus'}):
+                self.assertContains(self.client.get(reverse('market_insights'), query), 'Halving ahead summary')
+        self.assertEqual(listing.call_count, 1)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage', DATABASE_REPLICAS=[])
+class ChatFileTests(TestCase):
+    """Chat uploads can be finalized again and are shared with the consultation's analyst"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.buyer = User.objects.create(username='buyer')
+        self.analyst = Analyst.objects.create(user=User.objects.create(username='analyst'))
+        self.consultation = Consultation.objects.create(
+            user=self.buyer, analyst=self.analyst, title='Session', status='scheduled',
+            scheduled_date=timezone.now() + timedelta(days=1),
+        )
+        self.upload_url = reverse('upload_chat_file', args=[self.consultation.id])
+
+    def upload(self, **data):
+        return self.client.post(self.upload_url, data)
+
+    def test_failed_finalize_is_retried(self):
+        self.client.force_login(self.buyer)
+        response = self.upload(chunk=SimpleUploadedFile('notes.txt', b'hello '), total_size=11)
+        upload_id = response.json()['upload_id']
+        with mock.patch.object(ChatMessage.objects, 'create', side_effect=RuntimeError('database went away')):
+            with self.assertRaises(RuntimeError):
+                self.upload(chunk=SimpleUploadedFile('notes.txt', b'world'), upload_id=upload_id, offset=6)
+        # The client resends the last chunk from its own offset
+        response = self.upload(chunk=SimpleUploadedFile('notes.txt', b'world'), upload_id=upload_id, offset=6)
+        self.assertEqual(response.json()['status'], 'success')
+        message = ChatMessage.objects.get(id=response.json()['message_id'])
+        with message.blob.file.open('rb') as stored:
+            self.assertEqual(stored.read(), b'hello world')
+        resent = self.upload(chunk=SimpleUploadedFile('notes.txt', b'world'), upload_id=upload_id, offset=6)
+        self.assertEqual(resent.status_code, 409)
+
+    def test_malformed_upload_ids(self):
+        self.client.force_login(self.buyer)
+        for upload_id in ('not-a-uuid', '12345'):
+            response = self.client.get(self.upload_url, {'upload_id': upload_id})
+            self.assertEqual((response.status_code, response.json()['status']), (400, 'error'))
+            response = self.upload(chunk=SimpleUploadedFile('notes.txt', b'data'), upload_id=upload_id, offset=0)
+            self.assertEqual((response.status_code, response.json()['status']), (400, 'error'))
+        self.assertEqual(self.client.get(self.upload_url).status_code, 400)
+        self.assertEqual(self.client.get(self.upload_url, {'upload_id': str(uuid.uuid4())}).status_code, 404)
+
+    def test_analyst_opens_files_and_clears_only_own_messages(self):
+        self.client.force_login(self.buyer)
+        response = self.upload(file=SimpleUploadedFile('chart.png', b'png bytes', content_type='image/png'))
+        file_url = reverse('chat_file', args=[self.consultation.id, response.json()['message_id']])
+        ChatMessage.objects.create(chat_room=self.consultation.chat_room, user=self.analyst.user, content='Hi')
+        self.client.force_login(self.analyst.user)
+        self.assertEqual(b''.join(self.client.get(file_url).streaming_content), b'png bytes')
+        self.assertEqual(self.client.post(reverse('clear_chat', args=[self.consultation.id])).json()['deleted'], 1)
+        self.assertEqual(list(self.consultation.chat_room.messages.values_list('user', flat=True)), [self.buyer.id])
+        self.client.force_login(User.objects.create(username='stranger'))
+        self.assertEqual(self.client.get(file_url).status_code, 404)
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class ConsultationProvisioningTests(TestCase):
+    """Bulk imports get meeting details, reminders and chat rooms in a fixed number of queries"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='buyer')
+        self.analyst = Analyst.objects.create(user=User.objects.create(username='analyst'))
+
+    def consultations(self, count, status='scheduled'):
+        start = timezone.now() + timedelta(days=2)
+        return [Consultation(user=self.user, analyst=self.analyst, title=f'Session {i}', status=status,
+                             scheduled_date=start + timedelta(hours=i)) for i in range(count)]
+
+    def provision(self, count):
+        return consultations.provision_consultations(self.consultations(count))
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        # Consultations, reminders, chat rooms and participants, plus two savepoints and their releases
+        with self.assertNumQueries(8):
+            self.provision(1)
+        with self.assertNumQueries(8):
+            created = self.provision(25)
+        self.assertEqual(ConsultationReminder.objects.filter(consultation__in=created).count(), 50)
+        self.assertEqual(ConsultationParticipant.objects.filter(chat_room__consultation__in=created).count(), 25)
+        self.assertTrue(all(c.meeting_id and c.join_url and c.scheduled_end for c in created))
+
+    def test_only_scheduled_consultations_are_provisioned(self):
+        consultations.provision_consultations(self.consultations(2, status='cancelled'))
+        self.assertEqual(Consultation.objects.filter(meeting_id__isnull=True).count(), 2)
+        self.assertFalse(ConsultationChatRoom.objects.exists())
+
+    def test_rows_are_reselected_without_returning_inserts(self):
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert',
+                               new_callable=mock.PropertyMock, return_value=False):
+            created = self.provision(3)
+        self.assertEqual([c.pk for c in created],
+                         list(Consultation.objects.order_by('pk').values_list('pk', flat=True)))
+        self.assertEqual(ConsultationChatRoom.objects.filter(consultation__in=created).count(), 3)
+        self.assertEqual(ConsultationReminder.objects.count(), 6)
+
+    def test_bulk_import_drops_analyst_calendars(self):
+        availability.get_calendar(self.analyst)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.provision(1)
+        self.assertNotIn(self.analyst.id, availability._calendars)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage', DATABASE_REPLICAS=[],
+                   CACHES=LOCAL_CACHES)
+class AvailabilityTests(TestCase):
+    """Free slots come from weekly hours minus bookings; reservations re-check the database"""
+
+    # A Monday, in UTC (settings.TIME_ZONE)
+    MONDAY = datetime(2030, 1, 7, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        cache.clear()
+        availability._calendars.clear()
+        self.user = User.objects.create(username='buyer')
+        self.analyst = Analyst.objects.create(user=User.objects.create(username='analyst'), consultation_hours={})
+
+    def at(self, days=0, hour=0, minute=0):
+        return self.MONDAY + timedelta(days=days, hours=hour, minutes=minute)
+
+    def reserve(self, start, duration=60, analyst=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return availability.reserve_slot(start, duration, analyst=analyst, user=self.user, title='Session',
+                                             price=Decimal('20.00'), status='scheduled')
+
+    def starts(self, slots):
+        return [start for start, _ in slots]
+
+    def test_default_hours_fallback(self):
+        slots = availability.next_free_slots(60, count=3, analyst=self.analyst, after=self.at(hour=8))
+        self.assertEqual(self.starts(slots), [self.at(hour=9), self.at(hour=9, minute=30), self.at(hour=10)])
+        # The last start that still ends by 17:00, then the weekend is skipped
+        slots = availability.next_free_slots(60, count=2, analyst=self.analyst,
+                                             after=self.at(days=4, hour=15, minute=45))
+        self.assertEqual(self.starts(slots), [self.at(days=4, hour=16), self.at(days=7, hour=9)])
+
+    def test_configured_hours(self):
+        self.analyst.consultation_hours = {'timezone': 'Africa/Nairobi', 'tue': ['13:00-15:00']}
+        self.analyst.save()
+        slots = availability.next_free_slots(120, count=2, analyst=self.analyst, after=self.at())
+        # 13:00 Nairobi is 10:00 UTC
+        self.assertEqual(self.starts(slots), [self.at(days=1, hour=10), self.at(days=8, hour=10)])
+
+    def test_malformed_hours(self):
+        default = availability.compile_weekly_hours({})
+        with self.assertLogs('dashboard.services.availability', 'WARNING'):
+            self.assertEqual(availability.compile_weekly_hours(['09:00-17:00']), default)
+            self.assertEqual(availability.compile_weekly_hours('mon 9-5'), default)
+        with self.assertLogs('dashboard.services.availability', 'WARNING'):
+            tz, windows = availability.compile_weekly_hours({
+                'timezone': 3, 'mon': '09:00-12:00', 'tue': 7, 'wed': ['9-17', None, ['13:00', '14:00']],
+            })
+        self.assertEqual(str(tz), 'UTC')
+        self.assertEqual(windows[:3], [[(540, 720)], [], [(780, 840)]])
+
+    def test_bookings_block_overlapping_slots(self):
+        self.reserve(self.at(hour=10))
+        slots = availability.next_free_slots(60, count=4, analyst=self.analyst, after=self.at(hour=9))
+        self.assertEqual(self.starts(slots), [self.at(hour=9), self.at(hour=11), self.at(hour=11, minute=30),
+                                              self.at(hour=12)])
+        with self.assertRaises(availability.SlotUnavailable):
+            self.reserve(self.at(hour=10, minute=30), analyst=self.analyst)
+        # Touching the end of a booking is fine
+        self.assertEqual(self.reserve(self.at(hour=11), analyst=self.analyst).analyst, self.analyst)
+
+    def test_reserve_checks_database_when_calendar_is_stale(self):
+        availability.get_calendar(self.analyst)
+        consultation = self.reserve(self.at(hour=10))
+        # Put the stale, pre-booking calendar back
+        calendar = availability._calendars[self.analyst.id]
+        calendar.discard(consultation.id)
+        calendar.version = availability.get_version(availability._version_name(self.analyst.id))
+        with self.assertRaises(availability.SlotUnavailable):
+            self.reserve(self.at(hour=10, minute=30), analyst=self.analyst)
+
+    def test_rolled_back_booking_leaves_calendar_alone(self):
+        calendar = availability.get_calendar(self.analyst)
+        with self.captureOnCommitCallbacks(execute=True), self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                availability.reserve_slot(self.at(hour=10), 60, analyst=self.analyst, user=self.user,
+                                          title='Session', price=Decimal('20.00'), status='scheduled')
+                raise RuntimeError
+        self.assertIs(availability.get_calendar(self.analyst), calendar)
+        self.assertEqual(calendar.entries, [])
+        self.assertTrue(availability.is_slot_free(self.analyst, self.at(hour=10), 60))
+
+    def test_reserve_picks_next_free_analyst(self):
+        other = Analyst.objects.create(user=User.objects.create(username='other'), consultation_hours={})
+        first = self.reserve(self.at(hour=10))
+        second = self.reserve(self.at(hour=10))
+        self.assertEqual({first.analyst, second.analyst}, {self.analyst, other})
+        with self.assertRaises(availability.SlotUnavailable):
+            self.reserve(self.at(hour=10))
+        slots = availability.next_free_slots(60, count=1, after=self.at(hour=9, minute=30))
+        self.assertEqual(self.starts(slots), [self.at(hour=11)])
+
+    def test_slots_endpoint_rejects_bad_ids(self):
+        self.client.force_login(self.user)
+        for query in ({}, {'package_id': 'abc'}, {'package_id': '1', 'analyst_id': 'x'}):
+            response = self.client.get(reverse('consultation_slots'), query)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['status'], 'error')
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class ViewCounterTests(TestCase):
+    """Views are buffered in memory and written back in one batch"""
+
+    def setUp(self):
+        # Anything still buffered is written while this test's database exists
+        self.addCleanup(view_counters.flush)
+        for name, value in (('FLUSH_INTERVAL', 3600), ('MAX_PENDING', 1000)):
+            patcher = mock.patch.object(view_counters, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        view_counters.flush()
+        self.analysis = CryptoAnalysis.objects.create(
+            analyst=Analyst.objects.create(user=User.objects.create(username='analyst')), title='Analysis',
+            cryptocurrency='Bitcoin', symbol='BTC', analysis_type='technical', timeframe='short_term',
+            risk_level='low', price=Decimal('10.00'), description='d', executive_summary='e',
+            preview_content='p', full_content='f',
+        )
+
+    def test_views_are_flushed_in_a_batch(self):
+        for viewer in ('user:1', 'user:2', 'user:1'):
+            view_counters.record_view(self.analysis, viewer)
+        self.assertEqual(self.analysis.views_count, 3)
+        self.assertEqual(CryptoAnalysis.objects.get(pk=self.analysis.pk).views_count, 0)
+        view_counters.flush()
+        stored = CryptoAnalysis.objects.get(pk=self.analysis.pk)
+        self.assertEqual((stored.views_count, stored.unique_viewers), (3, 2))
+        view_counters.record_view(stored, 'user:3')
+        view_counters.flush()
+        stored = CryptoAnalysis.objects.get(pk=self.analysis.pk)
+        self.assertEqual((stored.views_count, stored.unique_viewers), (4, 3))
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class RollupTests(TestCase):
+    """Per-analyst breakdowns read only the daily rollup tables"""
+
+    def test_symbol_breakdown(self):
+        analyst = Analyst.objects.create(user=User.objects.create(username='analyst'))
+        for i, (symbol, price, buyers) in enumerate((('btc', '10.00', 2), ('ETH', '30.00', 1))):
+            analysis = CryptoAnalysis.objects.create(
+                analyst=analyst, title=f'Analysis {i}', cryptocurrency=symbol, symbol=symbol,
+                analysis_type='technical', timeframe='short_term', risk_level='low', price=Decimal(price),
+                description='d', executive_summary='e', preview_content='p', full_content='f',
+            )
+            for buyer in range(buyers):
+                PurchasedAnalysis.objects.create(user=User.objects.create(username=f'buyer{i}-{buyer}'),
+                                                 analysis=analysis, purchase_price=Decimal(price))
+        expected = [{'symbol': 'ETH', 'sales': 1, 'revenue': 30.0}, {'symbol': 'BTC', 'sales': 2, 'revenue': 20.0}]
+        since = timezone.localdate() - timedelta(days=365)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(rollups.symbol_breakdown(analyst, since), expected)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertNotIn('dashboard_cryptoanalysis', context.captured_queries[0]['sql'])
+        rollups.rebuild()
+        self.assertEqual(rollups.symbol_breakdown(analyst, since), expected)
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class ReportTests(TestCase):
+    """Analysis PDFs render whatever JSON the indicator rows hold"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def make_analysis(self):
+        return CryptoAnalysis.objects.create(
+            analyst=Analyst.objects.create(user=User.objects.create(username='analyst')), title='Analysis',
+            cryptocurrency='Bitcoin', symbol='BTC', analysis_type='technical', timeframe='short_term',
+            risk_level='low', price=Decimal('10.00'), description='d', executive_summary='e',
+            preview_content='p', full_content='f',
+        )
+
+    def test_scalar_indicator_parameters_and_data(self):
+        analysis = self.make_analysis()
+        TechnicalIndicatorData.objects.create(analysis=analysis, indicator_type='rsi', parameters=1.45788, data=1.2347)
+        TechnicalIndicatorData.objects.create(analysis=analysis, indicator_type='macd', parameters={'fast': 12},
+                                              data=[1.0, 1.5, 2.0])
+        path = reports.get_report(CryptoAnalysis.objects.get(pk=analysis.pk))
+        with open(path, 'rb') as report:
+            self.assertEqual(report.read(5), b'%PDF-')
+
+
+    def test_rating_retires_the_report(self):
+        analysis = self.make_analysis()
+        key = reports.report_key(CryptoAnalysis.objects.get(pk=analysis.pk))
+        AnalysisRating.objects.create(user=User.objects.create(username='reader'), analysis=analysis, rating=4)
+        rated = CryptoAnalysis.objects.get(pk=analysis.pk)
+        self.assertEqual((rated.rating, rated.rating_count), (Decimal('4.00'), 1))
+        self.assertNotEqual(reports.report_key(rated), key)
+        # Drift repaired by reconcile retires it too
+        CryptoAnalysis.objects.filter(pk=analysis.pk).update(rating_sum=0, rating_count=0, rating=0,
+                                                             updated_at=rated.updated_at)
+        key = reports.report_key(rated)
+        self.assertEqual(aggregates.reconcile()['analyses'], [analysis.pk])
+        self.assertNotEqual(reports.report_key(CryptoAnalysis.objects.get(pk=analysis.pk)), key)
+
+def price_series(length, offset=0):
+    closes = [round(100 + 10 * math.sin(i / 3) + i * 0.5, 4) for i in range(offset, offset + length)]
+    return {
+        'close': closes,
+        'high': [close + 1 for close in closes],
+        'low': [close - 1 for close in closes],
+        'volume': [float(i) for i in range(offset, offset + length)],
+    }
+
+
+class IndicatorTests(TestCase):
+    """Appending candles extends stored indicator data to what a full recompute gives"""
+
+    def full(self, indicator_type, series, parameters=None):
+        return indicators.update(indicator_type, {}, parameters, series, 0)
+
+    def test_append_matches_full_recompute(self):
+        series = price_series(80)
+        for indicator_type in indicators.CALCULATORS:
+            with self.subTest(indicator_type):
+                head = {field: values[:50] for field, values in series.items()}
+                stored = self.full(indicator_type, head)
+                self.assertEqual(indicators.update(indicator_type, stored, None, series, 50),
+                                 self.full(indicator_type, series))
+
+    def test_trimming_keeps_state(self):
+        series = price_series(80)
+        trimmed = {field: values[20:] for field, values in series.items()}
+        for indicator_type in indicators.CALCULATORS:
+            with self.subTest(indicator_type):
+                stored = self.full(indicator_type, {field: values[:50] for field, values in series.items()})
+                updated = indicators.update(indicator_type, stored, None, trimmed, 50, dropped=20)
+                expected = self.full(indicator_type, series)
+                self.assertEqual(updated['state'], expected.pop('state'))
+                for key, values in expected.items():
+                    self.assertEqual(updated[key], values[20:])
+
+    def test_recomputes_when_stored_data_does_not_line_up(self):
+        series = price_series(40)
+        stored = self.full('ema', {field: values[:30] for field, values in series.items()})
+        # Every stored point was trimmed away, so there is nothing to continue from
+        self.assertEqual(indicators.update('ema', stored, None, series, 30, dropped=35), self.full('ema', series))
+        self.assertEqual(indicators.update('sma', {'values': [1.0, 2.0]}, None, series, 30), self.full('sma', series))
+        # Recursive indicators cannot continue without their state
+        del stored['state']
+        self.assertEqual(indicators.update('ema', stored, None, series, 30), self.full('ema', series))
+
+    def test_scalar_parameters_and_data(self):
+        series = price_series(40)
+        self.assertEqual(indicators.update('rsi', 1.2347, 1.45788, series, 0), self.full('rsi', series))
+        self.assertEqual(indicators.update('macd', 12346, 1.23, series, 0), self.full('macd', series))
+
+    def test_known_values(self):
+        rising = {'close': [float(i) for i in range(1, 31)], 'high': [], 'low': [], 'volume': []}
+        rsi = self.full('rsi', rising)['values']
+        self.assertEqual(rsi[:14], [None] * 14)
+        self.assertEqual(set(rsi[14:]), {100.0})
+        flat = {'close': [5.0] * 30, 'high': [], 'low': [], 'volume': []}
+        self.assertEqual(self.full('ema', flat, {'period': 10})['values'], [None] * 9 + [5.0] * 21)
+        macd = self.full('macd', flat)
+        self.assertEqual(macd['values'][24:], [None, 0.0] + [0.0] * 4)
+        self.assertEqual(self.full('sma', rising, {'period': 3})['values'][:4], [None, None, 2.0, 3.0])
+        self.assertEqual(indicators.latest(macd), 0.0)
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class RefreshMetricsTests(TestCase):
+    """A refresh rolls matching metrics from current into previous"""
+
+    def test_refresh_metrics(self):
+        analysis = CryptoAnalysis.objects.create(
+            analyst=Analyst.objects.create(user=User.objects.create(username='analyst')), title='Analysis',
+            cryptocurrency='Bitcoin', symbol='BTC', analysis_type='technical', timeframe='short_term',
+            risk_level='low', price=Decimal('10.00'), description='d', executive_summary='e',
+            preview_content='p', full_content='f',
+        )
+        rows = {}
+        for name, current in (('Price', '1,000'), (' RSI ', '60%'), ('Sentiment', 'Bullish'), ('Volume', 'n/a')):
+            rows[name] = AnalysisMetric.objects.create(analysis=analysis, name=name, current_value=current,
+                                                       previous_value='', change='', trend='neutral')
+        self.assertEqual(analysis_refresh._refresh_metrics(analysis, {'price': 1100.0, 'rsi': 45.0, 'volume': 7.5}), 3)
+        metrics = {metric.name: metric for metric in analysis.metrics.all()}
+        self.assertEqual((metrics['Price'].previous_value, metrics['Price'].current_value), ('1,000', '1,100.00'))
+        self.assertEqual((metrics['Price'].change, metrics['Price'].trend), ('+10.00%', 'up'))
+        self.assertEqual((metrics[' RSI '].current_value, metrics[' RSI '].change, metrics[' RSI '].trend),
+                         ('45', '-25.00%', 'down'))
+        # Not computed by a refresh
+        self.assertEqual(metrics['Sentiment'].current_value, 'Bullish')
+        # No numeric previous value, so no change either
+        self.assertEqual((metrics['Volume'].current_value, metrics['Volume'].change), ('7.5', ''))
+
+
+def candles(timestamps, closes=None):
+    timestamps = list(timestamps)
+    closes = list(closes) if closes is not None else [float(i + 1) for i in range(len(timestamps))]
+    return {
+        'timestamp': timestamps,
+        'open': closes,
+        'high': [close + 0.5 for close in closes],
+        'low': [close - 0.5 for close in closes],
+        'close': closes,
+        'volume': [1.0] * len(timestamps),
+    }
+
+
+def utc(*args):
+    return int(datetime(*args, tzinfo=dt_timezone.utc).timestamp())
+
+
+class MarketDataTests(TestCase):
+    """Memory-mapped candle files, their sparse index and the coarser rollups"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        patcher = mock.patch.object(market_data, 'MARKET_DATA_DIR', directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_append_replaces_last_candle_and_skips_older(self):
+        self.assertEqual(market_data.append('btc', candles([60, 120, 180])), 3)
+        # The still-open candle is updated in place, and the next one follows it
+        self.assertEqual(market_data.append('BTC', candles([180, 240], closes=[9.0, 10.0])), 2)
+        # Anything before the last stored candle is ignored
+        with self.assertLogs('dashboard.services.market_data', 'WARNING'):
+            self.assertEqual(market_data.append('BTC', candles([60, 120], closes=[7.0, 8.0])), 0)
+        stored = market_data.get_candles('BTC')
+        self.assertEqual(stored['timestamp'].tolist(), [60, 120, 180, 240])
+        self.assertEqual(stored['close'].tolist(), [1.0, 2.0, 9.0, 10.0])
+        self.assertEqual(market_data.symbols(), ['BTC'])
+
+    def test_index_across_stride_boundary(self):
+        stride = market_data.INDEX_STRIDE
+        timestamps = [60 * i for i in range(stride + stride // 2)]
+        market_data.append('BTC', candles(timestamps[:stride - 3]))
+        market_data.append('BTC', candles(timestamps[stride - 4:]))
+        index = np.fromfile(market_data.index_path('BTC'), dtype='<i8')
+        self.assertEqual(index.tolist(), timestamps[::stride])
+        for position in (0, stride - 1, stride, stride + 1, len(timestamps) - 1):
+            found = market_data.get_candles('BTC', start=timestamps[position])
+            self.assertEqual(int(found['timestamp'][0]), timestamps[position])
+            self.assertEqual(len(found), len(timestamps) - position)
+
+    def test_get_candles_range_edges(self):
+        market_data.append('BTC', candles([60, 120, 180, 240]))
+
+        def timestamps(**kwargs):
+            return market_data.get_candles('BTC', **kwargs)['timestamp'].tolist()
+
+        # start is inclusive, end exclusive
+        self.assertEqual(timestamps(start=120, end=240), [120, 180])
+        self.assertEqual(timestamps(start=121, end=241), [180, 240])
+        self.assertEqual(timestamps(start=0, end=1000), [60, 120, 180, 240])
+        self.assertEqual(timestamps(start=241), [])
+        self.assertEqual(timestamps(end=60), [])
+        self.assertEqual(len(market_data.get_candles('ETH')), 0)
+        self.assertIsNone(market_data.latest_timestamp('ETH'))
+
+    def test_rollups(self):
+        # Every 6 hours from Saturday 6 January 2024 to Tuesday 9 January
+        timestamps = list(range(utc(2024, 1, 6), utc(2024, 1, 10), 6 * 3600))
+        closes = [float(i + 1) for i in range(len(timestamps))]
+        # Appended in two batches that split Sunday, so its rollups are replaced in place
+        market_data.append('BTC', candles(timestamps[:6], closes[:6]))
+        market_data.append('BTC', candles(timestamps[6:], closes[6:]))
+
+        hourly = market_data.get_candles('BTC', resolution='1h')
+        self.assertEqual(hourly['timestamp'].tolist(), timestamps)
+        daily = market_data.get_candles('BTC', resolution='1d')
+        self.assertEqual(daily['timestamp'].tolist(), [utc(2024, 1, day) for day in (6, 7, 8, 9)])
+        self.assertEqual(daily['open'].tolist(), [1.0, 5.0, 9.0, 13.0])
+        self.assertEqual(daily['close'].tolist(), [4.0, 8.0, 12.0, 16.0])
+        self.assertEqual(daily['volume'].tolist(), [4.0] * 4)
+        weekly = market_data.get_candles('BTC', resolution='1w')
+        # Weeks start on Monday: Saturday and Sunday belong to the week of 1 January
+        self.assertEqual(weekly['timestamp'].tolist(), [utc(2024, 1, 1), utc(2024, 1, 8)])
+        self.assertEqual(weekly['open'].tolist(), [1.0, 9.0])
+        self.assertEqual(weekly['close'].tolist(), [8.0, 16.0])
+        self.assertEqual(weekly['high'].tolist(), [8.5, 16.5])
+        self.assertEqual(weekly['low'].tolist(), [0.5, 8.5])
+        self.assertEqual(weekly['volume'].tolist(), [8.0, 8.0])
+
+        incremental = {resolution: market_data.get_candles('BTC', resolution=resolution).copy()
+                       for resolution in market_data.rollup_resolutions()}
+        market_data.rebuild_rollups('BTC')
+        for resolution, rolled in incremental.items():
+            self.assertTrue(np.array_equal(market_data.get_candles('BTC', resolution=resolution), rolled), resolution)
+
+    def test_pick_resolution(self):
+        day = 86400
+        self.assertEqual(market_data.pick_resolution(day, 60), '1m')
+        self.assertEqual(market_data.pick_resolution(day, 24), '1h')
+        self.assertEqual(market_data.pick_resolution(30 * day, 60), '1h')
+        self.assertEqual(market_data.pick_resolution(365 * day, 60), '1d')
+        self.assertEqual(market_data.pick_resolution(365 * day, 52), '1w')
+        # Nothing stored is fine enough: the finest available
+        self.assertEqual(market_data.pick_resolution(day, 1000, ['1d', '1h']), '1h')
+
+    def test_chart_candles(self):
+        start = utc(2024, 1, 1)
+        market_data.append('BTC', candles(range(start, start + 3 * 86400, 3600)))
+        resolution, chart = market_data.chart_candles('BTC', '1W', points=7)
+        self.assertEqual(resolution, '1d')
+        self.assertEqual(chart['timestamp'].tolist(), [start, start + 86400, start + 2 * 86400])
+        self.assertEqual(market_data.chart_candles('ETH')[0], market_data.BASE_RESOLUTION)
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class AnalysisRefreshTests(TestCase):
+    """Refreshes read only the candles a chart keeps, at the chart's own resolution"""
+
+    START = utc(2024, 1, 1)
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        for patcher in (mock.patch.object(market_data, 'MARKET_DATA_DIR', directory),
+                        mock.patch.object(analysis_refresh, 'MAX_POINTS', 5)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Three days of minute candles
+        market_data.append('BTC', candles(range(self.START, self.START + 3 * 86400, 60)))
+        self.analysis = CryptoAnalysis.objects.create(
+            analyst=Analyst.objects.create(user=User.objects.create(username='analyst')), title='Analysis',
+            cryptocurrency='Bitcoin', symbol='BTC', analysis_type='technical', timeframe='short_term',
+            risk_level='low', price=Decimal('10.00'), description='d', executive_summary='e',
+            preview_content='p', full_content='f',
+        )
+
+    def chart(self, **chart_data):
+        CryptoAnalysis.objects.filter(pk=self.analysis.pk).update(chart_data=chart_data)
+        result = analysis_refresh.refresh(self.analysis.pk)
+        chart_data = CryptoAnalysis.objects.get(pk=self.analysis.pk).chart_data
+        return result, chart_data
+
+    def timestamps(self, chart_data):
+        return [market_data.parse_timestamp(t) for t in chart_data['timestamps']]
+
+    def test_empty_chart_is_built_at_a_chart_resolution(self):
+        result, chart_data = self.chart()
+        # Five points over a month: daily candles
+        self.assertEqual(chart_data['resolution'], '1d')
+        self.assertEqual(self.timestamps(chart_data), [self.START, self.START + 86400, self.START + 2 * 86400])
+        self.assertEqual(result['candles'], 3)
+
+    def test_hourly_chart_gets_hourly_candles(self):
+        last = self.START + 69 * 3600
+        result, chart_data = self.chart(timestamps=[last - 3600, last], prices=[1.0, 2.0])
+        self.assertEqual(chart_data['resolution'], '1h')
+        self.assertEqual(self.timestamps(chart_data), [last - 3600, last, last + 3600, last + 7200])
+        self.assertEqual(result['candles'], 2)
+
+    def test_stale_chart_reads_only_the_last_points(self):
+        old = self.START + 3600
+        with mock.patch.object(market_data, 'get_candles', wraps=market_data.get_candles) as get_candles:
+            result, chart_data = self.chart(resolution='1h', timestamps=[old - 3600, old], prices=[1.0, 2.0])
+        self.assertEqual(len(get_candles.call_args_list), 1)
+        self.assertEqual(get_candles.call_args.kwargs, {'start': self.START + 67 * 3600, 'resolution': '1h'})
+        end = self.START + 71 * 3600
+        self.assertEqual(self.timestamps(chart_data), [end - i * 3600 for i in range(4, -1, -1)])
+        self.assertEqual(result['candles'], 5)
+
+
+def ohlc(rows):
+    """Candle array from ``(timestamp, high, low, close)`` rows"""
+    array = np.zeros(len(rows), dtype=market_data.RECORD)
+    for i, (timestamp, high, low, close) in enumerate(rows):
+        array[i] = (timestamp, close, high, low, close, 1.0)
+    return array
+
+
+@override_settings(DATABASE_REPLICAS=[], CACHES=LOCAL_CACHES)
+class PriceAlertTests(TestCase):
+    """Crossed levels fire once each and are emailed as one message per purchaser"""
+
+    def setUp(self):
+        cache.clear()
+        price_alerts._book = None
+        self.analyst = Analyst.objects.create(user=User.objects.create(username='analyst'))
+        self.buyer = User.objects.create(username='buyer', email='buyer@example.com')
+        self.analysis = self.make_analysis('BTC', price_targets=[120], support_levels={'strong_floor': 95})
+        ChartAnnotation.objects.create(analysis=self.analysis, type='target', price_level=Decimal('110'))
+        ChartAnnotation.objects.create(analysis=self.analysis, type='stop_loss', price_level=Decimal('90'))
+        PurchasedAnalysis.objects.create(user=self.buyer, analysis=self.analysis, purchase_price=Decimal('10.00'))
+
+    def make_analysis(self, symbol, **levels):
+        return CryptoAnalysis.objects.create(
+            analyst=self.analyst, title=f'{symbol} call', cryptocurrency=symbol, symbol=symbol,
+            analysis_type='technical', timeframe='short_term', risk_level='low', price=Decimal('10.00'),
+            description='d', executive_summary='e', preview_content='p', full_content='f', **levels,
+        )
+
+    def crossed(self):
+        return list(PriceAlert.objects.order_by('crossed_at', 'level_price').values_list('label', 'direction'))
+
+    def test_gaps_cross_levels_once(self):
+        candles = ohlc([
+            (60, 101, 99, 100),
+            # Gaps up over the 110 target without trading through it
+            (120, 113, 112, 112.5),
+            # Back through 110: already fired
+            (180, 112, 109, 109.5),
+            # Gaps down past the 95 support, stopping above the stop loss
+            (240, 94, 93, 93.5),
+        ])
+        self.assertEqual(price_alerts.check_candles('btc', candles, previous_close=100), 2)
+        self.assertEqual(self.crossed(), [('Price Target', 'up'), ('strong floor', 'down')])
+        self.assertEqual(price_alerts.check_candles('BTC', candles, previous_close=100), 0)
+        # A rebuilt book remembers what fired from the database
+        price_alerts.levels_changed()
+        self.assertEqual(price_alerts.check_candles('BTC', ohlc([(300, 121, 85, 86)]), previous_close=93.5), 2)
+        self.assertEqual(self.crossed()[2:], [('Stop Loss', 'down'), ('Price Target', 'up')])
+
+    def test_chart_refresh_keeps_the_book(self):
+        book = price_alerts.get_book()
+        self.analysis.chart_data = {'points': []}
+        self.analysis.save(update_fields=['chart_data', 'updated_at'])
+        self.assertIs(price_alerts.get_book(), book)
+        self.analysis.price_targets = [130]
+        self.analysis.save()
+        self.assertIsNot(price_alerts.get_book(), book)
+
+    def test_only_purchased_analyses(self):
+        self.make_analysis('ETH', price_targets=[10])
+        self.assertEqual(list(price_alerts.get_book().symbols), ['BTC'])
+        self.assertEqual(price_alerts.check_candles('ETH', ohlc([(60, 11, 9, 10)])), 0)
+
+    def test_dispatch_groups_alerts_per_user(self):
+        other = self.make_analysis('ETH', price_targets=[10])
+        second_buyer = User.objects.create(username='second', email='second@example.com')
+        PurchasedAnalysis.objects.create(user=self.buyer, analysis=other, purchase_price=Decimal('10.00'))
+        PurchasedAnalysis.objects.create(user=second_buyer, analysis=other, purchase_price=Decimal('10.00'))
+        no_email = User.objects.create(username='noemail')
+        PurchasedAnalysis.objects.create(user=no_email, analysis=other, purchase_price=Decimal('10.00'))
+        price_alerts.check_candles('BTC', ohlc([(60, 111, 109, 110.5)]), previous_close=100)
+        price_alerts.check_candles('ETH', ohlc([(60, 11, 9, 10)]))
+
+        self.assertEqual(price_alerts.dispatch_alerts(), {'alerts': 2, 'emails': 2})
+        sent = {message.to[0]: message for message in mail.outbox}
+        self.assertEqual(set(sent), {'buyer@example.com', 'second@example.com'})
+        self.assertTrue(sent['buyer@example.com'].subject.startswith('2 price levels crossed'))
+        self.assertIn('BTC Price Target', sent['buyer@example.com'].body)
+        self.assertTrue(sent['second@example.com'].subject.startswith('1 price level crossed'))
+        self.assertNotIn('BTC', sent['second@example.com'].body)
+        self.assertEqual(price_alerts.dispatch_alerts(), {'alerts': 0, 'emails': 0})
+
+
+class PortfolioScoringTests(TestCase):
+    """Calls are scored together over their concatenated candle paths"""
+
+    START = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        patcher = mock.patch.object(market_data, 'MARKET_DATA_DIR', directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def path(self, symbol, rows):
+        """Hourly candles from START, as ``(high, low, close)`` rows"""
+        start = int(self.START.timestamp())
+        market_data.append(symbol, ohlc([(start + i * 3600, *row) for i, row in enumerate(rows)]))
+
+    def call(self, key, symbol, recommendation, price_targets=(), **levels):
+        return portfolio.make_call(key, key, 1, symbol, recommendation, 'short_term', list(price_targets),
+                                   self.START, levels)
+
+    def score(self, *calls, hours=24 * 30):
+        return portfolio.score_calls(list(calls), now=self.START + timedelta(hours=hours))
+
+    def test_stop_wins_when_both_levels_touch_one_candle(self):
+        self.path('BTC', [(101, 99, 100), (111, 94, 100), (120, 100, 118)])
+        result, = self.score(self.call(1, 'BTC', 'buy', entry=[100.0], target=[110.0, 130.0], stop_loss=[95.0, 90.0]))
+        self.assertEqual((result['status'], result['hit'], result['return']), ('stopped', False, -5.0))
+        self.assertEqual((result['entry'], result['target'], result['stop']), (100.0, 110.0, 95.0))
+
+    def test_short_call_reaches_target(self):
+        self.path('ETH', [(101, 99, 100), (104, 95, 96), (97, 89, 91), (120, 85, 119)])
+        result, = self.score(self.call(1, 'ETH', 'strong_sell', price_targets=[80, 90], entry=[100.0],
+                                       stop_loss=[105.0, 120.0]))
+        self.assertEqual((result['status'], result['hit'], result['return']), ('target', True, 10.0))
+        self.assertEqual((result['target'], result['stop'], result['last_price']), (90.0, 105.0, 90.0))
+        self.assertEqual(result['drawdown'], 0.0)
+
+    def test_drawdown_does_not_carry_across_positions(self):
+        self.path('BTC', [(100, 100, 100), (150, 150, 150), (120, 120, 120)])
+        self.path('ETH', [(100, 100, 100), (90, 90, 90), (95, 95, 95)])
+        calls = [self.call(1, 'BTC', 'buy', entry=[100.0]), self.call(2, 'ETH', 'buy', entry=[100.0])]
+        together = self.score(*calls, hours=3)
+        self.assertEqual([result['drawdown'] for result in together], [20.0, 10.0])
+        self.assertEqual([result['status'] for result in together], ['open', 'open'])
+        self.assertEqual([result['return'] for result in together], [20.0, -5.0])
+        self.assertEqual(together, self.score(calls[0], hours=3) + self.score(calls[1], hours=3))
+
+    def test_expired_hold_and_missing_data(self):
+        self.path('BTC', [(100, 100, 100), (105, 103, 104)])
+        expired, hold, missing = self.score(
+            self.call(1, 'BTC', 'buy', entry=[100.0]), self.call(2, 'BTC', 'hold'), self.call(3, 'SOL', 'buy'),
+        )
+        self.assertEqual((expired['status'], expired['hit'], expired['return']), ('expired', True, 4.0))
+        self.assertEqual((hold['status'], hold['hit'], hold['return']), ('expired', None, 0.0))
+        self.assertEqual((missing['status'], missing['return']), ('no_data', None))
+
+        overall, by_analyst = portfolio.summarize([expired, hold, missing])
+        self.assertEqual((overall['positions'], overall['resolved'], overall['hits']), (3, 1, 1))
+        self.assertEqual((overall['hit_rate'], overall['realized_return']), (100.0, 4.0))
+        self.assertEqual(set(by_analyst), {1})
+
+    def test_summarize_empty(self):
+        overall, by_analyst = portfolio.summarize([])
+        self.assertEqual(overall, {
+            'positions': 0, 'resolved': 0, 'open': 0, 'hits': 0, 'hit_rate': None,
+            'realized_return': None, 'unrealized_return': None, 'max_drawdown': 0.0,
+        })
+        self.assertEqual(by_analyst, {})
+        self.assertEqual(portfolio.score_calls([]), [])
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class AnalystScoreTests(TestCase):
+    """Analyses and analysts are scored from their calls, chunk by chunk"""
+
+    START = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        patcher = mock.patch.object(market_data, 'MARKET_DATA_DIR', directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        start = int(self.START.timestamp())
+        # BTC rises from 100 to 110, ETH falls from 100 to 90
+        market_data.append('BTC', ohlc([(start, 100, 100, 100), (start + 3600, 110, 100, 110)]))
+        market_data.append('ETH', ohlc([(start, 100, 100, 100), (start + 3600, 100, 90, 90)]))
+        self.first = Analyst.objects.create(user=User.objects.create(username='first'))
+        self.second = Analyst.objects.create(user=User.objects.create(username='second'))
+
+    def make_analysis(self, analyst, symbol, recommendation):
+        return CryptoAnalysis.objects.create(
+            analyst=analyst, title=f'{symbol} call', cryptocurrency=symbol, symbol=symbol,
+            analysis_type='technical', timeframe='short_term', risk_level='low', price=Decimal('10.00'),
+            description='d', executive_summary='e', preview_content='p', full_content='f',
+            recommendation=recommendation, published_at=self.START,
+            overall_score=Decimal('8.0'), growth_potential='+24%',
+        )
+
+    def score(self, chunk_size):
+        analyst_scores.score_all(chunk_size=chunk_size, now=self.START + timedelta(days=30))
+        return list(Analyst.objects.order_by('id').values(*analyst_scores.ANALYST_FIELDS[:-1]))
+
+    def test_call_scores(self):
+        scores = analyst_scores.call_scores(np.array([0.0, 1000.0, -1000.0, 0.0]), np.array([0.0, 0.0, 1000.0, 10.0]))
+        self.assertEqual(scores[:3].tolist(), [5.0, 10.0, 0.0])
+        self.assertAlmostEqual(scores[3], 5.0 - 2.5 * math.tanh(1.0))
+
+    def test_analyst_values(self):
+        empty = analyst_scores.analyst_values(np.zeros(analyst_scores.COLUMNS))
+        self.assertEqual((empty['scored_calls'], empty['hit_rate'], empty['max_drawdown']), (0, None, None))
+        self.assertEqual(empty['performance_score'], Decimal('0.0'))
+
+        total = np.zeros(analyst_scores.COLUMNS)
+        total[[analyst_scores.SCORED, analyst_scores.RESOLVED, analyst_scores.HITS]] = 5, 4, 3
+        total[analyst_scores.RETURN_SUM] = 20.0
+        total[analyst_scores.DRAWDOWN] = 7.5
+        total[analyst_scores.BRIER_SUM] = 1.0
+        total[analyst_scores.SCORE_SUM] = 40.0
+        # Two resolved 0.6 calls, one right; two 0.75 calls, both right
+        bucket = analyst_scores.BUCKETS.index(0.6)
+        total[analyst_scores.BUCKET_COUNT + bucket], total[analyst_scores.BUCKET_HITS + bucket] = 2, 1
+        total[analyst_scores.BUCKET_COUNT + 1 - bucket], total[analyst_scores.BUCKET_HITS + 1 - bucket] = 2, 2
+        values = analyst_scores.analyst_values(total)
+        self.assertEqual((values['hit_rate'], values['average_return']), (Decimal('75.0'), Decimal('5.0')))
+        self.assertEqual((values['max_drawdown'], values['brier_score']), (Decimal('7.5'), Decimal('0.25')))
+        self.assertEqual(values['calibration_error'], Decimal('0.175'))
+        # Five neutral prior calls pull 8.0 towards 5.0
+        self.assertEqual((values['performance_score'], values['rating']), (Decimal('6.5'), Decimal('3.25')))
+
+    def test_chunks_merge_totals(self):
+        self.make_analysis(self.first, 'BTC', 'buy')
+        self.make_analysis(self.second, 'ETH', 'buy')
+        self.make_analysis(self.first, 'ETH', 'strong_sell')
+        self.make_analysis(self.first, 'ETH', 'buy')
+        self.make_analysis(self.second, 'BTC', 'sell')
+        whole = self.score(chunk_size=100)
+        self.assertEqual(self.score(chunk_size=1), whole)
+
+        first, second = whole
+        self.assertEqual((first['scored_calls'], first['resolved_calls'], first['hit_calls']), (3, 3, 2))
+        self.assertEqual((first['average_return'], first['max_drawdown']), (Decimal('3.33'), Decimal('10.0')))
+        self.assertEqual((second['scored_calls'], second['hit_calls'], second['hit_rate']), (2, 0, Decimal('0.0')))
+        self.assertEqual(second['average_return'], Decimal('-10.0'))
+
+    def test_unscored_calls_reset_hand_typed_values(self):
+        scored = self.make_analysis(self.first, 'BTC', 'buy')
+        hold = self.make_analysis(self.first, 'BTC', 'hold')
+        missing = self.make_analysis(self.first, 'SOL', 'buy')
+        self.score(chunk_size=100)
+
+        scored.refresh_from_db()
+        self.assertEqual((scored.call_status, scored.growth_potential), ('expired', '+10.00%'))
+        self.assertGreater(scored.overall_score, Decimal('5.0'))
+        for analysis, status in ((hold, 'expired'), (missing, 'no_data')):
+            analysis.refresh_from_db()
+            self.assertEqual((analysis.call_status, analysis.overall_score, analysis.growth_potential),
+                             (status, Decimal('5.0'), ''))
+        self.assertEqual(self.score(chunk_size=100)[0]['scored_calls'], 1)
+        self.assertEqual(analyst_scores.score_all(now=self.START + timedelta(days=30))['analyses_updated'], 0)
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class ReminderDispatchTests(TestCase):
+    """Due reminders are claimed once and sent in batches over one mail connection"""
+
+    def setUp(self):
+        self.analyst = Analyst.objects.create(user=User.objects.create(username='analyst'))
+
+    def consult(self, username, starts_in, status='scheduled', email=True):
+        user = User.objects.create(username=username, email=f'{username}@example.com' if email else '')
+        return Consultation.objects.create(user=user, analyst=self.analyst, title=f'{username} session',
+                                           status=status, scheduled_date=timezone.now() + starts_in)
+
+    def connection(self):
+        connection = mail.get_connection()
+        connection.send_messages = mock.Mock(wraps=connection.send_messages)
+        return connection
+
+    def test_due_reminders_are_claimed_once(self):
+        consultation = self.consult('buyer', timedelta(hours=2))
+        token, claimed = reminders.claim_due_reminders()
+        self.assertEqual([r.consultation_id for r in claimed], [consultation.pk])
+        self.assertEqual(reminders.claim_due_reminders(), (mock.ANY, []))
+        # A claim abandoned by a crashed worker is picked up again after the timeout
+        later = timezone.now() + reminders.CLAIM_TIMEOUT + timedelta(minutes=1)
+        self.assertEqual([r.pk for r in reminders.claim_due_reminders(now=later)[1]], [claimed[0].pk])
+
+    def test_batch_is_sent_over_one_connection(self):
+        due = [self.consult(f'buyer{i}', timedelta(hours=2)) for i in range(3)]
+        backlog = self.consult('backlog', timedelta(minutes=30))
+        upcoming = self.consult('upcoming', timedelta(days=3))
+        self.consult('no_email', timedelta(hours=2), email=False)
+        connection = self.connection()
+        with mock.patch.object(reminders, 'get_connection') as get_connection:
+            stats = reminders.dispatch_reminders(mail_connection=connection)
+        get_connection.assert_not_called()
+        connection.send_messages.assert_called_once()
+
+        self.assertEqual(stats, {'batches': 1, 'sent': 4, 'skipped': 2, 'failed': 0})
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         sorted(c.user.email for c in due + [backlog]))
+        # Both of the backlog's reminders were due; only one email went out and both are closed
+        self.assertEqual(ConsultationReminder.objects.filter(consultation=backlog, is_sent=True).count(), 2)
+        self.assertEqual(ConsultationReminder.objects.filter(consultation=backlog, sent_time__isnull=False).count(), 1)
+        self.assertEqual(set(Consultation.objects.filter(reminder_sent=True).values_list('pk', flat=True)),
+                         {c.pk for c in due + [backlog]})
+
+        # Reminders not yet due are left alone
+        self.assertFalse(ConsultationReminder.objects.filter(consultation=upcoming, is_sent=True).exists())
+        self.assertFalse(ConsultationReminder.objects.filter(consultation=upcoming, claim_token__isnull=False).exists())
+        self.assertEqual(ConsultationReminder.objects.filter(consultation__in=due, is_sent=False).count(), 3)
+
+        self.assertEqual(reminders.dispatch_reminders(mail_connection=self.connection())['sent'], 0)
+        self.assertEqual(len(mail.outbox), 4)
+
+    def test_failed_batch_is_released(self):
+        self.consult('buyer', timedelta(hours=2))
+        connection = self.connection()
+        connection.send_messages.side_effect = OSError('smtp down')
+        with self.assertLogs(reminders.logger, 'ERROR'):
+            self.assertEqual(reminders.dispatch_reminders(mail_connection=connection)['failed'], 1)
+        self.assertFalse(ConsultationReminder.objects.filter(claim_token__isnull=False).exists())
+        self.assertEqual(reminders.dispatch_reminders(mail_connection=self.connection())['sent'], 1)
+
+    def test_follow_ups_are_sent_once(self):
+        finished = self.consult('finished', -timedelta(hours=3), status='completed')
+        self.consult('recent', -timedelta(hours=1), status='completed')
+        connection = self.connection()
+        self.assertEqual(reminders.dispatch_follow_ups(mail_connection=connection), 1)
+        connection.send_messages.assert_called_once()
+        self.assertEqual([message.to for message in mail.outbox], [[finished.user.email]])
+        self.assertEqual(list(Consultation.objects.filter(follow_up_sent=True).values_list('pk', flat=True)),
+                         [finished.pk])
+        self.assertEqual(reminders.dispatch_follow_ups(mail_connection=self.connection()), 0)
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class AggregateTests(TestCase):
+    """Sales and rating counters follow their rows and reconcile repairs drift"""
+
+    def setUp(self):
+        self.analyst = Analyst.objects.create(user=User.objects.create(username='analyst'))
+        self.first, self.second = self.make_analysis('First'), self.make_analysis('Second')
+        self.reader = User.objects.create(username='reader')
+
+    def make_analysis(self, title):
+        return CryptoAnalysis.objects.create(
+            analyst=self.analyst, title=title, cryptocurrency='Bitcoin', symbol='BTC', analysis_type='technical',
+            timeframe='short_term', risk_level='low', price=Decimal('10.00'), description='d',
+            executive_summary='e', preview_content='p', full_content='f',
+        )
+
+    def counters(self, analysis):
+        return CryptoAnalysis.objects.values_list(
+            'sales_count', 'total_revenue', 'rating_sum', 'rating_count', 'rating'
+        ).get(pk=analysis.pk)
+
+    def test_edited_rating_moves_between_analyses(self):
+        AnalysisRating.objects.create(user=User.objects.create(username='other'), analysis=self.first, rating=2)
+        rating = AnalysisRating.objects.create(user=self.reader, analysis=self.first, rating=4)
+        self.assertEqual(self.counters(self.first)[2:], (6, 2, Decimal('3.00')))
+
+        rating.rating = 5
+        rating.save()
+        self.assertEqual(self.counters(self.first)[2:], (7, 2, Decimal('3.50')))
+
+        rating.analysis = self.second
+        rating.save()
+        self.assertEqual(self.counters(self.first)[2:], (2, 1, Decimal('2.00')))
+        self.assertEqual(self.counters(self.second)[2:], (5, 1, Decimal('5.00')))
+
+        rating.delete()
+        self.assertEqual(self.counters(self.second)[2:], (0, 0, Decimal('0.00')))
+        self.assertEqual(aggregates.reconcile(), {'analyses': [], 'analysts': []})
+
+    def test_deleted_purchase_is_taken_off_the_sales(self):
+        purchase = PurchasedAnalysis.objects.create(user=self.reader, analysis=self.first,
+                                                    purchase_price=Decimal('10.00'))
+        PurchasedAnalysis.objects.create(user=self.reader, analysis=self.second, purchase_price=Decimal('7.50'))
+        self.assertEqual(self.counters(self.first)[:2], (1, Decimal('10.00')))
+        self.assertEqual(Analyst.objects.values_list('total_sales', 'total_revenue').get(pk=self.analyst.pk),
+                         (2, Decimal('17.50')))
+
+        purchase.delete()
+        self.assertEqual(self.counters(self.first)[:2], (0, Decimal('0.00')))
+        self.assertEqual(Analyst.objects.values_list('total_sales', 'total_revenue').get(pk=self.analyst.pk),
+                         (1, Decimal('7.50')))
+        self.assertEqual(aggregates.reconcile(), {'analyses': [], 'analysts': []})
+
+    def test_reconcile_repairs_drifted_counters(self):
+        PurchasedAnalysis.objects.create(user=self.reader, analysis=self.first, purchase_price=Decimal('10.00'))
+        AnalysisRating.objects.create(user=self.reader, analysis=self.first, rating=4)
+        expected = self.counters(self.first)
+        # Saves from stale copies overwrite the counters
+        CryptoAnalysis.objects.filter(pk=self.first.pk).update(sales_count=5, rating_sum=1, rating=Decimal('1.00'))
+        CryptoAnalysis.objects.filter(pk=self.second.pk).update(total_revenue=Decimal('3.00'))
+        Analyst.objects.filter(pk=self.analyst.pk).update(total_sales=0)
+
+        self.assertCountEqual(aggregates.reconcile(fix=False)['analyses'], [self.first.pk, self.second.pk])
+        self.assertEqual(self.counters(self.first)[0], 5)
+
+        drifted = aggregates.reconcile(analyses=[self.first.pk])
+        self.assertEqual(drifted, {'analyses': [self.first.pk], 'analysts': [self.analyst.pk]})
+        self.assertEqual(self.counters(self.first), expected)
+        self.assertEqual(Analyst.objects.values_list('total_sales', 'total_revenue').get(pk=self.analyst.pk),
+                         (1, Decimal('10.00')))
+
+        self.assertEqual(aggregates.reconcile(), {'analyses': [self.second.pk], 'analysts': []})
+        self.assertEqual(self.counters(self.second), (0, Decimal('0.00'), 0, 0, Decimal('0.00')))
+        self.assertEqual(aggregates.reconcile(), {'analyses': [], 'analysts': []})
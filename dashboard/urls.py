@@ -8,6 +8,7 @@ urlpatterns = [
     path('dashboard/', views.dashboard, name='dashboard'),
     path('marketplace/', views.marketplace, name='marketplace'),
     path('portfolio/', views.portfolio, name='portfolio'),
+    path('analyst/dashboard/', views.analyst_dashboard, name='analyst_dashboard'),
     
     # User Management
     path('profile/', views.profile, name='profile'),
@@ -23,6 +24,7 @@ urlpatterns = [
     # Analysis & Consultations
     path('purchase_analysis/', views.purchase_analysis, name='purchase_analysis'),
     path('book_consultation/', views.book_consultation, name='book_consultation'),
+    path('book_consultation/slots/', views.consultation_slots, name='consultation_slots'),
     path('my-consultations/', views.my_consultations, name='my_consultations'),
     
     # Consultation Management URLs
@@ -37,6 +39,11 @@ urlpatterns = [
     path('consultation/<int:consultation_id>/chat/messages/', views.get_chat_messages, name='get_chat_messages'),
     path('consultation/<int:consultation_id>/chat/status/', views.update_participant_status, name='update_participant_status'),
     path('consultation/<int:consultation_id>/chat/participants/', views.get_online_participants, name='get_online_participants'),
+    path('consultation/<int:consultation_id>/chat/upload/', views.upload_chat_file, name='upload_chat_file'),
+    path('consultation/<int:consultation_id>/chat/media/', views.get_chat_media, name='get_chat_media'),
+    path('consultation/<int:consultation_id>/chat/file/<int:message_id>/', views.serve_chat_file, name='chat_file'),
+    path('consultation/<int:consultation_id>/chat/delete/<int:message_id>/', views.delete_chat_message, name='delete_chat_message'),
+    path('consultation/<int:consultation_id>/chat/clear/', views.clear_chat, name='clear_chat'),
     
     # Analysis Viewing URLs
     path('analysis/<int:analysis_id>/', views.view_analysis, name='view_analysis_old'),
@@ -51,6 +58,7 @@ urlpatterns = [
     path('check-balance/', views.check_wallet_balance, name='check_balance'),
     path('download-analysis/<int:analysis_id>/', views.download_analysis, name='download_analysis'),
     path('refresh-analysis/<int:analysis_id>/', views.refresh_analysis, name='refresh_analysis'),
+    path('refresh-analysis/jobs/<str:job_id>/', views.refresh_analysis_status, name='refresh_analysis_status'),
     
     # M-Pesa URLs - Deposits & Withdrawals
     path('mpesa/deposit/initiate/', views.initiate_mpesa_deposit, name='initiate_mpesa_deposit'),
@@ -79,4 +87,6 @@ urlpatterns = [
     path('debug-wallet/', views.debug_wallet, name='debug_wallet'),
     path('debug/withdrawal/', views.debug_withdrawal, name='debug_withdrawal'),
     path('api/analysis/<int:analysis_id>/', views.analysis_detail_api, name='analysis_detail_api'),
+    path('api/analyst/stats/', views.analyst_stats_api, name='analyst_stats_api'),
+    path('api/market/<str:symbol>/candles/', views.market_candles_api, name='market_candles_api'),
 ]
\ No newline at end of file
@@ -10,21 +10,26 @@ from django.shortcuts import redirect, render, get_object_or_404
 from django.db import transaction as db_transaction
 from django.db.models import Sum, Avg, Q
 from django.utils import timezone
-from django.http import JsonResponse, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponse
+from django.template.defaultfilters import filesizeformat
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.urls import reverse
 import random
-import time
 import logging
+import uuid
 from .models import (
     SiteSetting, UserWallet, UserProfile, Transaction, 
     CryptoAnalysis, PurchasedAnalysis, Analyst, Consultation, 
     ConsultationPackage, MarketInsight, ChartAnnotation, 
     TechnicalIndicatorData, AnalysisInsight, AnalysisMetric, MpesaTransaction,
-    ConsultationChatRoom, ChatMessage, ConsultationParticipant
+    ConsultationChatRoom, ChatMessage, ConsultationParticipant, ChunkedUpload
 )
 from .forms import UserUpdateForm, UserProfileForm, PaymentMethodForm, DepositForm, WithdrawalForm, ConsultationBookingForm
+from .services import (
+    analysis_refresh, availability, catalog, chat_files, copurchase, fragments, insights_feed, market_data, recommendations,
+    reports, rollups, view_counters, portfolio as portfolio_service
+)
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -403,30 +408,25 @@ def paypal_purchase_success(request):
             try:
                 analysis = CryptoAnalysis.objects.get(id=analysis_id, is_active=True)
                 
-                # Create purchase record
-                purchase = PurchasedAnalysis.objects.create(
-                    user=request.user,
-                    analysis=analysis,
-                    purchase_price=amount
-                )
-                
-                # Create transaction record
-                transaction = Transaction.objects.create(
-                    user=request.user,
-                    amount=amount,
-                    transaction_type='purchase',
-                    payment_method='paypal',
-                    status='completed',
-                    description=f'PayPal Purchase: {analysis.cryptocurrency} Analysis',
-                    paypal_transaction_id=order_id,
-                    analysis=analysis
-                )
-                
-                # Update analysis sales
-                analysis.sales_count += 1
-                if hasattr(analysis, 'total_revenue'):
-                    analysis.total_revenue += amount
-                analysis.save()
+                with db_transaction.atomic():
+                    # Create purchase record
+                    purchase = PurchasedAnalysis.objects.create(
+                        user=request.user,
+                        analysis=analysis,
+                        purchase_price=amount
+                    )
+                    
+                    # Create transaction record
+                    transaction = Transaction.objects.create(
+                        user=request.user,
+                        amount=amount,
+                        transaction_type='purchase',
+                        payment_method='paypal',
+                        status='completed',
+                        description=f'PayPal Purchase: {analysis.cryptocurrency} Analysis',
+                        paypal_transaction_id=order_id,
+                        analysis=analysis
+                    )
                 
                 # Clear session
                 if 'pending_paypal_purchase' in request.session:
@@ -786,32 +786,15 @@ def debug_withdrawal(request):
     return JsonResponse(debug_info)
 
 def base(request):
-    # Get consultation packages from database
-    consultation_packages = ConsultationPackage.objects.filter(is_active=True)
-    
-    # Convert to list of dicts for template compatibility
-    packages_data = []
-    for package in consultation_packages:
-        package_kes = usd_to_kes(package.price)
-        packages_data.append({
-            'id': package.id,
-            'title': package.title,
-            'level': package.level,
-            'description': package.description,
-            'price': str(package.price),
-            'price_kes': package_kes,
-            'features': package.get_features_list(),
-            'icon_class': package.icon_class,
-            'get_level_display': package.get_level_display,
-            'duration_minutes': package.duration_minutes,
-        })
+    packages_version, consultation_packages = catalog.snapshot()
     
     # Get site settings including hero video
     site_settings = SiteSetting.objects.filter(is_active=True).first()
     hero_video = site_settings.hero_video if site_settings else None
     
     context = {
-        'consultation_packages': packages_data,
+        'consultation_packages': consultation_packages,
+        'packages_version': packages_version,
         'hero_video': hero_video,
         'site_settings': site_settings,
         'exchange_rate': USD_TO_KES_RATE,
@@ -1151,35 +1134,7 @@ def dashboard(request):
         status='scheduled'
     ).order_by('scheduled_date')[:3]
     
-    # Get consultation packages from database
-    consultation_packages = ConsultationPackage.objects.filter(is_active=True)
-    
-    # Convert to list of dicts for template compatibility
-    packages_data = []
-    for package in consultation_packages:
-        package_kes = usd_to_kes(package.price)
-        packages_data.append({
-            'id': package.id,
-            'title': package.title,
-            'level': package.level,
-            'description': package.description,
-            'price': package.price,
-            'price_kes': package_kes,
-            'features': package.get_features_list(),
-            'icon_class': package.icon_class,
-            'get_level_display': package.get_level_display,
-        })
-    
-    # GET MARKET INSIGHTS FROM DATABASE
-    market_insights = MarketInsight.objects.filter(
-        is_active=True,
-        is_featured=True
-    ).order_by('-published_at', '-created_at')[:6]
-    
-    if not market_insights:
-        market_insights = MarketInsight.objects.filter(
-            is_active=True
-        ).order_by('-published_at', '-created_at')[:6]
+    packages_version, consultation_packages = catalog.snapshot()
     
     purchased_analysis_ids = PurchasedAnalysis.objects.filter(
         user=request.user
@@ -1196,13 +1151,26 @@ def dashboard(request):
         'recent_transactions': recent_transactions,
         'purchased_analyses': purchased_analyses,
         'user_consultations': user_consultations,
-        'consultation_packages': packages_data,
-        'market_insights': market_insights,
+        'consultation_packages': consultation_packages,
+        'packages_version': packages_version,
+        # Featured (or latest) insights; only evaluated on a fragment cache miss
+        'insights_version': insights_feed.current_version(),
+        'market_insights': insights_feed.dashboard_insights,
         'purchased_analysis_ids': list(purchased_analysis_ids),
         'exchange_rate': USD_TO_KES_RATE,
     }
     return render(request, 'dashboard/dashboard.html', context)
 
+# Marketplace orderings; analyst performance first, then the analysis's own score
+MARKETPLACE_SORTS = {
+    'performance': ('-analyst__performance_score', '-overall_score', '-created_at'),
+    'score': ('-overall_score', '-created_at'),
+    'newest': ('-created_at',),
+    'popular': ('-sales_count', '-created_at'),
+    'price_low': ('price', '-created_at'),
+    'price_high': ('-price', '-created_at'),
+}
+
 @login_required
 def marketplace(request):
     user_wallet, created = UserWallet.objects.get_or_create(user=request.user)
@@ -1233,6 +1201,19 @@ def marketplace(request):
     if recommendation:
         analyses = analyses.filter(recommendation=recommendation)
     
+    # Scores are written nightly by `score_analysts`, so sorting is a plain ORDER BY
+    sort = request.GET.get('sort', 'performance')
+    if sort not in MARKETPLACE_SORTS:
+        sort = 'performance'
+    analyses = analyses.order_by(*MARKETPLACE_SORTS[sort])
+    top_analysts = Analyst.objects.filter(resolved_calls__gt=0).select_related('user').order_by(
+        '-performance_score', '-hit_rate'
+    )[:5]
+    track_record = Analyst.objects.aggregate(hits=Sum('hit_calls'), resolved=Sum('resolved_calls'))
+    success_rate = None
+    if track_record['resolved']:
+        success_rate = round(track_record['hits'] / track_record['resolved'] * 100)
+    
     # Get purchased analyses for the current user
     purchased_analysis_ids = PurchasedAnalysis.objects.filter(
         user=request.user
@@ -1252,8 +1233,16 @@ def marketplace(request):
     total_spent_kes = usd_to_kes(total_spent)
     balance_kes = usd_to_kes(user_wallet.balance)
     
+    # "Users also bought" for the most recent purchase
+    purchased_analysis_ids = list(purchased_analysis_ids)
+    latest_purchase = purchased_analyses[0] if purchased_analyses else None
+    also_bought = []
+    if latest_purchase:
+        also_bought = copurchase.also_bought(latest_purchase.analysis_id, limit=3, exclude_ids=purchased_analysis_ids)
+    
     context = {
         'analyses': analyses,
+        'analyses_version': fragments.analyses_version(),
         'user_wallet': user_wallet,
         'purchased_count': purchased_count,
         'total_spent': total_spent,
@@ -1263,8 +1252,13 @@ def marketplace(request):
         'selected_type': analysis_type,
         'selected_risk': risk_level,
         'selected_recommendation': recommendation,
-        'purchased_analysis_ids': list(purchased_analysis_ids),
+        'selected_sort': sort,
+        'top_analysts': top_analysts,
+        'success_rate': success_rate,
+        'purchased_analysis_ids': purchased_analysis_ids,
         'purchased_analyses': purchased_analyses,
+        'latest_purchase': latest_purchase,
+        'also_bought': also_bought,
         'exchange_rate': USD_TO_KES_RATE,
     }
     return render(request, 'dashboard/marketplace.html', context)
@@ -1346,18 +1340,6 @@ def purchase_analysis(request):
                         analysis=analysis
                     )
                     
-                    # Update analysis sales count
-                    analysis.sales_count += 1
-                    
-                    # Safely update total_revenue if the field exists
-                    try:
-                        if hasattr(analysis, 'total_revenue'):
-                            analysis.total_revenue += analysis.price
-                    except AttributeError:
-                        logger.warning(f"total_revenue field not found for analysis {analysis.id}")
-                    
-                    analysis.save()
-                    
                     logger.info(f"Purchase successful: {analysis.cryptocurrency} for ${analysis.price}")
                     logger.info(f"New balance: ${user_wallet.balance}")
                     logger.info(f"Transaction created: {transaction.id}")
@@ -1506,18 +1488,6 @@ def instant_purchase(request):
                     analysis=analysis
                 )
                 
-                # Update analysis sales count
-                analysis.sales_count += 1
-                
-                # Safely update total_revenue if the field exists
-                try:
-                    if hasattr(analysis, 'total_revenue'):
-                        analysis.total_revenue += analysis.price
-                except AttributeError:
-                    logger.warning(f"total_revenue field not found for analysis {analysis.id}")
-                
-                analysis.save()
-                
                 logger.info(f"Instant purchase successful: {analysis.cryptocurrency}")
             
             return JsonResponse({
@@ -1564,16 +1534,28 @@ def check_wallet_balance(request):
 @login_required
 def portfolio(request):
     user_wallet, created = UserWallet.objects.get_or_create(user=request.user)
-    purchased_analyses = PurchasedAnalysis.objects.filter(
+    purchased_analyses = list(PurchasedAnalysis.objects.filter(
         user=request.user
-    ).select_related('analysis').order_by('-purchased_at')
+    ).select_related('analysis__analyst__user').order_by('-purchased_at'))
     balance_kes = usd_to_kes(user_wallet.balance)
     
     # Calculate portfolio stats
-    total_investment = sum(p.purchase_price for p in purchased_analyses)
+    total_investment = sum((p.purchase_price for p in purchased_analyses), Decimal('0'))
     total_investment_kes = usd_to_kes(total_investment)
-    active_analyses = purchased_analyses.filter(access_expires__isnull=True).count()
-    completed_analyses = purchased_analyses.filter(access_expires__isnull=False).count()
+    completed_analyses = sum(1 for p in purchased_analyses if p.is_expired)
+    active_analyses = len(purchased_analyses) - completed_analyses
+    
+    # How each call has played out since it was bought, from the cache while candles are unchanged
+    performance = portfolio_service.user_portfolio(request.user, purchased_analyses)
+    analysts = {}
+    for purchase in purchased_analyses:
+        purchase.performance = performance['positions'].get(purchase.id)
+        analysts.setdefault(purchase.analysis.analyst_id, purchase.analysis.analyst)
+    analyst_performance = [
+        dict(totals, analyst=analysts[analyst_id])
+        for analyst_id, totals in performance['analysts'].items() if analyst_id in analysts
+    ]
+    analyst_performance.sort(key=lambda row: (row['hit_rate'] is None, -(row['hit_rate'] or 0)))
     
     context = {
         'user_wallet': user_wallet,
@@ -1584,9 +1566,102 @@ def portfolio(request):
         'completed_analyses': completed_analyses,
         'balance_kes': balance_kes,
         'exchange_rate': USD_TO_KES_RATE,
+        'performance': performance['summary'],
+        'analyst_performance': analyst_performance,
     }
     return render(request, 'dashboard/portfolio.html', context)
 
+def _dashboard_analyst(request):
+    """The signed-in analyst; staff may look at any analyst with ?analyst_id="""
+    analyst_id = request.GET.get('analyst_id')
+    if analyst_id and request.user.is_staff:
+        return get_object_or_404(Analyst.objects.select_related('user'), id=analyst_id)
+    try:
+        return Analyst.objects.select_related('user').get(user=request.user)
+    except Analyst.DoesNotExist:
+        raise Http404('No analyst profile for this account')
+
+@login_required
+def analyst_dashboard(request):
+    """Earnings and performance of an analyst, read from the daily rollups only"""
+    analyst = _dashboard_analyst(request)
+    stats = rollups.analyst_stats(analyst)
+    today = timezone.localdate()
+    year_ago = today - timedelta(days=364)
+    
+    context = {
+        'analyst': analyst,
+        'this_month': rollups.totals(stats, since=today.replace(day=1)),
+        'last_30_days': rollups.totals(stats, since=today - timedelta(days=29)),
+        'last_12_months': rollups.totals(stats, since=year_ago),
+        'monthly_series': rollups.monthly_series(stats, months=12),
+        'daily_series': rollups.daily_series(stats, days=30),
+        'top_analyses': rollups.top_analyses(analyst, since=year_ago),
+        'symbols': rollups.symbol_breakdown(analyst, since=year_ago),
+    }
+    return render(request, 'dashboard/analyst_dashboard.html', context)
+
+@login_required
+def analyst_stats_api(request):
+    """Sales, revenue and rating series from the rollups as JSON"""
+    granularity = request.GET.get('granularity', 'month')
+    try:
+        periods = int(request.GET.get('periods', 12 if granularity == 'month' else 30))
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'periods must be a number'}, status=400)
+    
+    symbol = request.GET.get('symbol', '').strip()
+    if symbol:
+        if not request.user.is_staff:
+            return JsonResponse({'status': 'error', 'message': 'Symbol statistics are only available to staff'}, status=403)
+        analyst = None
+        stats = rollups.symbol_stats(symbol)
+    else:
+        analyst = _dashboard_analyst(request)
+        stats = rollups.analyst_stats(analyst)
+    
+    if granularity == 'day':
+        series = rollups.daily_series(stats, days=min(max(periods, 1), 366))
+    elif granularity == 'month':
+        series = rollups.monthly_series(stats, months=min(max(periods, 1), 36))
+    else:
+        return JsonResponse({'status': 'error', 'message': 'granularity must be "day" or "month"'}, status=400)
+    
+    return JsonResponse({
+        'status': 'success',
+        'analyst_id': analyst.id if analyst else None,
+        'symbol': symbol.upper() or None,
+        'granularity': granularity,
+        'series': series,
+    })
+
+@login_required
+def market_candles_api(request, symbol):
+    """OHLCV candles for price charts, served from the coarsest fitting resolution"""
+    range_name = request.GET.get('range', '1M')
+    if range_name not in market_data.CHART_RANGES:
+        return JsonResponse({'status': 'error', 'message': f"range must be one of {', '.join(market_data.CHART_RANGES)}"}, status=400)
+    try:
+        points = int(request.GET.get('points', market_data.DEFAULT_CHART_POINTS))
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'points must be a number'}, status=400)
+    
+    resolution, candles = market_data.chart_candles(symbol, range_name, points)
+    change_24h = None
+    if len(candles):
+        day_ago = market_data.get_candles(symbol, start=int(candles['timestamp'][-1]) - 86400)
+        if len(day_ago) and day_ago['close'][0]:
+            change_24h = round((float(candles['close'][-1]) / float(day_ago['close'][0]) - 1) * 100, 2)
+    
+    return JsonResponse({
+        'status': 'success',
+        'symbol': symbol.upper(),
+        'range': range_name,
+        'resolution': resolution,
+        'change_24h': change_24h,
+        'candles': {field: candles[field].tolist() for field in market_data.FIELDS},
+    })
+
 @login_required
 def book_consultation(request):
     user_wallet, created = UserWallet.objects.get_or_create(user=request.user)
@@ -1596,6 +1671,7 @@ def book_consultation(request):
         package_id = request.POST.get('package_id')
         scheduled_date = request.POST.get('scheduled_date')
         meeting_platform = request.POST.get('meeting_platform', 'jitsi')
+        analyst_id = request.POST.get('analyst_id')
         
         try:
             package = ConsultationPackage.objects.get(id=package_id, is_active=True)
@@ -1624,42 +1700,52 @@ def book_consultation(request):
                 messages.error(request, 'Please select a future date and time for your consultation.')
                 return redirect('book_consultation')
             
-            # Create consultation with all required fields
-            consultation = Consultation.objects.create(
-                user=request.user,
-                title=package.title,
-                level=package.level,
-                description=f"{package.title} - {package.description}",
-                price=package.price,
-                duration_minutes=package.duration_minutes,
-                scheduled_date=scheduled_datetime,
-                meeting_platform=meeting_platform,
-                payment_method='wallet',
-                payment_status='paid',
-                status='scheduled'
-            )
-            
-            # Generate meeting details
-            consultation.generate_meeting_details()
+            analyst = None
+            if analyst_id:
+                analyst = Analyst.objects.filter(id=analyst_id, available_for_consultation=True).first()
+                if not analyst:
+                    messages.error(request, 'The selected analyst is not taking consultations.')
+                    return redirect('book_consultation')
             
-            # Deduct from wallet
-            user_wallet.balance -= package.price
-            user_wallet.save()
-            
-            # Create transaction
-            Transaction.objects.create(
-                user=request.user,
-                amount=package.price,
-                transaction_type='purchase',
-                payment_method='wallet',
-                status='completed',
-                description=f"Consultation: {package.title}",
-                consultation=consultation
-            )
+            # Slot reservation, provisioning, wallet debit and transaction commit together
+            with db_transaction.atomic():
+                # Meeting details, reminders and chat room are provisioned on create
+                consultation = availability.reserve_slot(
+                    scheduled_datetime,
+                    package.duration_minutes,
+                    analyst=analyst,
+                    user=request.user,
+                    title=package.title,
+                    level=package.level,
+                    description=f"{package.title} - {package.description}",
+                    price=package.price,
+                    meeting_platform=meeting_platform,
+                    payment_method='wallet',
+                    payment_status='paid',
+                    status='scheduled'
+                )
+                
+                # Deduct from wallet
+                user_wallet.balance -= package.price
+                user_wallet.save()
+                
+                # Create transaction
+                Transaction.objects.create(
+                    user=request.user,
+                    amount=package.price,
+                    transaction_type='purchase',
+                    payment_method='wallet',
+                    status='completed',
+                    description=f"Consultation: {package.title}",
+                    consultation=consultation
+                )
             
             messages.success(request, f"Successfully booked {package.title} for {scheduled_datetime.strftime('%B %d, %Y at %I:%M %p')}!")
             return redirect('my_consultations')
             
+        except availability.SlotUnavailable as e:
+            messages.error(request, str(e))
+            return redirect('book_consultation')
         except ValueError as e:
             logger.error(f"Consultation booking error: {str(e)}")
             messages.error(request, 'Invalid date format. Please try again.')
@@ -1670,38 +1756,54 @@ def book_consultation(request):
             return redirect('book_consultation')
     
     # GET request - show consultation booking page
-    consultation_packages = ConsultationPackage.objects.filter(is_active=True)
-    
-    # Convert to list of dicts for template compatibility
-    packages_data = []
-    for package in consultation_packages:
-        package_kes = usd_to_kes(package.price)
-        packages_data.append({
-            'id': package.id,
-            'title': package.title,
-            'level': package.level,
-            'description': package.description,
-            'price': float(package.price),
-            'price_kes': float(package_kes),
-            'features': package.get_features_list(),
-            'icon_class': package.icon_class,
-            'get_level_display': package.get_level_display(),
-            'duration_minutes': package.duration_minutes,
-        })
+    packages_version, consultation_packages = catalog.snapshot()
     
     # Set default scheduled date to tomorrow at 9 AM
     default_date = (timezone.now() + timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
     default_date_str = default_date.strftime('%Y-%m-%dT%H:%M')
     
     context = {
-        'consultation_packages': packages_data,
+        'consultation_packages': consultation_packages,
+        'packages_version': packages_version,
         'user_wallet': user_wallet,
         'balance_kes': balance_kes,
         'default_date': default_date_str,
         'exchange_rate': USD_TO_KES_RATE,
+        'analysts': availability.bookable_analysts(),
     }
     return render(request, 'dashboard/book_consultation.html', context)
 
+@login_required
+def consultation_slots(request):
+    """Next free consultation slots for a package, optionally for one analyst"""
+    try:
+        package_id = int(request.GET.get('package_id', ''))
+        analyst_id = int(request.GET['analyst_id']) if request.GET.get('analyst_id') else None
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'package_id and analyst_id must be numbers'}, status=400)
+    package = get_object_or_404(ConsultationPackage, id=package_id, is_active=True)
+    analyst = None
+    if analyst_id:
+        analyst = get_object_or_404(Analyst, id=analyst_id, available_for_consultation=True)
+    try:
+        count = min(max(int(request.GET.get('count', 6)), 1), 20)
+    except ValueError:
+        count = 6
+    
+    slots = availability.next_free_slots(package.duration_minutes, count=count, analyst=analyst)
+    return JsonResponse({
+        'status': 'success',
+        'slots': [
+            {
+                'start': timezone.localtime(start).strftime('%Y-%m-%dT%H:%M'),
+                'label': timezone.localtime(start).strftime('%a %b %d, %I:%M %p'),
+                'analyst_id': slot_analyst.id,
+                'analyst_name': slot_analyst.analyst_name,
+            }
+            for start, slot_analyst in slots
+        ],
+    })
+
 @login_required
 def my_consultations(request):
     """View for users to see their consultation bookings and status"""
@@ -1832,7 +1934,7 @@ def consultation_chat(request, consultation_id):
     chat_room, created = ConsultationChatRoom.objects.get_or_create(consultation=consultation)
     
     # FIX: Get chat messages without slicing first, then reverse if needed
-    messages = chat_room.messages.all().select_related('user').order_by('-timestamp')[:100]
+    messages = chat_room.messages.all().select_related('user', 'blob').order_by('-timestamp')[:100]
     # Convert to list to avoid queryset issues
     messages_list = list(messages)
     
@@ -1916,11 +2018,11 @@ def get_chat_messages(request, consultation_id):
     # Get new messages
     messages = chat_room.messages.filter(
         id__gt=last_message_id
-    ).select_related('user').order_by('timestamp')
+    ).select_related('user', 'blob').order_by('timestamp')
     
     messages_data = []
     for message in messages:
-        messages_data.append({
+        message_data = {
             'id': message.id,
             'content': message.content,
             'username': message.user.username,
@@ -1928,7 +2030,14 @@ def get_chat_messages(request, consultation_id):
             'timestamp': message.timestamp.isoformat(),
             'message_type': message.message_type,
             'is_own_message': message.user.id == request.user.id
-        })
+        }
+        if message.blob_id:
+            message_data.update({
+                'file_url': message.file_url,
+                'file_name': message.file_name,
+                'file_size': filesizeformat(message.blob.size),
+            })
+        messages_data.append(message_data)
     
     # Update participant status
     participant, created = ConsultationParticipant.objects.get_or_create(
@@ -1992,6 +2101,186 @@ def get_online_participants(request, consultation_id):
         'participants': participants_data
     })
 
+def _chat_consultation(request, consultation_id):
+    """The consultation, if the current user booked it or is its analyst"""
+    return get_object_or_404(
+        Consultation.objects.filter(Q(user=request.user) | Q(analyst__user=request.user)), id=consultation_id
+    )
+
+def _upload_error_response(error):
+    data = {'status': 'error', 'message': str(error)}
+    if error.offset is not None:
+        data['offset'] = error.offset
+    return JsonResponse(data, status=error.status)
+
+def _parse_upload_id(value):
+    """UUID from a client-sent upload ID, or None if it is not one"""
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+@login_required
+@require_http_methods(["GET", "POST"])
+def upload_chat_file(request, consultation_id):
+    """
+    Resumable chat file upload.
+
+    A plain multipart POST with ``file`` (or ``audio``) uploads in one go.
+    Large files are sent as ``chunk`` parts with ``offset`` and ``total_size``;
+    the first response carries an ``upload_id`` that later chunks repeat.
+    ``GET ?upload_id=`` reports how many bytes the server holds, so an
+    interrupted client can resume from there. An upload that holds every
+    byte but failed to finalize is finalized again by the next POST.
+    """
+    consultation = _chat_consultation(request, consultation_id)
+    chat_room = get_object_or_404(ConsultationChatRoom, consultation=consultation)
+    
+    if request.method == 'GET':
+        upload_id = _parse_upload_id(request.GET.get('upload_id'))
+        if upload_id is None:
+            return JsonResponse({'status': 'error', 'message': 'Invalid upload ID'}, status=400)
+        upload = get_object_or_404(ChunkedUpload, upload_id=upload_id, chat_room=chat_room, user=request.user)
+        return JsonResponse({
+            'status': 'success',
+            'upload_id': str(upload.upload_id),
+            'offset': upload.offset,
+            'total_size': upload.total_size,
+            'complete': upload.is_complete,
+        })
+    
+    chunk = request.FILES.get('chunk') or request.FILES.get('file') or request.FILES.get('audio')
+    upload_id = request.POST.get('upload_id')
+    if not chunk and not upload_id:
+        return JsonResponse({'status': 'error', 'message': 'No file provided'}, status=400)
+    if upload_id:
+        upload_id = _parse_upload_id(upload_id)
+        if upload_id is None:
+            return JsonResponse({'status': 'error', 'message': 'Invalid upload ID'}, status=400)
+    
+    try:
+        if upload_id:
+            with db_transaction.atomic():
+                upload = get_object_or_404(
+                    ChunkedUpload.objects.select_for_update(),
+                    upload_id=upload_id, chat_room=chat_room, user=request.user
+                )
+                # An upload that holds every byte only needs finalizing; a resent chunk is ignored
+                needs_finalize = not upload.is_complete and upload.offset == upload.total_size
+                if not needs_finalize:
+                    if not chunk:
+                        return JsonResponse({'status': 'error', 'message': 'No file provided'}, status=400)
+                    offset = int(request.POST.get('offset', upload.offset))
+                    chat_files.append_chunk(upload, offset, chunk)
+        else:
+            total_size = int(request.POST.get('total_size') or chunk.size)
+            upload = chat_files.start_upload(
+                chat_room,
+                request.user,
+                request.POST.get('file_name') or chunk.name,
+                total_size,
+                content_type=chunk.content_type or '',
+                message_type=request.POST.get('message_type'),
+            )
+            chat_files.append_chunk(upload, 0, chunk)
+        
+        if upload.offset < upload.total_size:
+            return JsonResponse({
+                'status': 'partial',
+                'upload_id': str(upload.upload_id),
+                'offset': upload.offset,
+                'total_size': upload.total_size,
+            })
+        
+        message = chat_files.finish_upload(upload, caption=request.POST.get('caption', ''))
+    except chat_files.UploadError as e:
+        return _upload_error_response(e)
+    except (TypeError, ValueError):
+        return JsonResponse({'status': 'error', 'message': 'Invalid offset or size'}, status=400)
+    
+    chat_room.last_activity = timezone.now()
+    chat_room.save(update_fields=['last_activity'])
+    
+    return JsonResponse({
+        'status': 'success',
+        'upload_id': str(upload.upload_id),
+        'message_id': message.id,
+        'message_type': message.message_type,
+        'file_url': message.file_url,
+        'file_name': message.file_name,
+        'file_size': filesizeformat(message.blob.size),
+        'timestamp': message.timestamp.isoformat(),
+    })
+
+@login_required
+@require_http_methods(["GET", "HEAD"])
+def serve_chat_file(request, consultation_id, message_id):
+    """Stream a chat attachment with HTTP Range support"""
+    message = get_object_or_404(
+        ChatMessage.objects.select_related('blob'),
+        id=message_id,
+        chat_room__consultation=_chat_consultation(request, consultation_id),
+        blob__isnull=False,
+    )
+    return chat_files.serve_blob(
+        request, message.blob, message.file_name or 'file',
+        as_attachment=request.GET.get('download') == '1'
+    )
+
+@login_required
+def get_chat_media(request, consultation_id):
+    """Paginated list of files shared in the chat, newest first"""
+    consultation = _chat_consultation(request, consultation_id)
+    chat_room = get_object_or_404(ConsultationChatRoom, consultation=consultation)
+    
+    try:
+        before = int(request.GET.get('before', 0)) or None
+        limit = max(1, min(int(request.GET.get('limit', 24)), 100))
+    except (ValueError, TypeError):
+        before, limit = None, 24
+    
+    items, next_before = chat_files.media_page(chat_room, before=before, limit=limit)
+    media = [{
+        'id': message.id,
+        'message_type': message.message_type,
+        'file_url': message.file_url,
+        'file_name': message.file_name,
+        'file_size': filesizeformat(message.blob.size),
+        'content_type': message.blob.content_type,
+        'timestamp': message.timestamp.isoformat(),
+    } for message in items]
+    
+    return JsonResponse({
+        'status': 'success',
+        'media': media,
+        'next_before': next_before,
+        'has_more': next_before is not None,
+    })
+
+@login_required
+@require_http_methods(["POST"])
+def delete_chat_message(request, consultation_id, message_id):
+    """Delete one of the current user's chat messages"""
+    consultation = _chat_consultation(request, consultation_id)
+    message = get_object_or_404(
+        ChatMessage, id=message_id, chat_room__consultation=consultation, user=request.user
+    )
+    # Shared blobs are kept; other messages may reference the same content
+    message.delete()
+    return JsonResponse({'status': 'success'})
+
+@login_required
+@require_http_methods(["POST"])
+def clear_chat(request, consultation_id):
+    """Remove the current user's messages from the consultation chat"""
+    consultation = _chat_consultation(request, consultation_id)
+    chat_room = get_object_or_404(ConsultationChatRoom, consultation=consultation)
+    
+    # The other side's messages stay
+    deleted, _ = chat_room.messages.filter(user=request.user).delete()
+    logger.info(f"Cleared {deleted} chat messages from {request.user.username} in consultation {consultation.id}")
+    return JsonResponse({'status': 'success', 'deleted': deleted})
+
 @login_required
 def view_analysis(request, analysis_id):
     """View for users to view a specific purchased analysis"""
@@ -2017,16 +2306,26 @@ def view_analysis(request, analysis_id):
         messages.error(request, 'You have not purchased this analysis.')
         return redirect('marketplace')
     
-    # Get similar analyses for recommendation
-    similar_analyses = CryptoAnalysis.objects.filter(
-        is_active=True,
-        cryptocurrency=analysis.cryptocurrency
-    ).exclude(id=analysis_id).select_related('analyst')[:3]
+    view_counters.record_view(analysis, view_counters.viewer_key(request))
+    
+    # Similar analyses from the related-content index; items not indexed
+    # yet fall back to the same cryptocurrency
+    similar_analyses = recommendations.related_items(
+        analysis, 'analysis', 3, queryset=CryptoAnalysis.objects.select_related('analyst')
+    )
+    if similar_analyses is None:
+        similar_analyses = CryptoAnalysis.objects.filter(
+            is_active=True,
+            cryptocurrency=analysis.cryptocurrency
+        ).exclude(id=analysis_id).select_related('analyst')[:3]
     
     # Add KES prices to similar analyses
     for similar_analysis in similar_analyses:
         similar_analysis.price_kes = usd_to_kes(similar_analysis.price)
     
+    # Analyses bought by other buyers of this one
+    also_bought = copurchase.also_bought(analysis.id, limit=3)
+    
     # Get chart annotations
     chart_annotations = analysis.chart_annotations.all()
     
@@ -2044,6 +2343,7 @@ def view_analysis(request, analysis_id):
         'purchase': purchase,
         'user_wallet': user_wallet,
         'similar_analyses': similar_analyses,
+        'also_bought': also_bought,
         'chart_annotations': chart_annotations,
         'technical_indicators': technical_indicators,
         'insights': insights,
@@ -2059,45 +2359,25 @@ def market_insights(request):
     user_wallet, created = UserWallet.objects.get_or_create(user=request.user)
     balance_kes = usd_to_kes(user_wallet.balance)
     
-    # Get filter parameters
-    insight_type = request.GET.get('type', '')
-    urgency = request.GET.get('urgency', '')
+    # Get filter parameters; unknown values are ignored so they cannot add cache entries
     cryptocurrency = request.GET.get('crypto', '')
+    insight_type, urgency, crypto_filter = insights_feed.normalize_filters(
+        request.GET.get('type', ''), request.GET.get('urgency', ''), cryptocurrency,
+    )
     
-    # Build query
-    market_insights = MarketInsight.objects.filter(is_active=True)
-    
-    if insight_type:
-        market_insights = market_insights.filter(insight_type=insight_type)
-    
-    if urgency:
-        market_insights = market_insights.filter(urgency=urgency)
-    
-    if cryptocurrency:
-        market_insights = market_insights.filter(cryptocurrency__icontains=cryptocurrency)
-    
-    # Order by published date
-    market_insights = market_insights.order_by('-published_at', '-created_at')
-    
-    # Get featured insights for sidebar
-    featured_insights = MarketInsight.objects.filter(
-        is_active=True,
-        is_featured=True
-    ).order_by('-published_at')[:5]
-    
-    # Get recent insights for sidebar
-    recent_insights = MarketInsight.objects.filter(
-        is_active=True
-    ).order_by('-published_at')[:5]
-    
+    # Lists are shared by all users and cached per insights version. They are
+    # passed as callables so a fragment cache hit never touches them.
     context = {
         'user_wallet': user_wallet,
-        'market_insights': market_insights,
-        'featured_insights': featured_insights,
-        'recent_insights': recent_insights,
+        'insights_version': insights_feed.current_version(),
+        'market_insights': lambda: insights_feed.listing(insight_type, urgency, crypto_filter),
+        'insight_stats': insights_feed.stats,
+        'featured_insights': insights_feed.featured,
+        'recent_insights': insights_feed.recent,
         'selected_type': insight_type,
         'selected_urgency': urgency,
         'selected_crypto': cryptocurrency,
+        'crypto_filter': crypto_filter,
         'balance_kes': balance_kes,
         'exchange_rate': USD_TO_KES_RATE,
     }
@@ -2116,22 +2396,13 @@ def view_market_insight(request, insight_id):
         is_active=True
     )
     
-    # Increment view count
-    insight.views_count += 1
-    insight.save()
+    # Buffered view count; written back in batches
+    insight.increment_views(view_counters.viewer_key(request))
     
-    # Get related insights
-    related_insights = MarketInsight.objects.filter(
-        is_active=True,
-        cryptocurrency=insight.cryptocurrency
-    ).exclude(id=insight_id).order_by('-published_at')[:3]
-    
-    # If no related insights by cryptocurrency, get by type
-    if not related_insights:
-        related_insights = MarketInsight.objects.filter(
-            is_active=True,
-            insight_type=insight.insight_type
-        ).exclude(id=insight_id).order_by('-published_at')[:3]
+    # Related insights from the related-content index, or by cryptocurrency/type
+    related_insights = recommendations.related_items(insight, 'insight', 3)
+    if related_insights is None:
+        related_insights = insights_feed.related(insight)
     
     # Prepare author/verifier information for template
     author_info = {
@@ -2164,34 +2435,26 @@ def view_market_insight(request, insight_id):
 def download_analysis(request, analysis_id):
     """Handle analysis PDF download"""
     try:
-        analysis = CryptoAnalysis.objects.get(id=analysis_id, is_active=True)
+        analysis = CryptoAnalysis.objects.select_related('analyst__user').get(id=analysis_id, is_active=True)
         
         # Check if user has purchased this analysis
         if not PurchasedAnalysis.objects.filter(user=request.user, analysis=analysis).exists():
             messages.error(request, "You don't have access to this analysis.")
             return redirect('marketplace')
         
-        # For now, return a simple response - you can implement PDF generation later
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="analysis_{analysis_id}.pdf"'
-        
-        # Simple PDF content - you can replace this with actual PDF generation
-        response.write(f"Analysis Report #{analysis_id}\n")
-        response.write(f"Cryptocurrency: {analysis.cryptocurrency}\n")
-        response.write(f"Description: {analysis.description}\n")
-        response.write(f"Price: ${analysis.price}\n")
-        response.write(f"Price (KES): {usd_to_kes(analysis.price)}\n")
-        response.write(f"Risk Level: {analysis.get_risk_level_display()}\n")
-        
-        return response
+        return reports.serve_report(request, analysis)
         
     except CryptoAnalysis.DoesNotExist:
         messages.error(request, "Analysis not found.")
         return redirect('marketplace')
+    except reports.ReportError as e:
+        logger.error(f"PDF download failed for analysis {analysis_id}: {str(e)}")
+        messages.error(request, "The report could not be generated right now. Please try again shortly.")
+        return redirect('view_analysis', analysis_id=analysis_id)
 
 @login_required
 def refresh_analysis(request, analysis_id):
-    """AJAX endpoint to refresh analysis data"""
+    """AJAX endpoint that queues a data refresh and returns the job to poll"""
     if request.method == 'POST' and request.headers.get('x-requested-with') == 'XMLHttpRequest':
         try:
             analysis = CryptoAnalysis.objects.get(id=analysis_id, is_active=True)
@@ -2203,13 +2466,13 @@ def refresh_analysis(request, analysis_id):
                     'message': 'You do not have access to this analysis.'
                 })
             
-            # Simulate data refresh
-            time.sleep(1)
-            
+            job = analysis_refresh.request_refresh(analysis.id)
             return JsonResponse({
                 'status': 'success',
-                'message': 'Analysis data refreshed successfully!',
-                'updated_at': timezone.now().strftime('%Y-%m-%d %H:%M:%S')
+                'job_id': job['id'],
+                'state': job['state'],
+                'message': 'Data was refreshed recently.' if job['state'] == 'done' else 'Refresh started.',
+                'poll_url': reverse('refresh_analysis_status', args=[job['id']]),
             })
             
         except CryptoAnalysis.DoesNotExist:
@@ -2223,6 +2486,28 @@ def refresh_analysis(request, analysis_id):
         'message': 'Invalid request method.'
     })
 
+@login_required
+def refresh_analysis_status(request, job_id):
+    """Poll a refresh job started by refresh_analysis"""
+    job = analysis_refresh.get_job(job_id)
+    if not job or not PurchasedAnalysis.objects.filter(user=request.user, analysis_id=job['analysis_id']).exists():
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Refresh job not found.'
+        })
+    
+    updated_at = None
+    if job['state'] == 'done':
+        updated_at = CryptoAnalysis.objects.filter(id=job['analysis_id']).values_list('updated_at', flat=True).first()
+    return JsonResponse({
+        'status': 'success',
+        'job_id': job['id'],
+        'state': job['state'],
+        'message': job['message'],
+        'result': job['result'],
+        'updated_at': updated_at.strftime('%Y-%m-%d %H:%M:%S') if updated_at else None,
+    })
+
 @login_required
 def check_mpesa_transaction_status(request, transaction_id):
     """Check status of M-Pesa transaction"""
@@ -2443,20 +2728,17 @@ def mpesa_analysis_purchase_callback(request):
                     if mpesa_receipt:
                         transaction.mpesa_code = mpesa_receipt
                     
-                    transaction.save()
-                    
-                    # Create purchase record
-                    purchase = PurchasedAnalysis.objects.create(
-                        user=transaction.user,
-                        analysis=transaction.analysis,
-                        purchase_price=transaction.amount
-                    )
+                    with db_transaction.atomic():
+                        transaction.save()
+                        
+                        # Create purchase record
+                        purchase = PurchasedAnalysis.objects.create(
+                            user=transaction.user,
+                            analysis=transaction.analysis,
+                            purchase_price=transaction.amount
+                        )
                     
-                    # Update analysis sales count
                     analysis = transaction.analysis
-                    analysis.sales_count += 1
-                    analysis.total_revenue += transaction.amount
-                    analysis.save()
                     
                     # Update MpesaTransaction record
                     try:
@@ -2530,11 +2812,6 @@ def check_mpesa_payment_status(request, checkout_request_id):
                     analysis=analysis,
                     purchase_price=transaction.amount
                 )
-                
-                # Update analysis sales count
-                analysis.sales_count += 1
-                analysis.total_revenue += transaction.amount
-                analysis.save()
             
             return JsonResponse({
                 'status': 'success',
@@ -0,0 +1,83 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const loginForm = document.querySelector('.binance-form');
+    const loginInput = document.getElementById('id_login');
+    const passwordInput = document.getElementById('id_password');
+    const submitBtn = document.getElementById('submitBtn');
+    const submitText = document.getElementById('submitText');
+    const loadingSpinner = document.getElementById('loadingSpinner');
+
+    // Real-time validation
+    function validateField(field) {
+        if (field.value.trim() === '') {
+            field.classList.add('binance-input-error');
+        } else {
+            field.classList.remove('binance-input-error');
+        }
+    }
+
+    // Validate on input
+    if (loginInput) {
+        loginInput.addEventListener('input', function() {
+            validateField(this);
+        });
+    }
+
+    if (passwordInput) {
+        passwordInput.addEventListener('input', function() {
+            validateField(this);
+        });
+    }
+
+    // Form submission handling
+    if (loginForm) {
+        loginForm.addEventListener('submit', function(e) {
+            let isValid = true;
+
+            // Validate fields
+            if (!loginInput.value.trim()) {
+                loginInput.classList.add('binance-input-error');
+                isValid = false;
+            }
+
+            if (!passwordInput.value.trim()) {
+                passwordInput.classList.add('binance-input-error');
+                isValid = false;
+            }
+
+            if (!isValid) {
+                e.preventDefault();
+                return;
+            }
+
+            // Show loading state
+            submitText.textContent = 'Signing In...';
+            loadingSpinner.style.display = 'block';
+            submitBtn.disabled = true;
+        });
+    }
+
+    // Clear error styling when user starts typing
+    const inputs = document.querySelectorAll('.binance-input');
+    inputs.forEach(input => {
+        input.addEventListener('input', function() {
+            if (this.value.trim() !== '') {
+                this.classList.remove('binance-input-error');
+            }
+        });
+    });
+
+    // Auto-focus on login input
+    if (loginInput) {
+        setTimeout(() => {
+            loginInput.focus();
+        }, 100);
+    }
+
+    // Handle page load with existing errors
+    if (loginInput && loginInput.value.trim() !== '') {
+        loginInput.classList.remove('binance-input-error');
+    }
+    if (passwordInput && passwordInput.value.trim() !== '') {
+        passwordInput.classList.remove('binance-input-error');
+    }
+});
@@ -0,0 +1,24 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const signOutBtn = document.querySelector('button[type="submit"]');
+
+    // Add confirmation for sign out
+    if (signOutBtn) {
+        signOutBtn.addEventListener('click', function(e) {
+            const confirmed = confirm('Are you sure you want to sign out?');
+            if (!confirmed) {
+                e.preventDefault();
+            }
+        });
+    }
+
+    // Add entrance animation
+    const card = document.querySelector('.binance-card');
+    card.style.opacity = '0';
+    card.style.transform = 'translateY(20px)';
+
+    setTimeout(() => {
+        card.style.transition = 'all 0.5s ease';
+        card.style.opacity = '1';
+        card.style.transform = 'translateY(0)';
+    }, 100);
+});
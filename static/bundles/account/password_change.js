@@ -0,0 +1,124 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Password toggle functionality
+    const toggleButtons = document.querySelectorAll('.password-toggle');
+    toggleButtons.forEach(button => {
+        button.addEventListener('click', function() {
+            const targetId = this.getAttribute('data-target');
+            const passwordInput = document.getElementById(targetId);
+            const icon = this.querySelector('i');
+
+            if (passwordInput.type === 'password') {
+                passwordInput.type = 'text';
+                icon.className = 'fas fa-eye-slash';
+            } else {
+                passwordInput.type = 'password';
+                icon.className = 'fas fa-eye';
+            }
+        });
+    });
+
+    // Password strength meter
+    const passwordInput = document.getElementById(passwordFieldId);
+    const strengthBar = document.getElementById('strength-bar');
+    const strengthText = document.getElementById('strength-text');
+    const requirements = {
+        length: document.getElementById('req-length'),
+        uppercase: document.getElementById('req-uppercase'),
+        lowercase: document.getElementById('req-lowercase'),
+        number: document.getElementById('req-number'),
+        special: document.getElementById('req-special')
+    };
+
+    if (passwordInput) {
+        passwordInput.addEventListener('input', function() {
+            const password = this.value;
+            let strength = 0;
+            let messages = [];
+
+            // Check length
+            if (password.length >= 8) {
+                strength += 20;
+                requirements.length.style.color = 'var(--success-color)';
+                requirements.length.innerHTML = '✓ At least 8 characters';
+            } else {
+                requirements.length.style.color = 'var(--text-secondary)';
+                requirements.length.innerHTML = 'At least 8 characters';
+            }
+
+            // Check uppercase
+            if (/[A-Z]/.test(password)) {
+                strength += 20;
+                requirements.uppercase.style.color = 'var(--success-color)';
+                requirements.uppercase.innerHTML = '✓ One uppercase letter';
+            } else {
+                requirements.uppercase.style.color = 'var(--text-secondary)';
+                requirements.uppercase.innerHTML = 'One uppercase letter';
+            }
+
+            // Check lowercase
+            if (/[a-z]/.test(password)) {
+                strength += 20;
+                requirements.lowercase.style.color = 'var(--success-color)';
+                requirements.lowercase.innerHTML = '✓ One lowercase letter';
+            } else {
+                requirements.lowercase.style.color = 'var(--text-secondary)';
+                requirements.lowercase.innerHTML = 'One lowercase letter';
+            }
+
+            // Check numbers
+            if (/[0-9]/.test(password)) {
+                strength += 20;
+                requirements.number.style.color = 'var(--success-color)';
+                requirements.number.innerHTML = '✓ One number';
+            } else {
+                requirements.number.style.color = 'var(--text-secondary)';
+                requirements.number.innerHTML = 'One number';
+            }
+
+            // Check special characters
+            if (/[^A-Za-z0-9]/.test(password)) {
+                strength += 20;
+                requirements.special.style.color = 'var(--success-color)';
+                requirements.special.innerHTML = '✓ One special character';
+            } else {
+                requirements.special.style.color = 'var(--text-secondary)';
+                requirements.special.innerHTML = 'One special character';
+            }
+
+            // Update strength bar and text
+            strengthBar.style.width = strength + '%';
+
+            if (strength < 40) {
+                strengthBar.style.backgroundColor = 'var(--danger-color)';
+                strengthText.textContent = 'Weak';
+                strengthText.style.color = 'var(--danger-color)';
+            } else if (strength < 80) {
+                strengthBar.style.backgroundColor = 'var(--binance-yellow)';
+                strengthText.textContent = 'Medium';
+                strengthText.style.color = 'var(--binance-yellow)';
+            } else {
+                strengthBar.style.backgroundColor = 'var(--success-color)';
+                strengthText.textContent = 'Strong';
+                strengthText.style.color = 'var(--success-color)';
+            }
+        });
+    }
+
+    // Form submission loading state
+    const form = document.querySelector('.password-change-form');
+    if (form) {
+        form.addEventListener('submit', function(e) {
+            const submitBtn = this.querySelector('button[type="submit"]');
+            if (submitBtn) {
+                submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Updating...';
+                submitBtn.disabled = true;
+
+                // Re-enable after 5 seconds in case of error
+                setTimeout(() => {
+                    submitBtn.innerHTML = '<i class="fas fa-save"></i> Update Password';
+                    submitBtn.disabled = false;
+                }, 5000);
+            }
+        });
+    }
+});
@@ -0,0 +1,67 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const resetForm = document.getElementById('resetForm');
+    const emailInput = document.getElementById('id_email');
+    const submitBtn = document.getElementById('submitBtn');
+    const submitText = document.getElementById('submitText');
+    const loadingSpinner = document.getElementById('loadingSpinner');
+
+    // Real-time validation
+    function validateField(field) {
+        if (field.value.trim() === '') {
+            field.classList.add('binance-input-error');
+        } else {
+            field.classList.remove('binance-input-error');
+        }
+    }
+
+    // Validate on input
+    if (emailInput) {
+        emailInput.addEventListener('input', function() {
+            validateField(this);
+        });
+    }
+
+    // Form submission handling
+    if (resetForm) {
+        resetForm.addEventListener('submit', function(e) {
+            let isValid = true;
+
+            // Validate email
+            if (!emailInput.value.trim()) {
+                emailInput.classList.add('binance-input-error');
+                isValid = false;
+            }
+
+            if (!isValid) {
+                e.preventDefault();
+                return;
+            }
+
+            // Show loading state
+            submitText.textContent = 'Sending Reset Link...';
+            loadingSpinner.style.display = 'block';
+            submitBtn.disabled = true;
+        });
+    }
+
+    // Clear error styling when user starts typing
+    if (emailInput) {
+        emailInput.addEventListener('input', function() {
+            if (this.value.trim() !== '') {
+                this.classList.remove('binance-input-error');
+            }
+        });
+    }
+
+    // Auto-focus on email input
+    if (emailInput) {
+        setTimeout(() => {
+            emailInput.focus();
+        }, 100);
+    }
+
+    // Handle page load with existing value
+    if (emailInput && emailInput.value.trim() !== '') {
+        emailInput.classList.remove('binance-input-error');
+    }
+});
@@ -0,0 +1,7 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Add email sent animation
+    const emailIcon = document.querySelector('.binance-email-icon');
+    if (emailIcon) {
+        emailIcon.style.animation = 'emailSent 0.6s ease-out';
+    }
+});
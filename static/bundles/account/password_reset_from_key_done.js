@@ -0,0 +1,7 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Add success animation
+    const successIcon = document.querySelector('.binance-success-icon');
+    if (successIcon) {
+        successIcon.style.animation = 'successCheck 0.6s ease-out';
+    }
+});
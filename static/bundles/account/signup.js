@@ -0,0 +1,204 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const signupForm = document.getElementById('signupForm');
+    const usernameInput = document.getElementById('id_username');
+    const emailInput = document.getElementById('id_email');
+    const password1Input = document.getElementById('id_password1');
+    const password2Input = document.getElementById('id_password2');
+    const submitBtn = document.getElementById('submitBtn');
+    const submitText = document.getElementById('submitText');
+    const loadingSpinner = document.getElementById('loadingSpinner');
+    const passwordStrength = document.getElementById('passwordStrength');
+    const strengthFill = document.getElementById('strengthFill');
+    const strengthText = document.getElementById('strengthText');
+    const passwordMatch = document.getElementById('passwordMatch');
+
+    // Password strength checker
+    function checkPasswordStrength(password) {
+        let strength = 0;
+        let feedback = '';
+
+        // Length check
+        if (password.length >= 8) strength += 1;
+        if (password.length >= 12) strength += 1;
+
+        // Character variety checks
+        if (/[a-z]/.test(password)) strength += 1;
+        if (/[A-Z]/.test(password)) strength += 1;
+        if (/[0-9]/.test(password)) strength += 1;
+        if (/[^a-zA-Z0-9]/.test(password)) strength += 1;
+
+        // Determine strength level
+        if (password.length === 0) {
+            return { level: 0, text: '' };
+        } else if (strength <= 2) {
+            return { level: 1, text: 'Weak' };
+        } else if (strength <= 4) {
+            return { level: 2, text: 'Fair' };
+        } else if (strength <= 5) {
+            return { level: 3, text: 'Good' };
+        } else {
+            return { level: 4, text: 'Strong' };
+        }
+    }
+
+    // Update password strength indicator
+    function updatePasswordStrength() {
+        const password = password1Input.value;
+        const strength = checkPasswordStrength(password);
+
+        if (password.length === 0) {
+            passwordStrength.style.display = 'none';
+            return;
+        }
+
+        passwordStrength.style.display = 'block';
+
+        // Update strength bar and text
+        strengthFill.className = 'strength-fill';
+        switch(strength.level) {
+            case 1:
+                strengthFill.classList.add('strength-weak');
+                strengthText.style.color = 'var(--error-color)';
+                break;
+            case 2:
+                strengthFill.classList.add('strength-fair');
+                strengthText.style.color = '#f59e0b';
+                break;
+            case 3:
+                strengthFill.classList.add('strength-good');
+                strengthText.style.color = 'var(--binance-yellow)';
+                break;
+            case 4:
+                strengthFill.classList.add('strength-strong');
+                strengthText.style.color = 'var(--success-color)';
+                break;
+        }
+
+        strengthText.textContent = `Password strength: ${strength.text}`;
+    }
+
+    // Check if passwords match
+    function checkPasswordMatch() {
+        const password1 = password1Input.value;
+        const password2 = password2Input.value;
+
+        if (password2.length === 0) {
+            passwordMatch.style.display = 'none';
+            return;
+        }
+
+        passwordMatch.style.display = 'block';
+
+        if (password1 === password2) {
+            passwordMatch.textContent = 'Passwords match';
+            passwordMatch.style.color = 'var(--success-color)';
+            password2Input.classList.remove('binance-input-error');
+        } else {
+            passwordMatch.textContent = 'Passwords do not match';
+            passwordMatch.style.color = 'var(--error-color)';
+            password2Input.classList.add('binance-input-error');
+        }
+    }
+
+    // Real-time validation
+    function validateField(field) {
+        if (field.value.trim() === '') {
+            field.classList.add('binance-input-error');
+        } else {
+            field.classList.remove('binance-input-error');
+        }
+    }
+
+    // Event listeners
+    if (password1Input) {
+        password1Input.addEventListener('input', function() {
+            validateField(this);
+            updatePasswordStrength();
+            checkPasswordMatch();
+        });
+    }
+
+    if (password2Input) {
+        password2Input.addEventListener('input', function() {
+            validateField(this);
+            checkPasswordMatch();
+        });
+    }
+
+    if (usernameInput) {
+        usernameInput.addEventListener('input', function() {
+            validateField(this);
+        });
+    }
+
+    if (emailInput) {
+        emailInput.addEventListener('input', function() {
+            validateField(this);
+        });
+    }
+
+    // Form submission handling
+    if (signupForm) {
+        signupForm.addEventListener('submit', function(e) {
+            let isValid = true;
+
+            // Validate all fields
+            const fields = [usernameInput, emailInput, password1Input, password2Input];
+            fields.forEach(field => {
+                if (!field.value.trim()) {
+                    field.classList.add('binance-input-error');
+                    isValid = false;
+                }
+            });
+
+            // Check password match
+            if (password1Input.value !== password2Input.value) {
+                password2Input.classList.add('binance-input-error');
+                isValid = false;
+            }
+
+            if (!isValid) {
+                e.preventDefault();
+                return;
+            }
+
+            // Show loading state
+            submitText.textContent = 'Creating Account...';
+            loadingSpinner.style.display = 'block';
+            submitBtn.disabled = true;
+        });
+    }
+
+    // Clear error styling when user starts typing
+    const inputs = document.querySelectorAll('.binance-input');
+    inputs.forEach(input => {
+        input.addEventListener('input', function() {
+            if (this.value.trim() !== '') {
+                this.classList.remove('binance-input-error');
+            }
+        });
+    });
+
+    // Auto-focus on username input
+    if (usernameInput) {
+        setTimeout(() => {
+            usernameInput.focus();
+        }, 100);
+    }
+
+    // Handle page load with existing values
+    if (usernameInput && usernameInput.value.trim() !== '') {
+        usernameInput.classList.remove('binance-input-error');
+    }
+    if (emailInput && emailInput.value.trim() !== '') {
+        emailInput.classList.remove('binance-input-error');
+    }
+    if (password1Input && password1Input.value.trim() !== '') {
+        password1Input.classList.remove('binance-input-error');
+        updatePasswordStrength();
+    }
+    if (password2Input && password2Input.value.trim() !== '') {
+        password2Input.classList.remove('binance-input-error');
+        checkPasswordMatch();
+    }
+});
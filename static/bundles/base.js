@@ -0,0 +1,60 @@
+// Mobile Menu
+const mobileMenuBtn = document.getElementById('mobileMenuBtn');
+const closeMenuBtn = document.getElementById('closeMenuBtn');
+const mobileMenu = document.getElementById('mobileMenu');
+const mobileOverlay = document.getElementById('mobileOverlay');
+
+function toggleMobileMenu() {
+    mobileMenu.classList.toggle('active');
+    mobileOverlay.classList.toggle('active');
+    document.body.style.overflow = mobileMenu.classList.contains('active') ? 'hidden' : '';
+}
+
+mobileMenuBtn.addEventListener('click', toggleMobileMenu);
+closeMenuBtn.addEventListener('click', toggleMobileMenu);
+mobileOverlay.addEventListener('click', toggleMobileMenu);
+
+// User Dropdown
+const userMenuBtn = document.getElementById('userMenuBtn');
+const userMenu = document.getElementById('userMenu');
+
+if (userMenuBtn && userMenu) {
+    userMenuBtn.addEventListener('click', (e) => {
+        e.stopPropagation();
+        userMenu.classList.toggle('active');
+    });
+
+    document.addEventListener('click', (e) => {
+        if (!userMenu.contains(e.target) && !userMenuBtn.contains(e.target)) {
+            userMenu.classList.remove('active');
+        }
+    });
+}
+
+// Back to Top
+window.addEventListener('scroll', () => {
+    const backToTop = document.getElementById('backToTop');
+    if (window.scrollY > 300) {
+        backToTop.classList.add('visible');
+    } else {
+        backToTop.classList.remove('visible');
+    }
+});
+
+document.getElementById('backToTop').addEventListener('click', () => {
+    window.scrollTo({ top: 0, behavior: 'smooth' });
+});
+
+// Close Messages
+document.querySelectorAll('.close-message').forEach(btn => {
+    btn.addEventListener('click', function() {
+        this.closest('.alert').style.display = 'none';
+    });
+});
+
+// Auto-hide messages
+setTimeout(() => {
+    document.querySelectorAll('.alert').forEach(alert => {
+        alert.style.display = 'none';
+    });
+}, 5000);
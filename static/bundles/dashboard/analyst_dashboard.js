@@ -0,0 +1,39 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const series = {
+        monthly: JSON.parse(document.getElementById('monthly-series').textContent),
+        daily: JSON.parse(document.getElementById('daily-series').textContent)
+    };
+
+    const chart = new Chart(document.getElementById('revenueChart'), {
+        type: 'bar',
+        data: { labels: [], datasets: [] },
+        options: {
+            responsive: true,
+            plugins: { legend: { labels: { color: '#B7BDC6' } } },
+            scales: {
+                x: { ticks: { color: '#848E9C' }, grid: { color: '#363B44' } },
+                y: { ticks: { color: '#848E9C' }, grid: { color: '#363B44' }, beginAtZero: true }
+            }
+        }
+    });
+
+    function show(name) {
+        const points = series[name];
+        chart.data.labels = points.map(point => name === 'monthly' ? point.period.slice(0, 7) : point.period.slice(5));
+        chart.data.datasets = [
+            { label: 'Net revenue ($)', data: points.map(point => point.net_revenue), backgroundColor: '#F0B90B' },
+            { label: 'Sales', data: points.map(point => point.sales), backgroundColor: '#03A66D' }
+        ];
+        chart.update();
+    }
+
+    document.querySelectorAll('.chart-toggle button').forEach(button => {
+        button.addEventListener('click', function() {
+            document.querySelectorAll('.chart-toggle button').forEach(other => other.classList.remove('active'));
+            this.classList.add('active');
+            show(this.dataset.series);
+        });
+    });
+
+    show('monthly');
+});
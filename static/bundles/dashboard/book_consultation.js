@@ -0,0 +1,112 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Payment method selection
+    document.querySelectorAll('.payment-option input[type="radio"]').forEach(radio => {
+        radio.addEventListener('change', function() {
+            const packageId = this.name.split('_')[2];
+            const paymentMethod = this.value;
+
+            // Update the hidden payment method field
+            document.getElementById(`payment_method_${packageId}`).value = paymentMethod;
+
+            // Update button text based on payment method
+            const bookButton = document.getElementById(`book_button_${packageId}`);
+            if (bookButton) {
+                if (paymentMethod === 'wallet') {
+                    bookButton.innerHTML = '<i class="fas fa-calendar-check"></i> Book with Wallet';
+                    bookButton.className = bookButton.className.replace('btn-outline', 'btn-primary');
+                } else if (paymentMethod === 'mpesa') {
+                    bookButton.innerHTML = '<i class="fas fa-mobile-alt"></i> Pay with M-Pesa';
+                    bookButton.className = bookButton.className.replace('btn-outline', 'btn-primary');
+                } else if (paymentMethod === 'paypal') {
+                    bookButton.innerHTML = '<i class="fab fa-paypal"></i> Pay with PayPal';
+                    bookButton.className = bookButton.className.replace('btn-outline', 'btn-primary');
+                }
+            }
+        });
+    });
+
+    // Form submission handling
+    document.querySelectorAll('.consultation-booking-form').forEach(form => {
+        form.addEventListener('submit', function(e) {
+            const submitBtn = this.querySelector('button[type="submit"]');
+            const dateInput = this.querySelector('input[type="datetime-local"]');
+            const paymentMethod = this.querySelector('input[name="payment_method"]').value;
+
+            if (dateInput && !dateInput.value) {
+                e.preventDefault();
+                alert('Please select a date and time for your consultation.');
+                dateInput.focus();
+                return;
+            }
+
+            if (submitBtn) {
+                // Update button text based on payment method
+                if (paymentMethod === 'wallet') {
+                    submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Processing with Wallet...';
+                } else if (paymentMethod === 'mpesa') {
+                    submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Redirecting to M-Pesa...';
+                } else if (paymentMethod === 'paypal') {
+                    submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Redirecting to PayPal...';
+                }
+
+                submitBtn.disabled = true;
+            }
+        });
+    });
+
+    // Next available slots per package
+    function loadSlots(container) {
+        const packageId = container.dataset.packageId;
+        const form = container.closest('form');
+        const analystId = form.querySelector('select[name="analyst_id"]').value;
+        const params = new URLSearchParams({package_id: packageId, analyst_id: analystId});
+
+        fetch(`${consultationSlotsUrl}?${params}`)
+            .then(response => response.json())
+            .then(data => {
+                container.innerHTML = '';
+                if (data.status !== 'success' || !data.slots.length) {
+                    container.innerHTML = '<small style="color: var(--text-secondary);">No open slots in the coming weeks</small>';
+                    return;
+                }
+                data.slots.forEach(slot => {
+                    const chip = document.createElement('button');
+                    chip.type = 'button';
+                    chip.className = 'btn btn-outline';
+                    chip.style.cssText = 'padding: 0.25rem 0.5rem; font-size: 0.75rem; border-radius: 1rem;';
+                    chip.textContent = slot.label;
+                    chip.title = slot.analyst_name;
+                    chip.addEventListener('click', () => {
+                        form.querySelector('input[type="datetime-local"]').value = slot.start;
+                    });
+                    container.appendChild(chip);
+                });
+            })
+            .catch(() => { container.innerHTML = ''; });
+    }
+
+    document.querySelectorAll('.available-slots').forEach(loadSlots);
+    document.querySelectorAll('.analyst-select').forEach(select => {
+        select.addEventListener('change', function() {
+            loadSlots(this.closest('form').querySelector('.available-slots'));
+        });
+    });
+
+    // Date validation
+    const dateInputs = document.querySelectorAll('input[type="datetime-local"]');
+    dateInputs.forEach(input => {
+        const now = new Date();
+        const localDateTime = new Date(now.getTime() - now.getTimezoneOffset() * 60000).toISOString().slice(0, 16);
+        input.min = localDateTime;
+
+        input.addEventListener('change', function() {
+            const selectedDate = new Date(this.value);
+            const now = new Date();
+
+            if (selectedDate < now) {
+                alert('Please select a future date and time for your consultation.');
+                this.value = '';
+            }
+        });
+    });
+});
@@ -0,0 +1,1031 @@
+let pollInterval;
+let isAutoScroll = true;
+let mediaRecorder;
+let audioChunks = [];
+let recordingTimer;
+let recordingStartTime;
+let currentReplyTo = null;
+
+// Initialize chat
+document.addEventListener('DOMContentLoaded', function() {
+    console.log('Initializing chat...');
+    initializeChat();
+    setupEventListeners();
+    setupSidebar();
+    setupAttachmentMenu();
+    loadSharedMedia();
+
+    // Initialize hidden elements
+    document.getElementById('replyPreview').style.display = 'none';
+    document.getElementById('voiceRecorder').style.display = 'none';
+    document.getElementById('viewerImage').style.display = 'none';
+    document.getElementById('viewerVideo').style.display = 'none';
+});
+
+function initializeChat() {
+    scrollToBottom();
+    startPolling();
+    updateOnlineStatus();
+
+    setTimeout(() => {
+        loadMessages();
+        loadParticipants();
+    }, 500);
+}
+
+function setupEventListeners() {
+    const messageForm = document.getElementById('messageForm');
+    const messageInput = document.getElementById('messageInput');
+    const messagesContainer = document.getElementById('messagesContainer');
+    const attachButton = document.getElementById('attachButton');
+    const emojiButton = document.getElementById('emojiButton');
+
+    // Form submission
+    messageForm.addEventListener('submit', function(e) {
+        e.preventDefault();
+        sendMessage();
+    });
+
+    // Input events
+    messageInput.addEventListener('input', handleInputChange);
+    messageInput.addEventListener('keydown', handleKeyDown);
+    messageInput.addEventListener('focus', handleInputFocus);
+
+    // Attachment menu
+    attachButton.addEventListener('click', toggleAttachmentMenu);
+    emojiButton.addEventListener('click', toggleEmojiPicker);
+
+    // Scroll events
+    messagesContainer.addEventListener('scroll', handleScroll);
+
+    // Click outside to close menus
+    document.addEventListener('click', function(e) {
+        if (!e.target.closest('.attachment-menu')) {
+            closeAttachmentMenu();
+        }
+        if (!e.target.closest('.emoji-picker-container')) {
+            closeEmojiPicker();
+        }
+    });
+
+    // Handle input change on load
+    handleInputChange();
+}
+
+function setupSidebar() {
+    const sidebarToggle = document.getElementById('sidebarToggle');
+    const closeSidebar = document.getElementById('closeSidebar');
+    const sidebarOverlay = document.getElementById('sidebarOverlay');
+    const chatSidebar = document.getElementById('chatSidebar');
+
+    if (sidebarToggle && closeSidebar && sidebarOverlay && chatSidebar) {
+        sidebarToggle.addEventListener('click', function() {
+            chatSidebar.classList.add('active');
+            sidebarOverlay.classList.add('active');
+        });
+
+        closeSidebar.addEventListener('click', closeSidebarFunc);
+        sidebarOverlay.addEventListener('click', closeSidebarFunc);
+
+        function closeSidebarFunc() {
+            chatSidebar.classList.remove('active');
+            sidebarOverlay.classList.remove('active');
+        }
+    }
+}
+
+function setupAttachmentMenu() {
+    const attachButton = document.getElementById('attachButton');
+    const attachmentOptions = document.getElementById('attachmentOptions');
+
+    if (attachButton && attachmentOptions) {
+        attachButton.addEventListener('click', function(e) {
+            e.stopPropagation();
+            attachmentOptions.classList.toggle('active');
+        });
+    }
+}
+
+function toggleAttachmentMenu() {
+    const options = document.getElementById('attachmentOptions');
+    if (options) {
+        options.classList.toggle('active');
+    }
+}
+
+function closeAttachmentMenu() {
+    const options = document.getElementById('attachmentOptions');
+    if (options) {
+        options.classList.remove('active');
+    }
+}
+
+function openFilePicker(type) {
+    let fileInput;
+
+    if (type === 'image') {
+        fileInput = document.getElementById('imageInput');
+    } else if (type === 'document') {
+        fileInput = document.getElementById('documentInput');
+    }
+
+    if (fileInput) {
+        fileInput.onchange = function(e) {
+            handleFileSelect(e, type);
+        };
+        fileInput.click();
+        closeAttachmentMenu();
+    }
+}
+
+function handleFileSelect(event, type) {
+    const files = event.target.files;
+    if (files.length > 0) {
+        for (let file of files) {
+            uploadFile(file, type);
+        }
+        // Reset file input
+        event.target.value = '';
+    }
+}
+
+function uploadFile(file, messageType) {
+    const formData = new FormData();
+    formData.append('file', file);
+    formData.append('message_type', messageType);
+    formData.append('consultation_id', consultationId);
+
+    if (currentReplyTo) {
+        formData.append('reply_to', currentReplyTo);
+    }
+
+    showNotification(`Uploading ${file.name}...`, 'info');
+
+    // Use a more generic upload endpoint that handles all file types
+    fetch(`/consultation/${consultationId}/chat/upload/`, {
+        method: 'POST',
+        body: formData,
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken')
+        }
+    })
+    .then(response => {
+        if (!response.ok) {
+            throw new Error('Upload failed');
+        }
+        return response.json();
+    })
+    .then(data => {
+        if (data.status === 'success') {
+            showNotification('File uploaded successfully!', 'success');
+            // Force reload messages to show the new file
+            setTimeout(() => {
+                loadMessages();
+                loadSharedMedia();
+            }, 500);
+            cancelReply();
+        } else {
+            throw new Error(data.message || 'Upload failed');
+        }
+    })
+    .catch(error => {
+        console.error('Upload error:', error);
+        showNotification('Upload failed. Please try again.', 'error');
+    });
+}
+
+// Voice Recording Functions
+function startVoiceRecording() {
+    if (!navigator.mediaDevices || !navigator.mediaDevices.getUserMedia) {
+        showNotification('Voice recording not supported in your browser', 'error');
+        return;
+    }
+
+    navigator.mediaDevices.getUserMedia({ audio: true })
+        .then(stream => {
+            try {
+                mediaRecorder = new MediaRecorder(stream);
+                audioChunks = [];
+
+                mediaRecorder.ondataavailable = event => {
+                    audioChunks.push(event.data);
+                };
+
+                mediaRecorder.onstop = () => {
+                    const audioBlob = new Blob(audioChunks, { type: 'audio/webm' });
+                    uploadVoiceMessage(audioBlob);
+                    stream.getTracks().forEach(track => track.stop());
+                };
+
+                mediaRecorder.start();
+                startRecordingTimer();
+                showVoiceRecorderUI();
+                closeAttachmentMenu();
+            } catch (error) {
+                console.error('MediaRecorder error:', error);
+                showNotification('Voice recording not supported', 'error');
+                stream.getTracks().forEach(track => track.stop());
+            }
+        })
+        .catch(error => {
+            console.error('Error accessing microphone:', error);
+            showNotification('Cannot access microphone. Please check permissions.', 'error');
+        });
+}
+
+function stopVoiceRecording() {
+    if (mediaRecorder && mediaRecorder.state === 'recording') {
+        mediaRecorder.stop();
+        stopRecordingTimer();
+        hideVoiceRecorderUI();
+    }
+}
+
+function startRecordingTimer() {
+    recordingStartTime = Date.now();
+    recordingTimer = setInterval(() => {
+        const elapsed = Math.floor((Date.now() - recordingStartTime) / 1000);
+        const minutes = Math.floor(elapsed / 60);
+        const seconds = elapsed % 60;
+        const timerElement = document.querySelector('.recording-timer');
+        if (timerElement) {
+            timerElement.textContent = `${minutes}:${seconds.toString().padStart(2, '0')}`;
+        }
+    }, 1000);
+}
+
+function stopRecordingTimer() {
+    if (recordingTimer) {
+        clearInterval(recordingTimer);
+    }
+}
+
+function showVoiceRecorderUI() {
+    const voiceRecorder = document.getElementById('voiceRecorder');
+    const messageInput = document.getElementById('messageInput');
+    if (voiceRecorder && messageInput) {
+        voiceRecorder.style.display = 'flex';
+        messageInput.style.display = 'none';
+    }
+}
+
+function hideVoiceRecorderUI() {
+    const voiceRecorder = document.getElementById('voiceRecorder');
+    const messageInput = document.getElementById('messageInput');
+    if (voiceRecorder && messageInput) {
+        voiceRecorder.style.display = 'none';
+        messageInput.style.display = 'block';
+    }
+}
+
+function uploadVoiceMessage(audioBlob) {
+    const formData = new FormData();
+    formData.append('audio', audioBlob, `voice-${Date.now()}.webm`);
+    formData.append('message_type', 'voice');
+    formData.append('consultation_id', consultationId);
+
+    if (currentReplyTo) {
+        formData.append('reply_to', currentReplyTo);
+    }
+
+    showNotification('Sending voice message...', 'info');
+
+    fetch(`/consultation/${consultationId}/chat/upload/`, {
+        method: 'POST',
+        body: formData,
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken')
+        }
+    })
+    .then(response => {
+        if (!response.ok) {
+            throw new Error('Upload failed');
+        }
+        return response.json();
+    })
+    .then(data => {
+        if (data.status === 'success') {
+            showNotification('Voice message sent!', 'success');
+            setTimeout(() => {
+                loadMessages();
+                loadSharedMedia();
+            }, 500);
+            cancelReply();
+        } else {
+            throw new Error(data.message || 'Upload failed');
+        }
+    })
+    .catch(error => {
+        console.error('Voice upload error:', error);
+        showNotification('Failed to send voice message', 'error');
+    });
+}
+
+// Emoji Picker Functions
+function toggleEmojiPicker() {
+    const picker = document.getElementById('emojiPicker');
+    if (picker) {
+        picker.remove();
+        return;
+    }
+    openEmojiPicker();
+}
+
+function openEmojiPicker() {
+    const emojis = ['😀', '😂', '🥰', '😎', '🤔', '👋', '🎉', '💯', '❤️', '🔥', '📈', '💰'];
+
+    const picker = document.createElement('div');
+    picker.id = 'emojiPicker';
+    picker.className = 'emoji-picker-container';
+    picker.innerHTML = `
+        <div class="emoji-picker">
+            ${emojis.map(emoji => `
+                <button type="button" class="emoji-option" onclick="insertEmoji('${emoji}')">${emoji}</button>
+            `).join('')}
+        </div>
+    `;
+
+    const inputArea = document.querySelector('.message-input-area');
+    if (inputArea) {
+        inputArea.appendChild(picker);
+        closeAttachmentMenu();
+    }
+}
+
+function closeEmojiPicker() {
+    const picker = document.getElementById('emojiPicker');
+    if (picker) {
+        picker.remove();
+    }
+}
+
+function insertEmoji(emoji) {
+    const input = document.getElementById('messageInput');
+    if (input) {
+        // For emoji-only messages, send immediately
+        sendEmojiMessage(emoji);
+        closeEmojiPicker();
+    }
+}
+
+function sendEmojiMessage(emoji) {
+    const formData = new FormData();
+    formData.append('content', emoji);
+    formData.append('message_type', 'emoji');
+
+    if (currentReplyTo) {
+        formData.append('reply_to', currentReplyTo);
+    }
+
+    fetch(`/consultation/${consultationId}/chat/send/`, {
+        method: 'POST',
+        body: formData,
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken')
+        }
+    })
+    .then(response => {
+        if (!response.ok) throw new Error('Network error');
+        return response.json();
+    })
+    .then(data => {
+        if (data.status === 'success') {
+            setTimeout(() => loadMessages(), 100);
+            cancelReply();
+        } else {
+            throw new Error(data.message || 'Failed to send emoji');
+        }
+    })
+    .catch(error => {
+        console.error('Error sending emoji:', error);
+        showNotification('Failed to send emoji', 'error');
+    });
+}
+
+// Reply Functions
+function replyToMessage(messageId) {
+    const messageElement = document.querySelector(`[data-message-id="${messageId}"]`);
+    if (!messageElement) return;
+
+    const senderName = messageElement.querySelector('.sender-name')?.textContent || 'User';
+    const messageText = messageElement.querySelector('.message-text');
+    const mediaCaption = messageElement.querySelector('.media-caption');
+
+    let messageContent = 'Media message';
+    if (messageText) {
+        messageContent = messageText.textContent;
+    } else if (mediaCaption) {
+        messageContent = mediaCaption.textContent;
+    }
+
+    currentReplyTo = messageId;
+
+    // Show reply preview
+    const replyPreview = document.getElementById('replyPreview');
+    const replyUserName = document.getElementById('replyUserName');
+    const replyPreviewText = document.getElementById('replyPreviewText');
+
+    if (replyPreview && replyUserName && replyPreviewText) {
+        replyUserName.textContent = senderName;
+        replyPreviewText.textContent = messageContent;
+        replyPreview.style.display = 'block';
+    }
+
+    // Scroll to input
+    const messageInput = document.getElementById('messageInput');
+    if (messageInput) {
+        messageInput.focus();
+    }
+}
+
+function cancelReply() {
+    currentReplyTo = null;
+    const replyPreview = document.getElementById('replyPreview');
+    const replyTo = document.getElementById('replyTo');
+
+    if (replyPreview) replyPreview.style.display = 'none';
+    if (replyTo) replyTo.value = '';
+}
+
+// Message Actions
+function deleteMessage(messageId) {
+    if (!confirm('Are you sure you want to delete this message?')) return;
+
+    fetch(`/consultation/${consultationId}/chat/delete/${messageId}/`, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken'),
+            'Content-Type': 'application/json',
+        }
+    })
+    .then(response => {
+        if (!response.ok) throw new Error('Network error');
+        return response.json();
+    })
+    .then(data => {
+        if (data.status === 'success') {
+            showNotification('Message deleted', 'success');
+            const messageElement = document.querySelector(`[data-message-id="${messageId}"]`);
+            if (messageElement) {
+                messageElement.remove();
+            }
+        } else {
+            throw new Error(data.message || 'Delete failed');
+        }
+    })
+    .catch(error => {
+        console.error('Delete error:', error);
+        showNotification('Failed to delete message', 'error');
+    });
+}
+
+// Media Viewer
+function openMediaViewer(url, type) {
+    const viewer = document.getElementById('mediaViewer');
+    const image = document.getElementById('viewerImage');
+    const video = document.getElementById('viewerVideo');
+
+    if (viewer && image && video) {
+        if (type === 'image') {
+            image.src = url;
+            image.style.display = 'block';
+            video.style.display = 'none';
+        } else if (type === 'video') {
+            video.src = url;
+            video.style.display = 'block';
+            image.style.display = 'none';
+        }
+
+        viewer.style.display = 'flex';
+    }
+}
+
+function closeMediaViewer() {
+    const viewer = document.getElementById('mediaViewer');
+    const video = document.getElementById('viewerVideo');
+
+    if (viewer) viewer.style.display = 'none';
+    if (video) {
+        video.pause();
+        video.currentTime = 0;
+    }
+}
+
+function downloadCurrentMedia() {
+    const image = document.getElementById('viewerImage');
+    const video = document.getElementById('viewerVideo');
+
+    let url, filename;
+    if (image.style.display !== 'none') {
+        url = image.src;
+        filename = `image-${Date.now()}.jpg`;
+    } else {
+        url = video.src;
+        filename = `video-${Date.now()}.mp4`;
+    }
+
+    downloadFile(url, filename);
+}
+
+function downloadFile(url, filename) {
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = filename;
+    document.body.appendChild(a);
+    a.click();
+    document.body.removeChild(a);
+}
+
+// Voice Playback
+function toggleVoicePlayback(button) {
+    const voicePlayer = button.closest('.voice-player');
+    const audio = voicePlayer.querySelector('audio');
+    const icon = button.querySelector('i');
+
+    if (audio.paused) {
+        audio.play();
+        icon.className = 'fas fa-pause';
+        voicePlayer.classList.add('playing');
+    } else {
+        audio.pause();
+        icon.className = 'fas fa-play';
+        voicePlayer.classList.remove('playing');
+    }
+
+    audio.onended = function() {
+        icon.className = 'fas fa-play';
+        voicePlayer.classList.remove('playing');
+    };
+}
+
+// Shared Media
+function loadSharedMedia() {
+    fetch(`/consultation/${consultationId}/chat/media/`)
+        .then(response => {
+            if (!response.ok) throw new Error('Network error');
+            return response.json();
+        })
+        .then(data => {
+            if (data.status === 'success') {
+                updateSharedMediaGrid(data.media);
+            }
+        })
+        .catch(error => console.error('Error loading media:', error));
+}
+
+function updateSharedMediaGrid(mediaItems) {
+    const container = document.getElementById('sharedMedia');
+    if (!container) return;
+
+    if (!mediaItems || mediaItems.length === 0) {
+        container.innerHTML = '<div class="no-media">No media shared yet</div>';
+        return;
+    }
+
+    container.innerHTML = mediaItems.slice(0, 6).map(item => `
+        <div class="media-thumbnail" onclick="openMediaViewer('${item.file_url}', '${item.message_type}')">
+            ${item.message_type === 'image' ? 
+                `<img src="${item.file_url}" alt="Shared media">` :
+                item.message_type === 'video' ?
+                `<div class="video-thumbnail">
+                    <i class="fas fa-play"></i>
+                    <img src="${item.thumbnail_url || item.file_url}" alt="Video">
+                </div>` :
+                `<div class="document-thumbnail">
+                    <i class="fas fa-file"></i>
+                </div>`
+            }
+        </div>
+    `).join('');
+
+    if (mediaItems.length > 6) {
+        container.innerHTML += `<div class="media-more">+${mediaItems.length - 6} more</div>`;
+    }
+}
+
+// Clear Chat
+function clearChat() {
+    if (!confirm('Are you sure you want to clear your messages? This action cannot be undone.')) return;
+
+    fetch(`/consultation/${consultationId}/chat/clear/`, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken'),
+            'Content-Type': 'application/json',
+        }
+    })
+    .then(response => {
+        if (!response.ok) throw new Error('Network error');
+        return response.json();
+    })
+    .then(data => {
+        if (data.status === 'success') {
+            showNotification('Chat cleared', 'success');
+            const messagesContainer = document.getElementById('messagesContainer');
+            // Only our own messages are removed; the other side's stay
+            document.querySelectorAll('.message-bubble.sent').forEach(bubble => bubble.remove());
+            if (messagesContainer && !messagesContainer.querySelector('.message-bubble')) {
+                messagesContainer.innerHTML = `
+                    <div class="empty-chat">
+                        <div class="empty-icon">
+                            <i class="fas fa-comments"></i>
+                        </div>
+                        <h3>Start the Conversation</h3>
+                        <p>Send a message to begin your consultation chat</p>
+                    </div>
+                `;
+            }
+        } else {
+            throw new Error(data.message || 'Clear failed');
+        }
+    })
+    .catch(error => {
+        console.error('Clear chat error:', error);
+        showNotification('Failed to clear chat', 'error');
+    });
+}
+
+// Input Handlers
+function handleInputChange() {
+    const input = document.getElementById('messageInput');
+    const sendButton = document.getElementById('sendButton');
+    const charCount = document.getElementById('charCount');
+
+    if (!input || !sendButton || !charCount) return;
+
+    const hasText = input.value.trim().length > 0;
+
+    // Update character count
+    charCount.textContent = input.value.length;
+
+    // Show/hide send button state
+    if (hasText) {
+        sendButton.classList.add('active');
+        sendButton.disabled = false;
+    } else {
+        sendButton.classList.remove('active');
+        sendButton.disabled = true;
+    }
+}
+
+function handleInputFocus() {
+    if (window.innerWidth < 768) {
+        setTimeout(scrollToBottom, 300);
+    }
+}
+
+function handleKeyDown(e) {
+    if (e.key === 'Enter' && !e.shiftKey) {
+        e.preventDefault();
+        sendMessage();
+    }
+}
+
+function handleScroll() {
+    const container = document.getElementById('messagesContainer');
+    if (!container) return;
+
+    const threshold = 100;
+    isAutoScroll = container.scrollHeight - container.clientHeight - container.scrollTop <= threshold;
+}
+
+// Send Message Function
+function sendMessage() {
+    const input = document.getElementById('messageInput');
+    const sendButton = document.getElementById('sendButton');
+
+    if (!input || !sendButton) return;
+
+    const content = input.value.trim();
+
+    if (!content) return;
+
+    const originalHTML = sendButton.innerHTML;
+
+    // Show loading state
+    sendButton.disabled = true;
+    sendButton.innerHTML = '<i class="fas fa-spinner fa-spin"></i>';
+
+    const formData = new FormData();
+    formData.append('content', content);
+    formData.append('message_type', 'text');
+
+    if (currentReplyTo) {
+        formData.append('reply_to', currentReplyTo);
+    }
+
+    fetch(`/consultation/${consultationId}/chat/send/`, {
+        method: 'POST',
+        body: formData,
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken')
+        }
+    })
+    .then(response => {
+        if (!response.ok) throw new Error('Network error');
+        return response.json();
+    })
+    .then(data => {
+        if (data.status === 'success') {
+            input.value = '';
+            handleInputChange();
+            setTimeout(() => loadMessages(), 100);
+            cancelReply();
+        } else {
+            throw new Error(data.message || 'Failed to send message');
+        }
+    })
+    .catch(error => {
+        console.error('Error sending message:', error);
+        showNotification('Failed to send message. Please try again.', 'error');
+    })
+    .finally(() => {
+        sendButton.disabled = false;
+        sendButton.innerHTML = originalHTML;
+        handleInputChange();
+    });
+}
+
+// Utility Functions
+function insertSuggestion(text) {
+    const input = document.getElementById('messageInput');
+    if (!input) return;
+
+    input.value = text;
+    input.focus();
+    handleInputChange();
+}
+
+function scrollToBottom() {
+    const container = document.getElementById('messagesContainer');
+    if (container) {
+        container.scrollTop = container.scrollHeight;
+        isAutoScroll = true;
+    }
+}
+
+function startPolling() {
+    pollInterval = setInterval(() => {
+        loadMessages();
+        loadParticipants();
+    }, 2000);
+
+    setInterval(updateOnlineStatus, 30000);
+}
+
+function loadMessages() {
+    fetch(`/consultation/${consultationId}/chat/messages/?last_message_id=${lastMessageId}`)
+        .then(response => {
+            if (!response.ok) throw new Error('Network error');
+            return response.json();
+        })
+        .then(data => {
+            if (data.status === 'success' && data.messages && data.messages.length > 0) {
+                appendMessages(data.messages);
+                lastMessageId = data.last_message_id;
+
+                if (isAutoScroll) {
+                    setTimeout(scrollToBottom, 100);
+                }
+            }
+        })
+        .catch(error => {
+            console.error('Error loading messages:', error);
+        });
+}
+
+function appendMessages(messages) {
+    const container = document.getElementById('messagesContainer');
+    if (!container) return;
+
+    const emptyState = container.querySelector('.empty-chat');
+
+    if (emptyState && messages.length > 0) {
+        container.innerHTML = '';
+    }
+
+    let hasNewMessages = false;
+    messages.forEach(message => {
+        if (!container.querySelector(`[data-message-id="${message.id}"]`)) {
+            const messageElement = createMessageElement(message);
+            container.appendChild(messageElement);
+            hasNewMessages = true;
+        }
+    });
+
+    if (hasNewMessages && isAutoScroll) {
+        setTimeout(scrollToBottom, 50);
+    }
+}
+
+function createMessageElement(message) {
+    const isOwn = message.is_own_message;
+    const timestamp = new Date(message.timestamp).toLocaleTimeString([], { 
+        hour: '2-digit', minute: '2-digit' 
+    });
+
+    const div = document.createElement('div');
+    div.className = `message-bubble ${isOwn ? 'sent' : 'received'}`;
+    div.setAttribute('data-message-id', message.id);
+
+    let messageContent = '';
+
+    if (message.message_type === 'text') {
+        messageContent = `<div class="message-text">${escapeHtml(message.content)}</div>`;
+    } else if (message.message_type === 'image') {
+        messageContent = `
+            <div class="media-message image-message">
+                <img src="${message.file_url}" alt="Shared image" class="media-preview" onclick="openMediaViewer('${message.file_url}', 'image')">
+                ${message.content ? `<div class="media-caption">${escapeHtml(message.content)}</div>` : ''}
+            </div>
+        `;
+    } else if (message.message_type === 'video') {
+        messageContent = `
+            <div class="media-message video-message">
+                <video controls class="media-preview" onclick="openMediaViewer('${message.file_url}', 'video')">
+                    <source src="${message.file_url}" type="video/mp4">
+                    Your browser does not support the video tag.
+                </video>
+                ${message.content ? `<div class="media-caption">${escapeHtml(message.content)}</div>` : ''}
+            </div>
+        `;
+    } else if (message.message_type === 'document') {
+        messageContent = `
+            <div class="media-message document-message">
+                <div class="document-preview" onclick="downloadFile('${message.file_url}', '${message.file_name}')">
+                    <i class="fas fa-file-pdf document-icon"></i>
+                    <div class="document-info">
+                        <span class="document-name">${escapeHtml(message.file_name)}</span>
+                        <span class="document-size">${message.file_size}</span>
+                    </div>
+                    <i class="fas fa-download download-icon"></i>
+                </div>
+                ${message.content ? `<div class="media-caption">${escapeHtml(message.content)}</div>` : ''}
+            </div>
+        `;
+    } else if (message.message_type === 'voice') {
+        messageContent = `
+            <div class="media-message voice-message">
+                <div class="voice-player">
+                    <button class="play-pause-btn" onclick="toggleVoicePlayback(this)">
+                        <i class="fas fa-play"></i>
+                    </button>
+                    <div class="voice-waveform">
+                        <div class="wave-bar"></div>
+                        <div class="wave-bar"></div>
+                        <div class="wave-bar"></div>
+                        <div class="wave-bar"></div>
+                        <div class="wave-bar"></div>
+                    </div>
+                    <span class="voice-duration">${message.duration}s</span>
+                    <audio src="${message.file_url}" preload="none"></audio>
+                </div>
+            </div>
+        `;
+    } else if (message.message_type === 'emoji') {
+        messageContent = `
+            <div class="emoji-message">
+                <span class="large-emoji">${escapeHtml(message.content)}</span>
+            </div>
+        `;
+    }
+
+    div.innerHTML = `
+        <div class="message-avatar">
+            <div class="avatar ${isOwn ? 'you' : ''}">
+                ${isOwn ? 'Y' : (message.username ? message.username.charAt(0).toUpperCase() : 'U')}
+            </div>
+        </div>
+        <div class="message-content">
+            <div class="message-header">
+                <span class="sender-name">${isOwn ? 'You' : escapeHtml(message.username || 'User')}</span>
+                <span class="message-time">${timestamp}</span>
+            </div>
+            ${messageContent}
+        </div>
+        <div class="message-actions">
+            <button class="action-btn reply-btn" onclick="replyToMessage(${message.id})" title="Reply">
+                <i class="fas fa-reply"></i>
+            </button>
+            ${isOwn ? `
+            <button class="action-btn delete-btn" onclick="deleteMessage(${message.id})" title="Delete">
+                <i class="fas fa-trash"></i>
+            </button>
+            ` : ''}
+        </div>
+    `;
+
+    return div;
+}
+
+function loadParticipants() {
+    fetch(`/consultation/${consultationId}/chat/participants/`)
+        .then(response => {
+            if (!response.ok) throw new Error('Network error');
+            return response.json();
+        })
+        .then(data => {
+            if (data.status === 'success') {
+                updateParticipantsList(data.participants);
+            }
+        })
+        .catch(error => console.error('Error loading participants:', error));
+}
+
+function updateParticipantsList(participants) {
+    const container = document.getElementById('participantsList');
+    const onlineCount = document.getElementById('onlineCount');
+
+    if (!container || !onlineCount) return;
+
+    const otherParticipants = participants ? participants.filter(p => p.user_id !== currentUserId) : [];
+    onlineCount.textContent = otherParticipants.length + 1;
+
+    const existingParticipants = container.querySelectorAll('.participant-item:not(.you)');
+    existingParticipants.forEach(el => el.remove());
+
+    otherParticipants.forEach(participant => {
+        const participantEl = document.createElement('div');
+        participantEl.className = 'participant-item';
+        participantEl.innerHTML = `
+            <div class="participant-avatar">${participant.username ? participant.username.charAt(0).toUpperCase() : 'U'}</div>
+            <div class="participant-info">
+                <span class="participant-name">${escapeHtml(participant.username || 'User')}</span>
+                <span class="participant-status online">Online</span>
+            </div>
+        `;
+        container.appendChild(participantEl);
+    });
+}
+
+function updateOnlineStatus() {
+    fetch(`/consultation/${consultationId}/chat/status/`, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken'),
+            'Content-Type': 'application/json',
+        }
+    }).catch(error => console.error('Error updating status:', error));
+}
+
+function escapeHtml(text) {
+    if (!text) return '';
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+
+function getCookie(name) {
+    const value = `; ${document.cookie}`;
+    const parts = value.split(`; ${name}=`);
+    if (parts.length === 2) return parts.pop().split(';').shift();
+    return '';
+}
+
+function copyToClipboard(text) {
+    navigator.clipboard.writeText(text).then(() => {
+        showNotification('Copied to clipboard!', 'success');
+    }).catch(() => {
+        showNotification('Failed to copy', 'error');
+    });
+}
+
+function showNotification(message, type = 'info') {
+    const notification = document.createElement('div');
+    notification.style.cssText = `
+        position: fixed;
+        top: 20px;
+        right: 20px;
+        background: ${type === 'error' ? '#cf304a' : type === 'success' ? '#03a66d' : '#2b3139'};
+        color: white;
+        padding: 12px 20px;
+        border-radius: 8px;
+        border: 1px solid ${type === 'error' ? '#cf304a' : type === 'success' ? '#03a66d' : '#32353e'};
+        z-index: 10000;
+        font-size: 0.875rem;
+        max-width: 300px;
+        word-wrap: break-word;
+        box-shadow: 0 4px 12px rgba(0,0,0,0.3);
+    `;
+    notification.textContent = message;
+    document.body.appendChild(notification);
+
+    setTimeout(() => {
+        if (document.body.contains(notification)) {
+            document.body.removeChild(notification);
+        }
+    }, 3000);
+}
+
+// Cleanup
+window.addEventListener('beforeunload', () => {
+    if (pollInterval) clearInterval(pollInterval);
+});
+
+// Make functions globally available
+window.scrollToBottom = scrollToBottom;
+window.insertSuggestion = insertSuggestion;
+window.copyToClipboard = copyToClipboard;
+window.openMediaViewer = openMediaViewer;
+window.closeMediaViewer = closeMediaViewer;
+window.downloadFile = downloadFile;
@@ -0,0 +1,76 @@
+// Binance-style dashboard interactions
+document.addEventListener('DOMContentLoaded', function() {
+    console.log('Binance-style dashboard initialized');
+
+    // Add interactive hover effects
+    const interactiveCards = document.querySelectorAll('.stat-item, .action-btn, .insight-card, .purchased-card, .consultation-card');
+    interactiveCards.forEach(card => {
+        card.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-4px)';
+            this.style.boxShadow = '0 8px 25px rgba(240, 185, 11, 0.15)';
+        });
+        card.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0)';
+            this.style.boxShadow = 'none';
+        });
+    });
+
+    // Consultation form validation
+    const consultationForms = document.querySelectorAll('.consultation-booking-form');
+    consultationForms.forEach(form => {
+        const dateInput = form.querySelector('input[type="datetime-local"]');
+        if (dateInput) {
+            // Set minimum date to current date/time
+            const now = new Date();
+            const year = now.getFullYear();
+            const month = String(now.getMonth() + 1).padStart(2, '0');
+            const day = String(now.getDate()).padStart(2, '0');
+            const hours = String(now.getHours()).padStart(2, '0');
+            const minutes = String(now.getMinutes()).padStart(2, '0');
+
+            dateInput.min = `${year}-${month}-${day}T${hours}:${minutes}`;
+
+            // Add validation styling
+            dateInput.addEventListener('change', function() {
+                if (this.value < this.min) {
+                    this.style.borderColor = 'var(--binance-red)';
+                } else {
+                    this.style.borderColor = 'var(--binance-green)';
+                }
+            });
+        }
+    });
+
+    // Real-time stats animation
+    function animateStats() {
+        const stats = document.querySelectorAll('.stat-value');
+        stats.forEach(stat => {
+            const originalValue = stat.textContent;
+            stat.style.transform = 'scale(1.1)';
+            setTimeout(() => {
+                stat.style.transform = 'scale(1)';
+            }, 200);
+        });
+    }
+
+    // Simulate periodic updates (every 30 seconds)
+    setInterval(animateStats, 30000);
+
+    // Add loading states for buttons
+    const buttons = document.querySelectorAll('.btn');
+    buttons.forEach(button => {
+        button.addEventListener('click', function(e) {
+            if (!this.disabled) {
+                const originalText = this.innerHTML;
+                this.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Loading...';
+                this.disabled = true;
+
+                // Revert after 2 seconds for demo
+                setTimeout(() => {
+                    this.innerHTML = originalText;
+                    this.disabled = false;
+                }, 2000);
+            }
+        });
+    });
+});
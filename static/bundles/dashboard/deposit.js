@@ -0,0 +1,119 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const amountInput = document.getElementById('id_amount');
+    const paymentMethodInput = document.getElementById('id_payment_method');
+    const paymentMethodCards = document.querySelectorAll('.payment-method-card');
+    const mpesaInfo = document.getElementById('mpesaInfo');
+    const paypalInfo = document.getElementById('paypalInfo');
+    const kesConversion = document.getElementById('kesConversion');
+    const kesAmount = document.getElementById('kesAmount');
+    const depositForm = document.getElementById('depositForm');
+    const submitBtn = document.getElementById('submitBtn');
+    const submitText = document.getElementById('submitText');
+    const loadingSpinner = document.getElementById('loadingSpinner');
+
+    // Payment method selection
+    paymentMethodCards.forEach(card => {
+        card.addEventListener('click', function() {
+            const method = this.dataset.method;
+
+            // Remove active class from all cards
+            paymentMethodCards.forEach(c => c.classList.remove('active'));
+
+            // Add active class to clicked card
+            this.classList.add('active');
+
+            // Update hidden input
+            paymentMethodInput.value = method;
+
+            // Show/hide info cards
+            mpesaInfo.style.display = method === 'mpesa' ? 'block' : 'none';
+            paypalInfo.style.display = method === 'paypal' ? 'block' : 'none';
+
+            // Enable/disable submit button based on payment method setup
+            updateSubmitButtonState();
+        });
+    });
+
+    // Update KES conversion when amount changes
+    amountInput.addEventListener('input', function() {
+        const usdAmount = parseFloat(this.value) || 0;
+        const kesValue = (usdAmount * USD_TO_KES_RATE).toFixed(2);
+
+        if (usdAmount > 0) {
+            kesAmount.textContent = kesValue;
+            kesConversion.style.display = 'block';
+        } else {
+            kesConversion.style.display = 'none';
+        }
+
+        updateSubmitButtonState();
+    });
+
+    // Update submit button state
+    function updateSubmitButtonState() {
+        const amount = parseFloat(amountInput.value) || 0;
+        const paymentMethod = paymentMethodInput.value;
+        const hasMpesa = walletMpesaNumber !== '';
+        const hasPaypal = walletPaypalEmail !== '';
+
+        let isValid = amount >= 1 && paymentMethod !== '';
+
+        if (paymentMethod === 'mpesa' && !hasMpesa) {
+            isValid = false;
+        }
+
+        if (paymentMethod === 'paypal' && !hasPaypal) {
+            isValid = false;
+        }
+
+        submitBtn.disabled = !isValid;
+    }
+
+    // Handle form submission
+    depositForm.addEventListener('submit', function(e) {
+        const amount = parseFloat(amountInput.value);
+        const paymentMethod = paymentMethodInput.value;
+
+        if (!amount || amount < 1) {
+            e.preventDefault();
+            return;
+        }
+
+        if (!paymentMethod) {
+            e.preventDefault();
+            return;
+        }
+
+        // Show loading state
+        submitText.textContent = 'Processing...';
+        loadingSpinner.style.display = 'block';
+        submitBtn.disabled = true;
+
+        // For PayPal, handle redirect
+        if (paymentMethod === 'paypal') {
+            e.preventDefault();
+
+            const paypalForm = document.createElement('form');
+            paypalForm.method = 'POST';
+            paypalForm.action = paypalDepositUrl;
+
+            const csrfInput = document.createElement('input');
+            csrfInput.type = 'hidden';
+            csrfInput.name = 'csrfmiddlewaretoken';
+            csrfInput.value = csrfToken;
+            paypalForm.appendChild(csrfInput);
+
+            const amountInput = document.createElement('input');
+            amountInput.type = 'hidden';
+            amountInput.name = 'amount';
+            amountInput.value = amount;
+            paypalForm.appendChild(amountInput);
+
+            document.body.appendChild(paypalForm);
+            paypalForm.submit();
+        }
+    });
+
+    // Initialize button state
+    updateSubmitButtonState();
+});
@@ -0,0 +1,95 @@
+// Simple interactivity for the analysis page
+document.addEventListener('DOMContentLoaded', function() {
+    console.log(`Analysis page loaded for analysis #${analysisId}`);
+
+    // Function to show notifications
+    function showNotification(message, type) {
+        // Remove existing notifications
+        const existingNotifications = document.querySelectorAll('.analysis-notification');
+        existingNotifications.forEach(notification => notification.remove());
+
+        // Create new notification
+        const notification = document.createElement('div');
+        notification.className = `analysis-notification`;
+        notification.style.cssText = `
+            position: fixed;
+            top: 100px;
+            right: 20px;
+            background: ${type === 'success' ? 'rgba(3, 166, 109, 0.9)' : 
+                         type === 'error' ? 'rgba(207, 48, 74, 0.9)' : 
+                         'rgba(240, 185, 11, 0.9)'};
+            color: #000000;
+            padding: 1rem 1.5rem;
+            border-radius: 4px;
+            font-weight: 500;
+            font-size: 0.9rem;
+            z-index: 1000;
+            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.3);
+            max-width: 300px;
+        `;
+        notification.textContent = message;
+
+        document.body.appendChild(notification);
+
+        // Auto remove after 3 seconds
+        setTimeout(() => {
+            if (notification.parentNode) {
+                notification.parentNode.removeChild(notification);
+            }
+        }, 3000);
+    }
+
+    // Download handler
+    window.handleDownload = function() {
+        showNotification('Preparing your PDF report for download...', 'success');
+        // Simulate download preparation
+        setTimeout(() => {
+            showNotification('PDF download feature would be implemented here', 'info');
+        }, 2000);
+    };
+
+    // Refresh handler
+    window.refreshAnalysis = function() {
+        showNotification('Refreshing analysis data...', 'info');
+        // Simulate data refresh
+        setTimeout(() => {
+            showNotification('Analysis data updated!', 'success');
+        }, 1500);
+    };
+
+    // Share analysis function
+    window.shareAnalysis = function() {
+        const shareUrl = window.location.href;
+        const shareText = `Check out this ${analysisName} analysis on CryptoConsult`;
+
+        if (navigator.share) {
+            navigator.share({
+                title: `${analysisName} Analysis`,
+                text: shareText,
+                url: shareUrl,
+            })
+            .then(() => showNotification('Analysis shared successfully!', 'success'))
+            .catch(error => showNotification('Sharing failed', 'error'));
+        } else {
+            // Fallback: copy to clipboard
+            navigator.clipboard.writeText(shareUrl).then(() => {
+                showNotification('Link copied to clipboard!', 'success');
+            }).catch(() => {
+                // Final fallback: show URL
+                showNotification('Share this URL: ' + shareUrl, 'info');
+            });
+        }
+    };
+
+    // Add hover effects to cards
+    const cards = document.querySelectorAll('.card');
+    cards.forEach(card => {
+        card.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-2px)';
+        });
+
+        card.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0)';
+        });
+    });
+});
@@ -0,0 +1,19 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Add active states to filter buttons
+    const filterSelects = document.querySelectorAll('.filter-select');
+    filterSelects.forEach(select => {
+        select.addEventListener('change', function() {
+            this.style.borderColor = '#f0b90b';
+        });
+    });
+
+    // Quick filter chips (optional enhancement)
+    const filterChips = document.querySelectorAll('.filter-chip');
+    filterChips.forEach(chip => {
+        chip.addEventListener('click', function() {
+            const filterType = this.dataset.filterType;
+            const filterValue = this.dataset.filterValue;
+            // Implement quick filter logic here
+        });
+    });
+});
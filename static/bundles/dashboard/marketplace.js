@@ -0,0 +1,773 @@
+// Global variables
+let currentAnalysisId = null;
+let purchaseInProgress = false;
+let currentPaymentMethod = 'wallet';
+let mpesaPollingInterval = null;
+let isOnline = true;
+
+// Initialize the application
+document.addEventListener('DOMContentLoaded', function() {
+    console.log('Crypto Analysis Marketplace initialized');
+    initializeApp();
+    bindEventListeners();
+    initializeFilters();
+});
+
+function initializeApp() {
+    // Update UI with real data
+    updateUserInterface();
+}
+
+function updateUserInterface() {
+    // Balances are already set from Django template
+    console.log('User interface initialized with real data');
+}
+
+function initializeFilters() {
+    // Set current filter values from URL parameters
+    const urlParams = new URLSearchParams(window.location.search);
+    const typeFilter = document.getElementById('analysisTypeFilter');
+    if (typeFilter && urlParams.get('type')) {
+        typeFilter.value = urlParams.get('type');
+        filterAnalysesByType(typeFilter.value);
+    }
+}
+
+// Enhanced purchase modal for crypto analyses
+async function openPurchaseModal(analysisId) {
+    if (purchaseInProgress) {
+        return;
+    }
+
+    if (!isAuthenticated) {
+        window.location.href = urls.login;
+        return;
+    }
+
+    const modal = document.getElementById('purchaseModal');
+    const content = document.getElementById('purchaseModalContent');
+
+    currentAnalysisId = analysisId;
+    currentPaymentMethod = 'wallet';
+
+    // Show loading state
+    content.innerHTML = showLoading();
+    modal.style.display = 'flex';
+    document.body.style.overflow = 'hidden';
+
+    try {
+        // Fetch analysis details from server
+        const response = await fetch(`/api/analysis/${analysisId}/`);
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        const analysis = await response.json();
+
+        // Show enhanced purchase options
+        content.innerHTML = `
+            <div style="text-align: center; margin-bottom: 1.5rem;">
+                <div style="width: 60px; height: 60px; border-radius: 8px; background: linear-gradient(135deg, #017AFF, #0263CC); display: flex; align-items: center; justify-content: center; margin: 0 auto 1rem; font-weight: bold; color: #ffffff; font-size: 1.5rem;">
+                    <i class="fas fa-chart-line"></i>
+                </div>
+                <h3 style="color: #eaecef; font-size: 1.1rem; margin-bottom: 0.5rem;">${analysis.cryptocurrency} Analysis</h3>
+                <p style="color: #848e9c; font-size: 0.8rem;">${analysis.description}</p>
+            </div>
+
+            <div style="background: var(--binance-dark); border-radius: 8px; padding: 1rem; margin-bottom: 1.5rem;">
+                <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 0.5rem;">
+                    <span style="color: #848e9c;">Price:</span>
+                    <span style="color: var(--binance-yellow); font-weight: 600; font-size: 1.1rem;">$${analysis.price}</span>
+                </div>
+                <div style="display: flex; justify-content: space-between; align-items: center;">
+                    <span style="color: #848e9c;">Your Balance:</span>
+                    <span style="color: ${userCredit >= analysis.price ? '#03a66d' : '#cf304a'}; font-weight: 600;">$${userCredit.toFixed(2)}</span>
+                </div>
+            </div>
+
+            <!-- Analysis Details -->
+            <div style="background: var(--binance-dark); border-radius: 8px; padding: 1rem; margin-bottom: 1.5rem;">
+                <h4 style="color: #eaecef; margin-bottom: 0.75rem; font-size: 0.9rem;">Report Details:</h4>
+                <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 0.5rem; font-size: 0.8rem;">
+                    <div style="color: #848e9c;">Type:</div>
+                    <div style="color: #eaecef;">${analysis.analysis_type_display}</div>
+                    <div style="color: #848e9c;">Risk Level:</div>
+                    <div style="color: #eaecef;">${analysis.risk_level_display}</div>
+                    <div style="color: #848e9c;">Recommendation:</div>
+                    <div style="color: #eaecef;">${analysis.recommendation_display}</div>
+                    <div style="color: #848e9c;">Timeframe:</div>
+                    <div style="color: #eaecef;">${analysis.timeframe_display}</div>
+                </div>
+            </div>
+
+            <!-- Payment Method -->
+            <div class="payment-method-section">
+                <div class="payment-method-tabs">
+                    <div class="payment-tab active" data-method="wallet" onclick="switchPaymentMethod('wallet')">
+                        <div class="payment-method-icon">
+                            <i class="fas fa-wallet"></i>
+                        </div>
+                        <div>Wallet</div>
+                    </div>
+                    <div class="payment-tab" data-method="mpesa" onclick="switchPaymentMethod('mpesa')">
+                        <div class="payment-method-icon">
+                            <i class="fas fa-mobile-alt"></i>
+                        </div>
+                        <div>M-Pesa</div>
+                    </div>
+                </div>
+
+                <!-- Wallet Payment -->
+                <div id="walletPayment" class="payment-tab-content active">
+                    <div class="wallet-payment-info">
+                        <div class="wallet-balance">$${userCredit.toFixed(2)}</div>
+                        <div style="color: #848e9c; font-size: 0.875rem;">Available Balance</div>
+                    </div>
+
+                    ${userCredit >= parseFloat(analysis.price) ? `
+                        <button onclick="processWalletPayment(${analysis.id}, ${analysis.price})" class="btn-payment btn-wallet">
+                            <i class="fas fa-bolt"></i> Purchase Report - $${analysis.price}
+                        </button>
+                    ` : `
+                        <div class="error-message">
+                            <i class="fas fa-exclamation-triangle"></i> Insufficient wallet balance
+                        </div>
+                        <a href="${urls.deposit}" class="btn-payment" style="background: #03a66d; color: white; text-decoration: none;">
+                            <i class="fas fa-wallet"></i> Add Funds to Wallet
+                        </a>
+                    `}
+                </div>
+
+                <!-- M-Pesa Payment -->
+                <div id="mpesaPayment" class="payment-tab-content">
+                    <div class="mpesa-instructions">
+                        <h4 style="color: #007bff; margin-bottom: 1rem;">M-Pesa Payment Instructions</h4>
+                        <ul class="mpesa-steps">
+                            <li>Enter your M-Pesa registered phone number</li>
+                            <li>You will receive an STK push on your phone</li>
+                            <li>Enter your M-Pesa PIN when prompted</li>
+                            <li>Analysis will be available immediately after payment</li>
+                        </ul>
+                    </div>
+
+                    <form id="mpesaForm" onsubmit="processMpesaPayment(event, ${analysis.id}, ${analysis.price})">
+                        <div class="payment-form-group">
+                            <label class="payment-form-label">M-Pesa Phone Number</label>
+                            <div class="phone-input-group">
+                                <div class="phone-prefix">+254</div>
+                                <input type="tel" 
+                                       name="phone_number" 
+                                       value="${walletMpesaNumber}" 
+                                       required 
+                                       placeholder="712345678"
+                                       class="payment-form-input"
+                                       pattern="[0-9]{9}"
+                                       maxlength="9"
+                                       inputmode="numeric">
+                            </div>
+                            <div style="color: #64748b; font-size: 0.75rem; margin-top: 0.25rem;">
+                                Format: 7XXXXXXXX (without country code)
+                            </div>
+                        </div>
+
+                        <button type="submit" class="btn-payment btn-mpesa" id="mpesaSubmitBtn">
+                            <i class="fas fa-mobile-alt"></i> Pay with M-Pesa - $${analysis.price}
+                        </button>
+                    </form>
+                </div>
+            </div>
+        `;
+
+    } catch (error) {
+        console.error('Error loading purchase modal:', error);
+        content.innerHTML = `
+            <div style="text-align: center;">
+                <div class="error-message">
+                    <i class="fas fa-exclamation-triangle"></i> Failed to load analysis details
+                </div>
+                <div class="error-details">
+                    <strong>Error details:</strong><br>
+                    ${error.message}
+                </div>
+                <button onclick="closePurchaseModal()" class="btn btn-outline" style="margin-top: 1rem;">
+                    Close
+                </button>
+            </div>
+        `;
+    }
+}
+
+// Enhanced M-Pesa payment processing with better error handling
+async function processMpesaPayment(event, analysisId, price) {
+    event.preventDefault();
+
+    if (purchaseInProgress) {
+        showPurchaseError('Another purchase is already in progress. Please wait.');
+        return;
+    }
+
+    purchaseInProgress = true;
+
+    const form = event.target;
+    const phoneInput = form.phone_number;
+    const submitBtn = document.getElementById('mpesaSubmitBtn');
+    const phoneNumber = phoneInput.value.trim();
+
+    // Enhanced phone number validation
+    if (!phoneNumber) {
+        showPurchaseError('Please enter your M-Pesa phone number');
+        purchaseInProgress = false;
+        return;
+    }
+
+    if (!/^[0-9]{9}$/.test(phoneNumber)) {
+        showPurchaseError('Please enter a valid 9-digit M-Pesa phone number (without country code)');
+        purchaseInProgress = false;
+        return;
+    }
+
+    // Validate phone number starts with 7
+    if (!/^7/.test(phoneNumber)) {
+        showPurchaseError('M-Pesa phone number must start with 7 (e.g., 712345678)');
+        purchaseInProgress = false;
+        return;
+    }
+
+    // Disable submit button and show processing state
+    if (submitBtn) {
+        submitBtn.disabled = true;
+        submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Processing...';
+    }
+
+    showProcessingState(analysisId);
+    closePurchaseModal();
+
+    try {
+        const response = await fetch(urls.purchaseMpesa, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/x-www-form-urlencoded',
+                'X-Requested-With': 'XMLHttpRequest',
+                'X-CSRFToken': getCSRFToken()
+            },
+            body: new URLSearchParams({
+                'analysis_id': analysisId,
+                'phone_number': phoneNumber,
+                'amount': price
+            })
+        });
+
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        const result = await response.json();
+        console.log('M-Pesa Response:', result);
+
+        if (result.status === 'success') {
+            // Show M-Pesa pending state
+            showMpesaPending(analysisId, result);
+
+            // Start polling for payment status
+            pollMpesaPaymentStatus(result.checkout_request_id, analysisId);
+
+        } else if (result.status === 'already_purchased') {
+            showPurchaseError(result.message);
+            setTimeout(() => {
+                window.location.href = result.redirect_url;
+            }, 2000);
+        } else {
+            // Enhanced error handling with specific messages
+            let errorMessage = result.message || 'Payment initiation failed. Please try again.';
+
+            // Provide user-friendly error messages based on error codes
+            if (result.error_code) {
+                switch(result.error_code) {
+                    case '1032':
+                        errorMessage = 'Payment request cancelled by user. Please try again.';
+                        break;
+                    case '1037':
+                        errorMessage = 'Transaction timed out. Please try again.';
+                        break;
+                    case '1031':
+                        errorMessage = 'Insufficient M-Pesa balance. Please check your balance and try again.';
+                        break;
+                    case '1':
+                        errorMessage = 'M-Pesa service temporarily unavailable. Please try again in a few minutes.';
+                        break;
+                    default:
+                        errorMessage = `M-Pesa Error: ${errorMessage}`;
+                }
+            }
+
+            showPurchaseError(errorMessage);
+        }
+
+    } catch (error) {
+        console.error('M-Pesa payment error:', error);
+
+        // More specific error messages based on error type
+        if (error.name === 'TypeError' && error.message.includes('fetch')) {
+            showPurchaseError('Network error. Please check your internet connection and try again.');
+        } else if (error.name === 'SyntaxError') {
+            showPurchaseError('Invalid response from server. Please try again.');
+        } else if (error.message.includes('HTTP error')) {
+            showPurchaseError('Server error. Please try again in a few moments.');
+        } else {
+            showPurchaseError('Payment processing failed. Please try again or use wallet payment.');
+        }
+    } finally {
+        purchaseInProgress = false;
+
+        // Re-enable submit button
+        if (submitBtn) {
+            submitBtn.disabled = false;
+            submitBtn.innerHTML = '<i class="fas fa-mobile-alt"></i> Pay with M-Pesa - $' + price;
+        }
+    }
+}
+
+// Enhanced M-Pesa payment status polling with retry logic
+async function pollMpesaPaymentStatus(checkoutRequestId, analysisId) {
+    const maxAttempts = 36; // 3 minutes at 5-second intervals
+    let attempts = 0;
+
+    // Clear any existing interval
+    if (mpesaPollingInterval) {
+        clearInterval(mpesaPollingInterval);
+    }
+
+    const poll = async () => {
+        attempts++;
+
+        try {
+            const response = await fetch(`/check-mpesa-status/${checkoutRequestId}/`);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+
+            const result = await response.json();
+            console.log(`Polling attempt ${attempts}:`, result);
+
+            if (result.status === 'success') {
+                // Payment successful
+                clearInterval(mpesaPollingInterval);
+                closePendingModal();
+                showPurchaseSuccess(analysisId, result);
+
+                // Update user credit if returned
+                if (result.new_balance) {
+                    userCredit = parseFloat(result.new_balance);
+                    document.getElementById('creditBalanceText').textContent = userCredit.toFixed(2);
+                }
+
+                setTimeout(() => {
+                    window.location.href = `/view-analysis/${analysisId}/`;
+                }, 2500);
+
+            } else if (result.status === 'failed' || result.status === 'cancelled') {
+                // Payment failed or was cancelled
+                clearInterval(mpesaPollingInterval);
+                closePendingModal();
+                showPurchaseError(result.message || 'Payment failed. Please try again.');
+
+            } else if (attempts >= maxAttempts) {
+                // Timeout
+                clearInterval(mpesaPollingInterval);
+                closePendingModal();
+                showPurchaseError('Payment timeout. Please check your M-Pesa transactions or try again.');
+            }
+            // If status is still pending, continue polling
+
+        } catch (error) {
+            console.error('Polling error:', error);
+
+            if (attempts >= maxAttempts) {
+                clearInterval(mpesaPollingInterval);
+                closePendingModal();
+                showPurchaseError('Unable to verify payment status. Please check your M-Pesa transactions.');
+            }
+        }
+    };
+
+    // Start polling immediately and then every 5 seconds
+    mpesaPollingInterval = setInterval(poll, 5000);
+    poll(); // Initial call
+}
+
+// Enhanced M-Pesa pending modal
+function showMpesaPending(analysisId, result) {
+    const pendingModal = document.createElement('div');
+    pendingModal.className = 'modal mpesa-pending-modal';
+    pendingModal.style.display = 'flex';
+    pendingModal.innerHTML = `
+        <div class="modal-content" style="max-width: 400px;">
+            <div style="text-align: center; padding: 2rem;">
+                <div style="color: #007bff; font-size: 3rem; margin-bottom: 1rem;">
+                    <i class="fas fa-mobile-alt"></i>
+                </div>
+                <h3 style="color: #007bff; margin-bottom: 1rem;">Check Your Phone</h3>
+                <p style="color: #848e9c; margin-bottom: 1.5rem; line-height: 1.5;">
+                    We've sent an M-Pesa STK push to your phone.<br>
+                    Please check your phone and enter your M-Pesa PIN to complete the payment.
+                </p>
+
+                <div style="background: var(--binance-dark); border-radius: 8px; padding: 1rem; margin-bottom: 1.5rem;">
+                    <div style="font-size: 0.8rem; color: #848e9c; margin-bottom: 0.5rem;">Transaction Reference:</div>
+                    <div style="font-family: monospace; font-size: 0.9rem; color: #eaecef; word-break: break-all;">
+                        ${result.checkout_request_id || 'N/A'}
+                    </div>
+                </div>
+
+                <div class="processing-spinner" style="margin: 0 auto 1rem; width: 40px; height: 40px; border: 3px solid #f3f3f3; border-top: 3px solid #007bff; border-radius: 50%; animation: spin 1s linear infinite;"></div>
+                <div style="color: #848e9c; font-size: 0.9rem; margin-bottom: 0.5rem;">
+                    Waiting for payment confirmation...
+                </div>
+                <div style="color: #64748b; font-size: 0.8rem;">
+                    This may take up to 3 minutes
+                </div>
+
+                <button onclick="cancelMpesaPayment()" class="btn btn-outline" style="margin-top: 1.5rem; width: 100%;">
+                    <i class="fas fa-times"></i> Cancel Payment
+                </button>
+            </div>
+        </div>
+    `;
+
+    document.body.appendChild(pendingModal);
+    document.body.style.overflow = 'hidden';
+
+    // Store reference for closing
+    window.currentPendingModal = pendingModal;
+}
+
+// Cancel M-Pesa payment
+function cancelMpesaPayment() {
+    // Clear polling interval
+    if (mpesaPollingInterval) {
+        clearInterval(mpesaPollingInterval);
+        mpesaPollingInterval = null;
+    }
+
+    closePendingModal();
+    showPurchaseError('Payment cancelled. You can try again anytime.');
+}
+
+// Enhanced close pending modal
+function closePendingModal() {
+    if (window.currentPendingModal) {
+        window.currentPendingModal.remove();
+        window.currentPendingModal = null;
+    }
+
+    // Clear polling interval
+    if (mpesaPollingInterval) {
+        clearInterval(mpesaPollingInterval);
+        mpesaPollingInterval = null;
+    }
+
+    document.body.style.overflow = '';
+}
+
+// Show analysis details
+async function showAnalysisDetails(analysisId) {
+    const modal = document.getElementById('analysisDetailsModal');
+    const content = document.getElementById('analysisDetailsContent');
+
+    // Show loading state
+    content.innerHTML = showLoading('Loading Analysis Details', 'Please wait...');
+    modal.style.display = 'flex';
+    document.body.style.overflow = 'hidden';
+
+    try {
+        // Fetch analysis details from server
+        const response = await fetch(`/api/analysis/${analysisId}/`);
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        const analysis = await response.json();
+
+        content.innerHTML = `
+            <div style="text-align: center; margin-bottom: 1.5rem;">
+                <div style="width: 60px; height: 60px; border-radius: 8px; background: linear-gradient(135deg, #017AFF, #0263CC); display: flex; align-items: center; justify-content: center; margin: 0 auto 1rem; font-weight: bold; color: #ffffff; font-size: 1.5rem;">
+                    <i class="fas fa-chart-line"></i>
+                </div>
+                <h3 style="color: #eaecef; font-size: 1.1rem; margin-bottom: 0.5rem;">${analysis.cryptocurrency} Analysis</h3>
+            </div>
+
+            <div style="background: var(--binance-dark); border-radius: 8px; padding: 1.5rem; margin-bottom: 1.5rem;">
+                <h4 style="color: #eaecef; margin-bottom: 1rem; font-size: 1rem;">Report Overview</h4>
+                <p style="color: #848e9c; font-size: 0.9rem; line-height: 1.5; margin-bottom: 1rem;">
+                    ${analysis.description}
+                </p>
+
+                <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem; font-size: 0.8rem;">
+                    <div>
+                        <div style="color: #848e9c;">Analysis Type</div>
+                        <div style="color: #eaecef; font-weight: 600;">${analysis.analysis_type_display}</div>
+                    </div>
+                    <div>
+                        <div style="color: #848e9c;">Risk Level</div>
+                        <div style="color: #eaecef;">${analysis.risk_level_display}</div>
+                    </div>
+                    <div>
+                        <div style="color: #848e9c;">Recommendation</div>
+                        <div style="color: #eaecef;">${analysis.recommendation_display}</div>
+                    </div>
+                    <div>
+                        <div style="color: #848e9c;">Timeframe</div>
+                        <div style="color: #eaecef;">${analysis.timeframe_display}</div>
+                    </div>
+                    <div>
+                        <div style="color: #848e9c;">Overall Score</div>
+                        <div style="color: #03a66d; font-weight: 600; font-size: 1rem;">${analysis.overall_score}/10</div>
+                    </div>
+                    <div>
+                        <div style="color: #848e9c;">Call Return</div>
+                        <div style="color: #10b981; font-weight: 600;">${analysis.growth_potential || 'Not yet scored'}</div>
+                    </div>
+                </div>
+            </div>
+
+            <div style="background: var(--binance-dark); border-radius: 8px; padding: 1.5rem; margin-bottom: 1.5rem;">
+                <h4 style="color: #eaecef; margin-bottom: 1rem; font-size: 1rem;">What's Included</h4>
+                <ul style="color: #848e9c; font-size: 0.9rem; padding-left: 1rem;">
+                    ${analysis.features_list.map(feature => `<li style="margin-bottom: 0.5rem;">${feature}</li>`).join('')}
+                </ul>
+            </div>
+
+            ${analysis.id in purchasedAnalysisIds ? `
+                <a href="/view-analysis/${analysis.id}/" class="btn btn-primary" style="width: 100%;">
+                    <i class="fas fa-eye"></i> View Full Report
+                </a>
+            ` : `
+                <button onclick="openPurchaseModal(${analysis.id})" class="btn btn-primary" style="width: 100%;">
+                    <i class="fas fa-shopping-cart"></i> Purchase Report - $${analysis.price}
+                </button>
+            `}
+        `;
+
+    } catch (error) {
+        console.error('Error loading analysis details:', error);
+        content.innerHTML = `
+            <div style="text-align: center;">
+                <div class="error-message">
+                    <i class="fas fa-exclamation-triangle"></i> Failed to load analysis details
+                </div>
+                <div class="error-details">
+                    <strong>Error details:</strong><br>
+                    ${error.message}
+                </div>
+                <button onclick="closeAnalysisDetailsModal()" class="btn btn-outline" style="margin-top: 1rem;">
+                    Close
+                </button>
+            </div>
+        `;
+    }
+}
+
+// Switch between payment methods
+function switchPaymentMethod(method) {
+    currentPaymentMethod = method;
+
+    // Update tabs
+    document.querySelectorAll('.payment-tab').forEach(tab => {
+        tab.classList.remove('active');
+    });
+    document.querySelector(`.payment-tab[data-method="${method}"]`).classList.add('active');
+
+    // Update content
+    document.querySelectorAll('.payment-tab-content').forEach(content => {
+        content.classList.remove('active');
+    });
+    document.getElementById(`${method}Payment`).classList.add('active');
+}
+
+// Process wallet payment
+async function processWalletPayment(analysisId, price) {
+    if (purchaseInProgress) return;
+
+    purchaseInProgress = true;
+    showProcessingState(analysisId);
+    closePurchaseModal();
+
+    try {
+        const response = await fetch(urls.instantPurchase, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/x-www-form-urlencoded',
+                'X-Requested-With': 'XMLHttpRequest',
+                'X-CSRFToken': getCSRFToken()
+            },
+            body: `analysis_id=${analysisId}`
+        });
+
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        const result = await response.json();
+
+        if (result.status === 'success') {
+            // Update UI
+            userCredit = parseFloat(result.new_balance);
+            document.getElementById('creditBalanceText').textContent = userCredit.toFixed(2);
+
+            showPurchaseSuccess(analysisId, result);
+
+            // Reload the page after a delay to show updated purchase status
+            setTimeout(() => {
+                window.location.reload();
+            }, 2000);
+
+        } else if (result.status === 'already_purchased') {
+            showPurchaseError('You already own this analysis.');
+            setTimeout(() => {
+                window.location.href = result.redirect_url;
+            }, 1500);
+        } else {
+            showPurchaseError(result.message);
+        }
+
+    } catch (error) {
+        console.error('Wallet payment error:', error);
+        showPurchaseError('Network error. Please try again.');
+    } finally {
+        purchaseInProgress = false;
+    }
+}
+
+// Modal management functions
+function closePurchaseModal() {
+    document.getElementById('purchaseModal').style.display = 'none';
+    document.body.style.overflow = '';
+    currentAnalysisId = null;
+    currentPaymentMethod = 'wallet';
+}
+
+function closeAnalysisDetailsModal() {
+    document.getElementById('analysisDetailsModal').style.display = 'none';
+    document.body.style.overflow = '';
+}
+
+function closeStatusModal() {
+    document.getElementById('statusModal').style.display = 'none';
+}
+
+// Utility functions
+function showLoading(title = 'Loading', message = 'Please wait...') {
+    return `
+        <div style="text-align: center; padding: 2rem;">
+            <div class="loading" style="margin: 0 auto 1rem;"></div>
+            <h3 style="color: var(--text-primary); margin-bottom: 0.5rem;">${title}</h3>
+            <p style="color: var(--text-secondary);">${message}</p>
+        </div>
+    `;
+}
+
+function showError(message) {
+    return `
+        <div class="error-message">
+            <i class="fas fa-exclamation-triangle"></i> ${message}
+        </div>
+    `;
+}
+
+function showPurchaseSuccess(analysisId, result) {
+    document.getElementById('statusModalIcon').innerHTML = '<i class="fas fa-check-circle" style="color: var(--binance-green);"></i>';
+    document.getElementById('statusModalTitle').textContent = 'Purchase Successful!';
+    document.getElementById('statusModalMessage').textContent = result.message || 'Analysis purchased successfully! You can now access the full report.';
+    document.getElementById('statusModal').style.display = 'flex';
+}
+
+function showPurchaseError(message) {
+    document.getElementById('statusModalIcon').innerHTML = '<i class="fas fa-exclamation-triangle" style="color: var(--binance-red);"></i>';
+    document.getElementById('statusModalTitle').textContent = 'Purchase Failed';
+    document.getElementById('statusModalMessage').textContent = message;
+    document.getElementById('statusModal').style.display = 'flex';
+}
+
+function showProcessingState(analysisId) {
+    // You can implement a more sophisticated processing overlay here
+    console.log('Processing purchase for analysis:', analysisId);
+}
+
+// Get CSRF Token
+function getCSRFToken() {
+    const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]');
+    return csrfToken ? csrfToken.value : '';
+}
+
+// Event listeners
+function bindEventListeners() {
+    // Refresh button
+    document.getElementById('refreshBtn').addEventListener('click', function() {
+        window.location.reload();
+    });
+
+    // Search functionality
+    document.getElementById('searchBtn').addEventListener('click', function() {
+        performSearch();
+    });
+
+    document.getElementById('searchInput').addEventListener('keypress', function(e) {
+        if (e.key === 'Enter') {
+            performSearch();
+        }
+    });
+
+    // Analysis type filter
+    document.getElementById('analysisTypeFilter').addEventListener('change', function() {
+        performSearch();
+    });
+
+    document.getElementById('sortFilter').addEventListener('change', function() {
+        performSearch();
+    });
+}
+
+function performSearch() {
+    const searchTerm = document.getElementById('searchInput').value;
+    const analysisType = document.getElementById('analysisTypeFilter').value;
+
+    let url = `${urls.marketplace}?`;
+    const params = [];
+
+    if (searchTerm) {
+        params.push(`search=${encodeURIComponent(searchTerm)}`);
+    }
+
+    if (analysisType && analysisType !== 'all') {
+        params.push(`type=${encodeURIComponent(analysisType)}`);
+    }
+
+    const sort = document.getElementById('sortFilter').value;
+    if (sort && sort !== 'performance') {
+        params.push(`sort=${encodeURIComponent(sort)}`);
+    }
+
+    if (params.length > 0) {
+        url += params.join('&');
+    }
+
+    window.location.href = url;
+}
+
+function clearFilters() {
+    window.location.href = urls.marketplace;
+}
+
+function filterAnalysesByType(type) {
+    const analysisCards = document.querySelectorAll('.package-card');
+
+    analysisCards.forEach(card => {
+        if (type === 'all' || card.dataset.type === type) {
+            card.style.display = 'block';
+        } else {
+            card.style.display = 'none';
+        }
+    });
+
+    // Update count
+    const visibleCount = document.querySelectorAll('.package-card[style="display: block"]').length;
+    document.getElementById('analysesCount').textContent = visibleCount;
+}
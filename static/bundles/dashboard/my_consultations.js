@@ -0,0 +1,377 @@
+// Your existing JavaScript code remains the same
+document.addEventListener('DOMContentLoaded', function() {
+    // Tab functionality
+    const tabBtns = document.querySelectorAll('.tab-btn');
+    const tabContents = document.querySelectorAll('.tab-content');
+
+    tabBtns.forEach(btn => {
+        btn.addEventListener('click', function() {
+            const tabName = this.getAttribute('data-tab');
+
+            // Update active tab button
+            tabBtns.forEach(b => b.classList.remove('active'));
+            this.classList.add('active');
+
+            // Update active tab content
+            tabContents.forEach(content => content.classList.remove('active'));
+            document.getElementById(`${tabName}-tab`).classList.add('active');
+        });
+    });
+
+    // Row expansion functionality
+    document.querySelectorAll('.consultation-row .row-main').forEach(row => {
+        row.addEventListener('click', function(e) {
+            // Don't expand if clicking on buttons
+            if (e.target.closest('button') || e.target.closest('a')) {
+                return;
+            }
+
+            const consultationRow = this.closest('.consultation-row');
+            consultationRow.classList.toggle('expanded');
+        });
+    });
+
+    // Countdown functionality
+    function updateCountdowns() {
+        const countdowns = document.querySelectorAll('.countdown');
+
+        countdowns.forEach(countdown => {
+            const targetDate = new Date(countdown.getAttribute('data-date'));
+            const now = new Date();
+            const diff = targetDate - now;
+
+            if (diff <= 0) {
+                countdown.textContent = 'Session started';
+                countdown.style.color = '#03a66d';
+                return;
+            }
+
+            const days = Math.floor(diff / (1000 * 60 * 60 * 24));
+            const hours = Math.floor((diff % (1000 * 60 * 60 * 24)) / (1000 * 60 * 60));
+            const minutes = Math.floor((diff % (1000 * 60 * 60)) / (1000 * 60));
+
+            if (days > 0) {
+                countdown.textContent = `${days}d ${hours}h ${minutes}m`;
+            } else if (hours > 0) {
+                countdown.textContent = `${hours}h ${minutes}m`;
+            } else {
+                countdown.textContent = `${minutes}m`;
+                countdown.style.color = '#cf304a';
+            }
+        });
+
+        // Update main countdown timer
+        const mainCountdown = document.getElementById('mainCountdown');
+        if (mainCountdown) {
+            const targetDate = new Date(mainCountdown.getAttribute('data-date'));
+            const now = new Date();
+            const diff = targetDate - now;
+
+            if (diff > 0) {
+                const days = Math.floor(diff / (1000 * 60 * 60 * 24));
+                const hours = Math.floor((diff % (1000 * 60 * 60 * 24)) / (1000 * 60 * 60));
+                const minutes = Math.floor((diff % (1000 * 60 * 60)) / (1000 * 60));
+
+                document.getElementById('countdown-days').textContent = days.toString().padStart(2, '0');
+                document.getElementById('countdown-hours').textContent = hours.toString().padStart(2, '0');
+                document.getElementById('countdown-minutes').textContent = minutes.toString().padStart(2, '0');
+            }
+        }
+    }
+
+    // Update countdowns every minute
+    setInterval(updateCountdowns, 60000);
+    updateCountdowns();
+
+    // Modal functionality
+    const modals = {
+        reschedule: document.getElementById('rescheduleModal'),
+        cancel: document.getElementById('cancelModal'),
+        rating: document.getElementById('ratingModal')
+    };
+
+    function openModal(modalName, consultationId) {
+        modals[modalName].classList.add('active');
+        document.getElementById(modalName + 'ConsultationId').value = consultationId;
+        document.body.style.overflow = 'hidden';
+    }
+
+    function closeModal(modalName) {
+        modals[modalName].classList.remove('active');
+        document.body.style.overflow = '';
+    }
+
+    // Reschedule buttons
+    document.querySelectorAll('.reschedule-btn').forEach(btn => {
+        btn.addEventListener('click', function(e) {
+            e.stopPropagation();
+            const consultationId = this.getAttribute('data-consultation-id');
+            openModal('reschedule', consultationId);
+        });
+    });
+
+    // Cancel buttons
+    document.querySelectorAll('.cancel-btn').forEach(btn => {
+        btn.addEventListener('click', function(e) {
+            e.stopPropagation();
+            const consultationId = this.getAttribute('data-consultation-id');
+            openModal('cancel', consultationId);
+        });
+    });
+
+    // Rate buttons
+    document.querySelectorAll('.rate-btn').forEach(btn => {
+        btn.addEventListener('click', function(e) {
+            e.stopPropagation();
+            const consultationId = this.getAttribute('data-consultation-id');
+            openModal('rating', consultationId);
+        });
+    });
+
+    // Request refund buttons
+    document.querySelectorAll('.request-refund-btn').forEach(btn => {
+        btn.addEventListener('click', function(e) {
+            e.stopPropagation();
+            const consultationId = this.getAttribute('data-consultation-id');
+            if (confirm('Are you sure you want to request a refund for this consultation?')) {
+                // AJAX call to request refund
+                fetch(`/consultation/${consultationId}/refund/`, {
+                    method: 'POST',
+                    headers: {
+                        'X-CSRFToken': getCookie('csrftoken'),
+                        'Content-Type': 'application/json',
+                    }
+                })
+                .then(response => response.json())
+                .then(data => {
+                    if (data.status === 'success') {
+                        alert('Refund request submitted successfully!');
+                        location.reload();
+                    } else {
+                        alert('Failed to submit refund request: ' + data.message);
+                    }
+                })
+                .catch(error => {
+                    console.error('Error:', error);
+                    alert('An error occurred while submitting refund request.');
+                });
+            }
+        });
+    });
+
+    // Copy meeting link
+    document.querySelectorAll('.copy-link-btn').forEach(btn => {
+        btn.addEventListener('click', function(e) {
+            e.stopPropagation();
+            const link = this.getAttribute('data-link');
+            navigator.clipboard.writeText(link).then(() => {
+                const originalText = this.innerHTML;
+                this.innerHTML = '<i class="fas fa-check"></i> Copied!';
+                setTimeout(() => {
+                    this.innerHTML = originalText;
+                }, 2000);
+            }).catch(() => {
+                alert('Failed to copy link. Please copy it manually.');
+            });
+        });
+    });
+
+    // Star rating in modal
+    document.querySelectorAll('.rating-star-large').forEach(star => {
+        star.addEventListener('click', function() {
+            const rating = this.getAttribute('data-rating');
+            const stars = this.parentElement.querySelectorAll('.rating-star-large');
+
+            stars.forEach((s, index) => {
+                if (index < rating) {
+                    s.classList.remove('far');
+                    s.classList.add('fas', 'active');
+                } else {
+                    s.classList.remove('fas', 'active');
+                    s.classList.add('far');
+                }
+            });
+
+            this.closest('.modal-body').setAttribute('data-current-rating', rating);
+        });
+    });
+
+    // Modal close functionality
+    document.querySelectorAll('.modal-close, #cancelReschedule, #dontCancel, #cancelRating').forEach(btn => {
+        btn.addEventListener('click', function() {
+            const modal = this.closest('.modal');
+            if (modal) {
+                modal.classList.remove('active');
+                document.body.style.overflow = '';
+            }
+        });
+    });
+
+    // Close modal on overlay click
+    document.querySelectorAll('.modal').forEach(modal => {
+        modal.addEventListener('click', function(e) {
+            if (e.target === this) {
+                this.classList.remove('active');
+                document.body.style.overflow = '';
+            }
+        });
+    });
+
+    // Form submissions
+    document.getElementById('confirmReschedule').addEventListener('click', function() {
+        const consultationId = document.getElementById('rescheduleConsultationId').value;
+        const newDate = document.getElementById('newDate').value;
+        const reason = document.getElementById('rescheduleReason').value;
+
+        if (!newDate) {
+            alert('Please select a new date and time.');
+            return;
+        }
+
+        // AJAX call to reschedule
+        fetch(`/consultation/${consultationId}/reschedule/`, {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': getCookie('csrftoken'),
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                new_date: newDate,
+                reason: reason
+            })
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.status === 'success') {
+                alert('Reschedule request submitted successfully!');
+                closeModal('reschedule');
+                location.reload();
+            } else {
+                alert('Failed to reschedule: ' + data.message);
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            alert('An error occurred while rescheduling.');
+        });
+    });
+
+    document.getElementById('confirmCancel').addEventListener('click', function() {
+        const consultationId = document.getElementById('cancelConsultationId').value;
+        const reason = document.getElementById('cancelReason').value;
+        const details = document.getElementById('cancelDetails').value;
+        const requestRefund = document.getElementById('requestRefund').checked;
+
+        if (!reason) {
+            alert('Please select a cancellation reason.');
+            return;
+        }
+
+        // AJAX call to cancel
+        fetch(`/consultation/${consultationId}/cancel/`, {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': getCookie('csrftoken'),
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                reason: reason,
+                details: details,
+                request_refund: requestRefund
+            })
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.status === 'success') {
+                alert('Consultation cancelled successfully!');
+                closeModal('cancel');
+                location.reload();
+            } else {
+                alert('Failed to cancel: ' + data.message);
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            alert('An error occurred while cancelling.');
+        });
+    });
+
+    document.getElementById('submitRating').addEventListener('click', function() {
+        const consultationId = document.getElementById('ratingConsultationId').value;
+        const rating = document.querySelector('.modal-body').getAttribute('data-current-rating');
+        const feedback = document.getElementById('ratingFeedback').value;
+
+        if (!rating) {
+            alert('Please select a rating.');
+            return;
+        }
+
+        // AJAX call to submit rating
+        fetch(`/consultation/${consultationId}/rate/`, {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': getCookie('csrftoken'),
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                rating: rating,
+                feedback: feedback
+            })
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.status === 'success') {
+                alert('Rating submitted successfully!');
+                closeModal('rating');
+                location.reload();
+            } else {
+                alert('Failed to submit rating: ' + data.message);
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            alert('An error occurred while submitting rating.');
+        });
+    });
+
+    // Checklist functionality
+    document.querySelectorAll('.checklist-checkbox').forEach(checkbox => {
+        checkbox.addEventListener('change', function(e) {
+            e.stopPropagation();
+            const consultationId = this.closest('.consultation-row').dataset.consultationId;
+            const itemIndex = Array.from(this.closest('.checklist').children).indexOf(this.closest('.checklist-item'));
+
+            // Save checklist progress
+            const key = `consultation_checklist_${consultationId}`;
+            let progress = JSON.parse(localStorage.getItem(key)) || {};
+            progress[itemIndex] = this.checked;
+            localStorage.setItem(key, JSON.stringify(progress));
+        });
+
+        // Load saved checklist progress
+        const consultationId = checkbox.closest('.consultation-row').dataset.consultationId;
+        const itemIndex = Array.from(checkbox.closest('.checklist').children).indexOf(checkbox.closest('.checklist-item'));
+        const key = `consultation_checklist_${consultationId}`;
+        const progress = JSON.parse(localStorage.getItem(key)) || {};
+
+        if (progress[itemIndex]) {
+            checkbox.checked = true;
+        }
+    });
+
+    // Utility function to get CSRF token
+    function getCookie(name) {
+        let cookieValue = null;
+        if (document.cookie && document.cookie !== '') {
+            const cookies = document.cookie.split(';');
+            for (let i = 0; i < cookies.length; i++) {
+                const cookie = cookies[i].trim();
+                if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                    cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                    break;
+                }
+            }
+        }
+        return cookieValue;
+    }
+});
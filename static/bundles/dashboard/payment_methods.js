@@ -0,0 +1,89 @@
+// Add interactivity to the payment method selection
+document.addEventListener('DOMContentLoaded', function() {
+    // Function to update visual selection
+    function updateSelection() {
+        const mpesaCard = document.querySelector('label[for="preferred_method_mpesa"] > div');
+        const paypalCard = document.querySelector('label[for="preferred_method_paypal"] > div');
+
+        // Reset both cards
+        mpesaCard.style.borderColor = 'rgba(255, 255, 255, 0.2)';
+        mpesaCard.style.background = 'rgba(255, 255, 255, 0.05)';
+        paypalCard.style.borderColor = 'rgba(255, 255, 255, 0.2)';
+        paypalCard.style.background = 'rgba(255, 255, 255, 0.05)';
+
+        // Apply active styles based on checked radio
+        const checkedRadio = document.querySelector('input[name="preferred_payment_method"]:checked');
+        if (checkedRadio) {
+            if (checkedRadio.value === 'mpesa') {
+                mpesaCard.style.borderColor = '#00B300';
+                mpesaCard.style.background = 'rgba(0, 179, 0, 0.1)';
+            } else if (checkedRadio.value === 'paypal') {
+                paypalCard.style.borderColor = '#0070BA';
+                paypalCard.style.background = 'rgba(0, 112, 186, 0.1)';
+            }
+        }
+    }
+
+    // Add click event listeners to both cards
+    document.querySelectorAll('input[name="preferred_payment_method"]').forEach(radio => {
+        radio.addEventListener('change', updateSelection);
+    });
+
+    // Add click event to labels for better UX
+    document.querySelectorAll('label[for^="preferred_method_"]').forEach(label => {
+        label.addEventListener('click', function(e) {
+            // Prevent double triggering
+            e.stopPropagation();
+        });
+    });
+
+    // Initialize selection on page load
+    updateSelection();
+
+    // Form validation - ensure a payment method is selected before submit
+    const form = document.querySelector('form');
+    form.addEventListener('submit', function(e) {
+        const preferredMethod = document.querySelector('input[name="preferred_payment_method"]:checked');
+        if (!preferredMethod) {
+            e.preventDefault();
+            // Show error message
+            const errorDiv = document.createElement('div');
+            errorDiv.style.cssText = 'padding: 1rem; border-radius: 0.5rem; background: rgba(239, 68, 68, 0.1); border: 1px solid rgba(239, 68, 68, 0.5); color: #fca5a5; margin-bottom: 1.5rem;';
+            errorDiv.innerHTML = '<strong>Please select a preferred payment method.</strong>';
+
+            const existingError = document.querySelector('div[style*="background: rgba(239, 68, 68, 0.1)"]');
+            if (existingError) {
+                existingError.parentNode.insertBefore(errorDiv, existingError.nextSibling);
+            } else {
+                const form = document.querySelector('form');
+                form.insertBefore(errorDiv, form.firstChild);
+            }
+
+            // Scroll to error
+            errorDiv.scrollIntoView({ behavior: 'smooth', block: 'center' });
+        }
+    });
+
+    // Phone number formatting for M-Pesa
+    const mpesaInput = document.getElementById('id_mpesa_number');
+    if (mpesaInput) {
+        mpesaInput.addEventListener('input', function(e) {
+            let value = e.target.value.replace(/\D/g, '');
+
+            // Remove leading 0 if present and add 254
+            if (value.startsWith('0')) {
+                value = '254' + value.substring(1);
+            }
+            // If it starts with 7 and is 9 digits, add 254
+            else if (value.startsWith('7') && value.length === 9) {
+                value = '254' + value;
+            }
+            // If it starts with 254 and is 12 digits, keep it
+            else if (value.startsWith('254') && value.length === 12) {
+                // Already formatted correctly
+            }
+
+            e.target.value = value;
+        });
+    }
+});
@@ -0,0 +1,298 @@
+document.addEventListener('DOMContentLoaded', function() {
+    console.log('Portfolio page initialized');
+
+    // Animate progress bars
+    const progressBars = document.querySelectorAll('.progress-fill');
+    progressBars.forEach(bar => {
+        const width = bar.style.width;
+        bar.style.width = '0%';
+        setTimeout(() => {
+            bar.style.width = width;
+        }, 500);
+    });
+
+    // Add hover effects to table rows
+    const tableRows = document.querySelectorAll('.portfolio-table tbody tr');
+    tableRows.forEach(row => {
+        row.addEventListener('mouseenter', function() {
+            this.style.backgroundColor = 'rgba(255, 255, 255, 0.02)';
+        });
+
+        row.addEventListener('mouseleave', function() {
+            this.style.backgroundColor = '';
+        });
+    });
+
+    // Analysis filtering
+    const analysisFilter = document.getElementById('analysisFilter');
+    if (analysisFilter) {
+        analysisFilter.addEventListener('change', function() {
+            const filterValue = this.value;
+            const rows = document.querySelectorAll('.analysis-row');
+
+            rows.forEach(row => {
+                let showRow = false;
+
+                switch(filterValue) {
+                    case 'all':
+                        showRow = true;
+                        break;
+                    case 'active':
+                        showRow = row.getAttribute('data-status') === 'active';
+                        break;
+                    case 'completed':
+                        showRow = row.getAttribute('data-status') === 'expired';
+                        break;
+                    case 'recent':
+                        const purchaseDate = new Date(row.getAttribute('data-date'));
+                        const sevenDaysAgo = new Date();
+                        sevenDaysAgo.setDate(sevenDaysAgo.getDate() - 7);
+                        showRow = purchaseDate >= sevenDaysAgo;
+                        break;
+                }
+
+                row.style.display = showRow ? '' : 'none';
+            });
+        });
+    }
+
+    // Time period selector
+    const timePeriod = document.getElementById('timePeriod');
+    if (timePeriod) {
+        timePeriod.addEventListener('change', function() {
+            const days = parseInt(this.value);
+            console.log('Time period changed to:', days, 'days');
+
+            // Show loading state
+            const chartContainer = document.querySelector('.chart-container');
+            const originalContent = chartContainer.innerHTML;
+
+            chartContainer.innerHTML = `
+                <div class="placeholder-chart">
+                    <i class="fas fa-spinner fa-spin"></i>
+                    <h3>Loading Data...</h3>
+                    <p>Updating portfolio metrics for the last ${days} days</p>
+                </div>
+            `;
+
+            // Simulate data loading
+            setTimeout(() => {
+                updateChartData(days);
+            }, 1000);
+        });
+    }
+
+    // Export report functionality
+    const exportBtn = document.getElementById('exportReport');
+    if (exportBtn) {
+        exportBtn.addEventListener('click', function() {
+            const originalHTML = this.innerHTML;
+            this.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Generating...';
+            this.disabled = true;
+
+            // Simulate report generation
+            setTimeout(() => {
+                this.innerHTML = originalHTML;
+                this.disabled = false;
+
+                // Create and download a simple CSV report
+                const csvContent = generateCSVReport();
+                downloadCSV(csvContent, 'portfolio-report.csv');
+
+                showNotification('Portfolio report downloaded successfully!', 'success');
+            }, 2000);
+        });
+    }
+
+    // Performance view buttons
+    const performanceButtons = document.querySelectorAll('.view-performance');
+    performanceButtons.forEach(button => {
+        button.addEventListener('click', function() {
+            const analysisId = this.getAttribute('data-analysis-id');
+            const analysisName = this.getAttribute('data-analysis-name');
+
+            showPerformanceModal(analysisId, analysisName);
+        });
+    });
+
+    // Utility functions
+    function updateChartData(days) {
+        const chartContainer = document.querySelector('.chart-container');
+
+        // Update metrics based on time period (simulated)
+        const growthFactor = days === 7 ? 1.02 : days === 30 ? 1.08 : days === 90 ? 1.15 : 1.25;
+
+        // Update chart display
+        chartContainer.innerHTML = `
+            <div class="placeholder-chart">
+                <i class="fas fa-chart-line"></i>
+                <h3>Portfolio Performance (Last ${days} Days)</h3>
+                <p>Estimated growth: +${Math.round((growthFactor - 1) * 100)}%</p>
+                <div style="margin-top: 1rem; font-size: 0.875rem; color: var(--binance-green);">
+                    <i class="fas fa-chart-bar"></i> ${portfolioData.totalAnalyses} analyses tracked
+                </div>
+            </div>
+        `;
+
+        showNotification(`Portfolio data updated for last ${days} days`, 'info');
+    }
+
+    function generateCSVReport() {
+        const headers = ['Cryptocurrency', 'Symbol', 'Purchase Price', 'Status', 'Rating'];
+        let csv = headers.join(',') + '\n';
+
+        const rows = document.querySelectorAll('.analysis-row');
+        rows.forEach(row => {
+            const cryptoName = row.querySelector('.crypto-info h4').textContent;
+            const symbol = row.querySelector('.crypto-info span').textContent;
+            const price = row.querySelector('.table-price').textContent.replace('$', '');
+            const status = row.querySelector('.status-badge').textContent.trim();
+            const rating = row.querySelector('.table-rating span:last-child').textContent;
+
+            csv += `"${cryptoName}","${symbol}",${price},"${status}","${rating}"\n`;
+        });
+
+        return csv;
+    }
+
+    function downloadCSV(content, filename) {
+        const blob = new Blob([content], { type: 'text/csv' });
+        const url = window.URL.createObjectURL(blob);
+        const a = document.createElement('a');
+        a.href = url;
+        a.download = filename;
+        document.body.appendChild(a);
+        a.click();
+        document.body.removeChild(a);
+        window.URL.revokeObjectURL(url);
+    }
+
+    function showPerformanceModal(analysisId, cryptoName) {
+        // Create modal overlay
+        const modal = document.createElement('div');
+        modal.style.cssText = `
+            position: fixed;
+            top: 0;
+            left: 0;
+            width: 100%;
+            height: 100%;
+            background: rgba(0, 0, 0, 0.8);
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            z-index: 10000;
+            backdrop-filter: blur(5px);
+        `;
+
+        modal.innerHTML = `
+            <div style="background: var(--binance-card); border: 1px solid var(--binance-border); border-radius: 1rem; padding: 2rem; max-width: 500px; width: 90%; max-height: 80vh; overflow-y: auto;">
+                <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1.5rem;">
+                    <h3 style="color: var(--text-primary); margin: 0;">Performance: ${cryptoName}</h3>
+                    <button class="close-modal" style="background: none; border: none; color: var(--text-secondary); cursor: pointer; font-size: 1.5rem;">&times;</button>
+                </div>
+                <div style="color: var(--text-secondary); margin-bottom: 1.5rem;">
+                    <p>Detailed performance metrics and analytics for ${cryptoName} analysis.</p>
+                    <div style="background: var(--binance-dark); padding: 1rem; border-radius: 0.5rem; margin: 1rem 0;">
+                        <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem;">
+                            <div>
+                                <div style="color: var(--text-primary); font-weight: 600;">ROI Estimate</div>
+                                <div style="color: var(--binance-green);">+15.3%</div>
+                            </div>
+                            <div>
+                                <div style="color: var(--text-primary); font-weight: 600;">Win Rate</div>
+                                <div style="color: var(--binance-green);">87%</div>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+                <div style="display: flex; gap: 1rem; justify-content: flex-end;">
+                    <button class="btn btn-secondary close-modal">Close</button>
+                    <a href="/analysis/${analysisId}/" class="btn btn-primary">View Full Analysis</a>
+                </div>
+            </div>
+        `;
+
+        document.body.appendChild(modal);
+
+        // Close modal handlers
+        const closeButtons = modal.querySelectorAll('.close-modal');
+        closeButtons.forEach(btn => {
+            btn.addEventListener('click', () => {
+                document.body.removeChild(modal);
+            });
+        });
+
+        // Close on background click
+        modal.addEventListener('click', (e) => {
+            if (e.target === modal) {
+                document.body.removeChild(modal);
+            }
+        });
+    }
+
+    function showNotification(message, type = 'info') {
+        // Create notification element
+        const notification = document.createElement('div');
+        notification.className = `alert alert-${type}`;
+        notification.style.cssText = `
+            position: fixed;
+            top: 100px;
+            right: 20px;
+            z-index: 1000;
+            max-width: 300px;
+            animation: slideInRight 0.3s ease-out;
+            background: var(--binance-card);
+            border: 1px solid var(--binance-border);
+            border-radius: 0.5rem;
+            padding: 1rem;
+            color: var(--text-primary);
+            box-shadow: 0 10px 25px rgba(0, 0, 0, 0.3);
+        `;
+        notification.innerHTML = `
+            <div style="display: flex; align-items: center; justify-content: space-between;">
+                <div style="display: flex; align-items: center; gap: 0.5rem;">
+                    <i class="fas fa-${type === 'success' ? 'check-circle' : type === 'error' ? 'exclamation-circle' : 'info-circle'}" 
+                       style="color: ${type === 'success' ? 'var(--binance-green)' : type === 'error' ? 'var(--binance-red)' : 'var(--binance-blue)'};"></i>
+                    <span>${message}</span>
+                </div>
+                <button class="close-notification" style="background: none; border: none; color: var(--text-secondary); cursor: pointer; margin-left: 1rem;">
+                    <i class="fas fa-times"></i>
+                </button>
+            </div>
+        `;
+
+        document.body.appendChild(notification);
+
+        // Auto-remove after 5 seconds
+        setTimeout(() => {
+            if (notification.parentNode) {
+                notification.style.opacity = '0';
+                notification.style.transform = 'translateX(100%)';
+                setTimeout(() => notification.remove(), 300);
+            }
+        }, 5000);
+
+        // Close button functionality
+        notification.querySelector('.close-notification').addEventListener('click', function() {
+            notification.style.opacity = '0';
+            notification.style.transform = 'translateX(100%)';
+            setTimeout(() => notification.remove(), 300);
+        });
+    }
+
+    // Add CSS for animations
+    const style = document.createElement('style');
+    style.textContent = `
+        @keyframes slideInRight {
+            from {
+                transform: translateX(100%);
+                opacity: 0;
+            }
+            to {
+                transform: translateX(0);
+                opacity: 1;
+            }
+        }
+    `;
+    document.head.appendChild(style);
+});
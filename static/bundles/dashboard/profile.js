@@ -0,0 +1,147 @@
+// Mobile Menu Functionality
+const mobileMenuBtn = document.getElementById('mobileMenuBtn');
+const closeMenuBtn = document.getElementById('closeMenuBtn');
+const mobileMenu = document.getElementById('mobileMenu');
+const mobileOverlay = document.getElementById('mobileOverlay');
+
+function toggleMobileMenu() {
+    mobileMenu.classList.toggle('active');
+    mobileOverlay.classList.toggle('active');
+    document.body.style.overflow = mobileMenu.classList.contains('active') ? 'hidden' : '';
+}
+
+mobileMenuBtn.addEventListener('click', toggleMobileMenu);
+closeMenuBtn.addEventListener('click', toggleMobileMenu);
+mobileOverlay.addEventListener('click', toggleMobileMenu);
+
+// User Dropdown Functionality
+const userMenuBtn = document.getElementById('userMenuBtn');
+const userMenu = document.getElementById('userMenu');
+
+if (userMenuBtn && userMenu) {
+    userMenuBtn.addEventListener('click', (e) => {
+        e.stopPropagation();
+        userMenu.classList.toggle('active');
+    });
+
+    document.addEventListener('click', (e) => {
+        if (!userMenu.contains(e.target) && !userMenuBtn.contains(e.target)) {
+            userMenu.classList.remove('active');
+        }
+    });
+}
+
+// Global function to switch tabs
+function showTab(tabName) {
+    const navTabs = document.querySelectorAll('.nav-tab a');
+    const tabContents = document.querySelectorAll('.tab-content');
+
+    // Remove active class from all tabs and contents
+    navTabs.forEach(t => t.classList.remove('active'));
+    tabContents.forEach(c => c.classList.remove('active'));
+
+    // Add active class to target tab
+    const targetTab = document.querySelector(`[data-tab="${tabName}"]`);
+    if (targetTab) {
+        targetTab.classList.add('active');
+        document.getElementById(tabName).classList.add('active');
+    }
+}
+
+// Tab functionality
+const navTabs = document.querySelectorAll('.nav-tab a[data-tab]');
+navTabs.forEach(tab => {
+    tab.addEventListener('click', function(e) {
+        e.preventDefault();
+
+        // Remove active class from all tabs and contents
+        navTabs.forEach(t => t.classList.remove('active'));
+        document.querySelectorAll('.tab-content').forEach(c => c.classList.remove('active'));
+
+        // Add active class to clicked tab
+        this.classList.add('active');
+
+        // Show corresponding content
+        const targetTab = this.getAttribute('data-tab');
+        document.getElementById(targetTab).classList.add('active');
+    });
+});
+
+// File upload preview functionality
+document.addEventListener('DOMContentLoaded', function() {
+    const fileInput = document.getElementById(profilePictureFieldId);
+    const filePreview = document.getElementById('file-preview');
+
+    if (fileInput && filePreview) {
+        fileInput.addEventListener('change', function(e) {
+            const file = e.target.files[0];
+            if (file) {
+                const reader = new FileReader();
+                reader.onload = function(e) {
+                    filePreview.innerHTML = `<img src="${e.target.result}" alt="Profile preview">`;
+                };
+                reader.readAsDataURL(file);
+            }
+        });
+    }
+
+    // Form submission loading state
+    const forms = document.querySelectorAll('form');
+    forms.forEach(form => {
+        form.addEventListener('submit', function(e) {
+            const submitBtn = this.querySelector('button[type="submit"]');
+            if (submitBtn) {
+                submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Saving...';
+                submitBtn.disabled = true;
+
+                // Re-enable button after 5 seconds in case of error
+                setTimeout(() => {
+                    submitBtn.innerHTML = '<i class="fas fa-save"></i> Save Changes';
+                    submitBtn.disabled = false;
+                }, 5000);
+            }
+        });
+    });
+});
+
+// Function to show success message
+function showSuccessMessage(message) {
+    const alertDiv = document.createElement('div');
+    alertDiv.className = 'alert alert-success';
+    alertDiv.innerHTML = `<i class="fas fa-check-circle"></i> ${message}`;
+    alertDiv.style.animation = 'slideIn 0.3s ease';
+
+    const mainContent = document.querySelector('.profile-main');
+    mainContent.insertBefore(alertDiv, mainContent.firstChild);
+
+    // Auto remove after 5 seconds
+    setTimeout(() => {
+        alertDiv.style.animation = 'slideOut 0.3s ease';
+        setTimeout(() => {
+            if (alertDiv.parentNode) {
+                alertDiv.parentNode.removeChild(alertDiv);
+            }
+        }, 300);
+    }, 5000);
+}
+
+// Function to show error message
+function showErrorMessage(message) {
+    const alertDiv = document.createElement('div');
+    alertDiv.className = 'alert alert-error';
+    alertDiv.innerHTML = `<i class="fas fa-exclamation-circle"></i> ${message}`;
+    alertDiv.style.animation = 'slideIn 0.3s ease';
+
+    const mainContent = document.querySelector('.profile-main');
+    mainContent.insertBefore(alertDiv, mainContent.firstChild);
+
+    // Auto remove after 5 seconds
+    setTimeout(() => {
+        alertDiv.style.animation = 'slideOut 0.3s ease';
+        setTimeout(() => {
+            if (alertDiv.parentNode) {
+                alertDiv.parentNode.removeChild(alertDiv);
+            }
+        }, 300);
+    }, 5000);
+}
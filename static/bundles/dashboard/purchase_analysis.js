@@ -0,0 +1,107 @@
+document.addEventListener('DOMContentLoaded', function() {
+    console.log('Wallet page initialized');
+
+    // Initialize any wallet-specific functionality
+    initializeWallet();
+});
+
+function initializeWallet() {
+    // Add any initialization code here
+    console.log('Wallet functionality initialized');
+}
+
+function refreshWallet() {
+    const refreshBtn = document.getElementById('refreshBtn');
+    const icon = refreshBtn.querySelector('i');
+
+    // Show loading state
+    refreshBtn.classList.add('loading');
+    icon.className = 'fas fa-spinner fa-spin';
+
+    // Simulate API call
+    setTimeout(() => {
+        // Remove loading state
+        refreshBtn.classList.remove('loading');
+        icon.className = 'fas fa-sync-alt';
+
+        // Show success notification
+        showNotification('Wallet data refreshed successfully!', 'success');
+
+        // In a real implementation, this would update the data from the server
+        console.log('Wallet data refreshed');
+    }, 1500);
+}
+
+function filterTransactions() {
+    const filter = document.getElementById('transactionFilter').value;
+    const transactions = document.querySelectorAll('.transaction-item');
+
+    transactions.forEach(transaction => {
+        if (filter === 'all' || transaction.dataset.type === filter) {
+            transaction.style.display = 'flex';
+        } else {
+            transaction.style.display = 'none';
+        }
+    });
+}
+
+function setupPaymentMethod(method) {
+    // Redirect to payment method setup page
+    window.location.href = `/wallet/payment-methods/?method=${method}`;
+}
+
+function showTransferModal() {
+    document.getElementById('transferModal').style.display = 'flex';
+}
+
+function hideTransferModal() {
+    document.getElementById('transferModal').style.display = 'none';
+}
+
+function showNotification(message, type) {
+    // Remove existing notifications
+    const existingNotifications = document.querySelectorAll('.notification');
+    existingNotifications.forEach(notification => notification.remove());
+
+    // Create new notification
+    const notification = document.createElement('div');
+    notification.className = `notification ${type}`;
+    notification.textContent = message;
+
+    document.body.appendChild(notification);
+
+    // Auto remove after 3 seconds
+    setTimeout(() => {
+        if (notification.parentNode) {
+            notification.parentNode.removeChild(notification);
+        }
+    }, 3000);
+}
+
+// Auto-refresh wallet data every 30 seconds
+setInterval(() => {
+    console.log('Auto-refreshing wallet data...');
+    // In a real implementation, this would fetch updated data from the server
+}, 30000);
+
+// Handle page visibility changes
+document.addEventListener('visibilitychange', function() {
+    if (!document.hidden) {
+        // Page became visible, refresh data
+        refreshWallet();
+    }
+});
+
+// Keyboard shortcuts
+document.addEventListener('keydown', function(e) {
+    // Ctrl+R or Cmd+R to refresh
+    if ((e.ctrlKey || e.metaKey) && e.key === 'r') {
+        e.preventDefault();
+        refreshWallet();
+    }
+
+    // Escape key to close modals
+    if (e.key === 'Escape') {
+        hideTransferModal();
+    }
+});
@@ -0,0 +1,58 @@
+// Add data labels for mobile responsive table
+document.addEventListener('DOMContentLoaded', function() {
+    const tableCells = document.querySelectorAll('.transactions-table td');
+    const tableHeaders = document.querySelectorAll('.transactions-table th');
+
+    tableCells.forEach((cell, index) => {
+        const headerIndex = index % tableHeaders.length;
+        if (tableHeaders[headerIndex]) {
+            cell.setAttribute('data-label', tableHeaders[headerIndex].textContent);
+        }
+    });
+});
+
+// Add hover effects and animations
+document.addEventListener('DOMContentLoaded', function() {
+    const tableRows = document.querySelectorAll('.transactions-table tbody tr');
+
+    tableRows.forEach(row => {
+        row.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateX(4px)';
+        });
+
+        row.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateX(0)';
+        });
+    });
+
+    // Add loading animation for summary cards
+    const summaryCards = document.querySelectorAll('.summary-card');
+    summaryCards.forEach((card, index) => {
+        card.style.animationDelay = `${index * 0.1}s`;
+        card.style.animation = 'fadeInUp 0.6s ease-out';
+    });
+});
+
+// Add CSS animations
+const style = document.createElement('style');
+style.textContent = `
+    @keyframes fadeInUp {
+        from {
+            opacity: 0;
+            transform: translateY(20px);
+        }
+        to {
+            opacity: 1;
+            transform: translateY(0);
+        }
+    }
+
+    .summary-card {
+        animation: fadeInUp 0.6s ease-out;
+    }
+
+    .transactions-table tbody tr {
+        animation: fadeInUp 0.4s ease-out;
+    }
+`;
+document.head.appendChild(style);
@@ -0,0 +1,37 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Add interactive hover effects
+    const insightCards = document.querySelectorAll('.insight-card');
+    insightCards.forEach(card => {
+        card.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-4px)';
+            this.style.boxShadow = '0 8px 25px rgba(240, 185, 11, 0.15)';
+        });
+        card.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0)';
+            this.style.boxShadow = 'none';
+        });
+    });
+
+    // Add loading state to filter buttons
+    const filterForm = document.querySelector('form');
+    if (filterForm) {
+        filterForm.addEventListener('submit', function(e) {
+            const submitBtn = this.querySelector('button[type="submit"]');
+            if (submitBtn) {
+                submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Applying...';
+                submitBtn.disabled = true;
+            }
+        });
+    }
+
+    // Auto-submit form on filter change (optional)
+    const filterSelects = document.querySelectorAll('.filter-select');
+    filterSelects.forEach(select => {
+        select.addEventListener('change', function() {
+            // Uncomment the line below to auto-submit on filter change
+            // this.form.submit();
+        });
+    });
+
+    console.log('Market insights page initialized with Binance styling');
+});
@@ -0,0 +1,139 @@
+// Modal functions
+function showMpesaDepositModal() {
+    document.getElementById('mpesaDepositModal').style.display = 'flex';
+    document.body.style.overflow = 'hidden';
+    updateDepositUsdAmount();
+}
+
+function closeMpesaDepositModal() {
+    document.getElementById('mpesaDepositModal').style.display = 'none';
+    document.body.style.overflow = '';
+}
+
+function showMpesaWithdrawModal() {
+    document.getElementById('mpesaWithdrawModal').style.display = 'flex';
+    document.body.style.overflow = 'hidden';
+    updateWithdrawUsdAmount();
+}
+
+function closeMpesaWithdrawModal() {
+    document.getElementById('mpesaWithdrawModal').style.display = 'none';
+    document.body.style.overflow = '';
+}
+
+// Currency conversion functions
+function updateDepositUsdAmount() {
+    const kesInput = document.querySelector('#mpesaDepositForm input[name="amount"]');
+    const usdDisplay = document.getElementById('depositUsdAmount');
+
+    kesInput.addEventListener('input', function() {
+        const kesAmount = parseFloat(this.value) || 0;
+        const usdAmount = kesAmount / exchangeRate;
+        usdDisplay.textContent = usdAmount.toFixed(2);
+    });
+}
+
+function updateWithdrawUsdAmount() {
+    const kesInput = document.querySelector('#mpesaWithdrawForm input[name="amount"]');
+    const usdDisplay = document.getElementById('withdrawUsdAmount');
+
+    kesInput.addEventListener('input', function() {
+        const kesAmount = parseFloat(this.value) || 0;
+        const usdAmount = kesAmount / exchangeRate;
+        usdDisplay.textContent = usdAmount.toFixed(2);
+    });
+}
+
+// Calculate KES amounts for transactions
+function calculateTransactionKES() {
+    const kesElements = document.querySelectorAll('.transaction-kes');
+
+    kesElements.forEach(element => {
+        const usdAmount = parseFloat(element.getAttribute('data-amount')) || 0;
+        const kesAmount = usdAmount * exchangeRate;
+        element.textContent = Math.round(kesAmount);
+    });
+}
+
+// Close modals when clicking outside
+window.onclick = function(event) {
+    const depositModal = document.getElementById('mpesaDepositModal');
+    const withdrawModal = document.getElementById('mpesaWithdrawModal');
+
+    if (event.target === depositModal) {
+        closeMpesaDepositModal();
+    }
+    if (event.target === withdrawModal) {
+        closeMpesaWithdrawModal();
+    }
+}
+
+// Form submission handling
+document.getElementById('mpesaDepositForm').addEventListener('submit', function(e) {
+    e.preventDefault();
+    const amountInput = this.querySelector('input[name="amount"]');
+    const phoneInput = this.querySelector('input[name="phone_number"]');
+
+    // Validate amount
+    if (parseFloat(amountInput.value) < 1) {
+        alert('Please enter an amount greater than 0 KES');
+        return;
+    }
+
+    // Validate phone number
+    if (!phoneInput.value.trim()) {
+        alert('Please enter your M-Pesa number');
+        return;
+    }
+
+    // Show loading state
+    const submitBtn = this.querySelector('button[type="submit"]');
+    const originalText = submitBtn.textContent;
+    submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Processing...';
+    submitBtn.disabled = true;
+
+    // Submit form
+    this.submit();
+});
+
+document.getElementById('mpesaWithdrawForm').addEventListener('submit', function(e) {
+    e.preventDefault();
+    const amountInput = this.querySelector('input[name="amount"]');
+    const phoneInput = this.querySelector('input[name="phone_number"]');
+
+    // Validate amount
+    const amount = parseFloat(amountInput.value);
+    if (amount < 1) {
+        alert('Please enter an amount greater than 0 KES');
+        return;
+    }
+
+    // Check if amount exceeds balance
+    const maxAmount = parseFloat(balanceKes);
+    if (amount > maxAmount) {
+        alert('Withdrawal amount exceeds your available balance');
+        return;
+    }
+
+    // Validate phone number
+    if (!phoneInput.value.trim()) {
+        alert('Please enter your M-Pesa number');
+        return;
+    }
+
+    // Show loading state
+    const submitBtn = this.querySelector('button[type="submit"]');
+    const originalText = submitBtn.textContent;
+    submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Processing...';
+    submitBtn.disabled = true;
+
+    // Submit form
+    this.submit();
+});
+
+// Initialize currency conversion on page load
+document.addEventListener('DOMContentLoaded', function() {
+    updateDepositUsdAmount();
+    updateWithdrawUsdAmount();
+    calculateTransactionKES();
+});
@@ -0,0 +1,16 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const amountInput = document.getElementById('id_amount');
+    const maxAmount = parseFloat(walletBalance);
+
+    if (amountInput) {
+        amountInput.addEventListener('input', function() {
+            const currentAmount = parseFloat(this.value) || 0;
+
+            if (currentAmount > maxAmount) {
+                this.style.borderColor = '#ef4444';
+            } else {
+                this.style.borderColor = 'rgba(255, 255, 255, 0.2)';
+            }
+        });
+    }
+});